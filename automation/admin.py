@@ -1,6 +1,5 @@
 import csv
 from datetime import datetime
-from django.db.models import Q
 import json
 import logging
 from io import StringIO
@@ -15,7 +14,8 @@ import openpyxl
 from .models import (
     Country, CustomUser, Feedback, UserRole, Destination, Business,
     BusinessCategory, OpeningHours, AdditionalInfo, Image, Review,
-    ScrapingTask, Category, Level)
+    ScrapingTask, Category, Level, TranslationMemory)
+from .services.search import search_businesses
 
 logger = logging.getLogger(__name__)
 SITE_TYPES_CHOICES = [
@@ -289,10 +289,7 @@ class BusinessAdmin(admin.ModelAdmin):
             # Apply search if present
             search_term = request.GET.get('q')
             if search_term:
-                or_filter = Q()
-                for field in self.search_fields:
-                    or_filter |= Q(**{f"{field}__icontains": search_term})
-                qs = qs.filter(or_filter)
+                qs, _ = self.get_search_results(request, qs, search_term)
 
             try:
                 return self.export_queryset(qs, export_format)
@@ -304,6 +301,12 @@ class BusinessAdmin(admin.ModelAdmin):
 
         return super().changelist_view(request, extra_context)
 
+    def get_search_results(self, request, queryset, search_term):
+        """Use the indexed business search instead of icontains on every search field"""
+        if not search_term.strip():
+            return queryset, False
+        return search_businesses(queryset, search_term), False
+
     def level_title(self, obj):
         return obj.task.level.title if obj.task and obj.task.level else "No Level"
 
@@ -546,6 +549,14 @@ class FeedbackAdmin(admin.ModelAdmin):
     search_fields = ('business__title', 'content')
 
 
+@admin.register(TranslationMemory)
+class TranslationMemoryAdmin(admin.ModelAdmin):
+    list_display = ('source_text', 'target_language', 'prompt_version', 'hit_count', 'last_used_at')
+    list_filter = ('prompt_version', 'target_language')
+    search_fields = ('source_text', 'translated_text')
+    readonly_fields = ('key', 'hit_count', 'created_at', 'last_used_at')
+
+
 admin.site.register(OpeningHours)
 admin.site.register(AdditionalInfo)
 admin.site.register(Image)
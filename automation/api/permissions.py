@@ -1,5 +1,6 @@
 from rest_framework import permissions 
 from rest_framework.permissions import BasePermission, SAFE_METHODS
+from automation.services.permissions import get_permissions
 
 class IsAdminUser(permissions.BasePermission):
     """
@@ -9,7 +10,7 @@ class IsAdminUser(permissions.BasePermission):
         return bool(
             request.user and 
             request.user.is_authenticated and 
-            (request.user.is_superuser or request.user.roles.filter(role='ADMIN').exists())
+            get_permissions(request.user).is_admin
         )
 
 class IsAmbassadorUser(permissions.BasePermission):
@@ -20,7 +21,7 @@ class IsAmbassadorUser(permissions.BasePermission):
         return bool(
             request.user and 
             request.user.is_authenticated and 
-            request.user.roles.filter(role='AMBASSADOR').exists()
+            get_permissions(request.user).is_ambassador
         )
 
 class IsAdminOrAmbassador(permissions.BasePermission):
@@ -31,24 +32,15 @@ class IsAdminOrAmbassador(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
         
-        return bool(
-            request.user.is_superuser or 
-            request.user.roles.filter(role__in=['ADMIN', 'AMBASSADOR']).exists()
-        )
+        return get_permissions(request.user).is_admin_or_ambassador
 
 class HasDestinationPermission(permissions.BasePermission):
     """
     Permission class to check if user has access to specific destination data.
     """
     def has_object_permission(self, request, view, obj):
-        if request.user.is_superuser or request.user.roles.filter(role='ADMIN').exists():
-            return True
-            
-        if request.user.roles.filter(role='AMBASSADOR').exists():
-            # Check if the object's destination is in user's assigned destinations
-            return obj.destination in request.user.destinations.all()
-            
-        return False
+        # Admins pass; ambassadors only for their assigned destinations
+        return get_permissions(request.user).can_access_destination(obj.destination_id)
 
 class IsAuthenticatedOrReadOnly(BasePermission):
     """
@@ -1,5 +1,7 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from automation.models import ScrapingTask, Business, Image, Destination, CustomUser
+from automation.services.image_variants import VARIANT_WIDTHS, variant_url
 
 class DestinationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -25,6 +27,10 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['is_active', 'roles']
 
 class ImageSerializer(serializers.ModelSerializer):
+    # Smallest stored copies fit for a thumbnail and a card, as WebP
+    thumb_url = serializers.CharField(read_only=True)
+    medium_url = serializers.CharField(read_only=True)
+
     class Meta:
         model = Image
         fields = '__all__'
@@ -45,7 +51,45 @@ class BusinessSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Business
-        fields = '__all__'
+        exclude = ('search_text', 'search_vector')  # Search index columns
+
+# Model fields of the task detail card view
+BUSINESS_LIST_FIELDS = [
+    'id', 'title', 'translated_title', 'status', 'main_category', 'tailored_category',
+    'address', 'city', 'rating', 'reviews_count', 'form_destination_name', 'scraped_at',
+]
+
+class FirstImageMixin(serializers.Serializer):
+    """Inline only the first image, from the first_image_* queryset annotations."""
+    first_image = serializers.SerializerMethodField()
+
+    def get_first_image(self, obj):
+        image_url = getattr(obj, 'first_image_url', None)
+        thumbnail = getattr(obj, 'first_image_thumbnail', None)
+        local_path = getattr(obj, 'first_image_local_path', None)
+        variants = getattr(obj, 'first_image_variants', None)
+        if not image_url:
+            return None
+        return {
+            'image_url': variant_url(local_path, variants, VARIANT_WIDTHS['medium'], webp=True, fallback=image_url),
+            'thumbnail': variant_url(
+                local_path, variants, VARIANT_WIDTHS['thumb'], webp=True,
+                fallback=default_storage.url(thumbnail) if thumbnail else None,
+            ),
+        }
+
+class BusinessListSerializer(FirstImageMixin, serializers.ModelSerializer):
+    has_description = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Business
+        fields = BUSINESS_LIST_FIELDS + ['has_description', 'first_image']
+
+class BusinessEditSerializer(FirstImageMixin, BusinessSerializer):
+    images = None
+
+    class Meta(BusinessSerializer.Meta):
+        pass
  
 class DashboardStatsSerializer(serializers.Serializer):
     total_projects = serializers.IntegerField()
@@ -1,16 +1,15 @@
 #automation/api/views.py
 from datetime import timedelta
 from datetime import datetime
-from math import ceil
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count, Q, Prefetch
+from django.db.models import Count, Q, Prefetch, Value
 from django.utils import timezone  
 from django.conf import settings
-from django.db.models.functions import TruncDate
+from django.db.models.functions import Coalesce, TruncDate
 import logging 
 from automation.api.permissions import IsAdminOrAmbassador, IsAdminUser
 from automation.models import (Category, Country, CustomUser,Destination, ScrapingTask, Business, Image)
@@ -23,6 +22,12 @@ from rest_framework import status
 from django.utils import timezone
 from .serializers import (DashboardStatsSerializer, TimelineDataSerializer, BusinessStatusSerializer, DashboardDataSerializer)
 from automation.services.dashboard_service import DashboardService  
+from automation.services.permissions import get_permissions
+from automation.services.pagination import count_rows, paginate, parse_count_mode, parse_page_size, stable_ordering
+from automation.services.search import RELEVANCE_ORDERING, search_businesses
+from automation.services.task_queue import get_task_progress
+from automation.services.task_detail import get_task_businesses_page, get_task_detail
+from django.core.exceptions import PermissionDenied
 from django.core.serializers.json import DjangoJSONEncoder 
 import json
 from django.contrib.auth import get_user_model
@@ -31,6 +36,9 @@ import logging
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Largest ?limit= a listing endpoint serves per page
+LISTING_MAX_PAGE_SIZE = getattr(settings, 'LISTING_MAX_PAGE_SIZE', 200)
+
 #Businesses#Businesses#Businesses
 class BusinessViewSet(viewsets.ModelViewSet):
     serializer_class = BusinessSerializer
@@ -44,12 +52,12 @@ class BusinessViewSet(viewsets.ModelViewSet):
         - Ambassador: Only in their destinations
         - Others: none
         """
-        user = self.request.user
-        if user.is_superuser or user.roles.filter(role='ADMIN').exists():
+        permissions = get_permissions(self.request.user)
+        if permissions.is_admin:
             return Business.objects.filter(is_deleted=False)
-        elif user.roles.filter(role='AMBASSADOR').exists():
+        elif permissions.is_ambassador:
             return Business.objects.filter(
-                form_destination_id__in=user.destinations.values_list('id', flat=True),
+                form_destination_id__in=permissions.destination_ids,
                 is_deleted=False
             )
         else:
@@ -59,6 +67,9 @@ class BusinessViewSet(viewsets.ModelViewSet):
     def advanced_filter(self, request):
         """
         GET /api/businesses/advanced_filter/?status=IN_PRODUCTION&destination_id=1&destination_id=5&task=146
+
+        Pages through results with ?cursor=<next_cursor|previous_cursor>&limit=12.
+        ?count=exact|approx|none picks how the first page counts the total.
         """
         try:
             queryset = self.get_queryset()
@@ -71,23 +82,14 @@ class BusinessViewSet(viewsets.ModelViewSet):
             date_from = request.query_params.get('date_from', '')
             date_to = request.query_params.get('date_to', '')
             sort_by = request.query_params.get('sort_by', '-scraped_at')
-            page = int(request.query_params.get('page', 1))
-            limit = int(request.query_params.get('limit', 12))
-
-            if page < 1: 
-                page = 1
-            if limit < 1: 
-                limit = 12
+            cursor = request.query_params.get('cursor') or None
+            limit = parse_page_size(request.query_params.get('limit'), 12, LISTING_MAX_PAGE_SIZE)
+            count_mode = parse_count_mode(request.query_params.get('count'))
 
             # 2) Search functionality
             search = request.query_params.get('search', '').strip()
             if search:
-                queryset = queryset.filter(
-                    Q(title__icontains=search) |
-                    Q(description__icontains=search) |
-                    Q(destination__name__icontains=search) |
-                    Q(country__icontains=search)
-                )
+                queryset = search_businesses(queryset, search)
 
             # 2a) statuses => filter(status__in=[...])
             if statuses:
@@ -133,30 +135,35 @@ class BusinessViewSet(viewsets.ModelViewSet):
             # 3) Sorting 
             # check if sort_by references real fields like: '-scraped_at', 'title', '-title', 'status' ...
             valid_sorts = ['scraped_at', '-scraped_at', 'title', '-title', 'status', '-status', 'rank', '-rank']
-            if sort_by not in valid_sorts:
-                sort_by = '-scraped_at'
-            queryset = queryset.order_by(sort_by)
-
-            # 4) Pagination
-            total_count = queryset.count()
-            total_pages = ceil(total_count / limit) if total_count else 1
-            if page > total_pages:
-                page = total_pages
-            offset = (page - 1) * limit
-            results = queryset[offset : offset + limit]
+            if sort_by == 'relevance' and search:
+                ordering = RELEVANCE_ORDERING
+            else:
+                if sort_by not in valid_sorts:
+                    sort_by = '-scraped_at'
+                ordering = stable_ordering(sort_by)
+
+            # 4) Keyset pagination; the total is only counted for the first page
+            total_count, approximate = count_rows(queryset, count_mode) if not cursor else (None, False)
+            page = paginate(queryset, ordering, cursor, limit)
 
             # 5) Serialize
-            serializer = self.get_serializer(results, many=True)
+            serializer = self.get_serializer(page.items, many=True)
             data = serializer.data
 
             return Response({
                 'status': 'success',
                 'data': data,
                 'total_count': total_count,
-                'page': page,
-                'total_pages': total_pages
+                'count_is_approximate': approximate,
+                'limit': limit,
+                **page.as_dict(),
             })
 
+        except ValueError as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error in advanced_filter: {str(e)}", exc_info=True)
             return Response({
@@ -307,11 +314,10 @@ class BusinessFilterView(APIView):
 
     def get(self, request):
         try:
-            # 1️⃣ Pagination Parameters
-            page = int(request.GET.get("page", 1))
-            limit = int(request.GET.get("limit", 12))
-            page = max(page, 1)
-            limit = max(limit, 1)
+            # 1️⃣ Pagination Parameters (keyset cursors, see services/pagination.py)
+            cursor = request.GET.get("cursor") or None
+            limit = parse_page_size(request.GET.get("limit"), 12, LISTING_MAX_PAGE_SIZE)
+            count_mode = parse_count_mode(request.GET.get("count"))
 
             # 2️⃣ Collect Filter Parameters
             search = request.GET.get("search", "").strip()
@@ -347,40 +353,43 @@ class BusinessFilterView(APIView):
                 "status": "status",
                 "-status": "-status",
             }
-            sort_by = sort_map.get(sort_by, "-scraped_at")
-            queryset = queryset.order_by(sort_by)
+            if sort_by == "relevance" and search:
+                ordering = RELEVANCE_ORDERING
+            else:
+                ordering = stable_ordering(sort_map.get(sort_by, "-scraped_at"))
 
             # 6️⃣ Pagination
-            total_count = queryset.count()
-            total_pages = ceil(total_count / limit) if total_count > 0 else 1
-            page = min(page, total_pages)
-            offset = (page - 1) * limit
-            businesses = queryset[offset : offset + limit]
+            total_count, approximate = count_rows(queryset, count_mode) if not cursor else (None, False)
+            page = paginate(queryset, ordering, cursor, limit)
 
             # 7️⃣ Serialize Data (includes full business details)
-            serialized_data = BusinessSerializer(businesses, many=True).data
+            serialized_data = BusinessSerializer(page.items, many=True).data
 
             return Response(
                 {
                     "status": "success",
                     "data": serialized_data,
                     "total_count": total_count,
-                    "page": page,
-                    "total_pages": total_pages,
+                    "count_is_approximate": approximate,
+                    "limit": limit,
+                    **page.as_dict(),
                 }
             )
 
+        except ValueError as e:
+            return Response({"status": "error", "message": str(e)}, status=400)
         except Exception as e:
             logger.error(f"Error in BusinessFilterView: {str(e)}", exc_info=True)
             return Response({"status": "error", "message": str(e)}, status=500)
 
     def get_business_queryset(self, user):
         """Replicates logic from BusinessViewSet"""
-        if user.is_superuser or user.roles.filter(role="ADMIN").exists():
+        permissions = get_permissions(user)
+        if permissions.is_admin:
             return Business.objects.filter(is_deleted=False)
-        elif user.roles.filter(role="AMBASSADOR").exists():
+        elif permissions.is_ambassador:
             return Business.objects.filter(
-                form_destination_id__in=user.destinations.values_list("id", flat=True),
+                form_destination_id__in=permissions.destination_ids,
                 is_deleted=False,
             )
         else:
@@ -389,14 +398,9 @@ class BusinessFilterView(APIView):
     def apply_filters(self, queryset, search="", category_id="", destination_id="", date_from="", date_to="", status_filter=""):
         """Filters businesses based on search, category, destination, dates, and status"""
 
-        # 🔍 Improved Search Query
+        # 🔍 Indexed, accent-insensitive search (services/search.py)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(description__icontains=search) |  # Search in descriptions
-                Q(destination__name__icontains=search) |
-                Q(country__icontains=search)
-            )
+            queryset = search_businesses(queryset, search)
 
         # 🔹 Filter by Category
         if category_id:
@@ -516,99 +520,29 @@ class TaskViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser or user.roles.filter(role='ADMIN').exists():
+        permissions = get_permissions(self.request.user)
+        if permissions.is_admin:
             return ScrapingTask.objects.all()
-        elif user.roles.filter(role='AMBASSADOR').exists():
-            ambassador_destinations = user.destinations.all()
+        elif permissions.is_ambassador:
             return ScrapingTask.objects.filter(
-                businesses__form_destination_id__in=ambassador_destinations
+                businesses__form_destination_id__in=permissions.destination_ids
             ).distinct()
         return ScrapingTask.objects.none()
 
     @action(detail=True, methods=['get'], url_path='detailed_view')
     def detailed_view(self, request, pk=None):
         try:
-            user = request.user
-            task = get_object_or_404(ScrapingTask, pk=pk)
-            
-            # Check permissions and get appropriate business queryset
-            if user.is_superuser or user.roles.filter(role='ADMIN').exists():
-                # Admins see all businesses
-                businesses = Business.objects.filter(
-                    task=task,
-                    is_deleted=False
-                ).prefetch_related('images')
-            elif user.roles.filter(role='AMBASSADOR').exists():
-                # Ambassadors see only their assigned destinations
-                ambassador_destinations = user.destinations.all()
-                businesses = Business.objects.filter(
-                    task=task,
-                    is_deleted=False,
-                    form_destination_id__in=ambassador_destinations
-                ).prefetch_related('images')
-            else:
-                return Response(
-                    {'error': 'Permission denied'},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-
-            # Calculate status counts for all statuses
-            status_counts = {}
-            total_businesses = businesses.count()
-            for status_code, status_name in Business.STATUS_CHOICES:
-                count = businesses.filter(status=status_code).count()
-                status_counts[status_code] = {
-                    'count': count,
-                    'name': status_name,
-                    'percentage': (count / total_businesses * 100) if total_businesses > 0 else 0
-                }
-
-            # Calculate empty descriptions (excluding discarded)
-            empty_descriptions = businesses.exclude(
-                status='DISCARDED'
-            ).filter(
-                Q(description__isnull=True) |
-                Q(description='') |
-                Q(description='None') |
-                Q(description__exact='No description Available')
-            ).count()
-
-            # Get navigation tasks based on user role
-            if user.is_superuser or user.roles.filter(role='ADMIN').exists():
-                base_task_queryset = ScrapingTask.objects.all()
-            else:
-                ambassador_destinations = user.destinations.all()
-                base_task_queryset = ScrapingTask.objects.filter(
-                    businesses__form_destination_id__in=ambassador_destinations
-                ).distinct()
-
-            previous_task = base_task_queryset.filter(id__lt=task.id).order_by('-id').first()
-            next_task = base_task_queryset.filter(id__gt=task.id).order_by('id').first()
-
-            # Prepare response data
-            response_data = {
-                'task': TaskSerializer(task).data,
-                'businesses': BusinessSerializer(businesses, many=True).data,
-                'status_counts': status_counts,
-                'total_businesses': total_businesses,
-                'empty_descriptions': empty_descriptions,
-                'navigation': {
-                    'previous_task': TaskSerializer(previous_task).data if previous_task else None,
-                    'next_task': TaskSerializer(next_task).data if next_task else None,
-                },
-                'status_choices': Business.STATUS_CHOICES,
-                'user_permissions': {
-                    'is_admin': user.is_superuser or user.roles.filter(role='ADMIN').exists(),
-                    'is_ambassador': user.roles.filter(role='AMBASSADOR').exists(),
-                    'can_edit': user.is_superuser or user.roles.filter(role__in=['ADMIN', 'AMBASSADOR']).exists(),
-                    'can_delete': user.is_superuser or user.roles.filter(role='ADMIN').exists(),
-                    'can_move_to_production': user.is_superuser or user.roles.filter(role='ADMIN').exists(),
-                }
-            }
-
-            return Response(response_data)
-
+            return Response(get_task_detail(pk, request.user))
+        except ScrapingTask.DoesNotExist:
+            return Response(
+                {'error': 'Task not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except PermissionDenied:
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
         except Exception as e:
             logger.error(f"Error in detailed_view for task {pk}: {str(e)}", exc_info=True)
             return Response(
@@ -616,6 +550,52 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['get'], url_path='businesses')
+    def businesses_page(self, request, pk=None):
+        """
+        Lean task detail: counts on the first page, then keyset pages of
+        businesses. Query params: view=list|full, cursor, page_size, status.
+        """
+        try:
+            return Response(get_task_businesses_page(
+                pk,
+                request.user,
+                projection=request.query_params.get('view', 'list'),
+                cursor=request.query_params.get('cursor') or None,
+                page_size=request.query_params.get('page_size'),
+                status=request.query_params.get('status') or None,
+            ))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ScrapingTask.DoesNotExist:
+            return Response(
+                {'error': 'Task not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except PermissionDenied:
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        except Exception as e:
+            logger.error(f"Error in businesses_page for task {pk}: {str(e)}", exc_info=True)
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @action(detail=True, methods=['get'], url_path='status')
+    def progress(self, request, pk=None):
+        """Queue position and progress of a task, polled after submission."""
+        task = get_object_or_404(ScrapingTask, pk=pk)
+        # Owners can follow their own tasks before any business is gathered
+        if task.user_id != request.user.id and not self.get_queryset().filter(pk=task.pk).exists():
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(get_task_progress(task))
+
     @action(detail=False, methods=['GET'], url_path='list')
     def list_custom(self, request):
         tasks = self.queryset.order_by('-id')
@@ -654,9 +634,9 @@ class RecentTasksView(APIView):
             )
 
             # Filter based on user role
-            if not request.user.is_superuser and not request.user.roles.filter(role='ADMIN').exists():
-                ambassador_destinations = request.user.destinations.all()
-                queryset = queryset.filter(destination__in=ambassador_destinations)
+            permissions = get_permissions(request.user)
+            if not permissions.is_admin:
+                queryset = queryset.filter(destination_id__in=permissions.destination_ids)
 
             recent_tasks = queryset.order_by('-created_at')[:limit]
 
@@ -708,10 +688,10 @@ class TaskFilterOptionsView(APIView):
     def get(self, request):
         try:
             # For ambassadors, filter destinations
-            if not request.user.is_superuser and not request.user.roles.filter(role='ADMIN').exists():
-                ambassador_destinations = request.user.destinations.all()
-                destinations = ambassador_destinations
-                tasks = ScrapingTask.objects.filter(destination__in=ambassador_destinations)
+            permissions = get_permissions(request.user)
+            if not permissions.is_admin:
+                destinations = Destination.objects.filter(id__in=permissions.destination_ids)
+                tasks = ScrapingTask.objects.filter(destination_id__in=permissions.destination_ids)
             else:
                 destinations = Destination.objects.all()
                 tasks = ScrapingTask.objects.all()
@@ -748,20 +728,21 @@ class TaskFilterOptionsView(APIView):
 class TaskFilterView(APIView):
     """
     Endpoint to filter tasks based on various criteria.
-    Also supports pagination via ?page=1&limit=12 (both optional).
+    Pages with keyset cursors via ?cursor=<next_cursor|previous_cursor>&limit=12
+    (both optional); ?count=exact|approx|none picks how the total is counted.
     """
+    SORT_FIELDS = ('created_at', '-created_at', 'project_title', '-project_title', 'status', '-status')
+    # Keyset seeks cannot compare with NULL: nullable sort fields go through a non-null key
+    SORT_KEYS = {'project_title': 'project_title_key'}
     permission_classes = [IsAdminOrAmbassador]
     serializer_class = ProjectSerializer
 
     def get(self, request):
         try:
             # 1. Read pagination params (with defaults)
-            page = int(request.GET.get('page', 1))
-            limit = int(request.GET.get('limit', 12))
-            if page < 1:
-                page = 1
-            if limit < 1:
-                limit = 12
+            cursor = request.GET.get('cursor') or None
+            limit = parse_page_size(request.GET.get('limit'), 12, LISTING_MAX_PAGE_SIZE)
+            count_mode = parse_count_mode(request.GET.get('count'))
 
             # 2. Collect filter parameters
             filters = {
@@ -782,43 +763,44 @@ class TaskFilterView(APIView):
             ).prefetch_related('businesses')
 
             # Ambassador restrictions
-            if not request.user.is_superuser and not request.user.roles.filter(role='ADMIN').exists():
-                ambassador_destinations = request.user.destinations.all()
-                queryset = queryset.filter(destination__in=ambassador_destinations)
+            permissions = get_permissions(request.user)
+            if not permissions.is_admin:
+                queryset = queryset.filter(destination_id__in=permissions.destination_ids)
 
             # 4. Apply filters (search, user, category, etc.)
             queryset = self.apply_filters(queryset, filters)
 
-            # 5. Annotate with business_count
-            queryset = queryset.annotate(business_count=Count('businesses', distinct=True))
-
-            # 6. Count total after filtering
-            total_count = queryset.count()
+            # 5. Count total after filtering, on the first page only
+            total_count, approximate = count_rows(queryset, count_mode) if not cursor else (None, False)
 
-            # 7. Calculate total_pages
-            total_pages = ceil(total_count / limit) if total_count > 0 else 1
-
-            # Clamp page
-            if page > total_pages and total_pages > 0:
-                page = total_pages
-
-            # 8. Offset and slice
-            offset = (page - 1) * limit
-            queryset = queryset[offset : offset + limit]
+            # 6. Annotate with business_count and seek to the page
+            queryset = queryset.annotate(
+                business_count=Count('businesses', distinct=True),
+                project_title_key=Coalesce('project_title', Value('')),
+            )
+            sort_by = filters['sort_by'] if filters['sort_by'] in self.SORT_FIELDS else '-created_at'
+            sort_key = self.SORT_KEYS.get(sort_by.lstrip('-'), sort_by.lstrip('-'))
+            sort_by = f"-{sort_key}" if sort_by.startswith('-') else sort_key
+            page = paginate(queryset, stable_ordering(sort_by), cursor, limit)
 
-            # 9. Serialize
-            serializer = self.serializer_class(queryset, many=True)
+            # 7. Serialize
+            serializer = self.serializer_class(page.items, many=True)
 
-            # 10. Return response with pagination info
+            # 8. Return response with pagination info
             return Response({
                 'status': 'success',
                 'data': serializer.data,
                 'total_count': total_count,
-                'page': page,
-                'total_pages': total_pages,
-                'limit': limit
+                'count_is_approximate': approximate,
+                'limit': limit,
+                **page.as_dict(),
             })
 
+        except ValueError as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error in TaskFilterView: {str(e)}", exc_info=True)
             return Response({
@@ -872,8 +854,7 @@ class TaskFilterView(APIView):
             date_to = datetime.strptime(filters['date_to'], '%Y-%m-%d')
             queryset = queryset.filter(created_at__lte=date_to)
 
-        # Sort by
-        return queryset.order_by(filters['sort_by'])
+        return queryset
    
 class TaskTimelineView(APIView):
     def get(self, request):
@@ -1159,10 +1140,10 @@ class RecentProjectsView(APIView):
             ).prefetch_related('businesses')
 
             # Filter based on user role
-            if not request.user.is_superuser and not request.user.roles.filter(role='ADMIN').exists():
+            permissions = get_permissions(request.user)
+            if not permissions.is_admin:
                 # For ambassadors, filter by their destinations
-                ambassador_destinations = request.user.destinations.all()
-                queryset = queryset.filter(destination__in=ambassador_destinations)
+                queryset = queryset.filter(destination_id__in=permissions.destination_ids)
 
             recent_projects = queryset.order_by('-created_at')[:limit]
             
@@ -1259,10 +1240,11 @@ class AmbassadorDataView(APIView):
             }
             
             # Get ambassador's destinations
-            if user.is_superuser or user.roles.filter(role='ADMIN').exists():
+            permissions = get_permissions(user)
+            if permissions.is_admin:
                 destinations = Destination.objects.all()
             else:
-                destinations = user.destinations.all()
+                destinations = Destination.objects.filter(id__in=permissions.destination_ids)
             
             # Get tasks for these destinations
             tasks = ScrapingTask.objects.filter(
@@ -1352,14 +1334,13 @@ class AmbassadorDataView(APIView):
 
     def get_queryset(self):
         """Helper method to get filtered queryset based on user role"""
-        user = self.request.user
+        permissions = get_permissions(self.request.user)
         
-        if user.is_superuser or user.roles.filter(role='ADMIN').exists():
+        if permissions.is_admin:
             return ScrapingTask.objects.all()
             
-        ambassador_destinations = user.destinations.all()
         return ScrapingTask.objects.filter(
-            destination__in=ambassador_destinations
+            destination_id__in=permissions.destination_ids
         )
 
 class DestinationListAPI(APIView):
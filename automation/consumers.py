@@ -1,21 +1,27 @@
 import json
-import os
+from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
 from asgiref.sync import sync_to_async
-from django.conf import settings
 from .models import ScrapingTask
-import asyncio
-
-def get_log_file_path(task_id):
-    return os.path.join(settings.MEDIA_ROOT, f'task_logs_{task_id}.txt')
+from .services.log_stream import FINAL_STATUSES, read_log, task_group_name
 
 
 class LogConsumer(AsyncWebsocketConsumer):
+    """
+    Streams a task's log to the browser. The scraping task pushes new lines
+    and status changes to the task's group (services/log_stream.py); this
+    consumer only forwards them, so nothing here polls the DB or the file.
+
+    Messages carry byte offsets into the log. A client reconnecting with
+    ``?offset=<next_offset>`` gets only what it missed, read once from the
+    file, and then the live lines.
+    """
+
     async def connect(self):
         self.task_id = self.scope['url_route']['kwargs']['task_id']
-        self.task_group_name = f'task_{self.task_id}'
+        self.task_group_name = task_group_name(self.task_id)
 
-        # Join task group
+        # Join the group first so no line is lost between backlog and live stream
         await self.channel_layer.group_add(
             self.task_group_name,
             self.channel_name
@@ -23,11 +29,12 @@ class LogConsumer(AsyncWebsocketConsumer):
 
         await self.accept()
 
-        # Start sending logs
-        asyncio.create_task(self.send_logs())
+        self.next_offset = 0
+        await self.send_backlog(self.requested_offset())
 
-        # Start periodic status updates
-        self.status_update_task = asyncio.create_task(self.periodic_status_update())
+        status = await self.get_task_status()
+        if status:
+            await self.send_status_update(status)
 
     async def disconnect(self, close_code):
         # Leave task group
@@ -35,52 +42,63 @@ class LogConsumer(AsyncWebsocketConsumer):
             self.task_group_name,
             self.channel_name
         )
-        if hasattr(self, 'status_update_task'):
-            self.status_update_task.cancel()
 
-    async def send_logs(self):
-        while True:
-            task = await sync_to_async(ScrapingTask.objects.get)(id=self.task_id)
-            if task.status in ['COMPLETED', 'FAILED']:
-                break
+    async def receive(self, text_data):
+        pass
 
-            logs = await self.get_latest_logs(task)
-            if logs:
-                await self.send(text_data=json.dumps({
-                    'logs': logs
-                }))
+    def requested_offset(self):
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        try:
+            return max(int(query.get('offset', ['0'])[0]), 0)
+        except ValueError:
+            return 0
 
-            await asyncio.sleep(1)  # Wait for 1 second before checking again
+    async def send_backlog(self, offset):
+        backlog = await sync_to_async(read_log)(self.task_id, offset)
+        if backlog['lines']:
+            await self.send_lines(backlog['lines'], backlog['offset'], backlog['next_offset'])
+        self.next_offset = max(self.next_offset, backlog['next_offset'])
 
-    @sync_to_async
-    def get_latest_logs(self, task):
-        log_file_path = get_log_file_path(task.id)
-        if not os.path.exists(log_file_path):
-            return ""
-        
-        with open(log_file_path, 'r') as file:
-            file.seek(0, 2)  # Move to the end of the file
-            if file.tell() > 1024 * 100:  # If file is larger than 100KB
-                file.seek(-1024 * 100, 2)  # Move 100KB back from the end
-            else:
-                file.seek(0)
-            return file.read()
-    
-    async def receive(self, text_data):
-        pass
+    async def send_lines(self, lines, offset, next_offset):
+        await self.send(text_data=json.dumps({
+            'type': 'log_lines',
+            'lines': lines,
+            'offset': offset,
+            'next_offset': next_offset,
+        }))
+
+    async def log_lines(self, event):
+        """Group handler for 'log.lines' messages published by the task."""
+        offset, next_offset, lines = event['offset'], event['next_offset'], event['lines']
+        if next_offset <= self.next_offset:
+            return  # Already sent with the backlog
+        if offset > self.next_offset:
+            # A batch went missing (e.g. dropped by the channel layer); catch up from the file
+            await self.send_backlog(self.next_offset)
+            return
+        if offset < self.next_offset:
+            # Overlaps the backlog: skip the lines already sent
+            while lines and offset < self.next_offset:
+                offset += len(lines[0].encode('utf-8')) + 1
+                lines = lines[1:]
+        if lines:
+            await self.send_lines(lines, offset, next_offset)
+        self.next_offset = next_offset
 
-    async def periodic_status_update(self):
-        while True:
-            await asyncio.sleep(5)  # Update every 5 seconds
-            task = await self.get_task()
-            await self.send_status_update(task.status)
+    async def task_status(self, event):
+        """Group handler for 'task.status' messages."""
+        await self.send_status_update(event['status'])
 
     async def send_status_update(self, status):
         await self.send(text_data=json.dumps({
             'type': 'status_update',
-            'status': status
+            'status': status,
+            'final': status in FINAL_STATUSES,
         }))
 
     @sync_to_async
-    def get_task(self):
-        return ScrapingTask.objects.get(id=self.task_id)
\ No newline at end of file
+    def get_task_status(self):
+        # Once per connection; later changes are pushed
+        if not str(self.task_id).isdigit():
+            return None
+        return ScrapingTask.objects.filter(id=self.task_id).values_list('status', flat=True).first()
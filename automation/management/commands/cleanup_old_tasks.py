@@ -0,0 +1,43 @@
+# management/commands/cleanup_old_tasks.py
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from automation.services import storage_gc
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Delete the stored files of old scraping tasks and soft-delete the tasks, businesses and images"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'TASK_RETENTION_DAYS', 30),
+                            help='Delete tasks created more than this many days ago (default: %(default)s)')
+        parser.add_argument('--chunk-size', type=int, default=storage_gc.TASK_CHUNK_SIZE,
+                            help='Tasks per batch (default: %(default)s)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report what would be deleted and how many bytes it would free')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        report = storage_gc.collect_old_tasks(
+            older_than_days=options['days'],
+            dry_run=dry_run,
+            chunk_size=max(1, options['chunk_size']),
+        )
+
+        action = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(
+            f"{action} {report['tasks']} tasks, {report['businesses']} businesses, "
+            f"{report['images']} images and {report['objects']} stored objects "
+            f"({report['bytes'] / (1024 * 1024):.1f} MB)"
+        )
+        if report['published_tasks_kept']:
+            self.stdout.write(f"Kept {report['published_tasks_kept']} old tasks with businesses in production")
+        if not dry_run and report['deleted_objects'] != report['objects']:
+            self.stdout.write(self.style.WARNING(
+                f"{report['objects'] - report['deleted_objects']} objects could not be deleted; see the log"
+            ))
+        logger.info(f"cleanup_old_tasks {'dry run' if dry_run else 'run'}: {report}")
@@ -0,0 +1,72 @@
+# management/commands/fingerprint_images.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from automation.models import Image
+from automation.services.image_fingerprint import fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def _fingerprint_stored(row):
+    pk, local_path = row
+    try:
+        with default_storage.open(local_path, 'rb') as stored:
+            return pk, fingerprint(stored.read())
+    except Exception as e:
+        logger.warning(f"Could not fingerprint image {pk} ({local_path}): {str(e)}")
+        return pk, None
+
+
+class Command(BaseCommand):
+    help = "Compute content and perceptual hashes for stored images, reading them in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Images per batch (default: %(default)s)')
+        parser.add_argument('--workers', type=int, default=getattr(settings, 'IMAGE_FETCH_WORKERS', 6),
+                            help='Images read and hashed at once (default: %(default)s)')
+        parser.add_argument('--business', type=int, action='append', dest='business_ids',
+                            help='Only fingerprint images of this business (repeatable)')
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute fingerprints that are already stored')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        queryset = Image.objects.exclude(local_path__isnull=True).exclude(local_path='')
+        if not options['all']:
+            queryset = queryset.filter(content_hash='')
+        if options['business_ids']:
+            queryset = queryset.filter(business_id__in=options['business_ids'])
+
+        total = queryset.count()
+        self.stdout.write(f"Fingerprinting {total} images with {options['workers']} workers...")
+
+        done = failed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            while True:
+                # Keyset batches: images that fail are passed over, not retried forever
+                rows = list(
+                    queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', 'local_path')[:batch_size]
+                )
+                if not rows:
+                    break
+                updates = []
+                for pk, result in executor.map(_fingerprint_stored, rows):
+                    if result is None:
+                        failed += 1
+                        continue
+                    content_hash, perceptual_hash = result
+                    updates.append(Image(pk=pk, content_hash=content_hash, perceptual_hash=perceptual_hash))
+                Image.all_objects.bulk_update(updates, ['content_hash', 'perceptual_hash'])
+                done += len(updates)
+                last_id = rows[-1][0]
+                self.stdout.write(f"  {done + failed}/{total}")
+
+        self.stdout.write(self.style.SUCCESS(f"Fingerprinted {done} images, {failed} could not be read"))
+        logger.info(f"Fingerprinted {done} images, {failed} failed")
@@ -0,0 +1,87 @@
+# management/commands/generate_image_variants.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from PIL import Image as PILImage
+
+from automation.models import Image
+from automation.services.image_variants import render_variants, variant_path
+
+logger = logging.getLogger(__name__)
+
+
+def _store(path, data):
+    # FileSystemStorage would pick another name rather than overwrite
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    default_storage.save(path, ContentFile(data))
+
+
+def _generate_stored(row):
+    """Render and store the derivatives of one stored image; its {size: width}, or None."""
+    pk, local_path = row
+    try:
+        with default_storage.open(local_path, 'rb') as stored:
+            img = PILImage.open(BytesIO(stored.read()))
+            img = img.convert('RGB') if img.mode != 'RGB' else img
+        widths, files = render_variants(img)
+        for (size, fmt), data in files.items():
+            _store(variant_path(local_path, size, fmt), data)
+        return pk, widths
+    except Exception as e:
+        logger.warning(f"Could not generate derivatives of image {pk} ({local_path}): {str(e)}")
+        return pk, None
+
+
+class Command(BaseCommand):
+    help = "Generate the thumbnail, medium and WebP derivatives of stored images, in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Images per batch (default: %(default)s)')
+        parser.add_argument('--workers', type=int, default=getattr(settings, 'IMAGE_FETCH_WORKERS', 6),
+                            help='Images processed at once (default: %(default)s)')
+        parser.add_argument('--business', type=int, action='append', dest='business_ids',
+                            help='Only process images of this business (repeatable)')
+        parser.add_argument('--all', action='store_true',
+                            help='Regenerate derivatives that are already registered')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        queryset = Image.objects.exclude(local_path__isnull=True).exclude(local_path='')
+        if not options['all']:
+            queryset = queryset.filter(variants={})
+        if options['business_ids']:
+            queryset = queryset.filter(business_id__in=options['business_ids'])
+
+        total = queryset.count()
+        self.stdout.write(f"Generating derivatives of {total} images with {options['workers']} workers...")
+
+        done = failed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            while True:
+                # Keyset batches: images that fail are passed over, not retried forever
+                rows = list(
+                    queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', 'local_path')[:batch_size]
+                )
+                if not rows:
+                    break
+                updates = []
+                for pk, widths in executor.map(_generate_stored, rows):
+                    if widths is None:
+                        failed += 1
+                        continue
+                    updates.append(Image(pk=pk, variants=widths))
+                Image.all_objects.bulk_update(updates, ['variants'])
+                done += len(updates)
+                last_id = rows[-1][0]
+                self.stdout.write(f"  {done + failed}/{total}")
+
+        self.stdout.write(self.style.SUCCESS(f"Generated derivatives of {done} images, {failed} could not be read"))
+        logger.info(f"Generated derivatives of {done} images, {failed} failed")
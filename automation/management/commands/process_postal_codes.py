@@ -12,6 +12,14 @@ import logging
 import openai
 from time import sleep
 from django.conf import settings
+from automation.services.rate_limiter import get_rate_limiter
+from automation.services.search import refresh_search_index
+from automation.services.address_parser import (
+    get_postal_code_pattern,
+    normalize_country,
+    parse_addresses,
+    validate_postal_code,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,91 +27,14 @@ POSTAL_CODE_SETTINGS = {
     'GPT_BATCH_SIZE': 5,
     'BATCH_DELAY': 1,  # seconds
     'DEFAULT_STATUS': 'PENDING',
-    'GPT_MAX_RETRIES': 3
+    'GPT_MAX_RETRIES': 3,
+    'UPDATE_BATCH_SIZE': 1000,
 }
  
 class PostalCodeProcessor:      
 
     def __init__(self):
         openai.api_key = settings.OPENAI_API_KEY
-        self.patterns = {
-            # European Union Countries
-            'austria': r'\b\d{4}\b',  # Format: 1010 (Vienna)
-            'belgium': r'\b\d{4}\b',  # Format: 1000 (Brussels)
-            'bulgaria': r'\b\d{4}\b',  # Format: 1000 (Sofia)
-            'croatia': r'\b\d{5}\b',  # Format: 10000 (Zagreb)
-            'cyprus': r'\b\d{4}\b',  # Format: 1000 (Nicosia)
-            'czech republic': r'\b\d{3} ?\d{2}\b',  # Format: 100 00 (Prague)
-            'denmark': r'\b\d{4}\b',  # Format: 1000 (Copenhagen)
-            'estonia': r'\b\d{5}\b',  # Format: 10111 (Tallinn)
-            'finland': r'\b\d{5}\b',  # Format: 00100 (Helsinki)
-            'france': r'\b\d{5}\b',  # Format: 75001 (Paris)
-            'germany': r'\b\d{5}\b',  # Format: 10115 (Berlin)
-            'greece': r'\b\d{3} ?\d{2}\b',  # Format: 104 31 (Athens)
-            'hungary': r'\b\d{4}\b',  # Format: 1011 (Budapest)
-            'ireland': r'\b[A-Z]\d{2} ?[A-Z\d]{4}\b',  # Format: D02 AF30 (Dublin)
-            'italy': r'\b\d{5}\b',  # Format: 00100 (Rome)
-            'latvia': r'\b\d{4}\b',  # Format: 1050 (Riga)
-            'lithuania': r'\b\d{5}\b',  # Format: 01001 (Vilnius)
-            'luxembourg': r'\b\d{4}\b',  # Format: 1000
-            'malta': r'\b[A-Z]{3} ?\d{4}\b',  # Format: VLT 1117
-            'netherlands': r'\b\d{4} ?[A-Z]{2}\b',  # Format: 1000 AP
-            'poland': r'\b\d{2}-\d{3}\b',  # Format: 00-001
-            'portugal': r'\b\d{4}(?:-\d{3})?\b',  # Format: 1000-205
-            'romania': r'\b\d{6}\b',  # Format: 010001
-            'slovakia': r'\b\d{3} ?\d{2}\b',  # Format: 811 01
-            'slovenia': r'\b\d{4}\b',  # Format: 1000
-            'spain': r'\b\d{5}\b',  # Format: 28001
-            'sweden': r'\b\d{3} ?\d{2}\b',  # Format: 100 00
-
-            # Americas
-            'argentina': r'\b[ABCEGHJLNPQRSTVWXY]\d{4}[A-Z]{3}\b',  # Format: C1425DKF
-            'brazil': r'\b\d{5}-?\d{3}\b',  # Format: 01001-000
-            'canada': r'\b[ABCEGHJKLMNPRSTVXY]\d[ABCEGHJKLMNPRSTVWXYZ] ?\d[ABCEGHJKLMNPRSTVWXYZ]\d\b',  # Format: A1A 1A1
-            'chile': r'\b\d{7}\b',  # Format: 8320000
-            'colombia': r'\b\d{6}\b',  # Format: 110111
-            'costa rica': r'\b\d{5}(?:-\d{4})?\b',  # Format: 10101
-            'mexico': r'\b\d{5}\b',  # Format: 01000
-            'panama': r'\b\d{4}\b',  # Format: 0801
-            'peru': r'\b\d{5}\b',  # Format: 15001
-            'united states': r'\b\d{5}(?:-\d{4})?\b',  # Format: 10001 or 10001-1234
-            'uruguay': r'\b\d{5}\b',  # Format: 11000
-            'venezuela': r'\b\d{4}\b',  # Format: 1010
-
-            # Asia
-            'china': r'\b\d{6}\b',  # Format: 100000
-            'hong kong': r'\b\d{6}\b',  # Format: 999077
-            'india': r'\b\d{6}\b',  # Format: 110001
-            'indonesia': r'\b\d{5}\b',  # Format: 10110
-            'israel': r'\b\d{5}(?:\d{2})?\b',  # Format: 91000
-            'japan': r'\b\d{3}-?\d{4}\b',  # Format: 100-0001
-            'malaysia': r'\b\d{5}\b',  # Format: 50000
-            'philippines': r'\b\d{4}\b',  # Format: 1000
-            'russia': r'\b\d{6}\b',  # Format: 101000
-            'singapore': r'\b\d{6}\b',  # Format: 238838
-            'south korea': r'\b\d{5}\b',  # Format: 03154
-            'taiwan': r'\b\d{3}(?:\d{2})?\b',  # Format: 100 or 10001
-            'thailand': r'\b\d{5}\b',  # Format: 10200
-            'vietnam': r'\b\d{6}\b',  # Format: 100000
-
-            # Oceania
-            'australia': r'\b\d{4}\b',  # Format: 2000
-            'new zealand': r'\b\d{4}\b',  # Format: 0110
-
-            # Africa
-            'egypt': r'\b\d{5}\b',  # Format: 11511
-            'morocco': r'\b\d{5}\b',  # Format: 10000
-            'south africa': r'\b\d{4}\b',  # Format: 0083
-            'tunisia': r'\b\d{4}\b',  # Format: 1000
-
-            # Special Regions
-            'sardinia': r'\b0[7-9]\d{3}\b',  # Format: 07100
-            'sicily': r'\b9[0-5]\d{3}\b',  # Format: 90100
-            
-            # Default pattern for unknown countries
-            'default': r'\b\d{5}\b'
-        }
-
         self.city_defaults = {
             # Europe
             'athens': {
@@ -224,17 +155,22 @@ class PostalCodeProcessor:
         
     def get_postal_code_pattern(self, country: str) -> Optional[str]:
         """Get regex pattern for country's postal codes"""
-        return self.patterns.get(country.lower())
+        return get_postal_code_pattern(country)
 
     def validate_postal_code(self, postal_code: str, country: str) -> bool:
         """Validate postal code format for country"""
-        if not postal_code:
-            return False
-            
-        pattern = self.get_postal_code_pattern(country)
-        if not pattern:
-            return True  # If no pattern exists, accept any format
-        return bool(re.match(pattern, postal_code))
+        return validate_postal_code(postal_code, country)
+
+    def extract_from_address(self, address: str, country: str) -> Optional[str]:
+        """Extract the postal code already present in the address, if any"""
+        return self.extract_batch([{'address': address, 'country': country}])[0]
+
+    def extract_batch(self, businesses: List[Dict]) -> List[Optional[str]]:
+        """Extract postal codes from the addresses of many businesses in one pass"""
+        parsed = parse_addresses(
+            (business['address'], business['country'] or None) for business in businesses
+        )
+        return [components['postal_code'] or None for components in parsed]
 
     def process_batch_with_gpt(self, businesses: List[Dict]) -> List[Tuple[int, str]]:
         """Process multiple businesses in a single GPT call"""
@@ -247,6 +183,7 @@ class PostalCodeProcessor:
             combined_prompt = "\n---\n".join(prompts)
             
             # Call GPT-3.5 with combined prompt
+            get_rate_limiter('openai').acquire(openai.api_key)
             response = openai.ChatCompletion.create(
                 model="gpt-3.5-turbo",
                 messages=[
@@ -310,6 +247,7 @@ class PostalCodeProcessor:
                 return postal_code
             # 3. Use GPT only if previous methods fail
             prompt = self._build_enhanced_gpt_prompt(business)
+            get_rate_limiter('openai').acquire(openai.api_key)
             response = openai.ChatCompletion.create(
                 model="gpt-3.5-turbo",
                 messages=[
@@ -419,9 +357,9 @@ class PostalCodeProcessor:
         
         # Add known postal code format if available
         country = business['country'].lower()
-        if country in self.patterns:
+        if normalize_country(country) != 'default':
             components.append(
-                f"Expected format: {self.patterns[country]}"
+                f"Expected format: {get_postal_code_pattern(country)}"
             )
             
         # Add any city-specific information
@@ -467,6 +405,11 @@ class Command(BaseCommand):
             choices=['PENDING', 'REVIEWED', 'IN_PRODUCTION'],
             help='Filter by specific status'
         )
+        parser.add_argument(
+            '--skip-gpt',
+            action='store_true',
+            help='Only extract postal codes found in the stored addresses'
+        )
 
     def get_businesses_without_postal_code(
         self, 
@@ -507,6 +450,46 @@ class Command(BaseCommand):
             'status'
         )
     
+    def extract_from_addresses(
+        self,
+        businesses: List[Dict],
+        processor: PostalCodeProcessor,
+        dry_run: bool
+    ) -> Tuple[Dict, List[Dict]]:
+        """
+        Fill postal codes that can be read from the stored addresses.
+        Returns the stats and the businesses that still need a postal code.
+        """
+        stats = {'processed': 0, 'updated': 0, 'failed': 0}
+        remaining = []
+        updates = []
+
+        for business, postal_code in zip(businesses, processor.extract_batch(businesses)):
+            if postal_code:
+                updates.append(Business(id=business['id'], postal_code=postal_code))
+                if dry_run:
+                    self.stdout.write(
+                        f"Would update {business['title']} "
+                        f"with postal code: {postal_code}"
+                    )
+            else:
+                remaining.append(business)
+
+        if updates and not dry_run:
+            with transaction.atomic():
+                Business.objects.bulk_update(
+                    updates,
+                    ['postal_code'],
+                    batch_size=POSTAL_CODE_SETTINGS['UPDATE_BATCH_SIZE']
+                )
+                # bulk_update skips Business.save(), which keeps the search index current
+                refresh_search_index(Business.all_objects.filter(pk__in=[business.pk for business in updates]))
+            logger.info(f"Updated postal code for {len(updates)} businesses from their addresses")
+
+        stats['processed'] = len(updates)
+        stats['updated'] = len(updates)
+        return stats, remaining
+
     @transaction.atomic
     def process_batch(
         self, 
@@ -516,6 +499,7 @@ class Command(BaseCommand):
     ) -> Dict:
         """Process a batch of businesses"""
         stats = {'processed': 0, 'updated': 0, 'failed': 0}
+        updated_ids = []
         
         try:
             # Businesses are already in dict format since we used values()
@@ -537,6 +521,7 @@ class Command(BaseCommand):
                         Business.objects.filter(id=business_id).update(
                             postal_code=postal_code
                         )
+                        updated_ids.append(business_id)
                         logger.info(
                             f"Updated postal code for business {business_id}: "
                             f"{postal_code}"
@@ -549,6 +534,8 @@ class Command(BaseCommand):
                     stats['failed'] += 1
                 
             stats['processed'] = len(businesses)
+            # update() skips Business.save(), which keeps the search index current
+            refresh_search_index(Business.all_objects.filter(pk__in=updated_ids))
             
         except Exception as e:
             logger.error(f"Batch processing error: {str(e)}")
@@ -603,11 +590,23 @@ class Command(BaseCommand):
                 self.stdout.write(
                     self.style.WARNING("DRY RUN - No changes will be made")
                 )
-            # Process in batches
-            total_stats = {'processed': 0, 'updated': 0, 'failed': 0}
-            
-            for i in range(0, total, batch_size):
-                batch = list(businesses[i:i + batch_size])
+            # Extract postal codes already present in the addresses first
+            businesses = list(businesses)
+            total_stats, businesses = self.extract_from_addresses(
+                businesses, processor, dry_run
+            )
+            self.stdout.write(
+                f"Extracted {total_stats['updated']} postal codes from addresses, "
+                f"{len(businesses)} remaining"
+            )
+
+            if options['skip_gpt']:
+                businesses = []
+
+            # Process the remaining businesses in GPT batches
+            remaining = len(businesses)
+            for i in range(0, remaining, batch_size):
+                batch = businesses[i:i + batch_size]
                 batch_stats = self.process_batch(batch, processor, dry_run)
                 
                 # Update total stats
@@ -622,7 +621,7 @@ class Command(BaseCommand):
                 )
                 
                 # Add delay between batches
-                if i + batch_size < total:
+                if i + batch_size < remaining:
                     sleep(1)  # Prevent rate limiting
             # Final summary
             self.stdout.write(self.style.SUCCESS("\nProcessing completed:"))
@@ -646,6 +645,9 @@ python manage.py process_postal_codes --batch-size 3
 # Dry run for specific country and status
 python manage.py process_postal_codes --country Greece --status PENDING --dry-run
 
+# Only extract postal codes from the stored addresses, no GPT calls
+python manage.py process_postal_codes --skip-gpt
+
 """
  
 
@@ -0,0 +1,49 @@
+# management/commands/rebuild_search_index.py
+import logging
+
+from django.core.management.base import BaseCommand
+
+from automation.models import Business
+from automation.services import search
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Backfill Business.search_text and search_vector, in id order and in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=search.BATCH_SIZE,
+                            help='Businesses per batch (default: %(default)s)')
+        parser.add_argument('--missing-only', action='store_true',
+                            help='Only index businesses that have no search text yet')
+        parser.add_argument('--task', type=int, action='append', dest='task_ids',
+                            help='Only index businesses of this task (repeatable)')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        queryset = Business.all_objects.all()
+        if options['missing_only']:
+            queryset = queryset.filter(search_text='')
+        if options['task_ids']:
+            queryset = queryset.filter(task_id__in=options['task_ids'])
+
+        total = queryset.count()
+        self.stdout.write(f"Indexing {total} businesses in batches of {batch_size}...")
+        logger.info(f"Rebuilding search index for {total} businesses")
+
+        done = 0
+        last_id = 0
+        while True:
+            # Keyset batches: no OFFSET scans, and rows indexed meanwhile are not skipped
+            ids = list(
+                queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            done += search.refresh_search_index(Business.all_objects.filter(pk__in=ids), batch_size)
+            last_id = ids[-1]
+            self.stdout.write(f"  {done}/{total}")
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {done} businesses"))
+        logger.info(f"Search index rebuilt for {done} businesses")
@@ -0,0 +1,40 @@
+# management/commands/reconcile_daily_activity.py
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+from automation.models import ScrapingTask
+from automation.services.daily_activity import rebuild_daily_activity, to_local_date
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = "Recompute the daily activity rollup used by the dashboard timelines"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Number of past days to reconcile (default: 7)'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild the whole history, e.g. after the first deploy'
+        )
+
+    def handle(self, *args, **options):
+        end_date = timezone.localdate()
+        if options['all']:
+            first_task = ScrapingTask.objects.aggregate(first=Min('created_at'))['first']
+            start_date = to_local_date(first_task) or end_date
+        else:
+            start_date = end_date - timezone.timedelta(days=options['days'])
+
+        self.stdout.write(f"Reconciling daily activity from {start_date} to {end_date}...")
+        rows = rebuild_daily_activity(start_date, end_date)
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {rows} day/destination rows"))
+
+# python manage.py reconcile_daily_activity
+# python manage.py reconcile_daily_activity --all
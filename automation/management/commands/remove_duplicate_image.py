@@ -1,23 +1,67 @@
+# management/commands/remove_duplicate_image.py
+import logging
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+
 from automation.models import Image
-from django.core.files.storage import default_storage
-
-def remove_duplicate_images():
-    images = Image.objects.all()
-    image_paths = {}
-
-    for image in images:
-        # Check if the same business has the same image URL or file path multiple times
-        if image.image_url in image_paths or image.local_path in image_paths:
-            print(f"Deleting duplicate image {image.local_path}")
-            
-            # Delete the image from storage
-            if default_storage.exists(image.local_path):
-                default_storage.delete(image.local_path)
-            
-            # Delete the duplicate image record
-            image.delete()
-        else:
-            image_paths[image.image_url] = True
-            image_paths[image.local_path] = True
-
-    print("Duplicate images cleanup completed.")
+from automation.services.image_fingerprint import MAX_DISTANCE, DuplicateIndex
+from automation.services.image_variants import stored_paths
+from automation.services.storage_gc import DELETE_BATCH_SIZE, get_object_store
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete images that repeat an earlier image of the same business: the same URL, "
+        "the same bytes, or a near-identical picture. Run fingerprint_images first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-distance', type=int, default=MAX_DISTANCE,
+                            help='Perceptual hash bits two copies may differ by (default: %(default)s)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report the duplicates')
+
+    def handle(self, *args, **options):
+        rows = (
+            Image.objects.order_by('business_id', 'order', 'pk')
+            .values_list('pk', 'business_id', 'image_url', 'local_path', 'content_hash', 'perceptual_hash',
+                         'variants')
+            .iterator(chunk_size=2000)
+        )
+
+        duplicates = []
+        for business_id, images in groupby(rows, key=lambda row: row[1]):
+            index = DuplicateIndex(options['max_distance'])
+            seen_urls = set()
+            for pk, _, image_url, local_path, content_hash, perceptual_hash, variants in images:
+                if image_url in seen_urls or index.find(content_hash, perceptual_hash) is not None:
+                    duplicates.append((pk, local_path, stored_paths(local_path, variants)))
+                    continue
+                seen_urls.add(image_url)
+                index.add(content_hash, perceptual_hash, pk)
+
+        self.stdout.write(f"Found {len(duplicates)} duplicate images")
+        if options['dry_run'] or not duplicates:
+            return
+
+        store = get_object_store()
+        for start in range(0, len(duplicates), DELETE_BATCH_SIZE):
+            batch = duplicates[start:start + DELETE_BATCH_SIZE]
+            pks = [pk for pk, _, _ in batch]
+            # Rows sharing a local_path are duplicates by content too; their
+            # files stay while any row outside this batch, even a soft-deleted
+            # one, still uses them (a later batch frees them if it is a duplicate)
+            in_use = set(
+                Image.all_objects.filter(local_path__in=[local_path for _, local_path, _ in batch if local_path])
+                .exclude(pk__in=pks)
+                .values_list('local_path', flat=True)
+            )
+            store.delete([path for _, local_path, paths in batch if local_path not in in_use for path in paths])
+            Image.all_objects.filter(pk__in=pks).delete()
+            self.stdout.write(f"  {start + len(batch)}/{len(duplicates)}")
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {len(duplicates)} duplicate images"))
+        logger.info(f"Deleted {len(duplicates)} duplicate images")
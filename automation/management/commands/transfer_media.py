@@ -1,33 +1,78 @@
-from django.core.management.base import BaseCommand
-import os
-import boto3
+# management/commands/transfer_media.py
+import logging
+
 from django.conf import settings
-from botocore.exceptions import ClientError
+from django.core.management.base import BaseCommand, CommandError
+
+from automation.services.media_sync import MB, MediaSync
+
+logger = logging.getLogger(__name__)
+
 
 class Command(BaseCommand):
-    help = 'Transfer media files from server to DigitalOcean Spaces'
+    help = 'Transfer media files from server to DigitalOcean Spaces, uploading only what is missing or changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--local-dir', default=settings.MEDIA_ROOT,
+                            help='Directory to upload from (default: MEDIA_ROOT)')
+        parser.add_argument('--prefix', default='media/',
+                            help='Prefix (folder) inside the bucket (default: %(default)s)')
+        parser.add_argument('--concurrency', type=int,
+                            default=getattr(settings, 'MEDIA_SYNC_CONCURRENCY', 16),
+                            help='Files uploaded at once (default: %(default)s)')
+        parser.add_argument('--multipart-threshold-mb', type=int,
+                            default=getattr(settings, 'MEDIA_SYNC_MULTIPART_THRESHOLD', 8 * MB) // MB,
+                            help='Files larger than this go up in parts (default: %(default)s)')
+        parser.add_argument('--multipart-chunksize-mb', type=int,
+                            default=getattr(settings, 'MEDIA_SYNC_MULTIPART_CHUNKSIZE', 8 * MB) // MB,
+                            help='Size of each part (default: %(default)s)')
+        parser.add_argument('--manifest',
+                            help='Manifest file recording what was uploaded (default: inside --local-dir)')
+        parser.add_argument('--full', action='store_true',
+                            help='Re-hash every file instead of trusting the manifest')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report what would be uploaded')
 
     def handle(self, *args, **options):
-        session = boto3.session.Session()
-        client = session.client('s3',
-                                region_name=settings.AWS_S3_REGION_NAME,
-                                endpoint_url=settings.AWS_S3_ENDPOINT_URL,
-                                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY)
-
-        media_root = settings.MEDIA_ROOT
-        for root, dirs, files in os.walk(media_root):
-            for filename in files:
-                local_path = os.path.join(root, filename)
-                relative_path = os.path.relpath(local_path, media_root)
-                s3_key = os.path.join('media', relative_path).replace("\\", "/")
-
-                try:
-                    client.upload_file(local_path, settings.AWS_STORAGE_BUCKET_NAME, s3_key)
-                    self.stdout.write(self.style.SUCCESS(f"Uploaded {local_path} to {s3_key}"))
-                except ClientError as e:
-                    self.stdout.write(self.style.ERROR(f"Error uploading {local_path}: {e}"))
-
-        self.stdout.write(self.style.SUCCESS('Media transfer completed'))
+        from automation.tasks import get_s3_client
+
+        bucket = getattr(settings, 'AWS_STORAGE_BUCKET_NAME', None)
+        if not bucket:
+            raise CommandError("AWS_STORAGE_BUCKET_NAME is not configured")
+
+        extra_args = dict(getattr(settings, 'AWS_S3_OBJECT_PARAMETERS', {}))
+        if getattr(settings, 'AWS_DEFAULT_ACL', None):
+            extra_args['ACL'] = settings.AWS_DEFAULT_ACL
+
+        sync = MediaSync(
+            get_s3_client(),
+            bucket,
+            options['local_dir'],
+            prefix=options['prefix'],
+            concurrency=options['concurrency'],
+            multipart_threshold=max(5, options['multipart_threshold_mb']) * MB,
+            multipart_chunksize=max(5, options['multipart_chunksize_mb']) * MB,
+            manifest_path=options['manifest'],
+            extra_args=extra_args,
+            trust_manifest=not options['full'],
+        )
+        dry_run = options['dry_run']
+        report = sync.run(dry_run=dry_run)
+
+        self.stdout.write(
+            f"{report['files']} files, {report['unchanged']} already in {bucket}/{sync.prefix}, "
+            f"{report['to_upload']} to upload ({report['bytes_to_upload'] / MB:.1f} MB)"
+        )
+        if dry_run:
+            return
+        if report['failed']:
+            self.stdout.write(self.style.ERROR(
+                f"{report['failed']} files failed to upload; run again to retry them"
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f"Media transfer completed: {report['uploaded']} files uploaded "
+            f"({report['bytes_uploaded'] / MB:.1f} MB)"
+        ))
+        logger.info(f"transfer_media: {report}")
 
 #python manage.py transfer_media
@@ -3,6 +3,8 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from automation.models import Business
+from automation.services.address_parser import parse_addresses
+from automation.services.search import refresh_search_index
 import csv
 import json
 import logging
@@ -10,6 +12,8 @@ from typing import List, Dict
 
 logger = logging.getLogger(__name__)
 
+UPDATE_BATCH_SIZE = 1000
+
 class Command(BaseCommand):
     help = 'Bulk update postal codes from exported file'
 
@@ -25,65 +29,85 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be updated without making changes'
         )
+        parser.add_argument(
+            '--parse-addresses',
+            action='store_true',
+            help='Extract postal codes from the address column for rows without one'
+        )
 
-    def load_data(self, filename: str) -> List[Dict]:
+    def load_data(self, filename: str, from_addresses: bool = False) -> List[Dict]:
         """Load data from CSV or JSON file"""
         ext = filename.split('.')[-1].lower()
         
         if ext == 'csv':
-            return self.load_from_csv(filename)
+            data = self.load_from_csv(filename)
         elif ext == 'json':
-            return self.load_from_json(filename)
+            data = self.load_from_json(filename)
         else:
             raise ValueError(f"Unsupported file format: {ext}")
 
+        if from_addresses:
+            self.fill_from_addresses(data)
+        return [row for row in data if row.get('extracted_postal_code')]
+
+    def fill_from_addresses(self, data: List[Dict]):
+        """Extract postal codes for rows without one from their address, in one batch"""
+        missing = [row for row in data if not row.get('extracted_postal_code') and row.get('address')]
+        parsed = parse_addresses((row['address'], row.get('country') or None) for row in missing)
+        for row, components in zip(missing, parsed):
+            row['extracted_postal_code'] = components['postal_code']
+
     def load_from_csv(self, filename: str) -> List[Dict]:
         """Load data from CSV file"""
         data = []
         with open(filename, 'r', encoding='utf-8') as csvfile:
             reader = csv.DictReader(csvfile)
             for row in reader:
-                if row['extracted_postal_code']:
-                    data.append(row)
+                data.append(row)
         return data
 
     def load_from_json(self, filename: str) -> List[Dict]:
         """Load data from JSON file"""
         with open(filename, 'r', encoding='utf-8') as jsonfile:
             data = json.load(jsonfile)
-        return [b for b in data if b.get('extracted_postal_code')]
+        return data
 
     @transaction.atomic
     def update_postal_codes(self, data: List[Dict], dry_run: bool) -> Dict:
         """Update postal codes in database"""
         stats = {'total': len(data), 'updated': 0, 'errors': 0}
-        
+
+        if dry_run:
+            for item in data:
+                self.stdout.write(
+                    f"Would update business {item['id']} ({item['title']}) "
+                    f"with postal code: {item['extracted_postal_code']}"
+                )
+            stats['updated'] = len(data)
+            return stats
+
+        existing_ids = set(
+            Business.objects.filter(id__in=[item['id'] for item in data]).values_list('id', flat=True)
+        )
+        updates = []
         for item in data:
             try:
-                if dry_run:
-                    self.stdout.write(
-                        f"Would update business {item['id']} ({item['title']}) "
-                        f"with postal code: {item['extracted_postal_code']}"
-                    )
-                    stats['updated'] += 1
-                    continue
-
-                business = Business.objects.get(id=item['id'])
-                business.postal_code = item['extracted_postal_code']
-                business.save()
-                
-                logger.info(
-                    f"Updated postal code for business {business.id} "
-                    f"({business.title}): {business.postal_code}"
-                )
-                stats['updated'] += 1
-                
+                business_id = int(item['id'])
+                if business_id not in existing_ids:
+                    raise Business.DoesNotExist("Business matching query does not exist.")
+                updates.append(Business(id=business_id, postal_code=item['extracted_postal_code']))
             except Exception as e:
                 error_msg = f"Error updating business {item['id']}: {str(e)}"
                 logger.error(error_msg)
                 self.stdout.write(self.style.ERROR(error_msg))
                 stats['errors'] += 1
 
+        Business.objects.bulk_update(updates, ['postal_code'], batch_size=UPDATE_BATCH_SIZE)
+        # bulk_update skips Business.save(), which keeps the search index current
+        refresh_search_index(Business.all_objects.filter(pk__in=[business.pk for business in updates]))
+        logger.info(f"Updated postal code for {len(updates)} businesses")
+        stats['updated'] = len(updates)
+
         return stats
 
     def handle(self, *args, **options):
@@ -92,7 +116,7 @@ class Command(BaseCommand):
             dry_run = options['dry_run']
 
             self.stdout.write(f"Loading data from {input_file}")
-            data = self.load_data(input_file)
+            data = self.load_data(input_file, from_addresses=options['parse_addresses'])
             
             self.stdout.write("Updating postal codes...")
             stats = self.update_postal_codes(data, dry_run)
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation', '0022_business_types_uk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('destination_name', models.CharField(blank=True, default='', max_length=255)),
+                ('tasks_created', models.IntegerField(default=0)),
+                ('businesses_gathered', models.IntegerField(default=0)),
+                ('businesses_reviewed', models.IntegerField(default=0)),
+                ('businesses_in_production', models.IntegerField(default=0)),
+                ('businesses_discarded', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily activity',
+                'indexes': [models.Index(fields=['date'], name='automation__date_472e19_idx')],
+                'unique_together': {('date', 'destination_name')},
+            },
+        ),
+    ]
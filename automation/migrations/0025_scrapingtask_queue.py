@@ -0,0 +1,47 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation', '0024_movetoappjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingtask',
+            name='celery_task_id',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='scrapingtask',
+            name='form_data',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingtask',
+            name='priority',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'High'), (5, 'Normal'), (9, 'Low')], default=5),
+        ),
+        migrations.AddField(
+            model_name='scrapingtask',
+            name='queries_completed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapingtask',
+            name='queries_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapingtask',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='scrapingtask',
+            index=models.Index(fields=['user', 'status'], name='automation__user_id_149b73_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation', '0025_scrapingtask_queue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['task', 'status', 'id'], name='automation__task_id_7e858b_idx'),
+        ),
+    ]
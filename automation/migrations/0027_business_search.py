@@ -0,0 +1,62 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:02
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations, models
+
+
+class PostgresOnly(migrations.operations.base.Operation):
+    """Run ``operation`` on Postgres only; other databases search search_text without these indexes."""
+
+    reversible = True
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    def deconstruct(self):
+        return (self.__class__.__qualname__, [self.operation], {})
+
+    def state_forwards(self, app_label, state):
+        self.operation.state_forwards(app_label, state)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            self.operation.database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            self.operation.database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return f"{self.operation.describe()} (Postgres only)"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation', '0026_business_task_status_id'),
+    ]
+
+    operations = [
+        PostgresOnly(TrigramExtension()),
+        PostgresOnly(UnaccentExtension()),
+        migrations.AddField(
+            model_name='business',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='business',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        PostgresOnly(migrations.AddIndex(
+            model_name='business',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='business_search_vector_gin'),
+        )),
+        PostgresOnly(migrations.AddIndex(
+            model_name='business',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('search_text', name='gin_trgm_ops'), name='business_search_text_trgm'),
+        )),
+    ]
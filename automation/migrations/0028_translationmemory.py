@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation', '0027_business_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('prompt_version', models.CharField(max_length=50)),
+                ('target_language', models.CharField(max_length=50)),
+                ('source_text', models.TextField()),
+                ('translated_text', models.TextField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Translation memory',
+                'indexes': [models.Index(fields=['prompt_version', 'target_language'], name='automation__prompt__25e2bc_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation', '0028_translationmemory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='business',
+            name='score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['task', '-score'], name='business_task_score_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation', '0030_image_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businessimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:05
+
+from django.db import migrations
+
+
+def backfill_search_index(apps, schema_editor):
+    """Index the businesses that existed before search_text and search_vector were added."""
+    from automation.services.search import refresh_search_index
+
+    Business = apps.get_model('automation', 'Business')
+    refresh_search_index(Business._base_manager.using(schema_editor.connection.alias).all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation', '0031_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation', '0032_backfill_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='businessimage',
+            name='variants',
+        ),
+    ]
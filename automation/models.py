@@ -12,6 +12,10 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from automation.services import image_variants, search
+from automation.services.permissions import get_permissions
 
 logger = logging.getLogger(__name__)
 SITE_TYPES_CHOICES = [
@@ -101,11 +105,15 @@ class CustomUser(AbstractUser):
 
     @property
     def is_admin(self):
-        return self.is_superuser or 'ADMIN' in self.get_roles()
+        return get_permissions(self).is_admin
 
     @property
     def is_ambassador(self):
-        return 'AMBASSADOR' in self.get_roles()
+        return get_permissions(self).is_ambassador
+
+    @property
+    def role_display(self):
+        return get_permissions(self).primary_role_display
 
     def __str__(self):
         return self.username
@@ -221,11 +229,26 @@ class ScrapingTask(models.Model):
         ('TRANSLATION_FAILED', 'Translation Failed'),
     ]
 
+    # Lower values are dispatched first (Celery/Redis priority order)
+    PRIORITY_CHOICES = [
+        (0, 'High'),
+        (5, 'Normal'),
+        (9, 'Low'),
+    ]
+
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     translation_status = models.CharField(max_length=20, choices=TRANSLATION_STATUS_CHOICES, default='PENDING_TRANSLATION')
     file = models.FileField(upload_to='scraping_files/', null=True, blank=True)
     is_deleted = models.BooleanField(default=False)
 
+    # Queue dispatch and progress (see services/task_queue.py)
+    priority = models.PositiveSmallIntegerField(choices=PRIORITY_CHOICES, default=5)
+    form_data = JSONField(null=True, blank=True)
+    celery_task_id = models.CharField(max_length=255, blank=True, default='')
+    started_at = models.DateTimeField(null=True, blank=True)
+    queries_total = models.PositiveIntegerField(default=0)
+    queries_completed = models.PositiveIntegerField(default=0)
+
     objects = ActiveTaskManager()
     all_objects = models.Manager()
 
@@ -236,6 +259,7 @@ class ScrapingTask(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
             models.Index(fields=['destination']),
+            models.Index(fields=['user', 'status']),
         ]
 
     def __str__(self):
@@ -317,6 +341,7 @@ class Business(models.Model):
 
     search_string = models.CharField(max_length=255)
     rank = models.IntegerField(default=0)
+    score = models.FloatField(default=0.0)  # Kept by services/business_metrics.py
     search_page_url = models.URLField(max_length=500, blank=True, null=True)
     is_advertisement = models.BooleanField(default=False)
     
@@ -379,6 +404,10 @@ class Business(models.Model):
     #comments = models.TextField(blank=True, null=True)
     is_deleted = models.BooleanField(default=False)
 
+    # Search index, kept up to date by save() and services/search.py
+    search_text = models.TextField(blank=True, default='', editable=False)  # Normalized, accent-free
+    search_vector = SearchVectorField(null=True, editable=False)  # Postgres only
+
     objects = ActiveBusinessManager()
     all_objects = models.Manager()
 
@@ -415,8 +444,7 @@ class Business(models.Model):
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
-        self.clean_types()        
+    def normalize_operating_hours(self):
         if self.operating_hours:
             ordered_days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
             
@@ -439,21 +467,43 @@ class Business(models.Model):
                     for day in ordered_days
                 }
 
+    def save(self, *args, **kwargs):
+        self.clean_types()        
+        self.normalize_operating_hours()
+
         if not self.id:
             logger.info(f"Creating new Business: {self.title}")
         else:
             logger.info(f"Updating Business {self.id}: {self.title}")
-        
+
+        update_fields = kwargs.get('update_fields')
+        reindex = update_fields is None or bool(set(update_fields) & set(search.SEARCH_FIELDS))
+        # Reading deferred fields would cost a query each; reindex from the row instead
+        deferred = bool(self.get_deferred_fields() & set(search.SEARCH_FIELDS))
+        if reindex and not deferred:
+            self.search_text = search.build_search_text(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'search_text'}
+
         super().save(*args, **kwargs)
 
+        if reindex and deferred:
+            search.refresh_search_index(Business.all_objects.filter(pk=self.pk))
+        elif reindex and search.uses_postgres(self._state.db):
+            Business.all_objects.filter(pk=self.pk).update(search_vector=search.search_vector())
+
     class Meta:
         indexes = [
             models.Index(fields=['status']),  
             models.Index(fields=['title']),  
             models.Index(fields=['scraped_at']),    
+            models.Index(fields=['task', '-score'], name='business_task_score_idx'),
             models.Index(fields=['form_destination_id']),   
             models.Index(fields=['main_category']),   
             models.Index(fields=['city']),    
+            models.Index(fields=['task', 'status', 'id']),
+            GinIndex(fields=['search_vector'], name='business_search_vector_gin'),
+            GinIndex(OpClass('search_text', name='gin_trgm_ops'), name='business_search_text_trgm'),
         ]
         verbose_name_plural = "Businesses"
 
@@ -487,10 +537,28 @@ class Image(models.Model):
     thumbnail = models.ImageField(upload_to='thumbnails/', blank=True, null=True)
     is_approved = models.BooleanField(default=True)
     is_deleted = models.BooleanField(default=False)
+    # Fingerprints of the stored file, see services/image_fingerprint.py
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    perceptual_hash = models.BigIntegerField(null=True, blank=True)
+    # Derivatives stored next to local_path, {size: width}, see services/image_variants.py
+    variants = JSONField(default=dict, blank=True)
 
     objects = ActiveImageManager()
     all_objects = models.Manager()
 
+    def variant_url(self, width=None, webp=False):
+        """URL of the smallest stored copy at least ``width`` pixels wide."""
+        fallback = f"{settings.MEDIA_URL}{self.local_path}" if self.local_path else self.image_url
+        return image_variants.variant_url(self.local_path, self.variants, width, webp, fallback)
+
+    @property
+    def thumb_url(self):
+        return self.variant_url(image_variants.VARIANT_WIDTHS['thumb'], webp=True)
+
+    @property
+    def medium_url(self):
+        return self.variant_url(image_variants.VARIANT_WIDTHS['medium'], webp=True)
+
     def delete(self, *args, **kwargs):
         self.is_deleted = True
         self.save()
@@ -710,3 +778,93 @@ class TagMapping(models.Model):
             models.Index(fields=['tag_ls_id']),  
         ]
 
+
+class TranslationMemory(models.Model):
+    """
+    One machine translation, content-addressed by the SHA-256 of its prompt
+    version, target language and normalized source text, and shared by every
+    translation path (services/translation_memory.py).
+    """
+    key = models.CharField(max_length=64, unique=True)
+    prompt_version = models.CharField(max_length=50)
+    target_language = models.CharField(max_length=50)
+    source_text = models.TextField()
+    translated_text = models.TextField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['prompt_version', 'target_language']),
+        ]
+        verbose_name_plural = "Translation memory"
+
+    def __str__(self):
+        return f"[{self.prompt_version}/{self.target_language}] {self.source_text[:50]}"
+
+
+class DailyActivity(models.Model):
+    """
+    Daily rollup behind the dashboard timelines, one row per day and destination.
+    Tasks and businesses are counted on the day their task was created; status
+    transitions are counted on the day they happen.
+    """
+    date = models.DateField()
+    destination_name = models.CharField(max_length=255, blank=True, default='')
+    tasks_created = models.IntegerField(default=0)
+    businesses_gathered = models.IntegerField(default=0)
+    businesses_reviewed = models.IntegerField(default=0)
+    businesses_in_production = models.IntegerField(default=0)
+    businesses_discarded = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['date', 'destination_name']
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+        verbose_name_plural = "Daily activity"
+
+    def __str__(self):
+        return f"{self.date} - {self.destination_name or 'No Destination'}"
+
+
+class MoveToAppJob(models.Model):
+    """
+    Background publication of businesses to Local Secrets (move-to-app),
+    created by bulk IN_PRODUCTION updates. Per-business outcomes are kept in
+    ``results`` so the UI can poll progress.
+    """
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+    business_ids = JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    succeeded = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    results = JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status']),
+        ]
+
+    def __str__(self):
+        return f"Move to app job {self.id} ({self.processed}/{self.total}) - {self.status}"
+
+    @property
+    def is_finished(self):
+        return self.status in ['COMPLETED', 'FAILED']
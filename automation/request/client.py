@@ -61,8 +61,10 @@ class RequestClient:
     Client for making authenticated requests to a specified namespace and topic.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, session: requests.Session = None, timeout=None):
+        # A shared session keeps connections alive across many requests
+        self.session = session
+        self.timeout = timeout
 
     def _decode_response(self, response_data: str = None):
         """
@@ -98,9 +100,9 @@ class RequestClient:
             "X-Timestamp": str(timestamp)
         }
     
-        response = requests.post(
+        response = (self.session or requests).post(
             url, data=business_data,
-            headers=header, verify=False)
+            headers=header, verify=False, timeout=self.timeout)
         
         try:
             response.raise_for_status()
@@ -0,0 +1,215 @@
+# automation/services/address_parser.py
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Postal code formats by country. None means the country has no postal codes.
+POSTAL_CODE_PATTERNS = {
+    # European Union
+    'austria': r'\b\d{4}\b',  # Format: 1010 (Vienna)
+    'belgium': r'\b\d{4}\b',  # Format: 1000 (Brussels)
+    'bulgaria': r'\b\d{4}\b',  # Format: 1000 (Sofia)
+    'croatia': r'\b\d{5}\b',  # Format: 10000 (Zagreb)
+    'cyprus': r'\b\d{4}\b',  # Format: 1000 (Nicosia)
+    'czech republic': r'\b\d{3} ?\d{2}\b',  # Format: 100 00 (Prague)
+    'denmark': r'\b\d{4}\b',  # Format: 1000 (Copenhagen)
+    'estonia': r'\b\d{5}\b',  # Format: 10111 (Tallinn)
+    'finland': r'\b\d{5}\b',  # Format: 00100 (Helsinki)
+    'france': r'\b\d{5}\b',  # Format: 75001 (Paris)
+    'germany': r'\b\d{5}\b',  # Format: 10115 (Berlin)
+    'greece': r'\b\d{3} ?\d{2}\b',  # Format: 104 31 (Athens)
+    'hungary': r'\b\d{4}\b',  # Format: 1011 (Budapest)
+    'ireland': r'\b[A-Z]\d{2} ?[A-Z\d]{4}\b',  # Format: D02 AF30 (Dublin)
+    'italy': r'\b\d{5}\b',  # Format: 00100 (Rome)
+    'latvia': r'\b\d{4}\b',  # Format: 1050 (Riga)
+    'lithuania': r'\b\d{5}\b',  # Format: 01001 (Vilnius)
+    'luxembourg': r'\b\d{4}\b',  # Format: 1000
+    'malta': r'\b[A-Z]{3} ?\d{4}\b',  # Format: VLT 1117
+    'netherlands': r'\b\d{4} ?[A-Z]{2}\b',  # Format: 1000 AP
+    'poland': r'\b\d{2}-\d{3}\b',  # Format: 00-001
+    'portugal': r'\b\d{4}(?:-\d{3})?\b',  # Format: 1000-205
+    'romania': r'\b\d{6}\b',  # Format: 010001
+    'slovakia': r'\b\d{3} ?\d{2}\b',  # Format: 811 01
+    'slovenia': r'\b\d{4}\b',  # Format: 1000
+    'spain': r'\b\d{5}\b',  # Format: 28001
+    'sweden': r'\b\d{3} ?\d{2}\b',  # Format: 100 00
+
+    # Rest of Europe
+    'united kingdom': r'\b[A-Z]{1,2}\d[A-Z\d]? ?\d[A-Z]{2}\b',  # Format: SW1A 1AA
+    'norway': r'\b\d{4}\b',  # Format: 0150 (Oslo)
+    'iceland': r'\b\d{3}\b',  # Format: 101 (Reykjavík)
+    'russia': r'\b\d{6}\b',  # Format: 101000
+    'turkey': r'\b\d{5}\b',  # Format: 34000 (Istanbul)
+
+    # North America
+    'united states': r'\b\d{5}(?:-\d{4})?\b',  # Format: 10001 or 10001-1234
+    'canada': r'\b[ABCEGHJKLMNPRSTVXY]\d[ABCEGHJKLMNPRSTVWXYZ] ?\d[ABCEGHJKLMNPRSTVWXYZ]\d\b',  # Format: A1A 1A1
+    'mexico': r'\b\d{5}\b',  # Format: 01000
+
+    # Central and South America
+    'argentina': r'\b[ABCEGHJLNPQRSTVWXY]?\d{4}[A-Z]{3}\b',  # Format: C1425DKF
+    'san carlos de bariloche': r'\b[R]?8[4-5][0-9][0-9][A-Z]{3}\b',  # Format: R8400ABC
+    'brazil': r'\b\d{5}-?\d{3}\b',  # Format: 01001-000
+    'chile': r'\b\d{7}\b',  # Format: 8320000
+    'colombia': r'\b\d{6}\b',  # Format: 110111
+    'costa rica': r'\b\d{5}(?:-\d{4})?\b',  # Format: 10101
+    'dominican republic': r'\b\d{5}\b',  # Format: 10101 (Santo Domingo)
+    'panama': r'\b\d{4}\b',  # Format: 0801
+    'peru': r'\b\d{5}\b',  # Format: 15001
+    'uruguay': r'\b\d{5}\b',  # Format: 11000
+    'venezuela': r'\b\d{4}\b',  # Format: 1010
+
+    # Asia
+    'china': r'\b\d{6}\b',  # Format: 100000
+    'hong kong': r'\b\d{6}\b',  # Format: 999077
+    'india': r'\b\d{6}\b',  # Format: 110001
+    'indonesia': r'\b\d{5}\b',  # Format: 10110
+    'israel': r'\b\d{5}(?:\d{2})?\b',  # Format: 91000
+    'japan': r'\b\d{3}-?\d{4}\b',  # Format: 100-0001
+    'malaysia': r'\b\d{5}\b',  # Format: 50000
+    'philippines': r'\b\d{4}\b',  # Format: 1000
+    'singapore': r'\b\d{6}\b',  # Format: 238838
+    'south korea': r'\b\d{5}\b',  # Format: 03154
+    'taiwan': r'\b\d{3}(?:\d{2})?\b',  # Format: 100 or 10001
+    'thailand': r'\b\d{5}\b',  # Format: 10200
+    'vietnam': r'\b\d{6}\b',  # Format: 100000
+
+    # Oceania
+    'australia': r'\b\d{4}\b',  # Format: 2000
+    'new zealand': r'\b\d{4}\b',  # Format: 0110
+
+    # Africa
+    'egypt': r'\b\d{5}\b',  # Format: 11511
+    'morocco': r'\b\d{5}\b',  # Format: 10000
+    'south africa': r'\b\d{4}\b',  # Format: 0083
+    'tunisia': r'\b\d{4}\b',  # Format: 1000
+
+    # Special Regions and Territories
+    'united arab emirates': None,  # Dubai uses P.O. Boxes, no standard format
+    'saint maarten': r'\b\d{5}\b',  # Format: 97750
+    'sardinia': r'\b0[7-9]\d{3}\b',  # Format: 07100
+    'sicily': r'\b9[0-5]\d{3}\b',  # Format: 90100
+
+    # Default pattern for unknown countries
+    'default': r'\b\d{5}\b'
+}
+
+# Alternative country names
+COUNTRY_ALIASES = {
+    'uk': 'united kingdom',
+    'great britain': 'united kingdom',
+    'england': 'united kingdom',
+    'usa': 'united states',
+    'us': 'united states',
+    'u.s.': 'united states',
+    'united states of america': 'united states',
+    'czechia': 'czech republic',
+    'uae': 'united arab emirates',
+    'dominican rep': 'dominican republic',
+    'korea': 'south korea',
+    'korea south': 'south korea',
+    'sardegna': 'sardinia',
+    'isola di sardegna': 'sardinia',
+    'isle of sardinia': 'sardinia',
+    'sicilia': 'sicily',
+    'bariloche': 'san carlos de bariloche',
+    'scb': 'san carlos de bariloche',
+}
+
+# Compiled once at import; every lookup below reuses these objects.
+COMPILED_POSTAL_CODE_PATTERNS: Dict[str, Optional[Pattern]] = {
+    country: re.compile(pattern) if pattern else None
+    for country, pattern in POSTAL_CODE_PATTERNS.items()
+}
+TRAILING_PART_RE = re.compile(r',\s*([^,]+)$')
+
+
+def normalize_country(country: Optional[str]) -> str:
+    """Lower-case key of ``country`` in POSTAL_CODE_PATTERNS, resolving aliases."""
+    if not country:
+        return 'default'
+    key = country.strip().lower()
+    key = COUNTRY_ALIASES.get(key, key)
+    return key if key in POSTAL_CODE_PATTERNS else 'default'
+
+
+def get_postal_code_pattern(country: Optional[str]) -> Optional[str]:
+    """Regex source for ``country``'s postal codes (the default pattern if unknown)."""
+    return POSTAL_CODE_PATTERNS[normalize_country(country)]
+
+
+def get_postal_code_regex(country: Optional[str]) -> Optional[Pattern]:
+    """Compiled postal code regex for ``country``, or None if it has no postal codes."""
+    return COMPILED_POSTAL_CODE_PATTERNS[normalize_country(country)]
+
+
+def validate_postal_code(postal_code: str, country: Optional[str]) -> bool:
+    """Check that ``postal_code`` starts with a valid code for ``country``."""
+    if not postal_code:
+        return False
+    regex = get_postal_code_regex(country)
+    if regex is None:
+        return True  # No format for this country, accept any value
+    return bool(regex.match(postal_code))
+
+
+@lru_cache(maxsize=getattr(settings, 'ADDRESS_PARSER_CACHE_SIZE', 50000))
+def _parse(address: str, country: Optional[str]) -> Tuple[str, str, Optional[str]]:
+    address = address.strip()
+    if not country:
+        country_match = TRAILING_PART_RE.search(address)
+        if country_match:
+            country = country_match.group(1).strip()
+
+    parts = [part.strip() for part in address.split(',')]
+    regex = get_postal_code_regex(country)
+    postal_code_match = regex.search(address) if regex else None
+    if not postal_code_match:
+        # If no postal code found, take first part as street
+        return parts[0], '', country
+
+    postal_code = postal_code_match.group(0)
+    # Take all parts before the one holding the postal code for the street address
+    for i, part in enumerate(parts):
+        if postal_code in part:
+            return ', '.join(parts[:i]).strip(), postal_code, country
+    return parts[0], postal_code, country
+
+
+def parse_address(address: Optional[str], country: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """
+    Extract the street and postal code from a full address string.
+    When ``country`` is not given it is taken from the last comma-separated part.
+
+    Example:
+        "Carrer del Call, 17, Ciutat Vella, 08002 Barcelona, Spain"
+        -> {'street_address': 'Carrer del Call, 17, Ciutat Vella', 'postal_code': '08002', 'country': 'Spain'}
+    """
+    if not address:
+        return {'street_address': '', 'postal_code': '', 'country': country}
+    street_address, postal_code, country = _parse(address, country)
+    return {'street_address': street_address, 'postal_code': postal_code, 'country': country}
+
+
+def parse_addresses(items: Iterable[Tuple[Optional[str], Optional[str]]]) -> List[Dict[str, Optional[str]]]:
+    """
+    Parse many (address, country) pairs in one call, in input order.
+    Repeated pairs are parsed once; results are served from the shared cache.
+    """
+    items = list(items)
+    parsed = {pair: parse_address(*pair) for pair in set(items)}
+    return [dict(parsed[pair]) for pair in items]
+
+
+def extract_postal_code(address: Optional[str], country: Optional[str] = None) -> str:
+    return parse_address(address, country)['postal_code']
+
+
+def get_cache_stats() -> Dict[str, int]:
+    info = _parse.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
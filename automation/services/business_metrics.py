@@ -0,0 +1,94 @@
+# automation/services/business_metrics.py
+import logging
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Q, Subquery, Value, When, Window
+from django.db.models.functions import Coalesce, Least, Rank
+
+from automation.models import Business, Image
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, 'BUSINESS_RECOMPUTE_BATCH_SIZE', 5000)
+
+# Best scored first; id keeps ranks unique and stable between runs
+RANK_ORDERING = (F('score').desc(), F('id').asc())
+
+
+def _has_text(field: str) -> Q:
+    return Q(**{f'{field}__isnull': False}) & ~Q(**{field: ''})
+
+
+def score_expression():
+    """
+    A business's score as one SQL expression, capped at 300:
+    rating x 20 (up to 100), one point per review (up to 100), five per
+    active image (up to 50), 50 for a website and 25 for a phone number.
+    """
+    images = Subquery(
+        Image.objects.filter(business=OuterRef('pk'))
+        .order_by().values('business').annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField(),
+    )
+    return Least(
+        Coalesce(F('rating') * 20, Value(0.0), output_field=FloatField()) +
+        Least(F('reviews_count'), Value(100)) +
+        Least(Coalesce(images, Value(0)) * 5, Value(50)) +
+        Case(When(_has_text('website'), then=Value(50)), default=Value(0)) +
+        Case(When(_has_text('phone'), then=Value(25)), default=Value(0)),
+        Value(300.0),
+        output_field=FloatField(),
+    )
+
+
+def recompute_scores(queryset=None, batch_size: Optional[int] = None) -> int:
+    """
+    Store the score of every business in ``queryset`` (all active ones by
+    default) with one UPDATE per ``batch_size`` ids, skipping rows whose
+    score is already right. Returns the number of rows changed.
+    """
+    queryset = Business.objects.all() if queryset is None else queryset
+    batch_size = batch_size or BATCH_SIZE
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    updated = 0
+    last_id = 0
+    while True:
+        # Keyset batches keep each UPDATE, and the locks it holds, short
+        chunk = list(ids.filter(pk__gt=last_id)[:batch_size])
+        if not chunk:
+            break
+        updated += (
+            Business.all_objects.filter(pk__in=chunk)
+            .exclude(score=score_expression())
+            .update(score=score_expression())
+        )
+        last_id = chunk[-1]
+    return updated
+
+
+def recompute_rankings(task_ids: Optional[Iterable[int]] = None, batch_size: Optional[int] = None) -> int:
+    """
+    Rank the active businesses of each task by score with a window function,
+    computed by the database in one query, and write back only the ranks
+    that changed with bulk_update. Returns the number of rows changed.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    queryset = Business.objects.all()
+    if task_ids is not None:
+        queryset = queryset.filter(task_id__in=list(task_ids))
+    ranked = queryset.annotate(
+        new_rank=Window(Rank(), partition_by=[F('task_id')], order_by=RANK_ORDERING)
+    ).values_list('pk', 'rank', 'new_rank')
+
+    changed = []
+    updated = 0
+    for pk, rank, new_rank in ranked.iterator(chunk_size=batch_size):
+        if rank != new_rank:
+            changed.append(Business(pk=pk, rank=new_rank))
+        if len(changed) >= batch_size:
+            updated += Business.all_objects.bulk_update(changed, ['rank'])
+            changed = []
+    if changed:
+        updated += Business.all_objects.bulk_update(changed, ['rank'])
+    return updated
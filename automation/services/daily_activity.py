@@ -0,0 +1,141 @@
+# automation/services/daily_activity.py
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from automation.models import Business, DailyActivity, ScrapingTask
+
+logger = logging.getLogger(__name__)
+
+# Business status -> DailyActivity counter incremented when a business moves into it
+TRANSITION_FIELDS = {
+    'REVIEWED': 'businesses_reviewed',
+    'IN_PRODUCTION': 'businesses_in_production',
+    'DISCARDED': 'businesses_discarded',
+}
+
+
+def to_local_date(value) -> Optional[date]:
+    """Calendar day of ``value`` in the current time zone, as used by __date lookups."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            return timezone.localdate(value)
+        return value.date()
+    return value
+
+
+def increment(day: date, destination_name: Optional[str], **deltas):
+    """Atomically add ``deltas`` to the counters of one day/destination row."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if day is None or not deltas:
+        return
+    row, _ = DailyActivity.objects.get_or_create(date=day, destination_name=destination_name or '')
+    DailyActivity.objects.filter(pk=row.pk).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def record_task_created(task):
+    increment(to_local_date(task.created_at), task.destination_name, tasks_created=1)
+
+
+def record_businesses_gathered(task, count: int = 1):
+    increment(to_local_date(task.created_at), task.destination_name, businesses_gathered=count)
+
+
+def record_status_transition(business, new_status: str):
+    field = TRANSITION_FIELDS.get(new_status)
+    if field:
+        destination_name = business.task.destination_name if business.task_id else business.form_destination_name
+        increment(timezone.localdate(), destination_name, **{field: 1})
+
+
+def rebuild_daily_activity(start_date: date, end_date: date) -> int:
+    """
+    Recompute task and business counters for a date range from the source tables.
+    Transition counters have no source of truth and are left as recorded.
+    Returns the number of day/destination rows written.
+    """
+    tasks = (
+        ScrapingTask.objects.filter(created_at__date__range=[start_date, end_date])
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'destination_name')
+        .annotate(count=Count('id'))
+    )
+    businesses = (
+        Business.objects.filter(
+            task__created_at__date__range=[start_date, end_date],
+            task__is_deleted=False
+        )
+        .annotate(day=TruncDate('task__created_at'))
+        .values('day', 'task__destination_name')
+        .annotate(count=Count('id'))
+    )
+
+    counters: Dict[tuple, Dict[str, int]] = {}
+    for item in tasks:
+        key = (item['day'], item['destination_name'] or '')
+        counters.setdefault(key, {'tasks_created': 0, 'businesses_gathered': 0})['tasks_created'] += item['count']
+    for item in businesses:
+        key = (item['day'], item['task__destination_name'] or '')
+        counters.setdefault(key, {'tasks_created': 0, 'businesses_gathered': 0})['businesses_gathered'] += item['count']
+
+    with transaction.atomic():
+        DailyActivity.objects.filter(date__range=[start_date, end_date]).update(
+            tasks_created=0, businesses_gathered=0
+        )
+        DailyActivity.objects.bulk_create(
+            [
+                DailyActivity(date=day, destination_name=destination_name, **values)
+                for (day, destination_name), values in counters.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['date', 'destination_name'],
+            update_fields=['tasks_created', 'businesses_gathered', 'updated_at'],
+        )
+
+    logger.info(f"Rebuilt daily activity from {start_date} to {end_date}: {len(counters)} rows")
+    return len(counters)
+
+
+def get_timeline(start_date: date, end_date: date, destination_name: Optional[str] = None) -> Dict:
+    """
+    Daily task and business counts between two dates, inclusive, with every
+    day present. Reads the rollup only, so the cost grows with the number of days.
+    """
+    rows = DailyActivity.objects.filter(date__range=[start_date, end_date])
+    if destination_name:
+        rows = rows.filter(destination_name__iexact=destination_name)
+    by_day = {
+        row['date']: row
+        for row in rows.values('date').annotate(
+            tasks=Sum('tasks_created'),
+            businesses=Sum('businesses_gathered'),
+        )
+    }
+
+    dates = []
+    tasks = []
+    businesses = []
+    current_date = start_date
+    while current_date <= end_date:
+        row = by_day.get(current_date)
+        dates.append(current_date.strftime('%Y-%m-%d'))
+        tasks.append(row['tasks'] if row else 0)
+        businesses.append(row['businesses'] if row else 0)
+        current_date += timedelta(days=1)
+
+    return {
+        'dates': dates,
+        'tasks': tasks,
+        'businesses': businesses,
+        'total_tasks': sum(tasks),
+        'total_businesses': sum(businesses),
+    }
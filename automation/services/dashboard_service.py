@@ -3,10 +3,15 @@
 from django.db.models import Count, Q
 from django.utils import timezone
 from ..models import Business, ScrapingTask, CustomUser, Destination
+from . import daily_activity
 import logging
 logger = logging.getLogger(__name__) 
 from datetime import datetime, timedelta 
 
+TASK_STATUSES = ['PENDING', 'IN_PROGRESS', 'COMPLETED', 'FAILED', 'TASK_DONE']
+BUSINESS_STATUSES = ['PENDING', 'REVIEWED', 'IN_PRODUCTION', 'DISCARDED']
+ACTIVE_BUSINESS_STATUSES = ['PENDING', 'REVIEWED', 'IN_PRODUCTION']
+
 class DashboardService:
     def __init__(self):
         self.today = timezone.now()
@@ -16,21 +21,54 @@ class DashboardService:
     def get_dashboard_stats(self):
         """Get comprehensive dashboard statistics"""
         try:
+            task_counts = self.get_task_counts()
             return {
-                'status_counts': self._get_task_status_counts(),
-                'timeline_data': self._get_timeline_data(),
+                'status_counts': self._get_task_status_counts(task_counts),
+                'timeline_data': self.get_timeline_data(self.last_month, self.today),
                 'recent_activity': self._get_recent_activity(),
-                'overall_metrics': self._get_overall_metrics()
+                'overall_metrics': self._get_overall_metrics(task_counts)
             }
         except Exception as e:
             print(f"Error getting dashboard stats: {str(e)}")
             raise
 
-    def _get_task_status_counts(self):
+    def get_task_counts(self, queryset=None):
+        """
+        Task counters for the dashboard in a single conditional-aggregation query.
+        ``queryset`` restricts the counts, e.g. to an ambassador's tasks.
+        """
+        queryset = ScrapingTask.objects.all() if queryset is None else queryset
+        counts = queryset.aggregate(
+            all=Count('id'),
+            total=Count('id', filter=Q(status__in=TASK_STATUSES)),
+            translated=Count('id', filter=Q(translation_status='TRANSLATED')),
+            recent=Count('id', filter=Q(created_at__gte=self.last_week, status__in=TASK_STATUSES)),
+            recent_all=Count('id', filter=Q(created_at__gte=self.last_week)),
+            month=Count('id', filter=Q(created_at__gte=self.last_month)),
+            month_completed=Count('id', filter=Q(created_at__gte=self.last_month, status__in=['COMPLETED', 'DONE'])),
+            month_failed=Count('id', filter=Q(created_at__gte=self.last_month, status='FAILED')),
+            **{f'status_{status}': Count('id', filter=Q(status=status)) for status, _ in ScrapingTask.STATUS_CHOICES}
+        )
+        counts['by_status'] = {
+            status: counts.pop(f'status_{status}') for status, _ in ScrapingTask.STATUS_CHOICES
+        }
+        return counts
+
+    def get_business_counts(self, queryset=None):
+        """Business counters by status in a single conditional-aggregation query"""
+        queryset = Business.objects.all() if queryset is None else queryset
+        counts = queryset.aggregate(
+            all=Count('id'),
+            total=Count('id', filter=Q(status__in=ACTIVE_BUSINESS_STATUSES)),
+            recent=Count('id', filter=Q(scraped_at__gte=self.last_week)),
+            **{f'status_{status}': Count('id', filter=Q(status=status)) for status in BUSINESS_STATUSES}
+        )
+        counts['by_status'] = {status: counts.pop(f'status_{status}') for status in BUSINESS_STATUSES}
+        return counts
+
+    def _get_task_status_counts(self, task_counts=None):
         """Get counts of tasks by status"""
-        status_counts = ScrapingTask.objects.values('status')\
-            .exclude(status__isnull=True)\
-            .annotate(count=Count('id'))
+        task_counts = task_counts or self.get_task_counts()
         
         # Convert to dictionary with default values
         default_statuses = {
@@ -41,9 +79,9 @@ class DashboardService:
             'DONE': 0
         }
         
-        for item in status_counts:
-            if item['status'] in default_statuses:
-                default_statuses[item['status']] = item['count']
+        for status, count in task_counts['by_status'].items():
+            if status in default_statuses:
+                default_statuses[status] = count
         
         return default_statuses
     
@@ -62,60 +100,14 @@ class DashboardService:
         elif isinstance(end_date, datetime):
             end_date = end_date.date()
 
-        # Query tasks and businesses for the entire date range
-        tasks_data = ScrapingTask.objects.filter(
-            created_at__date__range=[start_date, end_date]
-        ).values('created_at__date').annotate(
-            task_count=Count('id')
-        ).order_by('created_at__date')
-
-        businesses_data = Business.objects.filter(
-            task__created_at__date__range=[start_date, end_date]
-        ).values('task__created_at__date').annotate(
-            business_count=Count('id')
-        ).order_by('task__created_at__date')
-
-        # Convert querysets to dictionaries for easier lookup
-        tasks_dict = {
-            item['created_at__date']: item['task_count'] 
-            for item in tasks_data
-        }
-        
-        businesses_dict = {
-            item['task__created_at__date']: item['business_count'] 
-            for item in businesses_data
-        }
-
-        # Generate complete date range
-        dates = []
-        tasks = []
-        businesses = []
-        
-        current_date = start_date
-        while current_date <= end_date:
-            # Add date to dates array  
-            dates.append(current_date.strftime('%Y-%m-%d'))
-            
-            # Get counts for current date (default to 0 if no data)
-            tasks.append(tasks_dict.get(current_date, 0))
-            businesses.append(businesses_dict.get(current_date, 0))
-            
-            current_date += timedelta(days=1)
+        timeline = daily_activity.get_timeline(start_date, end_date)
 
         # Get today's counts
-        today = timezone.now().date()
-        tasks_today = ScrapingTask.objects.filter(created_at__date=today).count()
-        businesses_today = Business.objects.filter(task__created_at__date=today).count()
+        today = daily_activity.get_timeline(timezone.localdate(), timezone.localdate())
+        timeline['tasks_today'] = today['total_tasks']
+        timeline['businesses_today'] = today['total_businesses']
 
-        return {
-            'dates': dates,
-            'tasks': tasks,
-            'businesses': businesses,
-            'total_tasks': sum(tasks),
-            'total_businesses': sum(businesses),
-            'tasks_today': tasks_today,
-            'businesses_today': businesses_today
-        }
+        return timeline
 
     def get_debug_info(self, start_date=None, end_date=None):
         """
@@ -160,53 +152,30 @@ class DashboardService:
             } if hasattr(task, 'destination') else None
         } for task in recent_tasks]
 
-    def _get_overall_metrics(self):
+    def _get_overall_metrics(self, task_counts=None):
         """Get overall metrics for the dashboard"""
+        task_counts = task_counts or self.get_task_counts()
+        business_counts = self.get_business_counts()
         return {
-            'total_tasks': ScrapingTask.objects.count(),
-            'total_businesses': Business.objects.count(),
+            'total_tasks': task_counts['all'],
+            'total_businesses': business_counts['all'],
             'total_destinations': Destination.objects.count(),
-            'recent_tasks': ScrapingTask.objects.filter(
-                created_at__gte=self.last_week
-            ).count(),
-            'recent_businesses': Business.objects.filter(
-                created_at__gte=self.last_week
-            ).count(),
-            'completion_rate': self._calculate_completion_rate(),
-            'success_rate': self._calculate_success_rate()
+            'recent_tasks': task_counts['recent_all'],
+            'recent_businesses': business_counts['recent'],
+            'completion_rate': self._calculate_completion_rate(task_counts),
+            'success_rate': self._calculate_success_rate(task_counts)
         }
 
-    def _calculate_completion_rate(self):
+    def _calculate_completion_rate(self, task_counts):
         """Calculate task completion rate for the last month"""
-        total = ScrapingTask.objects.filter(
-            created_at__gte=self.last_month
-        ).count()
-        
+        total = task_counts['month']
         if total == 0:
             return 0
-            
-        completed = ScrapingTask.objects.filter(
-            created_at__gte=self.last_month,
-            status__in=['COMPLETED', 'DONE']
-        ).count()
-        
-        return round((completed / total) * 100, 2)
+        return round((task_counts['month_completed'] / total) * 100, 2)
 
-    def _calculate_success_rate(self):
+    def _calculate_success_rate(self, task_counts):
         """Calculate task success rate for the last month"""
-        total = ScrapingTask.objects.filter(
-            created_at__gte=self.last_month
-        ).count()
-        
+        total = task_counts['month']
         if total == 0:
             return 0
-            
-        failed = ScrapingTask.objects.filter(
-            created_at__gte=self.last_month,
-            status='FAILED'
-        ).count()
-        
-        return round(((total - failed) / total) * 100, 2)
-
-
-
+        return round(((total - task_counts['month_failed']) / total) * 100, 2)
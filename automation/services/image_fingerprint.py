@@ -0,0 +1,122 @@
+# automation/services/image_fingerprint.py
+import hashlib
+from io import BytesIO
+from typing import Any, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from PIL import Image as PILImage
+
+HASH_BITS = 64
+_SIGN_BIT = 1 << (HASH_BITS - 1)
+
+# Perceptual hashes at most this many bits apart are treated as the same photo
+MAX_DISTANCE = getattr(settings, 'IMAGE_DUPLICATE_MAX_DISTANCE', 6)
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 of the exact bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_hash(img) -> int:
+    """
+    64-bit difference hash: the image shrunk to 9x8 grey pixels, one bit per
+    pair of horizontal neighbours set when the left one is brighter. Survives
+    re-encoding, resizing and small crops, unlike a content hash.
+    Returned as a signed integer so it fits a BigIntegerField.
+    """
+    pixels = img.convert('L').resize((9, 8), PILImage.LANCZOS).tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value - (1 << HASH_BITS) if value & _SIGN_BIT else value
+
+
+def fingerprint(data: bytes) -> Tuple[str, int]:
+    """Content hash and perceptual hash of encoded image bytes."""
+    return content_hash(data), perceptual_hash(PILImage.open(BytesIO(data)))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin((a ^ b) & ((1 << HASH_BITS) - 1)).count('1')
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over perceptual hashes: finds every hash within a
+    Hamming distance of a query while visiting only a small part of the tree.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, value: int, item: Any = None):
+        node = self._root
+        if node is None:
+            self._root = [value, item, {}]
+            self._size = 1
+            return
+        while True:
+            distance = hamming_distance(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, item, {}]
+                self._size += 1
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, Any]]:
+        """(distance, item) of every entry within ``max_distance`` of ``value``, closest first."""
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node_value, item, children = stack.pop()
+            distance = hamming_distance(value, node_value)
+            if distance <= max_distance:
+                found.append((distance, item))
+            # By the triangle inequality only these subtrees can hold matches
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return sorted(found, key=lambda match: match[0])
+
+
+class DuplicateIndex:
+    """Exact (content hash) and near (perceptual hash) duplicate lookup over a set of images."""
+
+    def __init__(self, max_distance: Optional[int] = None):
+        self.max_distance = MAX_DISTANCE if max_distance is None else max_distance
+        self._exact = {}
+        self._tree = BKTree()
+
+    def add(self, content_digest: Optional[str], phash: Optional[int], item: Any):
+        if content_digest:
+            self._exact.setdefault(content_digest, item)
+        if phash is not None:
+            self._tree.add(phash, item)
+
+    def find(self, content_digest: Optional[str], phash: Optional[int]) -> Optional[Any]:
+        """The item (never None) this image duplicates, or None."""
+        if content_digest and content_digest in self._exact:
+            return self._exact[content_digest]
+        if phash is not None:
+            matches = self._tree.search(phash, self.max_distance)
+            if matches:
+                return matches[0][1]
+        return None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Optional[str], Optional[int], Any]], max_distance: Optional[int] = None):
+        index = cls(max_distance)
+        for content_digest, phash, item in rows:
+            index.add(content_digest, phash, item)
+        return index
@@ -0,0 +1,240 @@
+# automation/services/image_pipeline.py
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from boto3.s3.transfer import TransferConfig
+from django.conf import settings
+from PIL import Image as PILImage
+from requests.adapters import HTTPAdapter
+
+from automation.services import image_fingerprint, image_variants
+from automation.services.pacing import default_pacer
+from automation.services.rate_limiter import get_rate_limiter
+from automation.services.task_logging import submit_in_context
+
+logger = logging.getLogger(__name__)
+
+IMAGE_ASPECT_RATIO = 3 / 2
+JPEG_QUALITY = image_variants.JPEG_QUALITY
+
+_session_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_executor_lock = threading.Lock()
+_image_executor = None
+
+
+def crop_image_to_aspect_ratio(img, aspect_ratio):
+    img_width, img_height = img.size
+    img_aspect_ratio = img_width / img_height
+
+    if img_aspect_ratio > aspect_ratio:
+        new_width = int(img_height * aspect_ratio)
+        left = (img_width - new_width) / 2
+        top = 0
+        right = left + new_width
+        bottom = img_height
+    else:
+        new_height = int(img_width / aspect_ratio)
+        left = 0
+        top = (img_height - new_height) / 2
+        right = img_width
+        bottom = top + new_height
+    return img.crop((left, top, right, bottom))
+
+
+def _crop_image_bytes(content: bytes, aspect_ratio: float):
+    img = PILImage.open(BytesIO(content))
+    img_cropped = crop_image_to_aspect_ratio(img, aspect_ratio)
+    if img_cropped.mode != 'RGB':
+        img_cropped = img_cropped.convert('RGB')
+    return img_cropped
+
+
+def _encode_jpeg(img, quality: int) -> bytes:
+    buffer = BytesIO()
+    img.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def process_image_bytes(content: bytes, aspect_ratio: float = IMAGE_ASPECT_RATIO, quality: int = JPEG_QUALITY) -> bytes:
+    """Decode a downloaded image, crop it to ``aspect_ratio`` and re-encode it as JPEG."""
+    return _encode_jpeg(_crop_image_bytes(content, aspect_ratio), quality)
+
+
+def process_and_fingerprint(content: bytes) -> Tuple[bytes, str, int, Dict[str, int], Dict[Tuple[str, str], bytes]]:
+    """
+    process_image_bytes() plus the content and perceptual hash of the result
+    and its smaller and WebP derivatives (image_variants.render_variants()),
+    all from a single decode and crop.
+    """
+    img = _crop_image_bytes(content, IMAGE_ASPECT_RATIO)
+    data = _encode_jpeg(img, JPEG_QUALITY)
+    widths, files = image_variants.render_variants(img)
+    return (data,) + image_fingerprint.fingerprint(data) + (widths, files)
+
+
+def get_http_session() -> requests.Session:
+    """Process-wide keep-alive session for image downloads."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            pool_size = getattr(settings, 'IMAGE_FETCH_WORKERS', 6) * 2
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _session = requests.Session()
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def get_image_executor():
+    """
+    Executor used to decode, crop and encode images.
+    A process pool is used where possible; Celery prefork children are daemonic
+    and cannot start processes, so they fall back to a thread pool.
+    """
+    global _image_executor
+    with _executor_lock:
+        if _image_executor is None:
+            workers = getattr(settings, 'IMAGE_PROCESS_WORKERS', 2)
+            if multiprocessing.current_process().daemon:
+                _image_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-process')
+            else:
+                # Spawn rather than fork: the scraping engine runs this from worker threads.
+                _image_executor = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return _image_executor
+
+
+class ImagePipeline:
+    """
+    Staged fetch -> decode/crop/encode -> upload pipeline for business images.
+
+    Each job is a dict with ``image_url``, ``file_path`` and ``order``. Downloads and
+    uploads run concurrently in a thread pool, image processing runs in
+    ``get_image_executor()``. ``run`` returns the jobs that were uploaded, with
+    the ``content_hash`` and ``perceptual_hash`` of what was stored and the
+    ``variants`` ({size: width}) stored next to it, see image_variants.py.
+
+    Given a ``DuplicateIndex`` of the images already kept, processed images
+    that duplicate one of them, or an earlier job, are dropped before upload
+    and listed in ``self.duplicates``.
+    """
+
+    def __init__(self, s3_client, bucket: str, pacer=None):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.duplicates: List[Dict] = []
+        self.pacer = pacer or default_pacer
+        self.fetch_workers = getattr(settings, 'IMAGE_FETCH_WORKERS', 6)
+        self.upload_workers = getattr(settings, 'IMAGE_UPLOAD_WORKERS', 4)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=getattr(settings, 'IMAGE_MULTIPART_THRESHOLD', 8 * 1024 * 1024),
+            max_concurrency=self.upload_workers,
+        )
+
+    def _fetch(self, job: Dict) -> Optional[bytes]:
+        image_url = job['image_url']
+        host = urlparse(image_url).netloc
+        get_rate_limiter('image_download').acquire(host)
+        with self.pacer.request(host):
+            response = get_http_session().get(image_url, timeout=10)
+        self.pacer.record_response(host, response)
+        if response.status_code != 200:
+            logger.error(f"Failed to download image {job['file_path']}: HTTP {response.status_code}")
+            return None
+        return response.content
+
+    def _put(self, key: str, data: bytes, content_type: str):
+        self.s3_client.upload_fileobj(
+            BytesIO(data),
+            self.bucket,
+            key,
+            ExtraArgs={
+                'ACL': 'public-read',
+                'ContentType': content_type
+            },
+            Config=self.transfer_config,
+        )
+
+    def _upload(self, job: Dict, data: bytes, files: Dict[Tuple[str, str], bytes]):
+        self._put(job['file_path'], data, 'image/jpeg')
+        stored = []
+        try:
+            for (size, fmt), variant in files.items():
+                key = image_variants.variant_path(job['file_path'], size, fmt)
+                self._put(key, variant, image_variants.CONTENT_TYPES[fmt])
+                stored.append(key)
+        except Exception as e:
+            # Without all of its derivatives the image is served at full size
+            logger.error(f"Error uploading derivatives of {job['file_path']}: {str(e)}")
+            job['variants'] = {}
+            self._delete(stored)
+        return job
+
+    def _delete(self, keys: List[str]):
+        """Remove derivatives that no image row will register, so nothing is left unreferenced."""
+        if not keys:
+            return
+        try:
+            self.s3_client.delete_objects(
+                Bucket=self.bucket,
+                Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True},
+            )
+        except Exception as e:
+            logger.error(f"Error deleting partial derivatives {keys}: {str(e)}")
+
+    def run(self, jobs: List[Dict], index: Optional[image_fingerprint.DuplicateIndex] = None) -> List[Dict]:
+        if not jobs:
+            return []
+
+        executor = get_image_executor()
+        uploaded = []
+        workers = max(self.fetch_workers, self.upload_workers)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-io') as io_pool:
+            fetches = {submit_in_context(io_pool, self._fetch, job): job for job in jobs}
+            processing = {}
+            for future in as_completed(fetches):
+                job = fetches[future]
+                try:
+                    content = future.result()
+                except Exception as e:
+                    logger.error(f"Error downloading image {job['file_path']}: {str(e)}", exc_info=True)
+                    continue
+                if content:
+                    processing[executor.submit(process_and_fingerprint, content)] = job
+
+            processed = []
+            for future in as_completed(processing):
+                job = processing[future]
+                try:
+                    data, job['content_hash'], job['perceptual_hash'], job['variants'], files = future.result()
+                    processed.append((job, data, files))
+                except Exception as e:
+                    logger.error(f"Error processing image {job['file_path']}: {str(e)}", exc_info=True)
+
+            uploads = {}
+            # In job order, so the first of several copies is the one kept
+            for job, data, files in sorted(processed, key=lambda item: item[0]['order']):
+                if index is not None:
+                    original = index.find(job['content_hash'], job['perceptual_hash'])
+                    if original is not None:
+                        logger.info(f"Skipping {job['file_path']}: duplicate of {original}")
+                        self.duplicates.append(job)
+                        continue
+                    index.add(job['content_hash'], job['perceptual_hash'], job['file_path'])
+                uploads[submit_in_context(io_pool, self._upload, job, data, files)] = job
+
+            for future in as_completed(uploads):
+                job = uploads[future]
+                try:
+                    uploaded.append(future.result())
+                except Exception as e:
+                    logger.error(f"Error uploading image {job['file_path']}: {str(e)}", exc_info=True)
+
+        return sorted(uploaded, key=lambda job: job['order'])
@@ -0,0 +1,90 @@
+# automation/services/image_variants.py
+import os
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from PIL import Image as PILImage
+
+# Widths of the smaller copies stored next to every image; FULL is the image itself
+VARIANT_WIDTHS = {'thumb': 320, 'medium': 960}
+FULL = 'full'
+JPEG_QUALITY = 85
+WEBP_QUALITY = getattr(settings, 'IMAGE_WEBP_QUALITY', 80)
+CONTENT_TYPES = {'jpg': 'image/jpeg', 'webp': 'image/webp'}
+
+
+def variant_path(local_path: str, size: str, fmt: str = 'jpg') -> str:
+    """
+    Storage path of a derivative of the image stored at ``local_path``:
+    business_images/1/cafe_0.jpg -> business_images/1/cafe_0@thumb.webp.
+    The full-size JPEG is the stored image itself.
+    """
+    if size == FULL and fmt == 'jpg':
+        return local_path
+    base, _ = os.path.splitext(local_path)
+    suffix = '' if size == FULL else f'@{size}'
+    return f"{base}{suffix}.{fmt}"
+
+
+def stored_paths(local_path: Optional[str], variants: Optional[Dict[str, int]]) -> List[str]:
+    """Every stored file of an image: ``local_path`` and the derivatives registered in ``variants``."""
+    if not local_path:
+        return []
+    return [local_path] + [
+        variant_path(local_path, size, fmt)
+        for size in (variants or {}) for fmt in CONTENT_TYPES
+        if (size, fmt) != (FULL, 'jpg')
+    ]
+
+
+def _encode(img, fmt: str, quality: int) -> bytes:
+    buffer = BytesIO()
+    if fmt == 'webp':
+        img.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        img.save(buffer, 'JPEG', quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def render_variants(img, quality: int = JPEG_QUALITY) -> Tuple[Dict[str, int], Dict[Tuple[str, str], bytes]]:
+    """
+    Encode the derivatives of an already cropped RGB image: a JPEG and a WebP
+    of each VARIANT_WIDTHS size narrower than the image, and a WebP of the
+    image at full size. Each size is resized from the next larger one.
+    Returns the widths to register ({size: width}) and {(size, format): bytes}.
+    """
+    widths = {FULL: img.width}
+    files = {(FULL, 'webp'): _encode(img, 'webp', quality)}
+    source = img
+    for size, width in sorted(VARIANT_WIDTHS.items(), key=lambda item: -item[1]):
+        if width >= source.width:
+            continue
+        source = source.resize((width, max(1, round(source.height * width / source.width))), PILImage.LANCZOS)
+        widths[size] = width
+        files[(size, 'jpg')] = _encode(source, 'jpg', quality)
+        files[(size, 'webp')] = _encode(source, 'webp', quality)
+    return widths, files
+
+
+def pick_variant(local_path: Optional[str], variants: Optional[Dict[str, int]],
+                 width: Optional[int] = None, webp: bool = False) -> Optional[str]:
+    """
+    Path of the smallest registered derivative at least ``width`` pixels wide
+    (the smallest of all without ``width``, the largest if none is wide
+    enough), or None when the image has no derivatives.
+    """
+    if not local_path or not variants:
+        return None
+    by_width = sorted(variants.items(), key=lambda item: item[1])
+    size = next((size for size, w in by_width if w >= (width or 0)), by_width[-1][0])
+    return variant_path(local_path, size, 'webp' if webp else 'jpg')
+
+
+def variant_url(local_path: Optional[str], variants: Optional[Dict[str, int]], width: Optional[int] = None,
+                webp: bool = False, fallback: Optional[str] = None) -> Optional[str]:
+    """URL of pick_variant(), or ``fallback`` when the image has no derivatives."""
+    path = pick_variant(local_path, variants, width, webp)
+    if path is None:
+        return fallback
+    return f"{settings.MEDIA_URL}{path}"
@@ -0,0 +1,157 @@
+# automation/services/log_stream.py
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which no more log lines are expected
+FINAL_STATUSES = ('COMPLETED', 'FAILED', 'DONE', 'TASK_DONE')
+
+
+def get_log_file_path(task_id) -> str:
+    return os.path.join(settings.MEDIA_ROOT, f'task_logs_{task_id}.txt')
+
+
+def task_group_name(task_id) -> str:
+    return f'task_{task_id}'
+
+
+def _group_send(task_id, message: Dict):
+    try:
+        from channels.layers import get_channel_layer
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        async_to_sync(channel_layer.group_send)(task_group_name(task_id), message)
+    except Exception as e:
+        # Streaming is best effort; never let it break the task itself
+        logger.debug(f"Could not publish to {task_group_name(task_id)}: {str(e)}")
+
+
+def read_log(task_id, offset: int = 0, max_bytes: Optional[int] = None) -> Dict:
+    """
+    Complete lines of the task's log from byte ``offset``, at most
+    ``max_bytes`` of them (LOG_STREAM_BACKLOG_BYTES). A client resuming
+    from further back than that gets the most recent part only.
+    """
+    max_bytes = max_bytes or getattr(settings, 'LOG_STREAM_BACKLOG_BYTES', 100 * 1024)
+    path = get_log_file_path(task_id)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return {'lines': [], 'offset': 0, 'next_offset': 0}
+
+    offset = min(max(int(offset), 0), size)
+    start = max(offset, size - max_bytes)
+    with open(path, 'rb') as log_file:
+        log_file.seek(start)
+        data = log_file.read(size - start)
+
+    if start > offset and b'\n' in data:
+        # Skipped ahead: drop the partial first line
+        cut = data.index(b'\n') + 1
+        data, start = data[cut:], start + cut
+    # Only hand out whole lines; a trailing partial line is sent once finished
+    end = data.rfind(b'\n') + 1
+    data = data[:end]
+    return {
+        'lines': data.decode('utf-8', errors='replace').splitlines(),
+        'offset': start,
+        'next_offset': start + end,
+    }
+
+
+def publish_status(task_id, status: str, **extra):
+    """Tell the task's watchers about a status change."""
+    _group_send(task_id, {'type': 'task.status', 'status': status, **extra})
+
+
+class TaskLogStreamHandler(logging.Handler):
+    """
+    Appends records to the task's log file and publishes the new lines,
+    with their byte offsets, to the task's channel group. Writes are
+    buffered and lines batched for up to LOG_STREAM_FLUSH_INTERVAL seconds
+    so a chatty task does not pay a disk flush and a message per line.
+    """
+
+    def __init__(self, task_id, flush_interval: Optional[float] = None, max_batch: int = 200):
+        super().__init__()
+        self.task_id = task_id
+        self.path = get_log_file_path(task_id)
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else getattr(settings, 'LOG_STREAM_FLUSH_INTERVAL', 0.5)
+        )
+        self.max_batch = max_batch
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'ab')
+        self._offset = self._file.tell()
+        self._batch: List[str] = []
+        self._batch_offset = self._offset
+        self._last_flush = time.monotonic()
+        self._io_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def emit(self, record):
+        try:
+            message = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        publish = None
+        with self._io_lock:
+            data = (message + '\n').encode('utf-8')
+            self._file.write(data)
+            if not self._batch:
+                self._batch_offset = self._offset
+            self._offset += len(data)
+            self._batch.extend(message.splitlines() or [''])
+            if (len(self._batch) >= self.max_batch or
+                    time.monotonic() - self._last_flush >= self.flush_interval):
+                publish = self._take_batch()
+            elif self._timer is None:
+                # Make sure a quiet task's last lines still go out promptly
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if publish:
+            _group_send(self.task_id, publish)
+
+    def _take_batch(self) -> Optional[Dict]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._batch:
+            return None
+        # Readers resuming from the file must find every line they are told about
+        self._file.flush()
+        message = {
+            'type': 'log.lines',
+            'lines': self._batch,
+            'offset': self._batch_offset,
+            'next_offset': self._offset,
+        }
+        self._batch = []
+        self._last_flush = time.monotonic()
+        return message
+
+    def flush(self):
+        with self._io_lock:
+            publish = self._take_batch()
+        if publish:
+            _group_send(self.task_id, publish)
+
+    def close(self):
+        try:
+            self.flush()
+            with self._io_lock:
+                self._file.close()
+        finally:
+            super().close()
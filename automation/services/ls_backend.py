@@ -3,13 +3,16 @@ import logging
 import requests
 from typing import List, Dict, Optional
 from django.conf import settings
-from django.core.cache import cache
 from requests.exceptions import RequestException
 from automation.request.client import ResourceAccessSignature
+from automation.services.rate_limiter import get_rate_limiter
+from automation.services.tiered_cache import get_tiered_cache
 import backoff
 
 logger = logging.getLogger(__name__)
 
+TOKEN_EXPIRY_MARGIN = 60  # seconds
+
 
 class LSBackendException(Exception):
     """Custom exception for LS Backend related errors."""
@@ -43,12 +46,21 @@ class LSBackendClient:
         Returns:
         - The generated OAuth token or an error if the process fails.
         """
-        cache_key = "ls_access_token"
-
-        # Check for token existance in cache,
-        if token := cache.get(cache_key):
-            return token
-
+        # The token is shared by every process through the tiered cache, and
+        # only one of them requests a new one when it expires.
+        token_data = get_tiered_cache().get_or_set(
+            "ls_access_token", self._request_token, timeout=self._token_timeout)
+        return token_data["access_token"]
+
+    @staticmethod
+    def _token_timeout(token_data):
+        # Expire the cached token a little early so no process uses it after it lapses
+        expires_in = token_data.get("expires_in")
+        if not expires_in:
+            return None
+        return max(1, int(expires_in) - TOKEN_EXPIRY_MARGIN)
+
+    def _request_token(self):
         # Generate and validate access signature for the request
         rs = ResourceAccessSignature()
         timestamp, signature = rs.generate_signature(topic="token")
@@ -63,23 +75,21 @@ class LSBackendClient:
             "client_id": settings.OAUTH_CLIENT_ID,
             "client_secret": settings.OAUTH_CLIENT_SECRET
         }
-        try:
-            response = requests.post(
-                f"{self.base_url}{endpoint}",
-                data=payload,
-                headers=header,
-                timeout=10
-            )
-            response = self.handle_response(
-                response, endpoint.strip('/').split('/')[-1])
-            if token := response.get("access_token") if response else None:
-                cache.set(cache_key, token, timeout=response.get("expires_in"))
-                return token
-            else:
-                raise LSBackendException("Invalid token.")
-
-        except requests.exceptions.HTTPError as e:
-            raise
+        get_rate_limiter('ls_backend').acquire(self.base_url)
+        response = requests.post(
+            f"{self.base_url}{endpoint}",
+            data=payload,
+            headers=header,
+            timeout=10
+        )
+        response = self.handle_response(
+            response, endpoint.strip('/').split('/')[-1])
+        if response and response.get("access_token"):
+            return {
+                "access_token": response["access_token"],
+                "expires_in": response.get("expires_in"),
+            }
+        raise LSBackendException("Invalid token.")
 
     @backoff.on_exception(backoff.expo, RequestException, max_tries=3)
     def _make_request(self, endpoint: str, params: Dict = None) -> Dict:
@@ -93,6 +103,7 @@ class LSBackendClient:
             if self.auth_needed:
                 self.headers["Authorization"] = f'Bearer {self._generate_token()}'
 
+            get_rate_limiter('ls_backend').acquire(self.base_url)
             response = requests.get(
                 full_url,
                 headers=self.headers,
@@ -116,6 +127,34 @@ class LSBackendClient:
             f"{k}_{v}" for k, v in sorted(params.items()) if v)
         return f'ls_{resource}_{param_str}'
 
+    def _fetch_signed(self, topic: str, endpoint: str, params: Dict) -> List[Dict]:
+        """
+        GET an endpoint protected by a resource access signature instead of a token.
+        topic is the name of the url which we are trying to access.
+        """
+        # Generate and validate access signature for the request.
+        rs = ResourceAccessSignature()
+        timestamp, signature = rs.generate_signature(topic=topic)
+
+        self.headers["X-Signature"] = signature
+        self.headers["X-Timestamp"] = str(timestamp)
+        self.auth_needed = False  # no need for token based authentication
+        try:
+            return self._make_request(endpoint, params)
+        finally:
+            self.auth_needed = True  # after use then revert to locked state
+
+    def _get_cached(self, cache_key: str, topic: str, endpoint: str, params: Dict) -> List[Dict]:
+        """
+        Serve a lookup from the tiered cache; only one caller fetches it from
+        LS Backend when it is missing, the others reuse its result.
+        """
+        return get_tiered_cache().get_or_set(
+            cache_key,
+            lambda: self._fetch_signed(topic, endpoint, params),
+            timeout=self.cache_timeout
+        )
+
     def handle_response(self, response: requests.Response, resource_type: str) -> List[Dict]:
         """
         Handle API response and check for errors.
@@ -149,33 +188,18 @@ class LSBackendClient:
             language=language,
             search=search
         )
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-
         params = {'language': language}
         if search:
             params['name'] = search.strip()
 
-        # Generate and validate access signature for the request.
-        # topic is the name of the url which we are trying to access.
-        rs = ResourceAccessSignature()
-        timestamp, signature = rs.generate_signature(topic="country-list")
-
-        self.headers["X-Signature"] = signature
-        self.headers["X-Timestamp"] = str(timestamp)
-        self.auth_needed = False  # no need for token based authentication
-
         try:
-            data = self._make_request('/api/custom-request/load_country', params)
-
+            data = self._get_cached(
+                cache_key, "country-list", '/api/custom-request/load_country', params)
             # Typically data is a list of {id: int, name: str}, but it could differ
             # if the backend returns an object
-            cache.set(cache_key, data, timeout=self.cache_timeout)
         except Exception as e:
             logger.error(f"Error fetching countries: {str(e)}")
-        
-        self.auth_needed = True  # after use then revert to locked state
+
         return data
 
     def get_cities(
@@ -195,10 +219,6 @@ class LSBackendClient:
             language=language,
             search=search
         )
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-
         params = {'language': language}
 
         # IMPORTANT: LS Backend expects 'country_id' (not just 'country')
@@ -206,23 +226,13 @@ class LSBackendClient:
             params['country_id'] = country_id
         if search:
             params['name'] = search.strip()
-        
-        # Generate and validate access signature for the request.
-        # topic is the name of the url which we are trying to access.
-        rs = ResourceAccessSignature()
-        timestamp, signature = rs.generate_signature(topic="city-list")
-
-        self.headers["X-Signature"] = signature
-        self.headers["X-Timestamp"] = str(timestamp)
-        self.auth_needed = False  # no need for token based authentication
 
         try:
-            data = self._make_request('/api/custom-request/load_city', params)
-            cache.set(cache_key, data, timeout=self.cache_timeout)
+            data = self._get_cached(
+                cache_key, "city-list", '/api/custom-request/load_city', params)
         except Exception as e:
             logger.error(f"Error fetching cities: {str(e)}")
 
-        self.auth_needed = True  # after use then revert to locked state
         return data
         
     def get_levels(
@@ -239,32 +249,18 @@ class LSBackendClient:
             language=language,
             search=search
         )
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-
         params = {'language': language}
         if search:
             params['name'] = search.strip()
 
-        # Generate and validate access signature for the request.
-        # topic is the name of the url which we are trying to access.
-        rs = ResourceAccessSignature()
-        timestamp, signature = rs.generate_signature(topic="level-list")
-
-        self.headers["X-Signature"] = signature
-        self.headers["X-Timestamp"] = str(timestamp)
-        self.auth_needed = False  # no need for token based authentication
         try:
-            data = self._make_request('/api/custom-request/load_level', params)
-
+            data = self._get_cached(
+                cache_key, "level-list", '/api/custom-request/load_level', params)
             # Response data format:-
             # [{"id": 32, "title": "Alojamiento", "categories": [{"id": 178, "title": "Tourism", "subcategories": []}]}]
-            cache.set(cache_key, data, timeout=self.cache_timeout)
         except Exception as e:
             logger.error(f"Error fetching levels: {str(e)}")
 
-        self.auth_needed = True  # after use then revert to locked state
         return data
 
     def get_categories(
@@ -285,32 +281,17 @@ class LSBackendClient:
             level_id=level_id
 
         )
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-
         params = {'level_id': level_id, 'language': language}
         if search:
             params['name'] = search.strip()
 
-        # Generate and validate access signature for the request.
-        # topic is the name of the url which we are trying to access.
-        rs = ResourceAccessSignature()
-        timestamp, signature = rs.generate_signature(topic="category-list")
-
-        self.headers["X-Signature"] = signature
-        self.headers["X-Timestamp"] = str(timestamp)
-        self.auth_needed = False  # no need for token based authentication
         try:
-            data = self._make_request(
-                '/api/custom-request/load_category', params)
-
+            data = self._get_cached(
+                cache_key, "category-list", '/api/custom-request/load_category', params)
             # Response data format:-
-            cache.set(cache_key, data, timeout=self.cache_timeout)
         except Exception as e:
             logger.error(f"Error fetching categories: {str(e)}")
 
-        self.auth_needed = True  # after use then revert to locked state
         return data
 
     def get_sub_categories(
@@ -330,31 +311,16 @@ class LSBackendClient:
             search=search,
             category_id=category_id
         )
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-
         params = {'category_id': category_id, 'language': language}
         if search:
             params['name'] = search.strip()
 
-        # Generate and validate access signature for the request.
-        # topic is the name of the url which we are trying to access.
-        rs = ResourceAccessSignature()
-        timestamp, signature = rs.generate_signature(topic="sub-category-list")
-
-        self.headers["X-Signature"] = signature
-        self.headers["X-Timestamp"] = str(timestamp)
-        self.auth_needed = False  # no need for token based authentication
         try:
-            data = self._make_request(
-                '/api/custom-request/load_sub_category', params)
-
+            data = self._get_cached(
+                cache_key, "sub-category-list", '/api/custom-request/load_sub_category', params)
             # Response data format:-
             # [{"id":121,"title":"Hoteles baratos","type":"place","order":0}]
-            cache.set(cache_key, data, timeout=self.cache_timeout)
         except Exception as e:
             logger.error(f"Error fetching sub categories: {str(e)}")
 
-        self.auth_needed = True  # after use then revert to locked state
         return data
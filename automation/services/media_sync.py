@@ -0,0 +1,207 @@
+# automation/services/media_sync.py
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, Tuple
+
+from boto3.s3.transfer import TransferConfig
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = '.media_sync_manifest.json'
+MB = 1024 * 1024
+
+
+def file_md5(path: str, chunk_size: int = MB) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SyncManifest:
+    """
+    What was last uploaded from each local file: {key: {size, mtime_ns, md5}}.
+    Saved atomically every ``save_every`` changes, so an interrupted sync
+    resumes where it stopped instead of starting over.
+    """
+
+    def __init__(self, path: str, save_every: int = 100):
+        self.path = path
+        self.save_every = save_every
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        try:
+            with open(path) as manifest_file:
+                self.entries: Dict[str, Dict] = json.load(manifest_file)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            return self.entries.get(key)
+
+    def record(self, key: str, size: int, mtime_ns: int, md5: str):
+        with self._lock:
+            self.entries[key] = {'size': size, 'mtime_ns': mtime_ns, 'md5': md5}
+            self._unsaved += 1
+            if self._unsaved >= self.save_every:
+                self._save()
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as manifest_file:
+            json.dump(self.entries, manifest_file)
+        os.replace(temp_path, self.path)
+        self._unsaved = 0
+
+
+class MediaSync:
+    """
+    One-way sync of a local directory to a bucket prefix.
+
+    The bucket is listed once (list_objects_v2, 1000 keys a page) and
+    compared with a scan of the directory. A file is skipped when the
+    bucket already holds an object of the same size whose ETag matches the
+    file's MD5, or, for multipart uploads whose ETag is no MD5, whose size
+    matches what the manifest says was uploaded. Files unchanged since the
+    manifest entry (same size and mtime) are not even re-hashed, unless
+    ``trust_manifest`` is off. The rest are uploaded ``concurrency`` at a
+    time, large ones in multipart chunks.
+    """
+
+    def __init__(self, client, bucket: str, local_dir: str, prefix: str = '',
+                 concurrency: int = 16, multipart_threshold: int = 8 * MB,
+                 multipart_chunksize: int = 8 * MB, manifest_path: Optional[str] = None,
+                 extra_args: Optional[Dict] = None, trust_manifest: bool = True):
+        self.client = client
+        self.bucket = bucket
+        self.local_dir = os.path.abspath(local_dir)
+        self.prefix = prefix.lstrip('/')
+        if self.prefix and not self.prefix.endswith('/'):
+            self.prefix += '/'
+        self.concurrency = max(1, concurrency)
+        self.manifest_path = manifest_path or os.path.join(self.local_dir, MANIFEST_NAME)
+        self.manifest = SyncManifest(self.manifest_path)
+        self.extra_args = extra_args or {}
+        self.trust_manifest = trust_manifest
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            # Files already go up in parallel; a few parts each keeps large files moving
+            max_concurrency=min(4, self.concurrency),
+        )
+
+    def scan(self) -> Dict[str, Tuple[str, int, int]]:
+        """{key: (local path, size, mtime_ns)} of every file under local_dir."""
+        files = {}
+        manifest_path = os.path.abspath(self.manifest_path)
+        for root, _, names in os.walk(self.local_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                if path == manifest_path or path == f"{manifest_path}.tmp":
+                    continue
+                stat = os.stat(path)
+                relative = os.path.relpath(path, self.local_dir).replace(os.sep, '/')
+                files[self.prefix + relative] = (path, stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def list_remote(self) -> Dict[str, Tuple[int, str]]:
+        """{key: (size, etag)} of every object under the prefix."""
+        remote = {}
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get('Contents', []):
+                remote[item['Key']] = (item.get('Size', 0), item.get('ETag', '').strip('"'))
+        return remote
+
+    def _is_synced(self, key: str, path: str, size: int, mtime_ns: int, remote: Dict) -> bool:
+        """Whether the bucket already holds this file, hashing it only when the manifest cannot tell."""
+        if key not in remote or remote[key][0] != size:
+            return False
+        etag = remote[key][1]
+        entry = self.manifest.get(key)
+        if self.trust_manifest and entry and entry['size'] == size and entry['mtime_ns'] == mtime_ns:
+            return True
+        md5 = file_md5(path)
+        if etag == md5 or ('-' in etag and entry and entry['md5'] == md5):
+            self.manifest.record(key, size, mtime_ns, md5)
+            return True
+        return False
+
+    def _upload(self, key: str, path: str, size: int, mtime_ns: int):
+        extra_args = dict(self.extra_args)
+        content_type = mimetypes.guess_type(path)[0]
+        if content_type:
+            extra_args.setdefault('ContentType', content_type)
+        md5 = file_md5(path)
+        self.client.upload_file(path, self.bucket, key, ExtraArgs=extra_args, Config=self.transfer_config)
+        self.manifest.record(key, size, mtime_ns, md5)
+
+    def run(self, dry_run: bool = False) -> Dict[str, int]:
+        started = time.monotonic()
+        local = self.scan()
+        remote = self.list_remote()
+        # Only files whose size matches the bucket's copy need hashing; those
+        # are hashed in parallel, hashlib releasing the GIL on large reads
+        to_check = [key for key, (_, size, _) in local.items() if key in remote and remote[key][0] == size]
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='media-sync-check') as executor:
+            synced = {
+                key for key, is_synced in zip(
+                    to_check, executor.map(lambda key: self._is_synced(key, *local[key], remote), to_check)
+                )
+                if is_synced
+            }
+        pending = {key: entry for key, entry in local.items() if key not in synced}
+        report = {
+            'files': len(local),
+            'unchanged': len(local) - len(pending),
+            'to_upload': len(pending),
+            'bytes_to_upload': sum(size for _, size, _ in pending.values()),
+            'uploaded': 0,
+            'bytes_uploaded': 0,
+            'failed': 0,
+        }
+        logger.info(
+            f"Media sync to {self.bucket}/{self.prefix}: {report['to_upload']} of {report['files']} files "
+            f"({report['bytes_to_upload'] / MB:.1f} MB) to upload"
+        )
+        if dry_run or not pending:
+            self.manifest.save()
+            return report
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='media-sync') as executor:
+                futures = {
+                    executor.submit(self._upload, key, *entry): (key, entry[1])
+                    for key, entry in sorted(pending.items())
+                }
+                for future in as_completed(futures):
+                    key, size = futures[future]
+                    try:
+                        future.result()
+                        report['uploaded'] += 1
+                        report['bytes_uploaded'] += size
+                    except Exception as e:
+                        report['failed'] += 1
+                        logger.error(f"Error uploading {key}: {str(e)}")
+        finally:
+            # Whatever finished is remembered, even if the sync is interrupted
+            self.manifest.save()
+
+        elapsed = max(time.monotonic() - started, 0.001)
+        logger.info(
+            f"Media sync uploaded {report['uploaded']} files ({report['bytes_uploaded'] / MB:.1f} MB, "
+            f"{report['bytes_uploaded'] / MB / elapsed:.1f} MB/s), {report['failed']} failed"
+        )
+        return report
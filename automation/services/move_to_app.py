@@ -0,0 +1,407 @@
+# automation/services/move_to_app.py
+import json
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.db.models.functions import Lower
+from django.forms.models import model_to_dict
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from automation.helper import datetime_serializer
+from automation.models import Business, Category, Country, CustomUser, Destination, Image, MoveToAppJob
+from automation.request.client import RequestClient
+from automation.services.image_variants import variant_url
+from automation.utils import process_scraped_types
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_DESCRIPTIONS = [
+    ('description', 'Original description'),
+    ('description_eng', 'English description'),
+    ('description_esp', 'Spanish description'),
+    ('description_fr', 'French description'),
+]
+PROGRESS_SAVE_INTERVAL = 1.0  # seconds between progress writes while publishing
+# images_urls point at the smallest stored copy at least this wide
+APP_IMAGE_WIDTH = getattr(settings, 'MOVE_TO_APP_IMAGE_WIDTH', 960)
+
+
+def _title(business, business_id) -> str:
+    return (business.title if business else None) or f"Business {business_id}"
+
+
+def validate_for_production(business_ids: Iterable) -> List[Dict]:
+    """Check in one query that every business exists and has all descriptions."""
+    business_ids = list(business_ids)
+    fields = [field for field, _ in REQUIRED_DESCRIPTIONS]
+    businesses = Business.objects.only('id', 'title', *fields).in_bulk(business_ids)
+
+    validation_errors = []
+    for business_id in business_ids:
+        business = businesses.get(int(business_id))
+        if business is None:
+            validation_errors.append({
+                'business_id': business_id,
+                'error': 'Business not found'
+            })
+            continue
+
+        missing_descriptions = [
+            label for field, label in REQUIRED_DESCRIPTIONS
+            if not (getattr(business, field) or '').strip()
+        ]
+        if missing_descriptions:
+            validation_errors.append({
+                'business_id': business_id,
+                'business_title': _title(business, business_id),
+                'missing_fields': missing_descriptions
+            })
+    return validation_errors
+
+
+class MoveToAppPublisher:
+    """
+    Publishes a batch of businesses to Local Secrets. Everything the payloads
+    need is loaded up front in a few queries; the payloads are then posted
+    concurrently over one keep-alive session that retries failed connects, and
+    each business is moved to IN_PRODUCTION as soon as its post succeeds.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, timeout: Optional[float] = None,
+                 retries: Optional[int] = None):
+        self.concurrency = concurrency or getattr(settings, 'MOVE_TO_APP_CONCURRENCY', 4)
+        self.timeout = timeout or getattr(settings, 'MOVE_TO_APP_TIMEOUT', 30)
+        self.retries = retries if retries is not None else getattr(settings, 'MOVE_TO_APP_RETRIES', 3)
+
+    def _create_session(self) -> requests.Session:
+        # Only failures to connect are retried: the POST is not idempotent, and
+        # after a read timeout or a gateway error Local Secrets may already
+        # have created the record, so a retry could publish it twice
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=1,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    # Prefetching
+
+    def _load_businesses(self, business_ids) -> Dict[int, Business]:
+        return Business.objects.select_related('task__level').in_bulk(business_ids)
+
+    def _load_categories(self, businesses) -> Tuple[Dict, Dict]:
+        """Index the categories of the batch's levels like get_category_by_title looks them up."""
+        level_ids = {b.task.level_id for b in businesses if b.task_id and b.task.level_id}
+        by_title = {}
+        by_parent = {}
+        for category in Category.objects.filter(level_id__in=level_ids).order_by('pk'):
+            title = category.title.strip().lower()
+            by_title.setdefault((category.level_id, title), category)
+            by_parent.setdefault((category.level_id, title, category.parent_id), category)
+        return by_title, by_parent
+
+    def _load_by_name(self, model, names) -> Dict[str, object]:
+        names = {name.lower() for name in names if name}
+        objects = {}
+        for obj in model.objects.annotate(name_lower=Lower('name')).filter(name_lower__in=names).order_by('pk'):
+            objects.setdefault(obj.name_lower, obj)
+        return objects
+
+    def _load_image_urls(self, business_ids) -> Dict[int, List[str]]:
+        image_urls = defaultdict(list)
+        images = Image.objects.filter(
+            business_id__in=business_ids,
+            is_approved=True
+        ).values_list('business_id', 'image_url', 'local_path', 'variants')
+        for business_id, image_url, local_path, variants in images:
+            # The smallest stored copy wide enough for the app, the original without one
+            image_urls[business_id].append(variant_url(local_path, variants, APP_IMAGE_WIDTH, fallback=image_url))
+        return image_urls
+
+    def prepare(self, business_ids, user_id) -> Tuple[Dict[int, Tuple[Business, Dict]], List[Dict]]:
+        """
+        Build the move-to-app payload of every business.
+        Returns ({business_id: (business, payload)}, errors).
+        """
+        from automation.tasks import format_operating_hours
+
+        businesses = self._load_businesses(business_ids)
+        categories_by_title, categories_by_parent = self._load_categories(businesses.values())
+        destinations = self._load_by_name(Destination, (b.city for b in businesses.values()))
+        countries = self._load_by_name(Country, (b.country for b in businesses.values()))
+        image_urls = self._load_image_urls(list(businesses))
+        user = CustomUser.objects.filter(id=int(user_id)).first()
+        user_data = model_to_dict(user) if user else None
+        country_data = {}
+
+        payloads = {}
+        errors = []
+        for business_id in business_ids:
+            business = businesses.get(int(business_id))
+
+            def fail(message):
+                errors.append({
+                    'business_id': business_id,
+                    'business_title': _title(business, business_id),
+                    'error': message
+                })
+
+            if business is None:
+                fail("Business not found")
+                continue
+
+            try:
+                # Process types
+                all_types = []
+                for types_str in [business.types, business.types_eng, business.types_esp, business.types_fr]:
+                    if types_str:
+                        all_types.extend(t.strip() for t in types_str.split(','))
+
+                business_data = model_to_dict(business)
+                business_data['types'] = process_scraped_types(all_types, business.main_category)
+                if not business_data.get('language'):
+                    business_data['language'] = 'en'
+
+                # Format operating hours
+                if business_data.get('operating_hours'):
+                    try:
+                        business_data['operating_hours'] = format_operating_hours(business_data['operating_hours'])
+                    except Exception as e:
+                        logger.error(f"Error formatting operating hours for business {business_id}: {str(e)}")
+                        fail(f"Operating hours formatting error: {str(e)}")
+                        continue
+
+                task_level = business.task.level
+                business_data["level_id"] = task_level.ls_id
+
+                # Category handling
+                main_category = categories_by_title.get(
+                    (task_level.id, (business.main_category or '').strip().lower()))
+                if not main_category:
+                    fail(f"Main category not found: {business.main_category}")
+                    continue
+                business_data["category_id"] = main_category.ls_id
+
+                if business.tailored_category:
+                    sub_category = categories_by_parent.get(
+                        (task_level.id, business.tailored_category.strip().lower(), main_category.id))
+                    if sub_category:
+                        business_data["sub_category_id"] = sub_category.ls_id
+                    else:
+                        logger.warning(
+                            f"Subcategory not found for business {business_id}: {business.tailored_category}"
+                        )
+
+                # City and Country handling
+                destination = destinations.get((business.city or '').lower())
+                country = countries.get((business.country or '').lower())
+                if not destination or not country:
+                    missing = 'Destination' if not destination else 'Country'
+                    fail(f"Location mapping error: No {missing} matches the given query.")
+                    continue
+                business_data["city_id"] = destination.ls_id
+                business_data["country_id"] = country.ls_id
+                if country.pk not in country_data:
+                    country_data[country.pk] = model_to_dict(country)
+
+                if user_data is None:
+                    fail(f"User {user_id} not found")
+                    continue
+
+                payloads[business.id] = (business, {
+                    **business_data,
+                    'country': country_data[country.pk],
+                    'user': user_data,
+                    'images_urls': image_urls.get(business.id, [])
+                })
+            except Exception as e:
+                fail(f"Data preparation error: {str(e)}")
+
+        return payloads, errors
+
+    # Publishing
+
+    def _post(self, client: RequestClient, business_id, result_data: Dict) -> Optional[str]:
+        """Post one payload; returns a warning if it only went through without types."""
+        try:
+            client.request('move-to-app', json.dumps(result_data, default=datetime_serializer))
+            return None
+        except Exception as first_error:
+            logger.warning(f"Move to app failed for business {business_id}, retrying without types: {str(first_error)}")
+
+        # Retry without types
+        result_data_without_types = result_data.copy()
+        removed_types = result_data_without_types.pop('types', '')
+        client.request('move-to-app', json.dumps(result_data_without_types, default=datetime_serializer))
+        return f'Moved without types: {removed_types}'
+
+    def publish(self, payloads: Dict[int, Tuple[Business, Dict]], on_result=None):
+        """
+        Post all payloads with bounded concurrency. ``on_result(business_id,
+        business, warning, error)`` is called from the calling thread as each
+        post finishes, so it may touch the database.
+        """
+        session = self._create_session()
+        client = RequestClient(session=session, timeout=self.timeout)
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = {
+                    executor.submit(self._post, client, business_id, result_data): business_id
+                    for business_id, (_, result_data) in payloads.items()
+                }
+                for future in as_completed(futures):
+                    business_id = futures[future]
+                    try:
+                        warning, error = future.result(), None
+                    except Exception as e:
+                        warning, error = None, e
+                    if on_result:
+                        on_result(business_id, payloads[business_id][0], warning, error)
+        finally:
+            session.close()
+
+
+def run_job(job: MoveToAppJob, publisher: Optional[MoveToAppPublisher] = None):
+    """Publish a job's businesses and move the published ones to IN_PRODUCTION."""
+    from automation.signals import update_task_status_signal
+
+    publisher = publisher or MoveToAppPublisher()
+    results = {
+        'moved_to_app_businesses': [],
+        'move_to_app_errors': [],
+        'updated_businesses': [],
+        'errors': [],
+        'affected_tasks': [],
+    }
+    affected_tasks = {}
+    last_saved = [time.monotonic()]
+
+    def save_progress(force=False, extra_fields=()):
+        if force or time.monotonic() - last_saved[0] >= PROGRESS_SAVE_INTERVAL:
+            job.processed = len(results['moved_to_app_businesses']) + len(results['move_to_app_errors'])
+            job.succeeded = len(results['updated_businesses'])
+            job.failed = len(results['move_to_app_errors']) + len(results['errors'])
+            job.results = results
+            job.save(update_fields=[
+                'status', 'processed', 'succeeded', 'failed', 'results', 'updated_at', *extra_fields
+            ])
+            last_saved[0] = time.monotonic()
+
+    def on_result(business_id, business, warning, error):
+        title = _title(business, business_id)
+        if error is not None:
+            results['move_to_app_errors'].append({
+                'business_id': business_id,
+                'business_title': title,
+                'error': f"Failed to move to Local Secrets: {str(error)}"
+            })
+            logger.error(f"Failed to move business {business_id} to Local Secrets: {str(error)}")
+            save_progress()
+            return
+
+        moved = {'business_id': business_id, 'business_title': title}
+        if warning:
+            moved['warning'] = warning
+            logger.warning(f"Business {business_id} moved to Local Secrets without types")
+        else:
+            logger.info(f"Successfully moved business {business_id} to Local Secrets")
+        results['moved_to_app_businesses'].append(moved)
+
+        try:
+            old_status = business.status
+            business.status = 'IN_PRODUCTION'
+            business.save()
+            if business.task:
+                affected_tasks[business.task_id] = business.task
+            results['updated_businesses'].append({
+                'id': business.id,
+                'old_status': old_status,
+                'new_status': 'IN_PRODUCTION',
+                'title': title
+            })
+            logger.info(f"Business {business_id} status updated: {old_status} -> IN_PRODUCTION")
+        except Exception as e:
+            error_msg = f"Error updating business {business_id}: {str(e)}"
+            results['errors'].append({'business_id': business_id, 'error': error_msg})
+            logger.error(error_msg, exc_info=True)
+        save_progress()
+
+    job.status = 'RUNNING'
+    job.total = len(job.business_ids)
+    job.save(update_fields=['status', 'total', 'updated_at'])
+
+    try:
+        payloads, errors = publisher.prepare(job.business_ids, job.user_id)
+        results['move_to_app_errors'].extend(errors)
+        save_progress(force=True)
+        publisher.publish(payloads, on_result=on_result)
+
+        for task in affected_tasks.values():
+            try:
+                update_task_status_signal(task, None)
+            except Exception as e:
+                error_msg = f"Error updating task {task.id} status: {str(e)}"
+                results['errors'].append({'task_id': task.id, 'error': error_msg})
+                logger.error(error_msg, exc_info=True)
+        results['affected_tasks'] = list(affected_tasks)
+        job.status = 'COMPLETED'
+    except Exception as e:
+        logger.error(f"Move to app job {job.id} failed: {str(e)}", exc_info=True)
+        job.status = 'FAILED'
+        job.error = str(e)
+
+    job.finished_at = timezone.now()
+    save_progress(force=True, extra_fields=['error', 'finished_at'])
+    logger.info(
+        f"Move to app job {job.id} finished: "
+        f"{len(results['updated_businesses'])} businesses updated, "
+        f"{len(results['move_to_app_errors']) + len(results['errors'])} errors occurred"
+    )
+    return job
+
+
+def job_response(job: MoveToAppJob) -> Dict:
+    """Progress of a job, in the shape of the bulk status update response once finished."""
+    results = job.results or {}
+    moved = results.get('moved_to_app_businesses', [])
+    move_errors = results.get('move_to_app_errors', [])
+    updated = results.get('updated_businesses', [])
+    errors = results.get('errors', [])
+
+    response_data = {
+        'job_id': job.id,
+        'status': job.status,
+        'finished': job.is_finished,
+        'total_requested': job.total or len(job.business_ids),
+        'processed': job.processed,
+        'success': len(updated) > 0,
+        'updated_count': len(updated),
+        'updated_businesses': updated,
+        'affected_tasks': results.get('affected_tasks', []),
+        'moved_to_app_count': len(moved),
+        'moved_to_app_businesses': moved,
+        'move_to_app_errors': move_errors,
+        'move_to_app_failed_count': len(move_errors),
+        'partial_success': len(moved) > 0 and len(move_errors) + len(errors) > 0,
+    }
+    if errors:
+        response_data['errors'] = errors
+        response_data['error_count'] = len(errors)
+    if job.error:
+        response_data['error'] = job.error
+    return response_data
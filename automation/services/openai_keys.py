@@ -0,0 +1,235 @@
+# automation/services/openai_keys.py
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import openai
+from django.conf import settings
+
+from automation.services.pacing import parse_retry_after
+from automation.services.rate_limiter import _hash_key, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Errors that say the key itself is unusable, as opposed to the request or the service
+KEY_ERRORS = (openai.error.AuthenticationError, openai.error.PermissionError)
+# Errors worth retrying with another key after a cooldown of this one
+TRANSIENT_ERRORS = (
+    openai.error.RateLimitError,
+    openai.error.APIError,
+    openai.error.APIConnectionError,
+    openai.error.Timeout,
+    openai.error.ServiceUnavailableError,
+)
+
+
+class NoOpenAIKeyAvailable(Exception):
+    """Every configured OpenAI key is missing or has been disabled."""
+
+
+class OpenAIKeyPool:
+    """
+    Configured OpenAI keys, chosen per call without probing the API.
+
+    Keys are handed out by smooth weighted round-robin (OPENAI_KEY_WEIGHTS),
+    so traffic spreads over every key in proportion to its weight. What the
+    real responses say decides a key's health: a rate limit or a transient
+    error cools the key down (honouring Retry-After, doubling up to
+    max_cooldown while it keeps failing), an authentication error or an
+    exhausted quota takes it out of rotation, and a success restores it.
+    """
+
+    def __init__(self, keys: Sequence[str], weights: Optional[Sequence[int]] = None,
+                 base_cooldown: Optional[float] = None, max_cooldown: Optional[float] = None):
+        weights = list(weights or [])
+        self.base_cooldown = (
+            base_cooldown if base_cooldown is not None else getattr(settings, 'OPENAI_KEY_COOLDOWN', 5.0)
+        )
+        self.max_cooldown = (
+            max_cooldown if max_cooldown is not None else getattr(settings, 'OPENAI_KEY_MAX_COOLDOWN', 300.0)
+        )
+        self._lock = threading.Lock()
+        self._keys: Dict[str, Dict] = {}
+        for index, key in enumerate(keys):
+            if not key or key in self._keys:
+                continue
+            weight = weights[index] if index < len(weights) else 1
+            self._keys[key] = {
+                'weight': max(1, int(weight)),
+                'current': 0,
+                'blocked_until': 0.0,
+                'cooldown': 0.0,
+                'disabled': False,
+                'calls': 0,
+                'failures': 0,
+                'rate_limited': 0,
+            }
+
+    def __len__(self):
+        return len(self._keys)
+
+    def has_usable_key(self) -> bool:
+        with self._lock:
+            return any(not state['disabled'] for state in self._keys.values())
+
+    def _choose(self, now: float) -> Optional[str]:
+        """Next available key by smooth weighted round-robin; caller holds the lock."""
+        available = [
+            (key, state) for key, state in self._keys.items()
+            if not state['disabled'] and state['blocked_until'] <= now
+        ]
+        if not available:
+            return None
+        total = sum(state['weight'] for _, state in available)
+        for _, state in available:
+            state['current'] += state['weight']
+        key, state = max(available, key=lambda item: item[1]['current'])
+        state['current'] -= total
+        return key
+
+    def _next(self, deadline: float):
+        """(key, 0) for the next call, or (None, seconds to wait before asking again)."""
+        with self._lock:
+            now = time.monotonic()
+            key = self._choose(now)
+            if key is None:
+                waiting = [state['blocked_until'] for state in self._keys.values() if not state['disabled']]
+                if not waiting:
+                    raise NoOpenAIKeyAvailable("No usable OpenAI API key is configured")
+                if now < deadline:
+                    return None, max(0.0, min(min(waiting), deadline) - now)
+                # Better to try a cooling key than to fail outright
+                key = min(
+                    (key for key, state in self._keys.items() if not state['disabled']),
+                    key=lambda key: self._keys[key]['blocked_until'],
+                )
+            self._keys[key]['calls'] += 1
+            return key, 0.0
+
+    def acquire(self, max_wait: Optional[float] = None) -> str:
+        """
+        A key to use for the next call. While every usable key is cooling
+        down this waits for the first one to recover, for at most
+        ``max_wait`` seconds (max_cooldown by default).
+        """
+        deadline = time.monotonic() + (self.max_cooldown if max_wait is None else max_wait)
+        while True:
+            key, wait = self._next(deadline)
+            if key is not None:
+                return key
+            time.sleep(wait)
+
+    async def acquire_async(self, max_wait: Optional[float] = None) -> str:
+        """Async variant of ``acquire`` that yields to the event loop while waiting."""
+        deadline = time.monotonic() + (self.max_cooldown if max_wait is None else max_wait)
+        while True:
+            key, wait = self._next(deadline)
+            if key is not None:
+                return key
+            await asyncio.sleep(wait)
+
+    def success(self, key: str):
+        with self._lock:
+            state = self._keys.get(key)
+            if state:
+                state['cooldown'] = 0.0
+                state['blocked_until'] = 0.0
+
+    def failure(self, key: str, error: Exception):
+        """Record what a failed call says about ``key``."""
+        with self._lock:
+            state = self._keys.get(key)
+            if not state:
+                return
+            state['failures'] += 1
+            quota_exhausted = getattr(error, 'code', None) == 'insufficient_quota'
+            if isinstance(error, KEY_ERRORS) or quota_exhausted:
+                state['disabled'] = True
+                logger.error(f"OpenAI key {_hash_key(key)} taken out of rotation: {str(error)}")
+                return
+            if isinstance(error, openai.error.RateLimitError):
+                state['rate_limited'] += 1
+            headers = getattr(error, 'headers', None) or {}
+            retry_after = parse_retry_after(headers.get('retry-after'))
+            state['cooldown'] = min(self.max_cooldown, max(self.base_cooldown, state['cooldown'] * 2))
+            pause = retry_after if retry_after is not None else state['cooldown']
+            state['blocked_until'] = time.monotonic() + pause
+            logger.warning(f"OpenAI key {_hash_key(key)} cooling down for {pause:.1f}s: {str(error)}")
+
+    def get_stats(self) -> List[Dict]:
+        """Health of each key, identified by its hash."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'key': _hash_key(key),
+                    'weight': state['weight'],
+                    'disabled': state['disabled'],
+                    'cooling_for': round(max(0.0, state['blocked_until'] - now), 1),
+                    'calls': state['calls'],
+                    'failures': state['failures'],
+                    'rate_limited': state['rate_limited'],
+                }
+                for key, state in self._keys.items()
+            ]
+
+
+_pool_lock = threading.Lock()
+_pool: Optional[OpenAIKeyPool] = None
+
+
+def get_openai_key_pool() -> OpenAIKeyPool:
+    """The process-wide pool over settings.OPENAI_KEYS, built on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OpenAIKeyPool(
+                getattr(settings, 'OPENAI_KEYS', []),
+                getattr(settings, 'OPENAI_KEY_WEIGHTS', None),
+            )
+            logger.info(f"OpenAI key pool initialized with {len(_pool)} key(s)")
+        return _pool
+
+
+def chat_completion(retries: int = 3, **kwargs):
+    """
+    openai.ChatCompletion.create() with a key from the pool, rate limited
+    per key. A failure is reported to the pool and, when transient or
+    key-specific, retried with the next key up to ``retries`` attempts.
+    """
+    pool = get_openai_key_pool()
+    attempts = max(1, retries)
+    for attempt in range(attempts):
+        key = pool.acquire()
+        get_rate_limiter('openai').acquire(key)
+        try:
+            response = openai.ChatCompletion.create(api_key=key, **kwargs)
+        except KEY_ERRORS + TRANSIENT_ERRORS as e:
+            pool.failure(key, e)
+            if attempt == attempts - 1 or not pool.has_usable_key():
+                raise
+            logger.warning(f"OpenAI call failed on attempt {attempt + 1}: {str(e)}")
+            continue
+        pool.success(key)
+        return response
+
+
+async def achat_completion(retries: int = 3, **kwargs):
+    """Async variant of ``chat_completion`` on openai.ChatCompletion.acreate()."""
+    pool = get_openai_key_pool()
+    attempts = max(1, retries)
+    for attempt in range(attempts):
+        key = await pool.acquire_async()
+        await get_rate_limiter('openai').acquire_async(key)
+        try:
+            response = await openai.ChatCompletion.acreate(api_key=key, **kwargs)
+        except KEY_ERRORS + TRANSIENT_ERRORS as e:
+            pool.failure(key, e)
+            if attempt == attempts - 1 or not pool.has_usable_key():
+                raise
+            logger.warning(f"OpenAI call failed on attempt {attempt + 1}: {str(e)}")
+            continue
+        pool.success(key)
+        return response
@@ -0,0 +1,142 @@
+# automation/services/pacing.py
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SERPAPI_HOST = 'serpapi.com'
+
+THROTTLE_STATUS_CODES = {429, 503}
+SERPAPI_THROTTLE_MARKERS = ('rate limit', 'too many requests', 'throttl', 'try again later')
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds from now."""
+    if value in (None, ''):
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class PacingController:
+    """
+    Adaptive pacing for calls to remote hosts.
+
+    Calls run at full speed until a host signals throttling (HTTP 429/503,
+    Retry-After or a SerpAPI rate-limit error). The delay for that host then
+    grows exponentially, honouring Retry-After when given, and decays again
+    with every successful response. Time spent waiting and time spent inside
+    requests are both recorded so a task can report how long it was throttled.
+    """
+
+    def __init__(self, base_delay: Optional[float] = None, max_delay: Optional[float] = None, decay: float = 0.5):
+        self.base_delay = base_delay if base_delay is not None else getattr(settings, 'PACING_BASE_DELAY', 1.0)
+        self.max_delay = max_delay if max_delay is not None else getattr(settings, 'PACING_MAX_DELAY', 60.0)
+        self.decay = decay
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict] = {}
+        self.throttled_seconds = 0.0
+        self.working_seconds = 0.0
+
+    def _host_state(self, host: str) -> Dict:
+        return self._hosts.setdefault(host, {
+            'delay': 0.0,
+            'blocked_until': 0.0,
+            'throttle_events': 0,
+            'requests': 0,
+        })
+
+    def wait(self, host: str) -> float:
+        """Sleep only if ``host`` is currently throttled. Returns the seconds slept."""
+        with self._lock:
+            state = self._host_state(host)
+            delay = max(0.0, state['blocked_until'] - time.monotonic())
+        if delay <= 0:
+            return 0.0
+        logger.info(f"Pacing {host}: waiting {delay:.2f}s after throttling")
+        time.sleep(delay)
+        with self._lock:
+            self.throttled_seconds += delay
+        return delay
+
+    def throttle(self, host: str, retry_after: Optional[float] = None):
+        """Register a throttling signal from ``host`` and back off."""
+        with self._lock:
+            state = self._host_state(host)
+            delay = min(self.max_delay, max(self.base_delay, state['delay'] * 2))
+            if retry_after is not None:
+                delay = min(self.max_delay, max(delay, retry_after))
+            state['delay'] = delay
+            state['blocked_until'] = max(state['blocked_until'], time.monotonic() + delay)
+            state['throttle_events'] += 1
+        logger.warning(f"Host {host} is throttling requests, backing off {delay:.2f}s")
+
+    def success(self, host: str):
+        """Relax the delay for ``host`` after a successful call."""
+        with self._lock:
+            state = self._host_state(host)
+            state['delay'] = state['delay'] * self.decay
+            if state['delay'] < self.base_delay / 4:
+                state['delay'] = 0.0
+
+    def record_response(self, host: str, response) -> bool:
+        """Inspect an HTTP response. Returns True if the host asked us to slow down."""
+        if response.status_code in THROTTLE_STATUS_CODES:
+            self.throttle(host, parse_retry_after(response.headers.get('Retry-After')))
+            return True
+        self.success(host)
+        return False
+
+    def record_serpapi_result(self, results) -> bool:
+        """Inspect a SerpAPI result dict. Returns True if the error means we are being throttled."""
+        error = (results or {}).get('error') if isinstance(results, dict) else None
+        if error and any(marker in str(error).lower() for marker in SERPAPI_THROTTLE_MARKERS):
+            self.throttle(SERPAPI_HOST)
+            return True
+        self.success(SERPAPI_HOST)
+        return False
+
+    @contextmanager
+    def request(self, host: str):
+        """Wait for ``host`` if needed, then time the wrapped call as working time."""
+        self.wait(host)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self.working_seconds += elapsed
+                self._host_state(host)['requests'] += 1
+
+    def get_stats(self) -> Dict:
+        """Throttled vs. working time and the per-host pacing state."""
+        with self._lock:
+            return {
+                'throttled_seconds': round(self.throttled_seconds, 2),
+                'working_seconds': round(self.working_seconds, 2),
+                'hosts': {
+                    host: {
+                        'delay': round(state['delay'], 2),
+                        'throttle_events': state['throttle_events'],
+                        'requests': state['requests'],
+                    }
+                    for host, state in self._hosts.items()
+                },
+            }
+
+
+default_pacer = PacingController()
@@ -0,0 +1,210 @@
+# automation/services/pagination.py
+import base64
+import hashlib
+import json
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import connections
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+COUNT_MODES = ('exact', 'approx', 'none')
+
+
+def encode_cursor(position: dict) -> str:
+    """Opaque, URL-safe cursor for a keyset position."""
+    raw = json.dumps(position, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(position, dict):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return position
+
+
+def parse_page_size(value, default: int, maximum: int) -> int:
+    """Requested page size clamped to 1..maximum; missing or invalid values mean ``default``."""
+    try:
+        return min(max(int(value), 1), maximum)
+    except (TypeError, ValueError):
+        return default
+
+
+def stable_ordering(sort_field: str, unique_field: str = 'id') -> Tuple[str, ...]:
+    """``sort_field`` plus ``unique_field`` in the same direction, so every row has one position."""
+    if sort_field.lstrip('-') == unique_field:
+        return (sort_field,)
+    return (sort_field, f"-{unique_field}" if sort_field.startswith('-') else unique_field)
+
+
+class CursorPage:
+    """One keyset page: its items and opaque cursors for the pages around it."""
+
+    def __init__(self, items: List, next_cursor: Optional[str], previous_cursor: Optional[str]):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def as_dict(self) -> Dict:
+        return {
+            'next_cursor': self.next_cursor,
+            'previous_cursor': self.previous_cursor,
+            'has_next': self.next_cursor is not None,
+            'has_previous': self.previous_cursor is not None,
+        }
+
+
+def _value(item, name):
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def _position(item, ordering: Sequence[str]) -> List:
+    return [_value(item, field.lstrip('-')) for field in ordering]
+
+
+def _after(ordering: Sequence[str], values: Sequence, backwards: bool = False) -> Q:
+    """
+    Rows strictly after ``values`` in ``ordering`` (before them when
+    ``backwards``): (a > x) OR (a = x AND b > y) OR ..., with each
+    comparison flipped for descending fields. The ordering columns must
+    not be NULL; sort nullable ones on a Coalesce() annotation instead.
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        if value is None:
+            raise ValueError(f"Cannot seek on NULL {name}; order by a non-null expression")
+        descending = field.startswith('-') != backwards
+        condition |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def paginate(queryset, ordering: Sequence[str], cursor: Optional[str], page_size: int) -> CursorPage:
+    """
+    One page of ``queryset`` in ``ordering``, whose last field must be unique
+    (see stable_ordering()). The page after or before ``cursor`` is found by
+    seeking on the ordering columns instead of OFFSET, so deep pages cost the
+    same as the first one. Ordering fields may be columns or annotations.
+    Raises ValueError for malformed cursors.
+    """
+    ordering = tuple(ordering)
+    position, backwards = None, False
+    if cursor:
+        decoded = decode_cursor(cursor)
+        position, direction = decoded.get('v'), decoded.get('d', 'next')
+        if (not isinstance(position, list) or len(position) != len(ordering)
+                or direction not in ('next', 'prev')
+                or not all(isinstance(value, (str, int, float)) for value in position)):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        backwards = direction == 'prev'
+        try:
+            queryset = queryset.filter(_after(ordering, position, backwards))
+        except (TypeError, ValueError, ValidationError) as e:
+            # Values of the right shape that the ordering fields cannot hold
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    if backwards:
+        reverse = tuple(field[1:] if field.startswith('-') else f"-{field}" for field in ordering)
+        items = list(queryset.order_by(*reverse)[:page_size + 1])
+    else:
+        items = list(queryset.order_by(*ordering)[:page_size + 1])
+    # The extra row tells whether there is more in the direction of travel
+    more = len(items) > page_size
+    items = items[:page_size]
+    if backwards:
+        items.reverse()
+
+    if not items:
+        return CursorPage([], None, None)
+    has_next = more if not backwards else True
+    has_previous = more if backwards else position is not None
+    return CursorPage(
+        items,
+        encode_cursor({'v': _position(items[-1], ordering), 'd': 'next'}) if has_next else None,
+        encode_cursor({'v': _position(items[0], ordering), 'd': 'prev'}) if has_previous else None,
+    )
+
+
+def keyset_page(queryset, cursor: Optional[str], page_size: int, field: str = 'id') -> Tuple[List, Optional[str]]:
+    """
+    One page of ``queryset`` ordered by the unique ``field`` (prefix with '-'
+    for descending), starting after ``cursor``.
+    Returns the items and the cursor of the next page, or None on the last.
+    """
+    page = paginate(queryset, (field,), cursor, page_size)
+    return page.items, page.next_cursor
+
+
+def _count_cache_key(queryset) -> str:
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f"{queryset.db}:{sql}:{params!r}".encode()).hexdigest()
+    return f"pagination_count:{digest}"
+
+
+def _estimate(queryset) -> Optional[int]:
+    """Planner row estimate of ``queryset`` on Postgres, without running it."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_rows(queryset, mode: str = 'approx') -> Tuple[Optional[int], bool]:
+    """
+    Total rows of ``queryset`` for a listing header, as (count, approximate).
+
+    'none' skips counting. 'exact' runs COUNT(*), cached for
+    PAGINATION_COUNT_CACHE_TTL seconds per query. 'approx' uses the Postgres
+    planner estimate when it is above PAGINATION_EXACT_COUNT_LIMIT, where an
+    exact count gets expensive, and an exact count otherwise.
+    """
+    if mode == 'none':
+        return None, False
+    queryset = queryset.order_by()
+    try:
+        key = _count_cache_key(queryset)
+    except EmptyResultSet:
+        return 0, False
+
+    if mode == 'approx' and connections[queryset.db].vendor == 'postgresql':
+        try:
+            estimate = _estimate(queryset)
+        except Exception as e:
+            logger.warning(f"Could not estimate row count: {str(e)}")
+            estimate = None
+        if estimate is not None and estimate > getattr(settings, 'PAGINATION_EXACT_COUNT_LIMIT', 10000):
+            return estimate, True
+
+    try:
+        total = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Could not read cached row count: {str(e)}")
+        total = None
+    if total is None:
+        total = queryset.count()
+        try:
+            cache.set(key, total, getattr(settings, 'PAGINATION_COUNT_CACHE_TTL', 60))
+        except Exception as e:
+            logger.warning(f"Could not cache row count: {str(e)}")
+    return total, False
+
+
+def parse_count_mode(value, default: str = 'approx') -> str:
+    return value if value in COUNT_MODES else default
@@ -0,0 +1,170 @@
+# automation/services/permissions.py
+import logging
+import uuid
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY = '_user_permissions'
+VERSION_KEY = 'user_permissions_version:{user_id}'
+# Attribute on the user instance; request.user lives for one request, so this is request-scoped
+USER_ATTRIBUTE = '_permissions_cache'
+
+
+class UserPermissions:
+    """Roles and assigned destination ids of one user, loaded once."""
+
+    def __init__(self, is_superuser: bool = False, roles: Iterable[str] = (),
+                 destination_ids: Iterable[int] = ()):
+        self.is_superuser = is_superuser
+        # Kept in UserRole id order so the first one stays the "primary" role
+        self.role_list: Tuple[str, ...] = tuple(roles)
+        self.roles: FrozenSet[str] = frozenset(self.role_list)
+        self.destination_ids: FrozenSet[int] = frozenset(destination_ids)
+
+    @property
+    def is_admin(self) -> bool:
+        return self.is_superuser or 'ADMIN' in self.roles
+
+    @property
+    def is_ambassador(self) -> bool:
+        return 'AMBASSADOR' in self.roles
+
+    @property
+    def is_admin_or_ambassador(self) -> bool:
+        return self.is_admin or self.is_ambassador
+
+    def has_role(self, role: str) -> bool:
+        return role in self.roles
+
+    @property
+    def primary_role_display(self) -> str:
+        """Display name of the user's first role, as shown in the page header."""
+        if not self.role_list:
+            return ''
+        from automation.models import UserRole
+        return dict(UserRole.ROLE_CHOICES).get(self.role_list[0], self.role_list[0])
+
+    def can_access_destination(self, destination_id) -> bool:
+        """Admins reach every destination, ambassadors only their assigned ones."""
+        if self.is_admin:
+            return True
+        return self.is_ambassador and destination_id in self.destination_ids
+
+    def as_dict(self) -> Dict[str, bool]:
+        """Flags exposed to templates and the task detail API."""
+        return {
+            'is_admin': self.is_admin,
+            'is_ambassador': self.is_ambassador,
+            'can_edit': self.is_superuser or bool(self.roles & {'ADMIN', 'AMBASSADOR'}),
+            'can_delete': self.is_admin,
+            'can_move_to_production': self.is_admin,
+        }
+
+    def to_session(self, version: str) -> Dict:
+        return {
+            'version': version,
+            'roles': list(self.role_list),
+            'destination_ids': sorted(self.destination_ids),
+        }
+
+    @classmethod
+    def from_session(cls, user, data: Dict) -> 'UserPermissions':
+        # is_superuser comes from the freshly loaded user row, never the session
+        return cls(user.is_superuser, data['roles'], data['destination_ids'])
+
+
+ANONYMOUS = UserPermissions()
+
+
+def load_permissions(user) -> UserPermissions:
+    """Read roles and destinations from the database: two queries."""
+    return UserPermissions(
+        is_superuser=user.is_superuser,
+        roles=user.roles.order_by('id').values_list('role', flat=True),
+        destination_ids=user.destinations.values_list('id', flat=True),
+    )
+
+
+def get_permissions(user) -> UserPermissions:
+    """
+    Permissions of ``user``, loaded at most once per user instance. Since
+    request.user is a fresh instance per request, every role check of a
+    request after the first is free.
+    """
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS
+    permissions = getattr(user, USER_ATTRIBUTE, None)
+    if permissions is None:
+        permissions = load_permissions(user)
+        setattr(user, USER_ATTRIBUTE, permissions)
+    return permissions
+
+
+def _current_version(user_id) -> Optional[str]:
+    try:
+        return cache.get(VERSION_KEY.format(user_id=user_id))
+    except Exception as e:
+        logger.warning(f"Could not read permissions version for user {user_id}: {str(e)}")
+        return None
+
+
+def get_request_permissions(request) -> UserPermissions:
+    """
+    Permissions of the request's user. With PERMISSIONS_SESSION_CACHE they
+    are kept in the session and reused until invalidate_permissions() bumps
+    the user's version, so most requests issue no role queries at all.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS
+    if getattr(user, USER_ATTRIBUTE, None) is not None:
+        return getattr(user, USER_ATTRIBUTE)
+
+    session = getattr(request, 'session', None)
+    if session is None or not getattr(settings, 'PERMISSIONS_SESSION_CACHE', False):
+        return get_permissions(user)
+
+    version = _current_version(user.pk)
+    cached = session.get(SESSION_KEY)
+    if version and cached and cached.get('version') == version:
+        permissions = UserPermissions.from_session(user, cached)
+    else:
+        permissions = load_permissions(user)
+        if not version:
+            version = invalidate_permissions(user.pk)
+        session[SESSION_KEY] = permissions.to_session(version)
+    setattr(user, USER_ATTRIBUTE, permissions)
+    return permissions
+
+
+def invalidate_permissions(user_id) -> str:
+    """Expire session-cached permissions of ``user_id`` by giving it a new version."""
+    version = uuid.uuid4().hex
+    try:
+        cache.set(VERSION_KEY.format(user_id=user_id), version, timeout=None)
+    except Exception as e:
+        logger.warning(f"Could not invalidate permissions of user {user_id}: {str(e)}")
+    return version
+
+
+class PermissionsMiddleware:
+    """
+    Expose request.permissions, resolved once per request. With
+    PERMISSIONS_SESSION_CACHE the user's permissions are seeded from the
+    session up front, so get_permissions(request.user) in decorators,
+    permission classes and views finds them without querying.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if getattr(settings, 'PERMISSIONS_SESSION_CACHE', False):
+            get_request_permissions(request)
+        request.permissions = SimpleLazyObject(lambda: get_request_permissions(request))
+        return self.get_response(request)
@@ -0,0 +1,274 @@
+# automation/services/rate_limiter.py
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEY = 'default'
+
+
+def _hash_key(key) -> str:
+    """Hash limiter keys so raw API keys never end up in store key names or logs."""
+    if key is None or key == '':
+        return DEFAULT_KEY
+    return hashlib.sha256(str(key).encode('utf-8')).hexdigest()[:16]
+
+
+class TokenBucketStore:
+    """
+    Storage backend for token buckets.
+
+    ``consume`` refills the bucket for ``key`` and tries to take ``tokens`` from it.
+    It returns 0 when the tokens were granted, otherwise the number of seconds
+    until enough tokens will be available.
+    """
+
+    def consume(self, key: str, rate: float, capacity: float, tokens: float = 1) -> float:
+        raise NotImplementedError
+
+    def record_wait(self, name: str, key: str, waited: float):
+        raise NotImplementedError
+
+    def get_metrics(self, name: str) -> Dict[str, Dict[str, float]]:
+        raise NotImplementedError
+
+
+class InMemoryTokenBucketStore(TokenBucketStore):
+    """Process-local store, used in tests and when no shared store is configured."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._metrics: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    def consume(self, key, rate, capacity, tokens=1):
+        with self._lock:
+            now = time.monotonic()
+            available, updated_at = self._buckets.get(key, (capacity, now))
+            available = min(capacity, available + (now - updated_at) * rate)
+            if available >= tokens:
+                self._buckets[key] = (available - tokens, now)
+                return 0.0
+            self._buckets[key] = (available, now)
+            return (tokens - available) / rate
+
+    def record_wait(self, name, key, waited):
+        with self._lock:
+            stats = self._metrics.setdefault(name, {}).setdefault(
+                key, {'calls': 0, 'throttled_calls': 0, 'total_wait': 0.0, 'max_wait': 0.0})
+            stats['calls'] += 1
+            if waited > 0:
+                stats['throttled_calls'] += 1
+                stats['total_wait'] += waited
+                stats['max_wait'] = max(stats['max_wait'], waited)
+
+    def get_metrics(self, name):
+        with self._lock:
+            return {key: dict(stats) for key, stats in self._metrics.get(name, {}).items()}
+
+
+class RedisTokenBucketStore(TokenBucketStore):
+    """
+    Redis store shared by every web and Celery process.
+    The refill-and-take step runs as a Lua script so concurrent workers never
+    over-spend a bucket, and the Redis server clock is used for all of them.
+    """
+
+    CONSUME_SCRIPT = """
+        local key = KEYS[1]
+        local rate = tonumber(ARGV[1])
+        local capacity = tonumber(ARGV[2])
+        local tokens = tonumber(ARGV[3])
+        local clock = redis.call('TIME')
+        local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+        local bucket = redis.call('HMGET', key, 'tokens', 'updated_at')
+        local available = tonumber(bucket[1]) or capacity
+        local updated_at = tonumber(bucket[2]) or now
+        available = math.min(capacity, available + math.max(0, now - updated_at) * rate)
+        local wait = 0
+        if available >= tokens then
+            available = available - tokens
+        else
+            wait = (tokens - available) / rate
+        end
+        redis.call('HSET', key, 'tokens', tostring(available), 'updated_at', tostring(now))
+        redis.call('EXPIRE', key, math.ceil(capacity / rate) + 60)
+        return tostring(wait)
+    """
+
+    def __init__(self, url: str, prefix: str = 'ratelimit'):
+        import redis
+
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self._consume = self.client.register_script(self.CONSUME_SCRIPT)
+
+    def _bucket_key(self, key):
+        return f"{self.prefix}:bucket:{key}"
+
+    def _metrics_key(self, name):
+        return f"{self.prefix}:metrics:{name}"
+
+    def consume(self, key, rate, capacity, tokens=1):
+        return float(self._consume(keys=[self._bucket_key(key)], args=[rate, capacity, tokens]))
+
+    def record_wait(self, name, key, waited):
+        pipe = self.client.pipeline(transaction=False)
+        metrics_key = self._metrics_key(name)
+        pipe.hincrby(metrics_key, f"{key}:calls", 1)
+        if waited > 0:
+            pipe.hincrby(metrics_key, f"{key}:throttled_calls", 1)
+            pipe.hincrbyfloat(metrics_key, f"{key}:total_wait", waited)
+        pipe.execute()
+
+    def get_metrics(self, name):
+        metrics = {}
+        for field, value in self.client.hgetall(self._metrics_key(name)).items():
+            key, stat = field.decode('utf-8').rsplit(':', 1)
+            metrics.setdefault(key, {})[stat] = float(value)
+        return metrics
+
+
+_store_lock = threading.Lock()
+_store: Optional[TokenBucketStore] = None
+_fallback_store = InMemoryTokenBucketStore()
+_limiters: Dict[str, 'TokenBucketRateLimiter'] = {}
+
+
+def get_rate_limit_store() -> TokenBucketStore:
+    """Return the store configured by RATE_LIMIT_STORE ('redis' or 'memory')."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = getattr(settings, 'RATE_LIMIT_STORE', 'memory')
+            if backend == 'redis':
+                try:
+                    _store = RedisTokenBucketStore(settings.RATE_LIMIT_REDIS_URL)
+                except Exception as e:
+                    logger.error(f"Could not initialize Redis rate limit store, using in-memory store: {str(e)}")
+                    _store = _fallback_store
+            else:
+                _store = _fallback_store
+        return _store
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket limiter shared by every process that uses the same store.
+
+    ``rate`` tokens are added per second up to ``capacity``. Each named limiter
+    keeps a separate bucket per key (e.g. per API key or per remote host).
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float, store: Optional[TokenBucketStore] = None):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._store = store
+
+    @property
+    def store(self) -> TokenBucketStore:
+        return self._store or get_rate_limit_store()
+
+    def _consume(self, bucket_key: str, tokens: float) -> float:
+        try:
+            return self.store.consume(bucket_key, self.rate, self.capacity, tokens)
+        except Exception as e:
+            logger.warning(f"Rate limit store unavailable for '{self.name}', using local bucket: {str(e)}")
+            return _fallback_store.consume(bucket_key, self.rate, self.capacity, tokens)
+
+    def _record(self, key: str, waited: float):
+        try:
+            self.store.record_wait(self.name, key, waited)
+        except Exception as e:
+            logger.debug(f"Could not record rate limit metrics for '{self.name}': {str(e)}")
+        if waited > 0:
+            logger.info(f"Rate limiter '{self.name}' waited {waited:.2f}s")
+
+    def _bucket(self, key, tokens: float) -> Tuple[str, str]:
+        """Hashed key and bucket name for ``key``, once ``tokens`` is known to fit in the bucket."""
+        if tokens > self.capacity:
+            # The bucket never holds that many tokens, so the wait would never end
+            raise ValueError(f"Cannot take {tokens} tokens from '{self.name}' with capacity {self.capacity}")
+        hashed = _hash_key(key)
+        return hashed, f"{self.name}:{hashed}"
+
+    def acquire(self, key=None, tokens: float = 1) -> float:
+        """Block until ``tokens`` are available for ``key``. Returns the seconds spent waiting."""
+        hashed, bucket_key = self._bucket(key, tokens)
+        waited = 0.0
+        while True:
+            wait = self._consume(bucket_key, tokens)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+        self._record(hashed, waited)
+        return waited
+
+    async def acquire_async(self, key=None, tokens: float = 1) -> float:
+        """
+        Async variant of ``acquire`` that yields to the event loop while waiting.
+        Store calls (Redis round-trips) run in a worker thread, off the loop.
+        """
+        hashed, bucket_key = self._bucket(key, tokens)
+        waited = 0.0
+        while True:
+            wait = await asyncio.to_thread(self._consume, bucket_key, tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+        await asyncio.to_thread(self._record, hashed, waited)
+        return waited
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Calls, throttled calls and wait time per (hashed) key."""
+        try:
+            return self.store.get_metrics(self.name)
+        except Exception as e:
+            logger.error(f"Could not read rate limit metrics for '{self.name}': {str(e)}")
+            return {}
+
+
+def get_rate_limiter(name: str) -> TokenBucketRateLimiter:
+    """
+    Return the limiter configured under ``settings.RATE_LIMITS[name]``.
+    Each entry has ``calls`` per ``period`` seconds and an optional ``burst`` capacity.
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        config = getattr(settings, 'RATE_LIMITS', {}).get(name)
+        if not config:
+            raise ValueError(f"No rate limit configured for '{name}'")
+        limiter = TokenBucketRateLimiter(
+            name,
+            rate=config['calls'] / config['period'],
+            capacity=config.get('burst', config['calls']),
+        )
+        _limiters[name] = limiter
+    return limiter
+
+
+def rate_limited(name: str, key_func: Optional[Callable] = None):
+    """
+    Decorator that takes one token from the named limiter before each call.
+    ``key_func`` receives the call arguments and returns the bucket key.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = key_func(*args, **kwargs) if key_func else None
+            get_rate_limiter(name).acquire(key)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
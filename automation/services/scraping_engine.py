@@ -0,0 +1,99 @@
+# automation/services/scraping_engine.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.db import connections
+
+from automation.services.task_logging import submit_in_context
+
+logger = logging.getLogger(__name__)
+
+_quota_lock = threading.Lock()
+_quota_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+
+def _get_quota_semaphore(api_key: Optional[str]) -> threading.BoundedSemaphore:
+    """Return the process-wide semaphore guarding in-flight calls for an API key."""
+    key = api_key or 'default'
+    with _quota_lock:
+        semaphore = _quota_semaphores.get(key)
+        if semaphore is None:
+            limit = max(1, int(getattr(settings, 'SERPAPI_MAX_CONCURRENT_REQUESTS', 4)))
+            semaphore = threading.BoundedSemaphore(limit)
+            _quota_semaphores[key] = semaphore
+        return semaphore
+
+
+@contextmanager
+def serpapi_slot(api_key: Optional[str]):
+    """
+    Hold one of the concurrent request slots allowed for a SerpAPI key.
+    Calls made with the same key from any worker thread share the same slots.
+    """
+    semaphore = _get_quota_semaphore(api_key)
+    semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+class ScrapingEngine:
+    """
+    Fans the queries of a ScrapingTask out to a bounded thread pool.
+
+    Each query is handed to ``query_worker`` as a whole, so the pages of a
+    single query are still fetched and saved in order by one thread while
+    different queries progress in parallel. The worker returns the number of
+    results it processed.
+    """
+
+    def __init__(self, query_worker: Callable[[int, Dict], int], max_workers: Optional[int] = None):
+        self.query_worker = query_worker
+        self.max_workers = max(1, int(max_workers or getattr(settings, 'SCRAPING_MAX_WORKERS', 4)))
+
+    def _run_query(self, index: int, query_data: Dict, in_worker_thread: bool = True) -> int:
+        try:
+            return self.query_worker(index, query_data) or 0
+        except SoftTimeLimitExceeded:
+            # The task is out of time: stop here rather than move on to the next query
+            raise
+        except Exception as e:
+            logger.error(f"Error processing query {index} '{query_data.get('query')}': {str(e)}", exc_info=True)
+            return 0
+        finally:
+            if in_worker_thread:
+                # Worker threads open their own DB connections; release them once the query is done.
+                connections.close_all()
+
+    def run(self, queries: List[Dict]) -> int:
+        """Process all queries and return the total number of results handled."""
+        if not queries:
+            return 0
+
+        workers = min(self.max_workers, len(queries))
+        logger.info(f"Processing {len(queries)} queries with {workers} workers")
+
+        if workers == 1:
+            return sum(self._run_query(index, query_data, in_worker_thread=False)
+                       for index, query_data in enumerate(queries, start=1))
+
+        total_results = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scraping') as executor:
+            futures = {
+                submit_in_context(executor, self._run_query, index, query_data): index
+                for index, query_data in enumerate(queries, start=1)
+            }
+            try:
+                for future in as_completed(futures):
+                    total_results += future.result()
+            except BaseException:
+                # Queries not started yet are dropped; the ones running are waited for
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        return total_results
@@ -0,0 +1,129 @@
+# automation/services/search.py
+import logging
+import re
+import unicodedata
+from typing import Iterable, List
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections
+from django.db.models import F, FloatField, Func, Q, Value
+
+logger = logging.getLogger(__name__)
+
+# Business columns folded into Business.search_text, title first
+SEARCH_FIELDS = (
+    'title',
+    'form_destination_name',
+    'city',
+    'country',
+    'street',
+    'postal_code',
+    'address',
+    'category_name',
+    'main_category',
+    'level',
+    'description',
+)
+
+BATCH_SIZE = getattr(settings, 'SEARCH_INDEX_BATCH_SIZE', 500)
+
+# Best matches first, newest first among equals; ends in a unique field for keyset pagination
+RELEVANCE_ORDERING = ('-search_rank', '-scraped_at', '-id')
+
+_separators = re.compile(r'[\W_]+', re.UNICODE)
+
+
+class Unaccent(Func):
+    """unaccent() from the Postgres extension of the same name."""
+    function = 'unaccent'
+
+
+def normalize_text(text) -> str:
+    """
+    Lowercase, accent-free, punctuation-free form of ``text``, e.g.
+    "Café de l'Opéra, C/ Mayor" -> "cafe de l opera c mayor".
+    Used for both the stored search text and the query, so they always agree.
+    """
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _separators.sub(' ', stripped.casefold()).strip()
+
+
+def build_search_text(values) -> str:
+    """Normalized search text of a business, from an instance or a values() dict."""
+    get = values.get if isinstance(values, dict) else lambda field: getattr(values, field, None)
+    return normalize_text(' '.join(str(get(field)) for field in SEARCH_FIELDS if get(field)))
+
+
+def uses_postgres(using: str) -> bool:
+    return connections[using].vendor == 'postgresql'
+
+
+def search_vector():
+    """Title-weighted tsvector; the 'simple' config keeps Spanish and French words unstemmed."""
+    return (
+        SearchVector(Unaccent(F('title')), weight='A', config='simple') +
+        SearchVector('search_text', weight='B', config='simple')
+    )
+
+
+def _chunks(ids: List[int], size: int) -> Iterable[List[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def refresh_search_index(queryset, batch_size: int = None) -> int:
+    """
+    Recompute search_text, and on Postgres search_vector, for the businesses
+    of ``queryset``: three queries per ``batch_size`` businesses, whatever
+    wrote them (bulk_create and update() bypass Business.save()).
+    Returns the number of businesses refreshed.
+    """
+    model = queryset.model
+    # The base manager sees soft-deleted rows too, and migrations' historical models have it
+    rows_of = model._base_manager.db_manager(queryset.db)
+    batch_size = batch_size or BATCH_SIZE
+    ids = list(queryset.order_by().values_list('pk', flat=True))
+    refreshed = 0
+    for chunk in _chunks(ids, batch_size):
+        rows = rows_of.filter(pk__in=chunk).values('pk', *SEARCH_FIELDS)
+        rows_of.bulk_update(
+            [model(pk=row['pk'], search_text=build_search_text(row)) for row in rows],
+            ['search_text'],
+        )
+        if uses_postgres(queryset.db):
+            rows_of.filter(pk__in=chunk).update(search_vector=search_vector())
+        refreshed += len(chunk)
+    return refreshed
+
+
+def search_businesses(queryset, text: str):
+    """
+    Businesses of ``queryset`` matching ``text``, annotated with
+    ``search_rank`` (higher is better; see RELEVANCE_ORDERING).
+
+    On Postgres this is a full-text match on the GIN-indexed search_vector,
+    with trigram-indexed substring and word-similarity matches on
+    search_text as a fallback for partial words and typos. Elsewhere every
+    word of ``text`` must occur in search_text, and all ranks are equal.
+    """
+    normalized = normalize_text(text)
+    if not normalized:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    if not uses_postgres(queryset.db):
+        for word in normalized.split():
+            queryset = queryset.filter(search_text__contains=word)
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    query = SearchQuery(normalized, config='simple')
+    return queryset.filter(
+        Q(search_vector=query) |
+        Q(search_text__contains=normalized) |
+        Q(search_text__trigram_word_similar=normalized)
+    ).annotate(
+        search_rank=SearchRank(F('search_vector'), query) + TrigramWordSimilarity(normalized, 'search_text')
+    )
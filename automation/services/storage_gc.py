@@ -0,0 +1,186 @@
+# automation/services/storage_gc.py
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from automation.models import Business, Image, ScrapingTask
+
+logger = logging.getLogger(__name__)
+
+# delete_objects accepts at most this many keys per request
+DELETE_BATCH_SIZE = 1000
+
+TASK_CHUNK_SIZE = getattr(settings, 'STORAGE_GC_TASK_CHUNK_SIZE', 50)
+WORKERS = getattr(settings, 'STORAGE_GC_WORKERS', 8)
+
+
+def _batches(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class S3ObjectStore:
+    """Objects in the media bucket (DigitalOcean Spaces), listed and deleted in bulk."""
+
+    def __init__(self, client, bucket: str, workers: int = WORKERS):
+        self.client = client
+        self.bucket = bucket
+        self.workers = workers
+
+    def list(self, prefix: str) -> List[Tuple[str, int]]:
+        objects = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            objects.extend((item['Key'], item.get('Size', 0)) for item in page.get('Contents', []))
+        return objects
+
+    def _delete_batch(self, keys: List[str]) -> int:
+        response = self.client.delete_objects(
+            Bucket=self.bucket,
+            Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True},
+        )
+        errors = response.get('Errors', [])
+        for error in errors[:5]:
+            logger.error(f"Could not delete {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+        return len(keys) - len(errors)
+
+    def delete(self, keys: List[str]) -> int:
+        """Delete ``keys``, DELETE_BATCH_SIZE per request and several requests at once."""
+        batches = list(_batches(keys, DELETE_BATCH_SIZE))
+        if len(batches) <= 1:
+            return sum(self._delete_batch(batch) for batch in batches)
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(batches))) as executor:
+            return sum(executor.map(self._delete_batch, batches))
+
+
+class LocalObjectStore:
+    """The same interface over MEDIA_ROOT, for development without S3."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def list(self, prefix: str) -> List[Tuple[str, int]]:
+        path = os.path.join(self.root, prefix)
+        if os.path.isfile(path):
+            return [(prefix, os.path.getsize(path))]
+        objects = []
+        for directory, _, files in os.walk(path):
+            for name in files:
+                full_path = os.path.join(directory, name)
+                key = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                objects.append((key, os.path.getsize(full_path)))
+        return objects
+
+    def delete(self, keys: List[str]) -> int:
+        deleted = 0
+        for key in keys:
+            try:
+                os.remove(os.path.join(self.root, key))
+                deleted += 1
+            except FileNotFoundError:
+                pass
+        return deleted
+
+
+def get_object_store():
+    if getattr(settings, 'USE_S3', False):
+        from automation.tasks import get_s3_client
+        return S3ObjectStore(get_s3_client(), settings.AWS_STORAGE_BUCKET_NAME)
+    return LocalObjectStore(settings.MEDIA_ROOT)
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _task_objects(store, task_ids: List[int], task_files: List[str]) -> Dict[str, int]:
+    """Keys and sizes of every stored object belonging to the tasks ``task_ids``."""
+    business_ids = list(Business.all_objects.filter(task_id__in=task_ids).values_list('id', flat=True))
+    prefixes = [f'scraping_results/{task_id}/' for task_id in task_ids]
+    prefixes += [f'business_images/{business_id}/' for business_id in business_ids]
+    # Files stored under shared prefixes are listed by their exact name
+    exact = set(task_files) | set(
+        Image.all_objects.filter(business_id__in=business_ids)
+        .exclude(thumbnail='').exclude(thumbnail__isnull=True)
+        .values_list('thumbnail', flat=True)
+    )
+
+    objects: Dict[str, int] = {}
+    exact = sorted(exact)
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        for listed in executor.map(store.list, prefixes):
+            objects.update(listed)
+        for name, listed in zip(exact, executor.map(store.list, exact)):
+            objects.update((key, size) for key, size in listed if key == name)
+    return objects
+
+
+def expired_tasks(cutoff):
+    """
+    Tasks created before ``cutoff`` that can be collected: not deleted yet,
+    and without businesses on the app, whose images the app still serves.
+    """
+    published = Business.all_objects.filter(status='IN_PRODUCTION').values('task_id')
+    return ScrapingTask.objects.filter(created_at__lt=cutoff).exclude(pk__in=published)
+
+
+def collect_old_tasks(older_than_days: Optional[int] = None, dry_run: bool = False,
+                      chunk_size: Optional[int] = None, store=None) -> Dict[str, int]:
+    """
+    Delete the stored files of scraping tasks created more than
+    ``older_than_days`` days ago (result dumps, business images, thumbnails
+    and the uploaded query file) and soft-delete the tasks with their
+    businesses and images. Tasks with businesses in production are kept.
+
+    Tasks are streamed ``chunk_size`` at a time. For each chunk the objects
+    are listed in parallel and deleted in batches of DELETE_BATCH_SIZE keys,
+    then the rows are marked deleted; objects go first, so a failed run
+    leaves rows that the next run will find again, never orphaned files.
+    With ``dry_run`` nothing is deleted and the counts show what would be.
+    """
+    older_than_days = (
+        older_than_days if older_than_days is not None else getattr(settings, 'TASK_RETENTION_DAYS', 30)
+    )
+    chunk_size = chunk_size or TASK_CHUNK_SIZE
+    store = store or get_object_store()
+    cutoff = timezone.now() - timezone.timedelta(days=older_than_days)
+    expired = expired_tasks(cutoff).order_by('pk').values_list('pk', 'file')
+
+    report = {
+        'tasks': 0, 'businesses': 0, 'images': 0, 'objects': 0, 'bytes': 0, 'deleted_objects': 0,
+        'published_tasks_kept': ScrapingTask.objects.filter(created_at__lt=cutoff).count() - expired.count(),
+    }
+    for chunk in _chunks(expired.iterator(chunk_size=chunk_size), chunk_size):
+        task_ids = [task_id for task_id, _ in chunk]
+        try:
+            objects = _task_objects(store, task_ids, [name for _, name in chunk if name])
+            report['tasks'] += len(task_ids)
+            report['businesses'] += Business.all_objects.filter(task_id__in=task_ids).count()
+            report['images'] += Image.all_objects.filter(business__task_id__in=task_ids).count()
+            report['objects'] += len(objects)
+            report['bytes'] += sum(objects.values())
+            if dry_run:
+                continue
+
+            report['deleted_objects'] += store.delete(sorted(objects))
+            # Soft delete, as ScrapingTask.delete() does; update() skips the per-business status signals
+            with transaction.atomic():
+                Image.all_objects.filter(business__task_id__in=task_ids).update(is_deleted=True)
+                Business.all_objects.filter(task_id__in=task_ids).update(is_deleted=True)
+                ScrapingTask.all_objects.filter(pk__in=task_ids).update(is_deleted=True)
+            logger.info(f"Deleted {len(task_ids)} old tasks and {len(objects)} stored objects")
+        except Exception as e:
+            logger.error(f"Error deleting old tasks {task_ids[0]}-{task_ids[-1]}: {str(e)}", exc_info=True)
+    return report
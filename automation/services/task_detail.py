@@ -0,0 +1,191 @@
+# automation/services/task_detail.py
+import logging
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db.models import BooleanField, Case, Count, OuterRef, Prefetch, Q, Subquery, Value, When
+
+from automation.api.serializers import (
+    BUSINESS_LIST_FIELDS, BusinessEditSerializer, BusinessListSerializer, BusinessSerializer, TaskSerializer
+)
+from automation.models import Business, Image, ScrapingTask
+from automation.services.pagination import keyset_page, parse_page_size
+from automation.services.permissions import get_permissions
+
+logger = logging.getLogger(__name__)
+
+EMPTY_DESCRIPTION = (
+    Q(description__isnull=True) |
+    Q(description='') |
+    Q(description='None') |
+    Q(description__exact='No description Available')
+)
+
+# Client-selectable projections of the paged business list
+PROJECTIONS = {
+    'list': BusinessListSerializer,
+    'full': BusinessEditSerializer,
+}
+PAGE_SIZE = getattr(settings, 'TASK_DETAIL_PAGE_SIZE', 50)
+MAX_PAGE_SIZE = getattr(settings, 'TASK_DETAIL_MAX_PAGE_SIZE', 200)
+
+
+def get_user_permissions(user) -> Dict[str, bool]:
+    """Task page permissions of ``user``, from the request-scoped resolver."""
+    return get_permissions(user).as_dict()
+
+
+def _task_queryset():
+    # Everything TaskSerializer reads, including the user's roles and destinations
+    return ScrapingTask.objects.select_related('user', 'destination').prefetch_related(
+        'user__destinations',
+        'user__roles__user',
+    )
+
+
+def _visible_businesses(task_id, user, permissions: Dict[str, bool]):
+    """
+    Businesses of the task that ``user`` may see, and the tasks they may
+    navigate to. Raises ScrapingTask.DoesNotExist for unknown tasks and
+    PermissionDenied for users who are neither admin nor ambassador.
+    """
+    if not ScrapingTask.objects.filter(pk=task_id).exists():
+        raise ScrapingTask.DoesNotExist(f"Task {task_id} not found")
+
+    if permissions['is_admin']:
+        # Admins see all businesses
+        businesses = Business.objects.filter(task_id=task_id, is_deleted=False)
+        base_task_queryset = ScrapingTask.objects.all()
+    elif permissions['is_ambassador']:
+        # Ambassadors see only their assigned destinations
+        destination_ids = get_permissions(user).destination_ids
+        businesses = Business.objects.filter(
+            task_id=task_id,
+            is_deleted=False,
+            form_destination_id__in=destination_ids
+        )
+        base_task_queryset = ScrapingTask.objects.filter(
+            businesses__form_destination_id__in=destination_ids
+        ).distinct()
+    else:
+        raise PermissionDenied("Permission denied")
+    return businesses, base_task_queryset
+
+
+def _status_summary(businesses) -> Dict:
+    """Total, per-status and empty-description counts in one query."""
+    counts = businesses.aggregate(
+        total=Count('id'),
+        empty_descriptions=Count('id', filter=~Q(status='DISCARDED') & EMPTY_DESCRIPTION),
+        **{
+            f'status_{status_code}': Count('id', filter=Q(status=status_code))
+            for status_code, _ in Business.STATUS_CHOICES
+        }
+    )
+    total_businesses = counts['total']
+    status_counts = {}
+    for status_code, status_name in Business.STATUS_CHOICES:
+        count = counts[f'status_{status_code}']
+        status_counts[status_code] = {
+            'count': count,
+            'name': status_name,
+            'percentage': (count / total_businesses * 100) if total_businesses > 0 else 0
+        }
+    return {
+        'status_counts': status_counts,
+        'total_businesses': total_businesses,
+        'empty_descriptions': counts['empty_descriptions'],
+    }
+
+
+def get_task_detail(task_id, user, permissions: Optional[Dict[str, bool]] = None) -> Dict:
+    """
+    Everything the task detail page and API show for one task, with the
+    businesses ``user`` may see. Raises ScrapingTask.DoesNotExist for unknown
+    tasks and PermissionDenied for users who are neither admin nor ambassador.
+    """
+    permissions = permissions or get_user_permissions(user)
+    businesses, base_task_queryset = _visible_businesses(task_id, user, permissions)
+    summary = _status_summary(businesses)
+
+    # Load the task and its neighbours together
+    previous_id = base_task_queryset.filter(id__lt=task_id).order_by('-id').values_list('id', flat=True).first()
+    next_id = base_task_queryset.filter(id__gt=task_id).order_by('id').values_list('id', flat=True).first()
+    tasks = _task_queryset().in_bulk([pk for pk in (task_id, previous_id, next_id) if pk])
+    task = tasks[int(task_id)]
+    previous_task = tasks.get(previous_id)
+    next_task = tasks.get(next_id)
+
+    businesses = businesses.prefetch_related(
+        Prefetch('images', queryset=Image.objects.all())
+    )
+
+    return {
+        'task': TaskSerializer(task).data,
+        'businesses': BusinessSerializer(businesses, many=True).data,
+        **summary,
+        'navigation': {
+            'previous_task': TaskSerializer(previous_task).data if previous_task else None,
+            'next_task': TaskSerializer(next_task).data if next_task else None,
+        },
+        'status_choices': Business.STATUS_CHOICES,
+        'user_permissions': permissions,
+    }
+
+
+def get_task_businesses_page(task_id, user, projection: str = 'list', cursor: Optional[str] = None,
+                             page_size=None, status: Optional[str] = None,
+                             permissions: Optional[Dict[str, bool]] = None) -> Dict:
+    """
+    Lean, paged variant of get_task_detail for large tasks.
+
+    Businesses come in keyset pages of ``page_size`` ordered by id, optionally
+    limited to one ``status``, serialized with the ``projection`` the client
+    asks for ('list' for cards, 'full' for the edit view). Only the first
+    image of each business is inlined. The counts are computed with a single
+    conditional aggregation and returned with the first page only. Raises
+    ValueError for an unknown projection or status, or a malformed cursor.
+    """
+    if projection not in PROJECTIONS:
+        raise ValueError(f"Unknown projection '{projection}', expected one of {', '.join(PROJECTIONS)}")
+    if status and status not in dict(Business.STATUS_CHOICES):
+        raise ValueError(f"Unknown status '{status}'")
+
+    permissions = permissions or get_user_permissions(user)
+    businesses, _ = _visible_businesses(task_id, user, permissions)
+
+    page_queryset = businesses.filter(status=status) if status else businesses
+    if projection == 'list':
+        page_queryset = page_queryset.only(*BUSINESS_LIST_FIELDS).annotate(
+            has_description=Case(
+                When(EMPTY_DESCRIPTION, then=Value(False)),
+                default=Value(True),
+                output_field=BooleanField(),
+            )
+        )
+    first_image = Image.objects.filter(business=OuterRef('pk')).order_by('order', 'id')
+    page_queryset = page_queryset.annotate(
+        first_image_url=Subquery(first_image.values('image_url')[:1]),
+        first_image_thumbnail=Subquery(first_image.values('thumbnail')[:1]),
+        first_image_local_path=Subquery(first_image.values('local_path')[:1]),
+        first_image_variants=Subquery(first_image.values('variants')[:1]),
+    )
+
+    items, next_cursor = keyset_page(
+        page_queryset,
+        cursor,
+        parse_page_size(page_size, PAGE_SIZE, MAX_PAGE_SIZE),
+    )
+
+    page = {
+        'task_id': int(task_id),
+        'projection': projection,
+        'status': status or None,
+        'businesses': PROJECTIONS[projection](items, many=True).data,
+        'next_cursor': next_cursor,
+    }
+    if not cursor:
+        page.update(_status_summary(businesses))
+        page['status_choices'] = Business.STATUS_CHOICES
+    return page
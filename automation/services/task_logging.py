@@ -0,0 +1,218 @@
+# automation/services/task_logging.py
+import contextvars
+import copy
+import logging
+import queue
+import reprlib
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from automation.services.log_stream import TaskLogStreamHandler
+
+logger = logging.getLogger(__name__)
+
+_current_task_id: contextvars.ContextVar = contextvars.ContextVar('scraping_task_id', default=None)
+_current_counters: contextvars.ContextVar = contextvars.ContextVar('scraping_task_counters', default=None)
+
+TASK_LOG_FORMAT = '{levelname} {asctime} {name} [task {task_id}] {message}'
+
+
+class StageCounters:
+    """Thread-safe per-stage counters of one task, logged once as a summary."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def add(self, stage: str, amount: int = 1) -> int:
+        with self._lock:
+            self._counts[stage] += amount
+            return self._counts[stage]
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def summary(self) -> str:
+        return ', '.join(f"{stage}={count}" for stage, count in sorted(self.snapshot().items()))
+
+
+def current_task_id():
+    return _current_task_id.get()
+
+
+def count(stage: str, amount: int = 1) -> int:
+    """Add to a stage counter of the running task; a no-op outside task_log_context."""
+    counters = _current_counters.get()
+    return counters.add(stage, amount) if counters is not None else 0
+
+
+def _payload_repr() -> reprlib.Repr:
+    limits = reprlib.Repr()
+    limits.maxlevel = 3
+    limits.maxdict = limits.maxlist = limits.maxtuple = limits.maxset = 10
+    limits.maxstring = limits.maxother = 120
+    return limits
+
+
+_repr = _payload_repr()
+
+
+def summarize(payload, max_chars: Optional[int] = None) -> str:
+    """
+    Bounded repr of ``payload``: nested containers and strings are cut
+    while being rendered, so a huge dict costs no more than a small one.
+    """
+    max_chars = max_chars or getattr(settings, 'LOG_PAYLOAD_MAX_CHARS', 500)
+    text = _repr.repr(payload)
+    return text if len(text) <= max_chars else f"{text[:max_chars]}... ({len(text)} chars)"
+
+
+def log_payload(log: logging.Logger, stage: str, message: str, payload, level: int = logging.DEBUG):
+    """
+    Count ``stage`` and log ``payload`` for its first and then every
+    LOG_PAYLOAD_SAMPLE_EVERY-th occurrence, truncated by summarize().
+    Nothing is rendered when the level is disabled or the call is not sampled.
+    """
+    occurrence = count(stage)
+    every = max(1, int(getattr(settings, 'LOG_PAYLOAD_SAMPLE_EVERY', 50)))
+    if occurrence > 1 and (occurrence - 1) % every:
+        return
+    if not log.isEnabledFor(level):
+        return
+    log.log(level, f"{message} [{stage} #{occurrence or 1}]: {summarize(payload)}")
+
+
+def submit_in_context(executor, fn, *args, **kwargs):
+    """executor.submit() that carries the caller's task logging context into the worker thread."""
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
+
+
+class _CloseSink:
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.done = threading.Event()
+
+
+class _SinkDispatcher:
+    """
+    Routes records to per-task file sinks from one background thread, so
+    the scraping threads only pay for a queue put.
+    """
+
+    def __init__(self):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._sinks: Dict = {}
+        self._refs: Counter = Counter()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='task-log-sink', daemon=True)
+            self._thread.start()
+
+    def open(self, task_id):
+        with self._lock:
+            if task_id not in self._sinks:
+                sink = TaskLogStreamHandler(task_id)
+                sink.setFormatter(logging.Formatter(TASK_LOG_FORMAT, style='{'))
+                self._sinks[task_id] = sink
+            self._refs[task_id] += 1
+            self._ensure_thread()
+
+    def submit(self, record) -> bool:
+        if record.task_id not in self._sinks:
+            return False
+        self._queue.put(record)
+        return True
+
+    def close(self, task_id, timeout: float = 10.0):
+        """Flush and close the task's sink once every record queued before now is written."""
+        marker = _CloseSink(task_id)
+        self._queue.put(marker)
+        if not marker.done.wait(timeout):
+            logger.warning(f"Timed out flushing the log of task {task_id}")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if isinstance(item, _CloseSink):
+                    self._close_sink(item)
+                else:
+                    sink = self._sinks.get(item.task_id)
+                    if sink is not None:
+                        sink.handle(item)
+            except Exception:
+                # Never let one bad record stop the sink thread
+                pass
+
+    def _close_sink(self, marker: _CloseSink):
+        try:
+            with self._lock:
+                self._refs[marker.task_id] -= 1
+                if self._refs[marker.task_id] > 0:
+                    return
+                del self._refs[marker.task_id]
+                sink = self._sinks.pop(marker.task_id, None)
+            if sink is not None:
+                sink.close()
+        finally:
+            marker.done.set()
+
+
+_dispatcher = _SinkDispatcher()
+
+
+class TaskLogRouter(logging.Handler):
+    """
+    Handler for the 'automation' logger: records emitted inside
+    task_log_context() are tagged with the task id and written to that
+    task's log only, whichever thread or module logged them.
+    """
+
+    def emit(self, record):
+        task_id = _current_task_id.get()
+        if task_id is None:
+            return
+        # Other handlers still get the original record
+        record = copy.copy(record)
+        record.task_id = task_id
+        try:
+            # Render now; args and exception state may change once queued
+            record.message = record.getMessage()
+            record.msg, record.args = record.message, None
+            if record.exc_info and not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+            _dispatcher.submit(record)
+        except Exception:
+            self.handleError(record)
+
+
+@contextmanager
+def task_log_context(task_id):
+    """
+    Scope logging to one task: records go to the task's own log file and
+    stream, and count() feeds per-stage counters that are logged once when
+    the context ends.
+    """
+    counters = StageCounters()
+    id_token = _current_task_id.set(task_id)
+    counters_token = _current_counters.set(counters)
+    _dispatcher.open(task_id)
+    try:
+        yield counters
+    finally:
+        summary = counters.summary()
+        if summary:
+            logger.info(f"Stage counters: {summary}")
+        _current_counters.reset(counters_token)
+        _current_task_id.reset(id_token)
+        _dispatcher.close(task_id)
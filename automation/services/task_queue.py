@@ -0,0 +1,196 @@
+# automation/services/task_queue.py
+import logging
+import uuid
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from automation.models import CustomUser, ScrapingTask
+
+logger = logging.getLogger(__name__)
+
+SCRAPING_TASK_NAME = 'automation.tasks.process_scraping_task'
+PRIORITIES = {label.lower(): value for value, label in ScrapingTask.PRIORITY_CHOICES}
+DEFAULT_PRIORITY = PRIORITIES['normal']
+
+
+def get_scraping_queue() -> str:
+    """Queue that process_scraping_task is routed to in CELERY_TASK_ROUTES."""
+    routes = getattr(settings, 'CELERY_TASK_ROUTES', {})
+    return routes.get(SCRAPING_TASK_NAME, {}).get('queue', 'scraping')
+
+
+def parse_priority(value) -> int:
+    """Accept a priority name ('high', 'normal', 'low') or number; unknown values mean normal."""
+    if value is None or value == '':
+        return DEFAULT_PRIORITY
+    if isinstance(value, str) and value.strip().lower() in PRIORITIES:
+        return PRIORITIES[value.strip().lower()]
+    try:
+        return min(max(int(value), 0), 9)
+    except (TypeError, ValueError):
+        return DEFAULT_PRIORITY
+
+
+def waiting_tasks():
+    """Tasks submitted but not handed to Celery yet."""
+    return ScrapingTask.objects.filter(status='QUEUED', celery_task_id='')
+
+
+def active_tasks():
+    """
+    Tasks dispatched to Celery and not finished: the worker clears
+    celery_task_id when it is done, whatever the status says (tasks under
+    review are IN_PROGRESS too). A task started more than
+    SCRAPING_TASK_TIME_LIMIT seconds ago no longer holds a slot, so a
+    hard-killed worker cannot block its user forever.
+    """
+    stale_after = int(getattr(settings, 'SCRAPING_TASK_TIME_LIMIT', 6 * 3600))
+    cutoff = timezone.now() - timezone.timedelta(seconds=stale_after)
+    return ScrapingTask.objects.exclude(celery_task_id='').filter(completed_at__isnull=True).filter(
+        Q(started_at__isnull=True) | Q(started_at__gte=cutoff)
+    )
+
+
+def start_task(task_id) -> int:
+    """Mark a dispatched task as running; update() so save() cannot re-derive the status."""
+    return ScrapingTask.objects.filter(pk=task_id).update(
+        status='IN_PROGRESS',
+        started_at=timezone.now(),
+        completed_at=None,
+    )
+
+
+def release_task(task_id):
+    """Free the task's slot once its worker is done, however it ended."""
+    ScrapingTask.all_objects.filter(pk=task_id).update(celery_task_id='')
+
+
+def submit_scraping_task(task: ScrapingTask, form_data: Optional[Dict] = None, priority=None) -> ScrapingTask:
+    """
+    Record ``task`` as waiting and dispatch it once the current transaction
+    commits, so the request returns as soon as the task row is saved.
+    """
+    task.form_data = form_data or {}
+    task.priority = parse_priority(priority)
+    task.status = 'QUEUED'
+    task.celery_task_id = ''
+    task.queries_total = 0
+    task.queries_completed = 0
+    task.started_at = None
+    task.completed_at = None
+    # update() rather than save(): ScrapingTask.save() re-derives the status from its businesses
+    ScrapingTask.objects.filter(pk=task.pk).update(
+        form_data=task.form_data,
+        priority=task.priority,
+        status=task.status,
+        celery_task_id='',
+        queries_total=0,
+        queries_completed=0,
+        started_at=None,
+        completed_at=None,
+    )
+    user_id = task.user_id
+    transaction.on_commit(lambda: dispatch_waiting_tasks(user_id))
+    return task
+
+
+def dispatch_waiting_tasks(user_id: Optional[int] = None) -> int:
+    """
+    Hand waiting tasks to Celery, highest priority and oldest first, keeping
+    each user within SCRAPING_MAX_ACTIVE_TASKS_PER_USER. Without ``user_id``
+    every user with waiting tasks is considered. Returns the number dispatched.
+    """
+    if user_id is not None:
+        user_ids = [user_id]
+    else:
+        user_ids = list(waiting_tasks().values_list('user_id', flat=True).distinct())
+
+    dispatched = 0
+    for uid in user_ids:
+        try:
+            dispatched += _dispatch_for_user(uid)
+        except Exception as e:
+            logger.error(f"Error dispatching Sites Gathering tasks for user {uid}: {str(e)}", exc_info=True)
+    return dispatched
+
+
+def _dispatch_for_user(user_id: Optional[int]) -> int:
+    cap = int(getattr(settings, 'SCRAPING_MAX_ACTIVE_TASKS_PER_USER', 2))
+
+    with transaction.atomic():
+        if user_id is not None:
+            # Serialise dispatchers for one user so the cap cannot be overrun
+            CustomUser.objects.select_for_update().filter(pk=user_id).first()
+
+        tasks = waiting_tasks().filter(user_id=user_id).order_by('priority', 'created_at')
+        if user_id is not None and cap > 0:
+            slots = cap - active_tasks().filter(user_id=user_id).count()
+            if slots <= 0:
+                return 0
+            tasks = tasks[:slots]
+
+        claimed = []
+        for task in tasks:
+            celery_task_id = str(uuid.uuid4())
+            ScrapingTask.objects.filter(pk=task.pk).update(celery_task_id=celery_task_id)
+            claimed.append((task.pk, task.priority, celery_task_id))
+
+        # Send only once the claim is committed, so the worker never reads a stale row
+        transaction.on_commit(lambda: _send(claimed))
+    return len(claimed)
+
+
+def _send(claimed):
+    from automation.tasks import process_scraping_task
+
+    queue = get_scraping_queue()
+    for task_id, priority, celery_task_id in claimed:
+        try:
+            process_scraping_task.apply_async(
+                kwargs={'task_id': task_id},
+                task_id=celery_task_id,
+                queue=queue,
+                priority=priority,
+            )
+            logger.info(f"Sites Gathering task {task_id} sent to queue '{queue}' with priority {priority}")
+        except Exception as e:
+            # Release the claim; the periodic dispatcher will retry it
+            ScrapingTask.objects.filter(pk=task_id, celery_task_id=celery_task_id).update(celery_task_id='')
+            logger.error(f"Failed to send Sites Gathering task {task_id} to Celery: {str(e)}", exc_info=True)
+
+
+def get_task_progress(task: ScrapingTask) -> Dict:
+    """Queue position and progress of a Sites Gathering task for the status API."""
+    queue_position = None
+    if task.status == 'QUEUED' and not task.celery_task_id:
+        queue_position = waiting_tasks().filter(user_id=task.user_id).filter(
+            Q(priority__lt=task.priority) |
+            Q(priority=task.priority, created_at__lt=task.created_at)
+        ).count() + 1
+
+    progress = 0
+    if task.status in ['COMPLETED', 'DONE', 'TASK_DONE']:
+        progress = 100
+    elif task.queries_total:
+        progress = round(task.queries_completed / task.queries_total * 100)
+
+    return {
+        'id': task.id,
+        'project_id': str(task.project_id),
+        'status': task.status,
+        'status_display': task.get_status_display(),
+        'priority': task.get_priority_display(),
+        'dispatched': bool(task.celery_task_id),
+        'queue_position': queue_position,
+        'queries_total': task.queries_total,
+        'queries_completed': task.queries_completed,
+        'progress': progress,
+        'businesses_count': task.businesses.count(),
+        'created_at': task.created_at,
+        'started_at': task.started_at,
+        'completed_at': task.completed_at,
+    }
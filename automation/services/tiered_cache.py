@@ -0,0 +1,222 @@
+# automation/services/tiered_cache.py
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LocalLRUCache:
+    """Thread-safe, size-bounded LRU with per-entry expiry, private to one process."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: str, default=_MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: Optional[float]):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class TieredCache:
+    """
+    Process-local LRU in front of a shared Django cache backend.
+
+    Reads try the local tier, then the shared tier, and only then call the
+    loader. Loads are single-flight: one thread per process, and one process
+    per shared backend (through an ``add``-based lock), refreshes a key while
+    the others wait for its result. Local entries live at most
+    ``local_ttl`` seconds so changes made by other processes are picked up.
+    """
+
+    def __init__(self, alias: str = 'default', max_entries: Optional[int] = None,
+                 local_ttl: Optional[float] = None, lock_timeout: float = 30.0):
+        self.alias = alias
+        self.local = LocalLRUCache(max_entries or getattr(settings, 'LOCAL_CACHE_MAX_ENTRIES', 1024))
+        self.local_ttl = local_ttl if local_ttl is not None else getattr(settings, 'LOCAL_CACHE_TTL', 60)
+        self.lock_timeout = lock_timeout
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._key_locks_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'loads': 0, 'load_errors': 0, 'waits': 0}
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    @staticmethod
+    def _resolve_timeout(timeout, value) -> Optional[float]:
+        # A callable timeout derives the expiry from the loaded value, e.g. a token's expires_in
+        return timeout(value) if callable(timeout) else timeout
+
+    def _local_ttl(self, timeout: Optional[float]) -> Optional[float]:
+        if timeout is None:
+            return self.local_ttl
+        return min(self.local_ttl, timeout)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._key_locks_lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _shared_get(self, key: str):
+        try:
+            return self.shared.get(key, _MISSING)
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable, reading '{key}' from source: {str(e)}")
+            return _MISSING
+
+    def get(self, key: str, default=None):
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self._count('local_hits')
+            return value
+        value = self._shared_get(key)
+        if value is not _MISSING:
+            self._count('shared_hits')
+            self.local.set(key, value, self.local_ttl)
+            return value
+        self._count('misses')
+        return default
+
+    def set(self, key: str, value, timeout: Optional[float] = None):
+        self.local.set(key, value, self._local_ttl(timeout))
+        try:
+            self.shared.set(key, value, timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Could not write '{key}' to shared cache: {str(e)}")
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        try:
+            self.shared.delete(key)
+        except Exception as e:
+            logger.warning(f"Could not delete '{key}' from shared cache: {str(e)}")
+
+    def get_or_set(self, key: str, loader: Callable[[], Any], timeout=None):
+        """
+        Return the cached value for ``key``, calling ``loader`` at most once
+        across concurrent callers when it is missing. ``timeout`` is a number
+        of seconds or a callable computing it from the value. ``None`` results
+        are not cached; exceptions from ``loader`` propagate.
+        """
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self._count('local_hits')
+            return value
+
+        with self._key_lock(key):
+            # Another thread may have loaded the key while we waited
+            value = self.local.get(key)
+            if value is not _MISSING:
+                self._count('local_hits')
+                return value
+
+            value = self._shared_get(key)
+            if value is not _MISSING:
+                self._count('shared_hits')
+                self.local.set(key, value, self._local_ttl(self._resolve_timeout(timeout, value)))
+                return value
+
+            self._count('misses')
+            return self._load(key, loader, timeout)
+
+    def _load(self, key: str, loader: Callable[[], Any], timeout):
+        lock_key = f"{key}:refresh-lock"
+        token = uuid.uuid4().hex
+        try:
+            have_lock = self.shared.add(lock_key, token, timeout=self.lock_timeout)
+        except Exception:
+            have_lock = True  # Shared cache down: load locally
+
+        if not have_lock:
+            # Another process is loading this key; wait for its result
+            self._count('waits')
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                value = self._shared_get(key)
+                if value is not _MISSING:
+                    self.local.set(key, value, self._local_ttl(self._resolve_timeout(timeout, value)))
+                    return value
+            logger.warning(f"Timed out waiting for '{key}' to be refreshed, loading it here")
+
+        try:
+            self._count('loads')
+            value = loader()
+        except Exception:
+            self._count('load_errors')
+            raise
+        finally:
+            if have_lock:
+                try:
+                    if self.shared.get(lock_key) == token:
+                        self.shared.delete(lock_key)
+                except Exception:
+                    pass
+
+        if value is not None:
+            self.set(key, value, self._resolve_timeout(timeout, value))
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process and the local tier size."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['local_hits'] + stats['shared_hits']) / lookups, 4) if lookups else 0.0
+        stats['local_entries'] = len(self.local)
+        return stats
+
+
+_tiered_cache: Optional[TieredCache] = None
+_tiered_cache_lock = threading.Lock()
+
+
+def get_tiered_cache() -> TieredCache:
+    """Process-wide TieredCache over the 'default' cache alias."""
+    global _tiered_cache
+    with _tiered_cache_lock:
+        if _tiered_cache is None:
+            _tiered_cache = TieredCache()
+        return _tiered_cache
@@ -0,0 +1,150 @@
+# automation/services/translation_memory.py
+import hashlib
+import logging
+import threading
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from automation.services.tiered_cache import LocalLRUCache
+
+logger = logging.getLogger(__name__)
+
+# A segment is one source text to translate into one language
+Segment = Tuple[str, str]
+
+# Translations never change for a key, so the process-local tier needs no expiry
+_local = LocalLRUCache(getattr(settings, 'TRANSLATION_MEMORY_LOCAL_ENTRIES', 4096))
+_stats_lock = threading.Lock()
+_stats = {'local_hits': 0, 'db_hits': 0, 'misses': 0, 'stored': 0}
+
+
+def _count(stat: str, amount: int = 1):
+    with _stats_lock:
+        _stats[stat] += amount
+
+
+def normalize_source(text: str) -> str:
+    """Source text as keyed: NFC, trimmed, with runs of whitespace collapsed."""
+    return ' '.join(unicodedata.normalize('NFC', text or '').split())
+
+
+def memory_key(text: str, target_language: str, prompt_version: str) -> str:
+    """SHA-256 identifying one translation; stable across processes and restarts."""
+    raw = f"{prompt_version}\x1f{target_language.strip().lower()}\x1f{normalize_source(text)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def lookup(segments: Iterable[Segment], prompt_version: str) -> Dict[Segment, str]:
+    """
+    Stored translations of ``segments`` ((text, target_language) pairs),
+    read with a single query for everything the local tier does not hold.
+    Segments without a translation are left out of the result.
+    """
+    from automation.models import TranslationMemory
+
+    keys = {}
+    for text, language in segments:
+        if normalize_source(text):
+            keys.setdefault(memory_key(text, language, prompt_version), []).append((text, language))
+    if not keys:
+        return {}
+
+    found: Dict[str, str] = {}
+    for key in keys:
+        translation = _local.get(key, None)
+        if translation is not None:
+            found[key] = translation
+    _count('local_hits', len(found))
+
+    missing = [key for key in keys if key not in found]
+    if missing:
+        rows = dict(
+            TranslationMemory.objects.filter(key__in=missing).values_list('key', 'translated_text')
+        )
+        if rows:
+            TranslationMemory.objects.filter(key__in=rows.keys()).update(
+                hit_count=F('hit_count') + 1, last_used_at=timezone.now()
+            )
+            for key, translation in rows.items():
+                _local.set(key, translation, None)
+            found.update(rows)
+        _count('db_hits', len(rows))
+        _count('misses', len(missing) - len(rows))
+
+    return {segment: found[key] for key, segments_for_key in keys.items() if key in found
+            for segment in segments_for_key}
+
+
+def store(translations: Dict[Segment, str], prompt_version: str) -> int:
+    """Save new translations; empty ones are skipped and existing keys kept. Returns how many were given."""
+    from automation.models import TranslationMemory
+
+    entries = {}
+    for (text, language), translation in translations.items():
+        if normalize_source(text) and translation and translation.strip():
+            key = memory_key(text, language, prompt_version)
+            entries[key] = TranslationMemory(
+                key=key,
+                prompt_version=prompt_version,
+                target_language=language.strip().lower(),
+                source_text=normalize_source(text),
+                translated_text=translation,
+            )
+    if not entries:
+        return 0
+    TranslationMemory.objects.bulk_create(entries.values(), ignore_conflicts=True)
+    for key, entry in entries.items():
+        _local.set(key, entry.translated_text, None)
+    _count('stored', len(entries))
+    return len(entries)
+
+
+def translate(text: str, target_language: str, prompt_version: str,
+              translate_fn: Callable[[str, str], Optional[str]]) -> Optional[str]:
+    """
+    Translation of ``text`` from the memory, or from ``translate_fn(text,
+    target_language)`` on a miss. Empty results are returned but not stored,
+    so failed calls are retried next time.
+    """
+    return translate_many([(text, target_language)], prompt_version, translate_fn).get((text, target_language))
+
+
+def translate_many(segments: Iterable[Segment], prompt_version: str,
+                   translate_fn: Callable[[str, str], Optional[str]]) -> Dict[Segment, Optional[str]]:
+    """translate() for many segments: one memory lookup, then ``translate_fn`` per miss."""
+    segments = list(dict.fromkeys(segments))
+    results: Dict[Segment, Optional[str]] = dict(lookup(segments, prompt_version))
+    fresh = {}
+    for segment in segments:
+        if segment not in results:
+            results[segment] = fresh[segment] = translate_fn(*segment)
+    if fresh:
+        store(fresh, prompt_version)
+    return results
+
+
+async def atranslate(text: str, target_language: str, prompt_version: str, translate_fn) -> Optional[str]:
+    """translate() for coroutine translators; the memory is read and written off the event loop."""
+    segment = (text, target_language)
+    stored = (await sync_to_async(lookup)([segment], prompt_version)).get(segment)
+    if stored is not None:
+        return stored
+    translation = await translate_fn(text, target_language)
+    if translation:
+        await sync_to_async(store)({segment: translation}, prompt_version)
+    return translation
+
+
+def get_stats() -> Dict[str, Any]:
+    """Lookups served by this process since start, and the resulting hit rate."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['local_hits'] + stats['db_hits'] + stats['misses']
+    stats['hit_rate'] = round((stats['local_hits'] + stats['db_hits']) / lookups, 4) if lookups else 0.0
+    stats['local_entries'] = len(_local)
+    return stats
@@ -57,6 +57,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'automation.services.permissions.PermissionsMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -176,10 +177,15 @@ LOGGING = {
             'filename': os.path.join(BASE_DIR, 'debug.log'),
             'formatter': 'verbose',
         },
+        # Per-task log file and live stream of records logged inside task_log_context()
+        'task_log': {
+            'level': 'DEBUG' if DEBUG else 'INFO',
+            'class': 'automation.services.task_logging.TaskLogRouter',
+        },
     },
     'loggers': {
         'automation': {
-            'handlers': ['console', 'file'],
+            'handlers': ['console', 'file', 'task_log'],
             'level': 'DEBUG' if DEBUG else 'INFO',
             'propagate': True,
         } 
@@ -208,11 +214,68 @@ DATABASE_OPTIONS = {
 }
 
 # Cache Configuration
-CACHES = {
-    'default': {
+# CACHE_BACKEND selects the shared tier: 'redis' for the web/Celery fleet,
+# 'file' or 'db' for single-host installs, 'locmem' for per-process only.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem' if DEVELOPMENT_MODE else 'redis')
+CACHE_BACKENDS = {
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/1')),
+        'KEY_PREFIX': 'automation',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_FILE_PATH', os.path.join(BASE_DIR, '.cache')),
+    },
+    'db': {
+        # Requires `python manage.py createcachetable`
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'automation_cache',
+    },
+    'locmem': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    },
 }
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
+}
+
+# Process-local LRU kept in front of the shared cache (see services/tiered_cache.py)
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv('LOCAL_CACHE_MAX_ENTRIES', 1024))
+LOCAL_CACHE_TTL = int(os.getenv('LOCAL_CACHE_TTL', 60))  # seconds
+
+# Channel layer for the task log WebSocket (see services/log_stream.py). Redis
+# lets Celery workers publish to consumers running in the web processes.
+CHANNEL_LAYER_BACKEND = os.getenv('CHANNEL_LAYER_BACKEND', 'memory' if DEVELOPMENT_MODE else 'redis')
+CHANNEL_LAYER_BACKENDS = {
+    'redis': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            'hosts': [os.getenv('CHANNEL_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/2'))],
+        },
+    },
+    'memory': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
+CHANNEL_LAYERS = {
+    'default': CHANNEL_LAYER_BACKENDS[CHANNEL_LAYER_BACKEND],
+}
+LOG_STREAM_FLUSH_INTERVAL = float(os.getenv('LOG_STREAM_FLUSH_INTERVAL', 0.5))  # seconds
+LOG_STREAM_BACKLOG_BYTES = int(os.getenv('LOG_STREAM_BACKLOG_BYTES', 100 * 1024))
+# Payload dumps in task logs: truncated to LOG_PAYLOAD_MAX_CHARS, first and every N-th logged
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv('LOG_PAYLOAD_MAX_CHARS', 500))
+LOG_PAYLOAD_SAMPLE_EVERY = int(os.getenv('LOG_PAYLOAD_SAMPLE_EVERY', 50))
+
+# Translations kept in each process in front of the TranslationMemory table
+TRANSLATION_MEMORY_LOCAL_ENTRIES = int(os.getenv('TRANSLATION_MEMORY_LOCAL_ENTRIES', 4096))
+
+# Business search index (services/search.py): rows recomputed per batch
+SEARCH_INDEX_BATCH_SIZE = int(os.getenv('SEARCH_INDEX_BATCH_SIZE', 500))
+
+# Keep each user's roles and destination ids in their session, invalidated
+# through a per-user version in the cache (see services/permissions.py)
+PERMISSIONS_SESSION_CACHE = os.getenv('PERMISSIONS_SESSION_CACHE', 'True').lower() == 'true'
 
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = DEBUG  # Allow all origins in development
@@ -236,6 +299,12 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Listing APIs page with keyset cursors (services/pagination.py)
+LISTING_MAX_PAGE_SIZE = int(os.getenv('LISTING_MAX_PAGE_SIZE', 200))
+# Above this many estimated rows, ?count=approx reports the planner estimate
+PAGINATION_EXACT_COUNT_LIMIT = int(os.getenv('PAGINATION_EXACT_COUNT_LIMIT', 10000))
+PAGINATION_COUNT_CACHE_TTL = int(os.getenv('PAGINATION_COUNT_CACHE_TTL', 60))  # seconds
+
 # Static Files Finders
 STATICFILES_FINDERS = [
     'django.contrib.staticfiles.finders.FileSystemFinder',
@@ -275,8 +344,48 @@ OPENAI_KEYS = [
     FALLBACK_2_OPENAI_API_KEY
 ]
 
+# Share of calls each of OPENAI_KEYS gets, e.g. "3,1,1"; keys are never probed,
+# a rate-limited or failing key cools down from OPENAI_KEY_COOLDOWN seconds, doubling
+# up to OPENAI_KEY_MAX_COOLDOWN, and a rejected key is dropped from rotation
+OPENAI_KEY_WEIGHTS = [int(weight) for weight in os.getenv('OPENAI_KEY_WEIGHTS', '').split(',') if weight.strip()]
+OPENAI_KEY_COOLDOWN = float(os.getenv('OPENAI_KEY_COOLDOWN', 5.0))
+OPENAI_KEY_MAX_COOLDOWN = float(os.getenv('OPENAI_KEY_MAX_COOLDOWN', 300.0))
+
 SERPAPI_KEY =  os.getenv('SERPAPI_KEY')
 
+# Concurrency for process_scraping_task: queries handled in parallel per task,
+# and in-flight SerpAPI requests allowed per API key within a worker process
+SCRAPING_MAX_WORKERS = int(os.getenv('SCRAPING_MAX_WORKERS', 4))
+SERPAPI_MAX_CONCURRENT_REQUESTS = int(os.getenv('SERPAPI_MAX_CONCURRENT_REQUESTS', 4))
+
+# Adaptive pacing: no delay between calls unless a host throttles us (HTTP 429/503,
+# Retry-After, SerpAPI rate-limit errors); back-off starts at the base delay
+PACING_BASE_DELAY = float(os.getenv('PACING_BASE_DELAY', 1.0))
+PACING_MAX_DELAY = float(os.getenv('PACING_MAX_DELAY', 60.0))
+
+# cleanup_old_tasks: tasks older than this many days are deleted with their stored files,
+# STORAGE_GC_TASK_CHUNK_SIZE tasks at a time, listing and deleting objects with STORAGE_GC_WORKERS threads
+TASK_RETENTION_DAYS = int(os.getenv('TASK_RETENTION_DAYS', 30))
+STORAGE_GC_TASK_CHUNK_SIZE = int(os.getenv('STORAGE_GC_TASK_CHUNK_SIZE', 50))
+STORAGE_GC_WORKERS = int(os.getenv('STORAGE_GC_WORKERS', 8))
+
+# transfer_media: files uploaded at once, and the size above which (and part size in which) a file goes up in parts
+MEDIA_SYNC_CONCURRENCY = int(os.getenv('MEDIA_SYNC_CONCURRENCY', 16))
+MEDIA_SYNC_MULTIPART_THRESHOLD = int(os.getenv('MEDIA_SYNC_MULTIPART_THRESHOLD', 8 * 1024 * 1024))
+MEDIA_SYNC_MULTIPART_CHUNKSIZE = int(os.getenv('MEDIA_SYNC_MULTIPART_CHUNKSIZE', 8 * 1024 * 1024))
+
+# Image ingestion pipeline used by download_images
+IMAGE_FETCH_WORKERS = int(os.getenv('IMAGE_FETCH_WORKERS', 6))
+IMAGE_PROCESS_WORKERS = int(os.getenv('IMAGE_PROCESS_WORKERS', 2))
+IMAGE_UPLOAD_WORKERS = int(os.getenv('IMAGE_UPLOAD_WORKERS', 4))
+IMAGE_MULTIPART_THRESHOLD = int(os.getenv('IMAGE_MULTIPART_THRESHOLD', 8 * 1024 * 1024))
+# Perceptual hashes at most this many bits apart count as the same photo and are not uploaded twice
+IMAGE_DUPLICATE_MAX_DISTANCE = int(os.getenv('IMAGE_DUPLICATE_MAX_DISTANCE', 6))
+# Derivatives (thumb/medium JPEG + WebP, full-size WebP) are stored next to each image;
+# move-to-app sends the smallest one at least MOVE_TO_APP_IMAGE_WIDTH pixels wide
+IMAGE_WEBP_QUALITY = int(os.getenv('IMAGE_WEBP_QUALITY', 80))
+MOVE_TO_APP_IMAGE_WIDTH = int(os.getenv('MOVE_TO_APP_IMAGE_WIDTH', 960))
+
 DEFAULT_IMAGES = 6
 
 AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
@@ -309,6 +418,7 @@ OAUTH_CLIENT_SECRET = os.environ.get('OAUTH_CLIENT_SECRET')
 
 
 # Celery Configuration
+from celery.schedules import crontab
 CELERY_BROKER_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 CELERY_ACCEPT_CONTENT = ['json']
@@ -319,11 +429,60 @@ CELERY_TIMEZONE = 'UTC'
 # Task-specific settings
 CELERY_TASK_ROUTES = {
     'automation.tasks.process_scraping_task': {'queue': 'scraping'},
+    # Own queue and worker, so publishing never waits behind long scraping tasks
+    'automation.tasks.publish_move_to_app_job': {'queue': 'publishing'},
     #'automation.tasks.bulk_business_translation': {'queue': 'translation'},
     #'automation.tasks.download_images': {'queue': 'images'},
 }
 
+# Honour per-task priorities on the Redis broker (0 = highest) and let workers
+# reserve one long-running task at a time so priorities take effect
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'queue_order_strategy': 'priority',
+    'priority_steps': list(range(10)),
+    'sep': ':',
+}
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Sites Gathering tasks a user can have dispatched or running at once; the rest
+# wait in QUEUED until a slot frees up (0 disables the cap)
+SCRAPING_MAX_ACTIVE_TASKS_PER_USER = int(os.getenv('SCRAPING_MAX_ACTIVE_TASKS_PER_USER', 2))
+# Hard time limit (seconds) of one Sites Gathering task; the soft limit is 10 minutes earlier.
+# A task started longer ago than this no longer counts against its user's cap.
+SCRAPING_TASK_TIME_LIMIT = int(os.getenv('SCRAPING_TASK_TIME_LIMIT', 6 * 3600))
+
 # Task time limits
 CELERY_TASK_TIME_LIMIT = 1800  # 30 minutes
 CELERY_TASK_SOFT_TIME_LIMIT = 1500  # 25 minutes
 
+# Periodic tasks (run with `celery -A automation beat`)
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-daily-activity': {
+        'task': 'automation.tasks.reconcile_daily_activity',
+        'schedule': crontab(hour=2, minute=0),
+        'options': {'queue': 'scraping'},
+    },
+    'dispatch-waiting-scraping-tasks': {
+        'task': 'automation.tasks.dispatch_waiting_scraping_tasks',
+        'schedule': crontab(minute='*/5'),
+        'options': {'queue': 'scraping'},
+    },
+}
+
+
+# Publishing businesses to Local Secrets (move-to-app) from bulk IN_PRODUCTION updates
+MOVE_TO_APP_CONCURRENCY = int(os.getenv('MOVE_TO_APP_CONCURRENCY', 4))
+MOVE_TO_APP_TIMEOUT = int(os.getenv('MOVE_TO_APP_TIMEOUT', 30))  # seconds per request
+MOVE_TO_APP_RETRIES = int(os.getenv('MOVE_TO_APP_RETRIES', 3))
+
+
+# Rate limiting for external APIs, shared across web and Celery processes.
+# RATE_LIMIT_STORE is 'redis' (shared buckets) or 'memory' (per-process, for tests)
+RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'memory' if DEVELOPMENT_MODE else 'redis')
+RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', CELERY_BROKER_URL)
+RATE_LIMITS = {
+    'serpapi': {'calls': int(os.getenv('SERPAPI_CALLS_PER_MINUTE', 10)), 'period': 60},
+    'openai': {'calls': int(os.getenv('OPENAI_CALLS_PER_MINUTE', 60)), 'period': 60},
+    'ls_backend': {'calls': int(os.getenv('LS_BACKEND_CALLS_PER_MINUTE', 120)), 'period': 60},
+    'image_download': {'calls': int(os.getenv('IMAGE_DOWNLOADS_PER_MINUTE', 120)), 'period': 60, 'burst': 20},
+}
@@ -5,9 +5,12 @@ from django.apps import apps
 from django.contrib.admin.models import LogEntry
 from django.db.models.signals import post_migrate
 from django.dispatch import receiver
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import m2m_changed, post_save, post_delete
 from automation.models import Business, CustomUser, ScrapingTask, UserRole, Feedback, Country, Level, Destination, Category
 from automation.common import update_task_status_core
+from automation.services import daily_activity
+from automation.services import log_stream
+from automation.services.permissions import invalidate_permissions
 from django.db.models.signals import pre_save
 import logging
 from django.core.mail import send_mail
@@ -17,6 +20,7 @@ from django.db.models.signals import pre_delete
 from django.template.loader import render_to_string
 from django.contrib.messages import add_message, SUCCESS, WARNING
 from django.db import models  # Import models
+from django.db import transaction
 logger = logging.getLogger(__name__)
 
 @receiver(post_migrate)
@@ -29,6 +33,33 @@ def create_user_role(sender, instance, created, **kwargs):
     pass
 
 
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def invalidate_role_permissions(sender, instance, **kwargs):
+    invalidate_permissions(instance.user_id)
+
+
+@receiver(m2m_changed, sender=CustomUser.destinations.through)
+def invalidate_destination_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_permissions(instance.pk)
+    elif action == 'pre_clear':
+        # pk_set is empty on clear; collect the users before their rows go
+        for user_id in instance.customuser_set.values_list('id', flat=True):
+            invalidate_permissions(user_id)
+    else:
+        for user_id in pk_set or ():
+            invalidate_permissions(user_id)
+
+
+@receiver(pre_delete, sender=Destination)
+def invalidate_deleted_destination_permissions(sender, instance, **kwargs):
+    for user_id in instance.customuser_set.values_list('id', flat=True):
+        invalidate_permissions(user_id)
+
+
 @receiver(pre_save, sender=Business)
 def enforce_description_validation(sender, instance, **kwargs):
     """Ensure that businesses in REVIEWED or IN_PRODUCTION status have their descriptions."""
@@ -62,9 +93,11 @@ def cleanup_feedback(sender, instance, **kwargs):
 def before_business_save(sender, instance, **kwargs):
     if instance.pk:
         try:
-            previous = Business.objects.get(pk=instance.pk)
+            previous = Business.all_objects.get(pk=instance.pk)
             instance._previous_main_category = previous.main_category
             instance._previous_tailored_category = previous.tailored_category
+            instance._previous_status = previous.status
+            instance._previous_is_deleted = previous.is_deleted
             logger.debug(f"Pre-save: Retrieved previous categories for Business ID {instance.pk}")
             logger.debug(f"Previous main_category: {instance._previous_main_category}")
             logger.debug(f"Previous tailored_category: {instance._previous_tailored_category}")
@@ -137,6 +170,43 @@ def update_task_status_signal(task, instance):
     """Signal handler version - requires instance"""
     return _update_task_status_core(task)
  
+@receiver(post_save, sender=ScrapingTask)
+def record_task_activity(sender, instance, created, **kwargs):
+    """Count new tasks in the daily activity rollup."""
+    if not created:
+        return
+    try:
+        daily_activity.record_task_created(instance)
+    except Exception as e:
+        logger.error(f"Error recording daily activity for task {instance.id}: {str(e)}", exc_info=True)
+
+@receiver(post_save, sender=ScrapingTask)
+def publish_task_status(sender, instance, created, **kwargs):
+    """Push status changes to the task's log watchers once they are committed."""
+    if created or getattr(instance, '_published_status', None) == instance.status:
+        return
+    instance._published_status = instance.status
+    task_id, status = instance.id, instance.status
+    transaction.on_commit(lambda: log_stream.publish_status(task_id, status))
+
+@receiver(post_save, sender=Business)
+def record_business_activity(sender, instance, created, **kwargs):
+    """Keep the daily activity rollup in step with new, (un)deleted and reviewed businesses."""
+    try:
+        if created:
+            daily_activity.record_businesses_gathered(instance.task)
+            return
+
+        previous_is_deleted = getattr(instance, '_previous_is_deleted', None)
+        if previous_is_deleted is not None and previous_is_deleted != instance.is_deleted:
+            daily_activity.record_businesses_gathered(instance.task, -1 if instance.is_deleted else 1)
+
+        previous_status = getattr(instance, '_previous_status', None)
+        if previous_status and previous_status != instance.status:
+            daily_activity.record_status_transition(instance, instance.status)
+    except Exception as e:
+        logger.error(f"Error recording daily activity for business {instance.id}: {str(e)}", exc_info=True)
+
 @receiver(post_save, sender=Business)
 @receiver(post_delete, sender=Business)
 def business_status_changed(sender, instance, **kwargs):
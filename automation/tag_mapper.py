@@ -1,33 +1,43 @@
 # tag_mapper.py
-from django.core.cache import cache
 from typing import List, Dict, Union
 
 import openai
 from automation.models import TagMapping
+from automation.services import translation_memory
+from automation.services.openai_keys import chat_completion
+from automation.services.tiered_cache import get_tiered_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump when the tag prompt changes, so the translation memory stops serving old output
+TAG_PROMPT_VERSION = 'tag-v1'
+
+
 class TagMappingService:
     def __init__(self):
         self._load_cache()
     
     def _load_cache(self):
         """Load existing tag mappings from cache or database"""
-        self.cache = cache.get('tag_mappings')
-        if not self.cache:
-            mappings = TagMapping.objects.all().values(
-                'english_tag', 'spanish_tag', 'french_tag'
-            )
-            self.cache = {
-                m['english_tag'].lower(): {
-                    'spanish': m['spanish_tag'],
-                    'french': m['french_tag'],
-                    'eng': m['english_tag']
-                }
-                for m in mappings
+        # Copy so that local additions never leak into the shared cached value
+        self.cache = dict(get_tiered_cache().get_or_set(
+            'tag_mappings', self._load_mappings, timeout=3600
+        ))
+
+    @staticmethod
+    def _load_mappings() -> Dict[str, Dict[str, str]]:
+        mappings = TagMapping.objects.all().values(
+            'english_tag', 'spanish_tag', 'french_tag'
+        )
+        return {
+            m['english_tag'].lower(): {
+                'spanish': m['spanish_tag'],
+                'french': m['french_tag'],
+                'eng': m['english_tag']
             }
-            cache.set('tag_mappings', self.cache, timeout=3600)
+            for m in mappings
+        }
 
     def process_business_types(self, scraped_types: Union[str, List[str]]) -> Dict[str, str]:
         """
@@ -92,13 +102,20 @@ class TagMappingService:
 
         # Update cache with new mappings
         if new_mappings:
-            for mapping in new_mappings:
-                self.cache[mapping['english_tag'].lower()] = {
+            added = {
+                mapping['english_tag'].lower(): {
                     'spanish': mapping['spanish_tag'],
                     'french': mapping['french_tag'],
                     'eng': mapping['english_tag']
                 }
-            cache.set('tag_mappings', self.cache, timeout=3600)
+                for mapping in new_mappings
+            }
+            self.cache.update(added)
+            # Merge into the latest shared copy so mappings added by other workers are kept
+            tiered_cache = get_tiered_cache()
+            shared = dict(tiered_cache.get('tag_mappings') or {})
+            shared.update(added)
+            tiered_cache.set('tag_mappings', shared, timeout=3600)
 
         # Convert lists to strings
         result['types_esp'] = ', '.join(result['types_esp'])
@@ -108,7 +125,7 @@ class TagMappingService:
 
     def _translate_text(self, text: str, target_lang: str) -> str:
         """
-        Translate text using OpenAI service
+        Translate text using OpenAI service, through the translation memory
         
         Args:
             text: Text to translate
@@ -120,35 +137,8 @@ class TagMappingService:
         if not text.strip():
             return text
 
-        lang_display = {
-            'spanish': 'Spanish',
-            'french': 'French'
-        }
-
         try:
-            messages = [
-                {
-                    "role": "system",
-                    "content": (
-                        f"You are a professional translator. "
-                        f"Translate the following business type or category to {lang_display[target_lang]}. "
-                        "Keep proper nouns unchanged. Use standard business terminology."
-                    )
-                },
-                {"role": "user", "content": text}
-            ]
-
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                temperature=0.3,  # Lower temperature for more consistent translations
-                max_tokens=100
-            )
-
-            translated_text = response.choices[0].message.content.strip()
-            logger.info(f"Translated '{text}' to {target_lang}: '{translated_text}'")
-            return translated_text
-
+            return translation_memory.translate(text, target_lang, TAG_PROMPT_VERSION, self._request_translation)
         except openai.error.RateLimitError:
             logger.error(f"OpenAI rate limit reached while translating: {text}")
             return text
@@ -156,4 +146,34 @@ class TagMappingService:
             logger.error(f"Translation error for text '{text}': {str(e)}")
             return text
 
+    def _request_translation(self, text: str, target_lang: str) -> str:
+        """OpenAI translation of a tag; raises on failure so nothing is remembered."""
+        lang_display = {
+            'spanish': 'Spanish',
+            'french': 'French'
+        }
+
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    f"You are a professional translator. "
+                    f"Translate the following business type or category to {lang_display[target_lang]}. "
+                    "Keep proper nouns unchanged. Use standard business terminology."
+                )
+            },
+            {"role": "user", "content": text}
+        ]
+
+        response = chat_completion(
+            model="gpt-3.5-turbo",
+            messages=messages,
+            temperature=0.3,  # Lower temperature for more consistent translations
+            max_tokens=100
+        )
+
+        translated_text = response.choices[0].message.content.strip()
+        logger.info(f"Translated '{text}' to {target_lang}: '{translated_text}'")
+        return translated_text
+
  
\ No newline at end of file
@@ -7,13 +7,13 @@ from typing import Optional
 from urllib.parse import parse_qs, urlparse
 import uuid
 from celery import shared_task
+from celery.exceptions import SoftTimeLimitExceeded
 from django.urls import reverse
 from django.utils import timezone
 from ratelimit import RateLimitException
 import urllib
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from automation.consumers import get_log_file_path 
-from .models import BusinessImage, Country, Destination, HourlyBusyness, PopularTimes, Review, ScrapingTask, Business, Category, OpeningHours, AdditionalInfo, Image
+from .models import BusinessCategory, BusinessImage, Country, Destination, HourlyBusyness, PopularTimes, Review, ScrapingTask, Business, Category, OpeningHours, AdditionalInfo, Image, MoveToAppJob
 from django.conf import settings 
 from serpapi import GoogleSearch
 import json
@@ -26,13 +26,14 @@ import logging
 import asyncio
 from .translation_utils import translate_business_info_sync
 from serpapi import GoogleSearch
+import threading
 import time
 from PIL import Image as PILImage
 from io import BytesIO
 from django.db import transaction
 from django.core.management import call_command
 from django.core.mail import send_mail
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, F
 from django.db import connection
 from django.template.loader import get_template
 from django.db.models.signals import post_save
@@ -69,6 +70,21 @@ import time
 from requests.exceptions import RequestException
 from django.utils.text import slugify
 from .utils import process_scraped_types
+from .common import update_task_status_core
+from .services.scraping_engine import ScrapingEngine, serpapi_slot
+from .services.rate_limiter import get_rate_limiter, rate_limited
+from .services.pacing import PacingController, SERPAPI_HOST, default_pacer
+from .services.image_fingerprint import DuplicateIndex
+from .services.image_pipeline import ImagePipeline, crop_image_to_aspect_ratio
+from .services.address_parser import parse_address
+from .services import daily_activity
+from .services.move_to_app import run_job as run_move_to_app_job
+from .services.task_queue import dispatch_waiting_tasks, release_task, start_task
+from .services import task_logging
+from .services.task_logging import task_log_context
+from .services.search import refresh_search_index
+from .services import business_metrics, translation_memory
+from .services.openai_keys import KEY_ERRORS, TRANSIENT_ERRORS, chat_completion, get_openai_key_pool
 import csv
 import pandas as pd
 from django.contrib import messages
@@ -82,39 +98,32 @@ OPENAI_API_KEY = settings.TRANSLATION_OPENAI_API_KEY
 FALLBACK_1_OPENAI_API_KEY = settings.FALLBACK_1_OPENAI_API_KEY 
 FALLBACK_2_OPENAI_API_KEY = settings.FALLBACK_2_OPENAI_API_KEY 
 
-def get_available_openai_key():
-    keys = [
-        settings.OPENAI_API_KEY,
-        settings.FALLBACK_1_OPENAI_API_KEY,
-        settings.FALLBACK_2_OPENAI_API_KEY,
-    ]
-    for key in keys:
-        for _ in range(3):   
-            try:
-                openai.api_key = key
-                openai.Model.list()
-                logger.debug(f"Using OpenAI API Key: {key} - tasks")
-                return key
-            except openai.error.OpenAIError as e:
-                logger.warning(f"Transient error with key {key}: {e}")
-                time.sleep(2)   
-                continue
-            except Exception as e:
-                logger.error(f"API key {key} failed with error: {e}")
-                break  
-        continue
-    logger.error("All OpenAI API keys failed.")
-    return None
+# Doctran sends every call with the module-wide openai.api_key, so one call at a time
+_doctran_lock = threading.Lock()
 
-valid_openai_key = get_available_openai_key()
 
-if valid_openai_key:
+def doctran_summarize(content, token_limit):
+    """
+    Summarize ``content`` with Doctran on the next key from the OpenAI key
+    pool, reporting the outcome back to the pool like chat_completion().
+    """
+    pool = get_openai_key_pool()
+    key = pool.acquire()
+    get_rate_limiter('openai').acquire(key)
     try:
-        doctran = Doctran(openai_api_key=valid_openai_key)
+        with _doctran_lock:
+            document = Doctran(openai_api_key=key).parse(content=content)
+            summary = document.summarize(token_limit=token_limit).execute().transformed_content
     except Exception as e:
-        logger.critical(f"Failed to initialize Doctran: {e}")
-else:
-    logger.critical("Failed to initialize Doctran due to no available OpenAI API keys.")
+        # Doctran wraps the OpenAI error in plain Exceptions
+        cause = e
+        while cause is not None and not isinstance(cause, KEY_ERRORS + TRANSIENT_ERRORS):
+            cause = cause.__cause__ or cause.__context__
+        if cause is not None:
+            pool.failure(key, cause)
+        raise
+    pool.success(key)
+    return summary
 
 def read_queries(file_path):
     """
@@ -268,7 +277,7 @@ def extract_coordinates(url):
         logger.error(f"Error extracting coordinates: {str(e)}")
         return None
     
-def process_query(query_data):
+def process_query(query_data, pacer=None):
     query = query_data['query']
     data_id = query_data.get('data_id')
     ll = query_data.get('ll')
@@ -293,7 +302,7 @@ def process_query(query_data):
 
         logger.info(f"Searching for exact place with params: {params}")
 
-        results = fetch_search_results(params)
+        results = fetch_paced_results(params, pacer=pacer)
         
         if results and 'error' not in results:
             if 'place_results' in results:
@@ -310,28 +319,6 @@ def process_query(query_data):
         logger.error(f"Error processing query '{query}': {str(e)}")
         return None
  
-def rate_limiter(max_calls, period):
-    def decorator(func):
-        last_reset = [time.time()]
-        call_counts = [0]
-
-        def wrapper(*args, **kwargs):
-            current_time = time.time()
-            if current_time - last_reset[0] > period:
-                last_reset[0] = current_time
-                call_counts[0] = 0
-
-            if call_counts[0] < max_calls:
-                call_counts[0] += 1
-                return func(*args, **kwargs)
-            else:
-                time.sleep(period - (current_time - last_reset[0]))
-                return wrapper(*args, **kwargs)
-
-        return wrapper
-
-    return decorator
-
 def read_queries_from_content(content):
     logger.info("Reading queries from content")
     try:
@@ -389,14 +376,26 @@ def read_queries_from_content(content):
         return []
  
 @backoff.on_exception(backoff.expo, RequestException, max_tries=5)
-@rate_limiter(max_calls=10, period=60)  
+@rate_limited('serpapi', key_func=lambda params: params.get('api_key'))
 def fetch_search_results(params):
-    search = GoogleSearch(params)
-    return search.get_dict()
+    with serpapi_slot(params.get('api_key')):
+        search = GoogleSearch(params)
+        return search.get_dict()
 
-def random_delay(min_delay=2, max_delay=5):
-    delay = random.uniform(min_delay, max_delay)
-    time.sleep(delay)
+def fetch_paced_results(params, pacer=None, max_attempts=3):
+    """
+    Fetch SerpAPI results through the pacing controller.
+    Retries with back-off only while SerpAPI reports that we are being throttled.
+    """
+    pacer = pacer or default_pacer
+    results = None
+    for attempt in range(max_attempts):
+        with pacer.request(SERPAPI_HOST):
+            results = fetch_search_results(params)
+        if not pacer.record_serpapi_result(results):
+            break
+        logger.warning(f"SerpAPI throttled request (attempt {attempt + 1}/{max_attempts})")
+    return results
 
 def get_next_page_token(results):
     return results.get('serpapi_pagination', {}).get('next_page_token')
@@ -435,17 +434,92 @@ def extract_query_from_url(url):
         logger.error(f"Error parsing URL: {str(e)}")
         return None
 
-@shared_task(bind=True)
+def process_query_pages(task, query_data, index, total_queries, form_data=None, image_count=6, pacer=None):
+    """
+    Fetch and save every result page of a single query, in page order.
+    Returns the number of local results processed for the query.
+    """
+    query = query_data['query']
+    page_num = 1
+    next_page_token = None
+    total_results = 0
+
+    while True:
+        logger.info(f"Processing query {index}/{total_queries}: {query} (Page {page_num})")
+
+        # Handle pagination
+        if next_page_token:
+            query_data['start'] = next_page_token
+        else:
+            query_data.pop('start', None)
+
+        # Process query and get results
+        results = process_query(query_data, pacer=pacer)
+        if results is None:
+            break
+
+        local_results = results.get('local_results', [])
+        if not local_results:
+            logger.info(f"No results found for query '{query}' (Page {page_num})")
+            break
+
+        logger.info(f"Processing {len(local_results)} local results for query '{query}' (Page {page_num})")
+        task_logging.count('pages_fetched')
+        task_logging.count('results_received', len(local_results))
+        task_logging.log_payload(logger, 'result_pages', "Local result data", local_results)
+
+        save_results(task, results, query)
+
+        # Save the whole page in one batch, then fetch images per business
+        saved = save_page_businesses(task, local_results, query, form_data=form_data)
+        for business, local_result in saved:
+            try:
+                logger.debug(f"Downloading images for business {business.id}")
+                download_images(business, local_result, image_count=image_count, pacer=pacer)
+            except SoftTimeLimitExceeded:
+                raise
+            except Exception as e:
+                logger.error(f"Error downloading images for business {business.id}: {str(e)}", exc_info=True)
+
+        total_results += len(local_results)
+        logger.info(f"Processed {len(local_results)} results on page {page_num} for query '{query}'")
+
+        next_page_token = get_next_page_token(results)
+        if next_page_token:
+            logger.info(f"Next page token found: {next_page_token}")
+            page_num += 1
+        else:
+            logger.info(f"No next page token found for query '{query}'")
+            break
+
+    logger.info(f"Finished processing query: {query}")
+    return total_results
+
+# A multi-page scrape can run for hours: its own limits instead of the global
+# CELERY_TASK_*TIME_LIMIT, with a grace period to record what was gathered
+SCRAPING_TASK_TIME_LIMIT = getattr(settings, 'SCRAPING_TASK_TIME_LIMIT', 6 * 3600)
+SCRAPING_TASK_SOFT_TIME_LIMIT = max(60, SCRAPING_TASK_TIME_LIMIT - 600)
+
+
+@shared_task(bind=True, soft_time_limit=SCRAPING_TASK_SOFT_TIME_LIMIT, time_limit=SCRAPING_TASK_TIME_LIMIT)
 def process_scraping_task(self, task_id, form_data=None):
-    log_file_path = get_log_file_path(task_id)
-    file_handler = logging.FileHandler(log_file_path)
-    logger.addHandler(file_handler)
+    # Everything logged while the task runs, from any thread, goes to its own
+    # log file and the LogConsumer stream (services/task_logging.py)
+    with task_log_context(task_id):
+        _process_scraping_task(task_id, form_data)
+
 
+def _process_scraping_task(task_id, form_data=None):
     try:
         logger.info(f"Starting Sites Gathering task {task_id}")
         task = ScrapingTask.objects.get(id=task_id)
-        task.status = 'IN_PROGRESS'
-        task.save()
+        # update() rather than save(): ScrapingTask.save() would turn a task
+        # without PENDING businesses yet into DONE
+        start_task(task.pk)
+        task.refresh_from_db(fields=['status', 'started_at', 'completed_at'])
+
+        # Tasks dispatched from the queue carry their form data on the row
+        form_data = form_data or task.form_data or None
 
         # Get image_count early and ensure it's an integer
         image_count = int(form_data.get('image_count', 6)) if form_data else 6
@@ -490,87 +564,52 @@ def process_scraping_task(self, task_id, form_data=None):
 
         if not queries:
             logger.error("No valid queries to process.")
-            task.status = 'FAILED'
-            task.save()
+            ScrapingTask.objects.filter(pk=task.pk).update(status='FAILED')
             return
 
-        total_results = 0 
+        task.queries_total = len(queries)
+        task.queries_completed = 0
+        ScrapingTask.objects.filter(pk=task.pk).update(queries_total=task.queries_total, queries_completed=0)
+        pacer = PacingController()
 
-        for index, query_data in enumerate(queries, start=1):
-            query = query_data['query']
-            page_num = 1
-            next_page_token = None
-
-            while True:
-                logger.info(f"Processing query {index}/{len(queries)}: {query} (Page {page_num})")
-
-                # Handle pagination
-                if next_page_token:
-                    query_data['start'] = next_page_token
-                else:
-                    query_data.pop('start', None)
-
-                # Process query and get results
-                results = process_query(query_data)
-                if results is None:
-                    break
-
-                local_results = results.get('local_results', [])
-                if not local_results:
-                    logger.info(f"No results found for query '{query}' (Page {page_num})")
-                    break
-
-                logger.info(f"Processing {len(local_results)} local results for query '{query}' (Page {page_num})")
-                logger.info(f"Local result data: {local_results}")
-
-                save_results(task, results, query)
-
-                # Process individual results
-                for result_index, local_result in enumerate(local_results, start=1):
-                    try:
-                        with transaction.atomic():
-                            logger.info(f"Saving business {result_index}/{len(local_results)} for query '{query}' (Page {page_num})")
-                            business = save_business(task, local_result, query, form_data=form_data)
-                            
-                            if business:
-                                logger.info(f"Downloading images for business {business.id}")
-                                download_images(business, local_result, image_count=image_count)
-                            else:
-                                logger.warning(f"Business skipped: {local_result.get('title', 'Unknown')}")
-                    except Exception as e:
-                        logger.error(f"Error processing business result {result_index} for query '{query}': {str(e)}", exc_info=True)
-                        continue
-
-                total_results += len(local_results)
-                logger.info(f"Processed {len(local_results)} results on page {page_num} for query '{query}'")
-
-                next_page_token = get_next_page_token(results)
-                if next_page_token:
-                    logger.info(f"Next page token found: {next_page_token}")
-                    page_num += 1
-                    random_delay(min_delay=2, max_delay=20)
-                else:
-                    logger.info(f"No next page token found for query '{query}'")
-                    break
-
-            logger.info(f"Finished processing query: {query}")
+        def query_worker(index, query_data):
+            try:
+                return process_query_pages(task, query_data, index, len(queries), form_data=form_data,
+                                           image_count=image_count, pacer=pacer)
+            finally:
+                ScrapingTask.objects.filter(pk=task.pk).update(queries_completed=F('queries_completed') + 1)
+
+        total_results = ScrapingEngine(query_worker).run(queries)
+        pacing_stats = pacer.get_stats()
+        logger.info(
+            f"Task {task_id} pacing: {pacing_stats['working_seconds']}s in requests, "
+            f"{pacing_stats['throttled_seconds']}s throttled, hosts: {pacing_stats['hosts']}"
+        )
 
         logger.info(f"Total results processed across all queries: {total_results}")
         logger.info(f"Sites Gathering task {task_id} completed successfully")
         
         task.status = 'COMPLETED'
         task.completed_at = timezone.now()
+        task.queries_completed = task.queries_total
         task.save()
 
     except ScrapingTask.DoesNotExist:
         logger.error(f"Sites Gathering task with id {task_id} not found")
+    except SoftTimeLimitExceeded:
+        # Whatever was saved so far is kept and can be reviewed
+        logger.error(
+            f"Sites Gathering task {task_id} stopped after {SCRAPING_TASK_SOFT_TIME_LIMIT}s "
+            f"(SCRAPING_TASK_TIME_LIMIT); keeping the results gathered so far"
+        )
+        ScrapingTask.objects.filter(pk=task_id).update(status='COMPLETED', completed_at=timezone.now())
     except Exception as e:
         logger.error(f"Error in Sites Gathering task {task_id}: {str(e)}", exc_info=True)
-        task.status = 'FAILED'
-        task.save()
+        ScrapingTask.objects.filter(pk=task_id).update(status='FAILED')
     finally:
-        logger.removeHandler(file_handler)
-        file_handler.close()
+        # A slot is free again for this user's waiting tasks
+        release_task(task_id)
+        dispatch_waiting_tasks(ScrapingTask.all_objects.filter(id=task_id).values_list('user_id', flat=True).first())
  
 def update_image_url(business, local_path, new_path):
     try:
@@ -590,24 +629,6 @@ def update_image_url(business, local_path, new_path):
     except Exception as e:
         logger.error(f"Error fetching images for update: {str(e)}")
  
-def crop_image_to_aspect_ratio(img, aspect_ratio):
-    img_width, img_height = img.size
-    img_aspect_ratio = img_width / img_height
-
-    if img_aspect_ratio > aspect_ratio:
-        new_width = int(img_height * aspect_ratio)
-        left = (img_width - new_width) / 2
-        top = 0
-        right = left + new_width
-        bottom = img_height
-    else:
-        new_height = int(img_width / aspect_ratio)
-        left = 0
-        top = (img_height - new_height) / 2
-        right = img_width
-        bottom = top + new_height
-    return img.crop((left, top, right, bottom))
- 
 def get_s3_client():
     return boto3.client(
         's3',
@@ -617,7 +638,7 @@ def get_s3_client():
         aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
     )
 
-def download_images(business, local_result, image_count=6):
+def download_images(business, local_result, image_count=6, pacer=None):
     photos_link = local_result.get('photos_link')
     if not photos_link:
         logger.info(f"No photos link found for business {business.id}")
@@ -631,16 +652,16 @@ def download_images(business, local_result, image_count=6):
         logger.warning(f"Invalid image count provided ({image_count}), using default: 6. Error: {str(e)}")
         image_count = 6
 
+    pacer = pacer or default_pacer
     image_paths = []
     try:
-        photos_search = GoogleSearch({
+        photos_results = fetch_paced_results({
             "api_key": settings.SERPAPI_KEY,
             "engine": "google_maps_photos",
             "data_id": local_result['data_id'],
             "hl": "en",
             "no_cache": "true"
-        })
-        photos_results = photos_search.get_dict()
+        }, pacer=pacer)
 
         if 'error' in photos_results:
             logger.error(f"API Error fetching photos for business '{business.title}': {photos_results['error']}")
@@ -658,67 +679,60 @@ def download_images(business, local_result, image_count=6):
         # Create a slug of the business name
         business_slug = slugify(business.title)
 
-        # Initialize the S3 client
-        s3_client = get_s3_client()
-
+        # One query for everything already stored for this business
+        existing_urls = set()
+        existing_paths = set()
+        duplicate_index = DuplicateIndex()
+        for image_url, local_path, is_deleted, content_hash, perceptual_hash in Image.all_objects.filter(
+                business=business).values_list(
+                'image_url', 'local_path', 'is_deleted', 'content_hash', 'perceptual_hash'):
+            existing_paths.add(local_path)
+            if not is_deleted:
+                existing_urls.add(image_url)
+                duplicate_index.add(content_hash, perceptual_hash, local_path)
+
+        jobs = []
         for i, photo in enumerate(photos):
             image_url = photo.get('image')
-            
-            # Check if the image_url already exists for this business
-            if Image.objects.filter(business=business, image_url=image_url).exists():
-                logger.info(f"Image already exists for business {business.id}, skipping download.")
-                continue  # Skip if image already exists
+            if not image_url:
+                continue
 
-            if image_url:
-                try:
-                    response = requests.get(image_url, timeout=10)
-                    if response.status_code == 200:
-                        img = PILImage.open(BytesIO(response.content))
-
-                        # Calculate and crop to the 3:2 aspect ratio
-                        aspect_ratio = 3 / 2
-                        img_cropped = crop_image_to_aspect_ratio(img, aspect_ratio)
-
-                        # Ensure file name is unique
-                        file_name = f"{business_slug}_{i}.jpg"
-                        file_path = f'business_images/{business.id}/{file_name}'
-
-                        # Save the image to a temporary buffer
-                        buffer = BytesIO()
-                        img_cropped.save(buffer, 'JPEG', quality=85)
-                        buffer.seek(0)  # Reset buffer position
-
-                        # Upload the image using boto3 client
-                        s3_client.upload_fileobj(
-                            buffer,
-                            settings.AWS_STORAGE_BUCKET_NAME,
-                            file_path,
-                            ExtraArgs={
-                                'ACL': 'public-read',
-                                'ContentType': 'image/jpeg'
-                            }
-                        )
-
-                        # Create an image object in the database only if it doesn't exist
-                        if not Image.objects.filter(business=business, local_path=file_path).exists():
-                            Image.objects.create(
-                                business=business,
-                                image_url=image_url,
-                                local_path=file_path,
-                                order=i
-                            )
-                            image_paths.append(file_path)
-                            logger.info(f"Downloaded and processed image {i} for business {business.id}")
+            # Ensure file name is unique
+            file_name = f"{business_slug}_{i}.jpg"
+            file_path = f'business_images/{business.id}/{file_name}'
 
-                        else:
-                            logger.info(f"Image with local path {file_path} already exists for business {business.id}, skipping.")
+            if image_url in existing_urls:
+                logger.info(f"Image already exists for business {business.id}, skipping download.")
+                continue
+            if file_path in existing_paths:
+                logger.info(f"Image with local path {file_path} already exists for business {business.id}, skipping.")
+                continue
+            jobs.append({'image_url': image_url, 'file_path': file_path, 'order': i})
 
-                    else:
-                        logger.error(f"Failed to download image {i} for business {business.id}: HTTP {response.status_code}")
-                except Exception as e:
-                    logger.error(f"Error downloading image {i} for business {business.id}: {str(e)}", exc_info=True)
+        pipeline = ImagePipeline(get_s3_client(), settings.AWS_STORAGE_BUCKET_NAME, pacer=pacer)
+        # The same photo often comes back under several URLs; copies never reach S3
+        uploaded = pipeline.run(jobs, index=duplicate_index)
 
-            random_delay(min_delay=2, max_delay=20)  
+        Image.objects.bulk_create([
+            Image(
+                business=business,
+                image_url=job['image_url'],
+                local_path=job['file_path'],
+                order=job['order'],
+                content_hash=job['content_hash'],
+                perceptual_hash=job['perceptual_hash'],
+                variants=job['variants']
+            )
+            for job in uploaded
+        ], ignore_conflicts=True)
+        image_paths = [job['file_path'] for job in uploaded]
+        logger.info(
+            f"Downloaded and processed {len(uploaded)}/{len(jobs)} images for business {business.id}, "
+            f"skipped {len(pipeline.duplicates)} duplicates"
+        )
+        task_logging.count('images_saved', len(uploaded))
+        if pipeline.duplicates:
+            task_logging.count('images_duplicate', len(pipeline.duplicates))
 
         # Set the first image as the main image if it exists
         first_image = Image.objects.filter(business=business).order_by('order').first()
@@ -746,43 +760,46 @@ def save_results(task, results, query):
 #####################DESCRIPTION TRANSLATE##################################
 
 
-def call_openai_with_retry(messages, model="gpt-3.5-turbo", temperature=0.3, max_tokens=1000, presence_penalty=0.0, frequency_penalty=0.0, retries=2, delay=1):
-    for attempt in range(retries):
-        try:
-            return openai.ChatCompletion.create(
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                presence_penalty=presence_penalty,
-                frequency_penalty=frequency_penalty
-            )
-        except openai.error.RateLimitError as e:
-            logger.warning(f"Rate limit error on attempt {attempt+1}: {str(e)}")
-            if attempt == retries - 1:
-                raise
-            time.sleep(delay * (attempt + 1))
-        except openai.error.OpenAIError as e:
-            logger.warning(f"OpenAI error on attempt {attempt+1}: {str(e)}")
-            if attempt == retries - 1:
-                raise
-            time.sleep(delay)
+def call_openai_with_retry(messages, model="gpt-3.5-turbo", temperature=0.3, max_tokens=1000, presence_penalty=0.0, frequency_penalty=0.0, retries=2):
+    # Keys are chosen, cooled down and rotated by the key pool
+    return chat_completion(
+        retries=retries,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        presence_penalty=presence_penalty,
+        frequency_penalty=frequency_penalty
+    )
   
+# Bump when the prompt below changes, so the translation memory stops serving old output
+TRANSLATE_TEXT_PROMPT_VERSION = 'translate-text-v1'
+TRANSLATE_LIST_PROMPT_VERSION = 'translate-list-v1'
+
+TRANSLATION_LANGUAGES = {
+    "eng": "British English",
+    "spanish": "Spanish",
+    "fr": "French",
+}
+
+
 def translate_text_openai(text, target_language):
+    """Translation of ``text`` from the translation memory, or from OpenAI on a miss."""
     if not text or text.strip() == "":
         logger.warning("Empty text provided for translation")
         return ""
 
-    language_map = {
-        "eng": "British English",
-        "spanish": "Spanish",
-        "fr": "French",
-    }
-
-    if target_language not in language_map:
+    if target_language not in TRANSLATION_LANGUAGES:
         logger.error(f"Unsupported target language: {target_language}")
         return ""
 
+    return translation_memory.translate(
+        text, target_language, TRANSLATE_TEXT_PROMPT_VERSION, _request_text_translation
+    ) or ""
+
+
+def _request_text_translation(text, target_language):
+    language_map = TRANSLATION_LANGUAGES
     messages = [
         {
             "role": "system",
@@ -1016,10 +1033,7 @@ def generate_additional_sentences(business, word_deficit):
             f"Maintain the same tone and style as the existing description."
         )
 
-        document = doctran.parse(content=prompt)
-        additional_sentences = document.summarize(
-            token_limit=word_deficit * 2
-        ).transformed_content.strip()
+        additional_sentences = doctran_summarize(prompt, token_limit=word_deficit * 2).strip()
 
         # Validate generated content
         if additional_sentences and len(additional_sentences.split()) >= word_deficit * 0.8:
@@ -1121,24 +1135,24 @@ def validate_business_content(business):
 
 def translate_business_titles(business, languages):
     """
-    Handles the translation of business titles.
+    Handles the translation of business titles. Every missing language is
+    looked up in the translation memory at once; only misses go to OpenAI.
     """
+    title_fields = {"spanish": "title_esp", "eng": "title_eng", "fr": "title_fr"}
     try:
-        for lang in languages:
-            if lang == "spanish" and not business.title_esp:
-                translated_title = translate_text_openai(business.title, "spanish")
-                if translated_title:
-                    business.title_esp = translated_title
-                    
-            elif lang == "eng" and not business.title_eng:
-                translated_title = translate_text_openai(business.title, "eng")
-                if translated_title:
-                    business.title_eng = translated_title
-            
-            elif lang == "fr" and not business.title_fr:
-                translated_title = translate_text_openai(business.title, "fr")
-                if translated_title:
-                    business.title_fr = translated_title
+        missing = [
+            lang for lang in languages
+            if lang in title_fields and not getattr(business, title_fields[lang])
+        ]
+        translations = translation_memory.translate_many(
+            [(business.title, lang) for lang in missing],
+            TRANSLATE_TEXT_PROMPT_VERSION,
+            _request_text_translation,
+        )
+        for lang in missing:
+            translated_title = translations.get((business.title, lang))
+            if translated_title:
+                setattr(business, title_fields[lang], translated_title)
 
         business.save(update_fields=['title_esp', 'title_eng', 'title_fr'])
         return True
@@ -1199,10 +1213,17 @@ def translate_comma_separated_list(types_string, language_description):
     """
     Sends all comma-separated items in a single prompt, telling GPT explicitly
     to output the translation as a comma-separated list with the same number of items.
+    Lists translated before, by any worker, come from the translation memory.
     """
     if not types_string.strip():
         return ""
 
+    return translation_memory.translate(
+        types_string, language_description, TRANSLATE_LIST_PROMPT_VERSION, _request_list_translation
+    ) or ""
+
+
+def _request_list_translation(types_string, language_description):
     messages = [
         {
             "role": "system",
@@ -1582,169 +1603,6 @@ class TranslationMetrics(models.Model):
 
 #####################DESCRIPTION TRANSLATE##################################
 
-def get_postal_code_pattern(country: str) -> Optional[str]:
-    patterns = {
-        # European Union
-        'spain': r'\b\d{5}\b',
-        'portugal': r'\b\d{4}(?:-\d{3})?\b',
-        'france': r'\b\d{5}\b',
-        'germany': r'\b\d{5}\b',
-        'italy': r'\b\d{5}\b',
-        'uk': r'\b[A-Z]{1,2}\d[A-Z\d]? ?\d[A-Z]{2}\b',
-        'united kingdom': r'\b[A-Z]{1,2}\d[A-Z\d]? ?\d[A-Z]{2}\b',
-        'ireland': r'\b[A-Z]\d{2} ?[A-Z\d]{4}\b',
-        'greece': r'\b\d{5}\b',  # Covers Athens (10431-11523) and other cities
-        'romania': r'\b\d{6}\b',  # Covers Bucharest (010011-060042)
-        'hungary': r'\b\d{4}\b',  # Covers Budapest (1011-1239)
-        'malta': r'\b[A-Z]{3} ?\d{4}\b',  # Covers Malta format (VLT 1111)
-        'czech republic': r'\b\d{5}\b',  # Covers Prague (10000-19900)
-        'poland': r'\b\d{2}-\d{3}\b',  # Covers Warsaw (00-001-04-999)
-        'austria': r'\b\d{4}\b',  # Covers Vienna (1010-1230)
-        'belgium': r'\b\d{4}\b',
-        'netherlands': r'\b\d{4} ?[A-Z]{2}\b',
-        'denmark': r'\b\d{4}\b',
-        'sweden': r'\b\d{3} ?\d{2}\b',
-        'norway': r'\b\d{4}\b',
-        'finland': r'\b\d{5}\b',
-        'bulgaria': r'\b\d{4}\b',  # Covers Sofia (1000-1429)
-
-        # North America
-        'usa': r'\b\d{5}(?:-\d{4})?\b',
-        'united states of america': r'\b\d{5}(?:-\d{4})?\b',
-        'us': r'\b\d{5}(?:-\d{4})?\b',
-        'canada': r'\b[A-Z]\d[A-Z] ?\d[A-Z]\d\b',
-        'mexico': r'\b\d{5}\b',
-
-        # South America
-        'argentina': r'\b[R]?\d{4}[A-Z]{3}\b',
-        'san carlos de bariloche': r'\b[R]?8[4-5][0-9][0-9][A-Z]{3}\b',
-        'brazil': r'\b\d{5}-?\d{3}\b',
-        'chile': r'\b\d{7}\b',  # Covers Santiago (8320000-8329999)
-        'colombia': r'\b\d{6}\b',  # Covers Barranquilla, Bogotá, Cartagena
-        'costa rica': r'\b\d{5}\b',  # Covers Puerto Limón (70101-70111)
-        'panama': r'\b\d{4}\b',  # Covers Panama City (0801-0819)
-        'uruguay': r'\b\d{5}\b',  # Covers Punta del Este (20100-20200)
-        'dominican republic': r'\b\d{5}\b',  # Covers Santo Domingo (10101-10212)
-
-        # Asia
-        'japan': r'\b\d{3}-?\d{4}\b',
-        'china': r'\b\d{6}\b',
-        'india': r'\b\d{6}\b',
-        'singapore': r'\b\d{6}\b',
-        'russia': r'\b\d{6}\b',
-        'south korea': r'\b\d{5}\b',  # Covers Seoul (04500-08800)
-        'israel': r'\b\d{5}\b',  # Covers Tel Aviv (61000-69999)
-        'turkey': r'\b\d{5}\b',  # Covers Istanbul (34000-34990)
-
-        # Oceania
-        'australia': r'\b\d{4}\b',
-        'new zealand': r'\b\d{4}\b',
-
-        # Africa
-        'morocco': r'\b\d{5}\b',
-        'south africa': r'\b\d{4}\b',
-        'egypt': r'\b\d{5}\b',  # Covers Cairo (11311-11938)
-        'tunisia': r'\b\d{4}\b',  # Covers Tunis (1000-2099)
-
-        # Special Regions and Territories
-        'united arab emirates': None,  # Dubai uses P.O. Boxes, no standard format
-        'saint maarten': r'\b\d{5}\b',  # Covers Saint Maarten (97750)
-        'sardinia': r'\b0[7-9]\d{3}\b',  # Specific pattern for Sardinia (07000-09170)
-        'sardegna': r'\b0[7-9]\d{3}\b',  # Alternative name for Sardinia
-        'iceland': r'\b\d{3}\b',  # Covers Reykjavík (101-155)
-
-        # Default pattern
-        'default': r'\b\d{5}\b'
-    }
-
-    # Country aliases for alternative names
-    country_aliases = {
-        'czechia': 'czech republic',
-        'uae': 'united arab emirates',
-        'dominican rep': 'dominican republic',
-        'korea': 'south korea',
-        'korea south': 'south korea',
-        'isola di sardegna': 'sardinia',
-        'isle of sardinia': 'sardinia',
-        'bariloche': 'san carlos de bariloche',
-        'scb': 'san carlos de bariloche'
-    }
-
-    # First check if there's an alias, then get the pattern
-    country_key = country_aliases.get(country.lower(), country.lower())
-    return patterns.get(country_key, patterns['default'])
-
-def extract_address_components(address_string: string, country: str = None):
-    """
-    Extract address components from a full address string with country-specific postal code formats.
-    
-    Args:
-        address_string: Full address string
-        country: Country name to determine postal code format (optional)
-    
-    Returns:
-        Dictionary with street_address and postal_code
-    
-    Example: 
-        "Carrer del Call, 17, Ciutat Vella, 08002 Barcelona, Spain"
-        "Rua Augusta 12, 1100-053 Lisboa, Portugal"
-    """
-    components = {
-        'street_address': '',
-        'postal_code': '',
-        'country': country
-    }
-    
-    if not address_string:
-        return components
-
-    try:
-        address_string = address_string.strip()
-
-        if not country:
-            country_match = re.search(r',\s*([^,]+)$', address_string)
-            if country_match:
-                country = country_match.group(1).strip()
-                components['country'] = country
-        
-        postal_pattern = get_postal_code_pattern(country) if country else get_postal_code_pattern('default')
-
-        postal_code_match = re.search(postal_pattern, address_string)
-        
-        if postal_code_match:
-            components['postal_code'] = postal_code_match.group(0)
-            # Split address by comma and take parts before the postal code
-            parts = [part.strip() for part in address_string.split(',')]
-            
-            # Find which part contains the postal code
-            postal_code_part_index = None
-            for i, part in enumerate(parts):
-                if components['postal_code'] in part:
-                    postal_code_part_index = i
-                    break
-            
-            if postal_code_part_index is not None:
-                # Take all parts before the postal code for the street address
-                components['street_address'] = ', '.join(parts[:postal_code_part_index]).strip()
-            else:
-                components['street_address'] = parts[0]
-        else:
-            # If no postal code found, take first part as street
-            parts = [part.strip() for part in address_string.split(',')]
-            components['street_address'] = parts[0]
-            
-        logger.info(f"Parsed address components from: {address_string}")
-        logger.info(f"Country detected: {components['country']}")
-        logger.info(f"Street: {components['street_address']}")
-        logger.info(f"Postal Code: {components['postal_code']}")
-        
-    except Exception as e:
-        logger.error(f"Error parsing address: {str(e)}")
-        parts = address_string.split(',')
-        components['street_address'] = parts[0] if parts else address_string
-    
-    return components
-
 def fill_missing_address_components(business_data, task, query, form_data=None):
     """
     Fills the missing address components, prioritizing form data if provided.
@@ -1764,232 +1622,361 @@ def fill_missing_address_components(business_data, task, query, form_data=None):
     if not business_data.get('city'):
         business_data['city'] = query.split(',')[0].strip()
 
-    logger.info(f"Final address components:")
-    logger.info(f"Street: {business_data.get('address', '')}")
-    logger.info(f"Postal Code: {business_data.get('postal_code', '')}")
-    logger.info(f"City: {business_data.get('city', '')}")
-    logger.info(f"Country: {business_data.get('country', '')}")
+    logger.debug(
+        f"Final address components: street={business_data.get('address', '')!r}, "
+        f"postal_code={business_data.get('postal_code', '')!r}, city={business_data.get('city', '')!r}, "
+        f"country={business_data.get('country', '')!r}"
+    )
  
-@transaction.atomic
-def save_business(task, local_result, query, form_data=None):
-    logger.info(f"Saving business data for task {task.id}")
-    try: 
-        business_data = {
-            'task': task,
-            'project_id': task.project_id,
-            'project_title': task.project_title,
-            'main_category': form_data.get('main_category', task.main_category),
-            'tailored_category': form_data.get('subcategory', task.tailored_category),
-            'search_string': query,
-            'scraped_at': timezone.now(),
-            'level': form_data.get('level', task.level),
-            'country': form_data.get('country_name', ''),
-            'city': form_data.get('destination_name', ''),
-            'state': '',   
-            'form_country_id': form_data.get('country_id'),
-            'form_country_name': form_data.get('country_name', ''),
-            'form_destination_id': form_data.get('destination_id'),
-            'form_destination_name': form_data.get('destination_name', ''),
-            'destination_id': form_data.get('destination_id'),
-        }
+BUSINESS_FIELD_NAMES = {
+    name
+    for field in Business._meta.concrete_fields
+    for name in (field.name, field.attname)
+}
+
+
+def build_business_data(task, local_result, query, form_data=None):
+    """
+    Map one SerpAPI local result onto Business field values.
+    Returns None when the result has no place_id.
+    """
+    form_data = form_data or {}
+    business_data = {
+        'task': task,
+        'project_id': task.project_id,
+        'project_title': task.project_title,
+        'main_category': form_data.get('main_category', task.main_category),
+        'tailored_category': form_data.get('subcategory', task.tailored_category),
+        'search_string': query,
+        'scraped_at': timezone.now(),
+        'level': form_data.get('level', task.level),
+        'country': form_data.get('country_name', ''),
+        'city': form_data.get('destination_name', ''),
+        'state': '',   
+        'form_country_id': form_data.get('country_id'),
+        'form_country_name': form_data.get('country_name', ''),
+        'form_destination_id': form_data.get('destination_id'),
+        'form_destination_name': form_data.get('destination_name', ''),
+        'destination_id': form_data.get('destination_id'),
+    }
 
-        logger.info(f"Local result data: {local_result}") 
-        if 'address' in local_result:
-            full_address = local_result['address']
-            business_data['address'] = full_address  
+    task_logging.log_payload(logger, 'local_results', "Local result data", local_result)
+    if 'address' in local_result:
+        full_address = local_result['address']
+        business_data['address'] = full_address  
  
-            address_components = extract_address_components(full_address)
+        address_components = parse_address(full_address)
  
-            # Set street and postal_code
-            business_data['street'] = address_components['street_address']
-            business_data['postal_code'] = address_components['postal_code']
-            
-            logger.info(f"Extracted address components:")
-            logger.info(f"Full Address: {full_address}")
-            logger.info(f"Street: {business_data['street']}")
-            logger.info(f"Postal Code: {business_data['postal_code']}")
-
-        field_mapping = {
-            'position': 'rank',
-            'title': 'title',
-            'place_id': 'place_id',
-            'data_id': 'data_id',
-            'data_cid': 'data_cid',
-            'rating': 'rating',
-            'reviews': 'reviews_count',
-            'price': 'price',
-            'types': 'type',
-            'address': 'address',
-            'postal_code': 'postal_code',
-            'city': 'city',
-            'phone': 'phone',
-            'website': 'website',
-            'description': 'description',
-            'thumbnail': 'thumbnail',
-        }
+        # Set street and postal_code
+        business_data['street'] = address_components['street_address']
+        business_data['postal_code'] = address_components['postal_code']
+        
+        logger.debug(
+            f"Extracted address components from {full_address!r}: "
+            f"street={business_data['street']!r}, postal_code={business_data['postal_code']!r}"
+        )
 
-        for api_field, model_field in field_mapping.items():
-            if local_result.get(api_field) is not None:
-                business_data[model_field] = local_result[api_field]
-        logger.info(f"Business data to be saved: {business_data}")
+    field_mapping = {
+        'position': 'rank',
+        'title': 'title',
+        'place_id': 'place_id',
+        'data_id': 'data_id',
+        'data_cid': 'data_cid',
+        'rating': 'rating',
+        'reviews': 'reviews_count',
+        'price': 'price',
+        'types': 'type',
+        'address': 'address',
+        'postal_code': 'postal_code',
+        'city': 'city',
+        'phone': 'phone',
+        'website': 'website',
+        'description': 'description',
+        'thumbnail': 'thumbnail',
+    }
+
+    for api_field, model_field in field_mapping.items():
+        if local_result.get(api_field) is not None:
+            business_data[model_field] = local_result[api_field]
+    task_logging.log_payload(logger, 'business_data', "Business data to be saved", business_data)
  
-        if 'gps_coordinates' in local_result:
-            business_data['latitude'] = local_result['gps_coordinates'].get('latitude')
-            business_data['longitude'] = local_result['gps_coordinates'].get('longitude')
+    if 'gps_coordinates' in local_result:
+        business_data['latitude'] = local_result['gps_coordinates'].get('latitude')
+        business_data['longitude'] = local_result['gps_coordinates'].get('longitude')
  
-        scraped_types = None
-        if 'type' in local_result:
-            scraped_types = local_result['type']
-        elif 'types' in local_result:
-            scraped_types = local_result['types']
-
-        if scraped_types:
-            # Process the types using the utility function
-            processed_types = process_scraped_types(scraped_types)
-            logger.info(f"Processed business types: {processed_types}")
-            business_data['types'] = processed_types
-        
-        US_COUNTRY_NAMES = {'united states', 'usa', 'u.s.', 'united states of america'}
-
-        # Check if the country is one of the acceptable variations
-        if business_data.get('country', '').strip().lower() in US_COUNTRY_NAMES:
-            phone = business_data.get('phone', '')
-            if phone and not phone.startswith('+1'):
-                business_data['phone'] = f'+1{phone.lstrip(" +")}'
-                logger.info(f"Updated phone with +1 prefix: {business_data['phone']}")
+    scraped_types = None
+    if 'type' in local_result:
+        scraped_types = local_result['type']
+    elif 'types' in local_result:
+        scraped_types = local_result['types']
+
+    if scraped_types:
+        # Process the types using the utility function
+        processed_types = process_scraped_types(scraped_types)
+        logger.debug(f"Processed business types: {processed_types}")
+        business_data['types'] = processed_types
+    
+    US_COUNTRY_NAMES = {'united states', 'usa', 'u.s.', 'united states of america'}
+
+    # Check if the country is one of the acceptable variations
+    if business_data.get('country', '').strip().lower() in US_COUNTRY_NAMES:
+        phone = business_data.get('phone', '')
+        if phone and not phone.startswith('+1'):
+            business_data['phone'] = f'+1{phone.lstrip(" +")}'
+            logger.info(f"Updated phone with +1 prefix: {business_data['phone']}")
  
  
-       
-        ordered_days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+   
+    ordered_days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
 
-        if 'hours' in local_result:
-            hours_data = local_result['hours']
-            formatted_hours = {day: None for day in ordered_days}  # Initialize with None values
+    if 'hours' in local_result:
+        hours_data = local_result['hours']
+        formatted_hours = {day: None for day in ordered_days}  # Initialize with None values
 
-            if isinstance(hours_data, dict):
-                # If hours_data is already a dictionary
-                for day in ordered_days:
-                    formatted_hours[day] = hours_data.get(day, None)
-            
-            elif isinstance(hours_data, list):
-                # If hours_data is a list of schedules
-                for schedule_item in hours_data:
-                    if isinstance(schedule_item, dict):
-                        # Update formatted_hours with any found schedules
-                        formatted_hours.update(schedule_item)
+        if isinstance(hours_data, dict):
+            # If hours_data is already a dictionary
+            for day in ordered_days:
+                formatted_hours[day] = hours_data.get(day, None)
+        
+        elif isinstance(hours_data, list):
+            # If hours_data is a list of schedules
+            for schedule_item in hours_data:
+                if isinstance(schedule_item, dict):
+                    # Update formatted_hours with any found schedules
+                    formatted_hours.update(schedule_item)
 
-            business_data['operating_hours'] = formatted_hours
-            logger.info(f"Formatted hours data: {formatted_hours}")
+        business_data['operating_hours'] = formatted_hours
+        logger.info(f"Formatted hours data: {formatted_hours}")
 
 
-        elif 'operating_hours' in local_result:
-            hours_data = local_result['operating_hours']
-            formatted_hours = {}
-            ordered_days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-            
-            if isinstance(hours_data, dict):
-                formatted_hours = {
-                    day: hours_data.get(day, None) 
-                    for day in ordered_days
-                }
-            elif isinstance(hours_data, list):
-                for day in ordered_days:
-                    day_schedule = next(
-                        (schedule for schedule in hours_data 
-                        if isinstance(schedule, str) and day in schedule.lower()),
-                        None
-                    )
-                    formatted_hours[day] = day_schedule
-            
-            business_data['operating_hours'] = formatted_hours
-
-        if 'extensions' in local_result:
-            extensions = local_result['extensions']
-            if isinstance(extensions, list):
-                cleaned_extensions = []
-                for category_dict in extensions:
-                    if isinstance(category_dict, dict):
-                        for category, values in category_dict.items():
-                            if values:  
-                                cleaned_extensions.append({category: values})
-                business_data['service_options'] = cleaned_extensions
-                logger.info(f"Processed extensions data: {cleaned_extensions}")
-        elif 'service_options' in local_result:
-            service_opts = local_result['service_options']
-            if isinstance(service_opts, dict):
-                formatted_options = [{
-                    'general': [
-                        f"{key}: {'Yes' if value else 'No'}"
-                        for key, value in service_opts.items()
-                    ]
-                }]
-                business_data['service_options'] = formatted_options
+    elif 'operating_hours' in local_result:
+        hours_data = local_result['operating_hours']
+        formatted_hours = {}
+        ordered_days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+        
+        if isinstance(hours_data, dict):
+            formatted_hours = {
+                day: hours_data.get(day, None) 
+                for day in ordered_days
+            }
+        elif isinstance(hours_data, list):
+            for day in ordered_days:
+                day_schedule = next(
+                    (schedule for schedule in hours_data 
+                    if isinstance(schedule, str) and day in schedule.lower()),
+                    None
+                )
+                formatted_hours[day] = day_schedule
+        
+        business_data['operating_hours'] = formatted_hours
+
+    if 'extensions' in local_result:
+        extensions = local_result['extensions']
+        if isinstance(extensions, list):
+            cleaned_extensions = []
+            for category_dict in extensions:
+                if isinstance(category_dict, dict):
+                    for category, values in category_dict.items():
+                        if values:  
+                            cleaned_extensions.append({category: values})
+            business_data['service_options'] = cleaned_extensions
+            logger.info(f"Processed extensions data: {cleaned_extensions}")
+    elif 'service_options' in local_result:
+        service_opts = local_result['service_options']
+        if isinstance(service_opts, dict):
+            formatted_options = [{
+                'general': [
+                    f"{key}: {'Yes' if value else 'No'}"
+                    for key, value in service_opts.items()
+                ]
+            }]
+            business_data['service_options'] = formatted_options
  
-        fill_missing_address_components(business_data, task, query, form_data=form_data)
+    fill_missing_address_components(business_data, task, query, form_data=form_data)
 
-        if 'place_id' not in business_data:
-            logger.warning(f"Skipping business entry for task {task.id} due to missing 'place_id'")
-            return None  
+    # Service options sent as a flat dict take precedence over the extensions
+    service_options = local_result.get('serviceOptions', {})
+    if service_options:
+        business_data['service_options'] = service_options
 
-        # Create or update the business FIRST
-        business, created = Business.objects.update_or_create(
-            place_id=business_data['place_id'],
-            defaults=business_data
+    if 'place_id' not in business_data:
+        logger.warning(f"Skipping business entry for task {task.id} due to missing 'place_id'")
+        return None
+
+    # Keys such as 'type' are kept in the mapping for reference but are not model fields
+    unknown = set(business_data) - BUSINESS_FIELD_NAMES
+    if unknown:
+        logger.debug(f"Ignoring non-model fields for {business_data['place_id']}: {sorted(unknown)}")
+        for key in unknown:
+            business_data.pop(key)
+
+    return business_data
+
+
+def save_businesses(task, local_results, query, form_data=None):
+    """
+    Upsert a batch of local results with a handful of queries instead of a
+    round-trip per business and per popular-times hour.
+
+    Businesses are upserted on place_id with bulk_create(update_conflicts=True).
+    Results are grouped by the set of fields they carry so that, like
+    update_or_create, fields missing from a result keep their stored value.
+    Places whose business was deleted are skipped, not updated behind the
+    delete. No pre_save/post_save is sent: scraped results carry no status
+    for enforce_description_validation, new businesses are counted in the
+    daily activity here and save_page_businesses recalculates the task.
+    Returns a list of (business, local_result) pairs in input order.
+    """
+    logger.info(f"Saving {len(local_results)} businesses for task {task.id}")
+    rows = {}
+    for local_result in local_results:
+        business_data = build_business_data(task, local_result, query, form_data=form_data)
+        if business_data:
+            # A place repeated on the same page is saved once, with its last values
+            rows[business_data['place_id']] = (business_data, local_result)
+    if not rows:
+        return []
+
+    existing = dict(
+        Business.all_objects.filter(place_id__in=rows.keys()).values_list('place_id', 'is_deleted')
+    )
+    deleted = sorted(place_id for place_id, is_deleted in existing.items() if is_deleted)
+    if deleted:
+        logger.info(f"Skipping {len(deleted)} deleted businesses for task {task.id}: {deleted}")
+        for place_id in deleted:
+            rows.pop(place_id)
+    if not rows:
+        return []
+
+    groups = {}
+    for place_id, (business_data, local_result) in rows.items():
+        groups.setdefault(frozenset(business_data), []).append(place_id)
+
+    businesses = {}
+    for fields, place_ids in groups.items():
+        instances = []
+        for place_id in place_ids:
+            business = Business(**rows[place_id][0])
+            business.clean_types()
+            business.normalize_operating_hours()
+            instances.append(business)
+        Business.all_objects.bulk_create(
+            instances,
+            update_conflicts=True,
+            unique_fields=['place_id'],
+            update_fields=sorted(fields - {'place_id'}),
         )
+        for business in instances:
+            businesses[business.place_id] = business
+    # bulk_create bypasses Business.save(), which keeps the search index current
+    refresh_search_index(Business.all_objects.filter(place_id__in=rows.keys()))
+
+    created = len(rows) - (len(existing) - len(deleted))
+    logger.info(f"Upserted {len(rows)} businesses for task {task.id} "
+                f"({created} new, {len(rows) - created} updated)")
+    # bulk_create does not send post_save, so count new businesses here
+    daily_activity.record_businesses_gathered(task, created)
+
+    saved = [(businesses[place_id], local_result) for place_id, (_, local_result) in rows.items()]
+
+    save_popular_times_bulk([
+        (business, local_result.get('popular_times')) for business, local_result in saved
+        if local_result.get('popular_times')
+    ])
+    save_business_categories(saved)
+    save_additional_info(saved)
+
+    return saved
+
+
+def save_business_categories(saved):
+    category_ids = {
+        category_id
+        for _, local_result in saved
+        for category_id in local_result.get('categories', [])
+    }
+    if not category_ids:
+        return
 
-        if created:
-            logger.info(f"New business created: {business.title} (ID: {business.id})")
-        else:
-            logger.info(f"Existing business updated: {business.title} (ID: {business.id})")
+    categories = Category.objects.in_bulk(category_ids)
+    missing = category_ids - set(categories)
+    if missing:
+        logger.warning(f"Category IDs {sorted(missing)} do not exist.")
 
-        # THEN save popular times
-        popular_times_data = local_result.get('popular_times')  
-        if popular_times_data:
-            save_popular_times(business, popular_times_data)
+    links = [
+        BusinessCategory(business=business, category=categories[category_id])
+        for business, local_result in saved
+        for category_id in local_result.get('categories', [])
+        if category_id in categories
+    ]
+    existing = set(
+        BusinessCategory.objects.filter(
+            business__in=[business for business, _ in saved]
+        ).values_list('business_id', 'category_id')
+    )
+    BusinessCategory.objects.bulk_create([
+        link for link in links if (link.business_id, link.category_id) not in existing
+    ])
 
-        # Save categories
-        categories = local_result.get('categories', [])
-        for category_id in categories:
-            try:
-                category = Category.objects.get(id=category_id)
-                business.main_category.add(category)
-            except Category.DoesNotExist:
-                logger.warning(f"Category ID {category_id} does not exist.")
-
-        # Save additional info
-        additional_info = [
-            AdditionalInfo(
-                business=business,
-                key=key,
-                value=value
-            )
-            for key, value in local_result.get('additionalInfo', {}).items()
-        ]
+
+def save_additional_info(saved):
+    additional_info = [
+        AdditionalInfo(
+            business=business,
+            key=key,
+            value=value
+        )
+        for business, local_result in saved
+        for key, value in local_result.get('additionalInfo', {}).items()
+    ]
+    if additional_info:
         AdditionalInfo.objects.bulk_create(additional_info, ignore_conflicts=True)
-        logger.info(f"Additional data saved for business {business.id}")
+        logger.info(f"Additional data saved for {len(saved)} businesses")
 
-        # Save service options
-        service_options = local_result.get('serviceOptions', {})
-        if service_options:
-            business.service_options = service_options
-            business.save()
 
-        logger.info(f"All business data processed and saved for business {business.id}")
-        logger.info(f"Address components saved - Street: {business.street}, "
-            f"Postal Code: {business.postal_code}, City: {business.city}")
+def save_page_businesses(task, local_results, query, form_data=None):
+    """
+    Save a result page in one transaction. If the batch fails, fall back to
+    saving result by result so one bad row does not drop the whole page.
+    The task status is recalculated once per page, as bulk writes skip the
+    per-business post_save signal.
+    """
+    try:
+        with transaction.atomic():
+            saved = save_businesses(task, local_results, query, form_data=form_data)
+    except Exception as e:
+        logger.error(f"Batch save failed for query '{query}', saving results one by one: {str(e)}", exc_info=True)
+        saved = []
+        for result_index, local_result in enumerate(local_results, start=1):
+            try:
+                with transaction.atomic():
+                    saved.extend(save_businesses(task, [local_result], query, form_data=form_data))
+            except Exception as e:
+                logger.error(f"Error processing business result {result_index} for query '{query}': {str(e)}", exc_info=True)
 
-        # Download images
-        try:
-            image_paths = download_images(business, local_result)
-            logger.info(f"Downloaded {len(image_paths)} images for business {business.id}")
-        except Exception as e:
-            logger.error(f"Error downloading images for business {business.id}: {str(e)}", exc_info=True)
+    skipped = len(local_results) - len(saved)
+    task_logging.count('businesses_saved', len(saved))
+    if skipped:
+        task_logging.count('results_skipped', skipped)
+        logger.warning(f"{skipped} results skipped for query '{query}'")
+    if saved:
+        update_task_status_core(task, force_update=True)
+    return saved
 
-        return business
 
+@transaction.atomic
+def save_business(task, local_result, query, form_data=None):
+    try:
+        saved = save_businesses(task, [local_result], query, form_data=form_data)
     except Exception as e:
         logger.error(f"Error saving business data for task {task.id}: {str(e)}", exc_info=True)
         raise
+    if not saved:
+        return None
+    business = saved[0][0]
+    update_task_status_core(task, force_update=True)
+    # Images are downloaded by the caller once the business is saved
+    return business
 
 def generate_full_address(business_data):
     """
@@ -2186,39 +2173,15 @@ def save_category(category):
 def save_info(info):
     info.save()
  
-def cleanup_old_tasks():
+def cleanup_old_tasks(dry_run=False):
     """
-    Delete tasks older than 30 days
+    Delete tasks older than TASK_RETENTION_DAYS (30) days, with their stored files
     """
-    thirty_days_ago = timezone.now() - timezone.timedelta(days=30)
-    old_tasks = ScrapingTask.objects.filter(created_at__lt=thirty_days_ago)
-    
-    for task in old_tasks:
-        try:
-            # Delete associated files
-            if task.file:
-                if os.path.isfile(task.file.path):
-                    os.remove(task.file.path)
-            
-            # Delete associated businesses and their images
-            for business in task.businesses.all():
-                if business.main_image:
-                    if os.path.isfile(business.main_image.path):
-                        os.remove(business.main_image.path)
-                
-                for image in business.images.all():
-                    if image.image:
-                        if os.path.isfile(image.image.path):
-                            os.remove(image.image.path)
-                    image.delete()
-                
-                business.delete()
-            
-            # Delete the task
-            task.delete()
-            logger.info(f"Deleted old task: {task.id}")
-        except Exception as e:
-            logger.error(f"Error deleting old task {task.id}: {str(e)}", exc_info=True)
+    from .services.storage_gc import collect_old_tasks
+
+    report = collect_old_tasks(dry_run=dry_run)
+    logger.info(f"Old task cleanup{' (dry run)' if dry_run else ''}: {report}")
+    return report
  
 def update_task_status():
     """
@@ -2243,73 +2206,26 @@ def update_task_status():
         except Exception as e:
             logger.error(f"Error updating status for task {task.id}: {str(e)}", exc_info=True)
  
-def get_business_status(business):
-    """
-    Determine the status of a business based on its attributes
-    """
-    if business.permanently_closed:
-        return 'CLOSED'
-    elif business.temporarily_closed:
-        return 'TEMPORARY_CLOSED'
-    elif business.claim_this_business:
-        return 'UNCLAIMED'
-    else:
-        return 'ACTIVE'
- 
 def update_business_statuses():
     """
-    Update the status of all businesses
+    Business.status is the review workflow state (PENDING, REVIEWED,
+    DISCARDED, IN_PRODUCTION) set by reviewers, and businesses record no
+    closure or claim flags to derive another status from, so nothing is
+    recomputed here.
     """
-    businesses = Business.objects.all()
-    for business in businesses:
-        try:
-            new_status = get_business_status(business)
-            if business.status != new_status:
-                business.status = new_status
-                business.save()
-                logger.info(f"Updated status for business {business.id} to {new_status}")
-        except Exception as e:
-            logger.error(f"Error updating status for business {business.id}: {str(e)}", exc_info=True)
- 
-def calculate_business_score(business):
-    """
-    Calculate a score for a business based on various factors
-    """
-    score = 0
-    if business.rating:
-        score += business.rating * 20  # Max 100 points for rating
-
-    if business.reviews_count:
-        score += min(business.reviews_count, 100)  # Max 100 points for review count
-
-    if business.images_count:
-        score += min(business.images_count * 5, 50)  # Max 50 points for images
-
-    if business.website:
-        score += 50  # 50 points for having a website
-
-    if business.phone:
-        score += 25  # 25 points for having a phone number
-
-    return min(score, 300)  # Cap the score at 300
+    logger.info("Business statuses are set by review; nothing to recompute")
+    return 0
  
 def update_business_scores():
     """
-    Update the scores of all businesses
+    Update the scores of all businesses, computed by the database in batches
     """
-    businesses = Business.objects.all()
-    for business in businesses:
-        try:
-            new_score = calculate_business_score(business)
-            if business.score != new_score:
-                business.score = new_score
-                business.save()
-                logger.info(f"Updated score for business {business.id} to {new_score}")
-        except Exception as e:
-            logger.error(f"Error updating score for business {business.id}: {str(e)}", exc_info=True)
+    updated = business_metrics.recompute_scores()
+    logger.info(f"Updated scores for {updated} businesses")
+    return updated
  
  
-def update_business_details(business_id):
+def update_business_details(business_id, pacer=None):
     """
     Update details for a specific business using the Google Maps Place Details API
     """
@@ -2323,8 +2239,7 @@ def update_business_details(business_id):
             "hl": "en"
         }
 
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = fetch_paced_results(params, pacer=pacer)
 
         if "error" in results:
             logger.error(f"API Error for business {business_id}: {results['error']}")
@@ -2360,12 +2275,12 @@ def update_all_business_details():
     """
     Update details for all businesses
     """
-    businesses = Business.objects.all()
-    for business in businesses:
-        update_business_details(business.id)
-        random_delay(min_delay=2, max_delay=20) 
+    pacer = PacingController()
+    for business_id in Business.objects.values_list('id', flat=True):
+        update_business_details(business_id, pacer=pacer)
+    logger.info(f"Business details update pacing: {pacer.get_stats()}")
  
-def process_business_reviews(business_id):
+def process_business_reviews(business_id, pacer=None):
     """
     Process reviews for a specific business
     """
@@ -2380,8 +2295,7 @@ def process_business_reviews(business_id):
             "sort": "newest"  # Get the most recent reviews
         }
 
-        search = GoogleSearch(params)
-        results = search.get_dict()
+        results = fetch_paced_results(params, pacer=pacer)
 
         if "error" in results:
             logger.error(f"API Error for business reviews {business_id}: {results['error']}")
@@ -2426,10 +2340,10 @@ def process_all_business_reviews():
     """
     Process reviews for all businesses
     """
-    businesses = Business.objects.all()
-    for business in businesses:
-        process_business_reviews(business.id)
-        random_delay(min_delay=2, max_delay=20)  
+    pacer = PacingController()
+    for business_id in Business.objects.values_list('id', flat=True):
+        process_business_reviews(business_id, pacer=pacer)
+    logger.info(f"Business reviews pacing: {pacer.get_stats()}")
  
 def update_business_rankings(task_id):
     """
@@ -2437,13 +2351,8 @@ def update_business_rankings(task_id):
     """
     try:
         task = ScrapingTask.objects.get(id=task_id)
-        businesses = Business.objects.filter(task=task).order_by('-score')
-
-        for rank, business in enumerate(businesses, start=1):
-            business.rank = rank
-            business.save()
-
-        logger.info(f"Updated rankings for businesses in task {task_id}")
+        updated = business_metrics.recompute_rankings([task.id])
+        logger.info(f"Updated rankings for {updated} businesses in task {task_id}")
 
     except ScrapingTask.DoesNotExist:
         logger.error(f"Task with id {task_id} not found")
@@ -2452,37 +2361,90 @@ def update_business_rankings(task_id):
  
 def update_all_task_rankings():
     """
-    Update rankings for all tasks
+    Update rankings for all tasks with one window query over every task
     """
-    tasks = ScrapingTask.objects.all()
-    for task in tasks:
-        update_business_rankings(task.id)
+    updated = business_metrics.recompute_rankings()
+    logger.info(f"Updated rankings for {updated} businesses")
+    return updated
 
 
 ###Busyness####
 
 def save_popular_times(business, popular_times_data):
-    if not popular_times_data or 'graph_results' not in popular_times_data:
+    save_popular_times_bulk([(business, popular_times_data)])
+
+def save_popular_times_bulk(items):
+    """
+    Save popular times for several businesses at once.
+    ``items`` is a list of (business, popular_times_data) pairs.
+    """
+    days = []
+    for business, popular_times_data in items:
+        if not popular_times_data or 'graph_results' not in popular_times_data:
+            continue
+        live_hash = popular_times_data.get('live_hash', {})
+        for day, hours_data in popular_times_data['graph_results'].items():
+            days.append((business, day, live_hash, hours_data))
+    if not days:
         return
 
-    graph_results = popular_times_data['graph_results']
-    live_hash = popular_times_data.get('live_hash', {})
+    # Existing days keep their live info, as with get_or_create
+    PopularTimes.objects.bulk_create(
+        [
+            PopularTimes(
+                business=business,
+                day=day,
+                live_busyness_info=live_hash.get('info'),
+                time_spent=live_hash.get('time_spent')
+            )
+            for business, day, live_hash, _ in days
+        ],
+        ignore_conflicts=True,
+    )
+    popular_times_ids = {
+        (business_id, day): pk
+        for pk, business_id, day in PopularTimes.objects.filter(
+            business__in={business.id for business, _, _, _ in days}
+        ).values_list('id', 'business_id', 'day')
+    }
 
-    for day, hours_data in graph_results.items():
-        popular_times, created = PopularTimes.objects.get_or_create(
-            business=business,
-            day=day,
-            defaults={
-                'live_busyness_info': live_hash.get('info'),
-                'time_spent': live_hash.get('time_spent')
-            }
-        )
+    hourly = {}
+    for business, day, _, hours_data in days:
+        popular_times_id = popular_times_ids[(business.id, day)]
         for hour_data in hours_data:
-            HourlyBusyness.objects.update_or_create(
-                popular_times=popular_times,
+            hourly[(popular_times_id, hour_data['time'])] = HourlyBusyness(
+                popular_times_id=popular_times_id,
                 time=hour_data['time'],
-                defaults={
-                    'busyness_score': hour_data.get('busyness_score', 0),
-                    'info': hour_data.get('info', '')
-                }
+                busyness_score=hour_data.get('busyness_score', 0),
+                info=hour_data.get('info', '')
             )
+    HourlyBusyness.objects.bulk_create(
+        list(hourly.values()),
+        update_conflicts=True,
+        unique_fields=['popular_times', 'time'],
+        update_fields=['busyness_score', 'info'],
+    )
+
+@shared_task
+def reconcile_daily_activity(days=7):
+    """Nightly correction of the daily activity rollup (deleted tasks, moved businesses)."""
+    call_command('reconcile_daily_activity', days=days)
+
+@shared_task
+def publish_move_to_app_job(job_id):
+    """Publish the businesses of a bulk IN_PRODUCTION request to Local Secrets."""
+    job = MoveToAppJob.objects.filter(id=job_id).first()
+    if not job:
+        logger.error(f"Move to app job {job_id} not found")
+        return
+    if job.is_finished:
+        logger.info(f"Move to app job {job_id} already finished")
+        return
+    run_move_to_app_job(job)
+
+@shared_task
+def dispatch_waiting_scraping_tasks():
+    """Retry dispatching Sites Gathering tasks that could not be sent or were held back by the per-user cap."""
+    dispatched = dispatch_waiting_tasks()
+    if dispatched:
+        logger.info(f"Dispatched {dispatched} waiting Sites Gathering tasks")
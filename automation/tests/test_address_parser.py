@@ -0,0 +1,51 @@
+# tests/test_address_parser.py
+from django.test import SimpleTestCase
+
+from automation.services.address_parser import (
+    get_cache_stats,
+    get_postal_code_pattern,
+    parse_address,
+    parse_addresses,
+    validate_postal_code,
+)
+
+
+class TestAddressParser(SimpleTestCase):
+    def test_parses_street_and_postal_code(self):
+        components = parse_address("Carrer del Call, 17, Ciutat Vella, 08002 Barcelona, Spain")
+
+        self.assertEqual(components['street_address'], "Carrer del Call, 17, Ciutat Vella")
+        self.assertEqual(components['postal_code'], "08002")
+        self.assertEqual(components['country'], "Spain")
+
+    def test_uses_country_specific_format(self):
+        components = parse_address("Rua Augusta 12, 1100-053 Lisboa, Portugal")
+
+        self.assertEqual(components['postal_code'], "1100-053")
+        self.assertEqual(components['street_address'], "Rua Augusta 12")
+
+    def test_without_postal_code_takes_first_part_as_street(self):
+        components = parse_address("Sheikh Zayed Road, Dubai, United Arab Emirates")
+
+        self.assertEqual(components['street_address'], "Sheikh Zayed Road")
+        self.assertEqual(components['postal_code'], "")
+
+    def test_aliases_and_unknown_countries(self):
+        self.assertEqual(get_postal_code_pattern('USA'), get_postal_code_pattern('united states'))
+        self.assertEqual(get_postal_code_pattern('Atlantis'), get_postal_code_pattern('default'))
+        self.assertTrue(validate_postal_code('SW1A 1AA', 'UK'))
+        self.assertFalse(validate_postal_code('', 'Spain'))
+
+    def test_batch_matches_single_parse_and_uses_cache(self):
+        items = [
+            ("Calle Mayor 1, 28013 Madrid, Spain", None),
+            ("Rua Augusta 12, 1100-053 Lisboa", "Portugal"),
+            ("Calle Mayor 1, 28013 Madrid, Spain", None),
+        ]
+
+        before = get_cache_stats()
+        results = parse_addresses(items)
+
+        self.assertEqual(results, [parse_address(*item) for item in items])
+        self.assertIsNot(results[0], results[2])
+        self.assertGreater(get_cache_stats()['hits'], before['hits'])
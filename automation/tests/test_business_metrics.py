@@ -0,0 +1,111 @@
+# tests/test_business_metrics.py
+import uuid
+
+from django.test import TestCase
+from django.utils import timezone
+
+from automation.models import Business, Image, ScrapingTask
+from automation.services.business_metrics import recompute_rankings, recompute_scores
+from automation.tasks import update_business_statuses
+
+
+def python_score(business, images_count):
+    """The per-row formula recompute_scores replaced."""
+    score = 0
+    if business.rating:
+        score += business.rating * 20
+    if business.reviews_count:
+        score += min(business.reviews_count, 100)
+    if images_count:
+        score += min(images_count * 5, 50)
+    if business.website:
+        score += 50
+    if business.phone:
+        score += 25
+    return min(score, 300)
+
+
+class BusinessFixtures(TestCase):
+    def setUp(self):
+        self.task = ScrapingTask.all_objects.create(project_title='Cafes')
+
+    def make(self, task=None, images=0, deleted_images=0, **fields):
+        task = task or self.task
+        values = {
+            'task': task, 'project_id': uuid.uuid4(), 'project_title': 'Cafes', 'search_string': 'cafes',
+            'title': 'Cafe', 'place_id': str(uuid.uuid4()), 'scraped_at': timezone.now(),
+        }
+        values.update(fields)
+        business = Business.all_objects.bulk_create([Business(**values)])[0]
+        Image.all_objects.bulk_create(
+            [Image(business=business, image_url='http://img') for _ in range(images)] +
+            [Image(business=business, image_url='http://img', is_deleted=True) for _ in range(deleted_images)]
+        )
+        return business
+
+
+class TestRecomputeScores(BusinessFixtures):
+    def test_sql_scores_match_the_per_row_formula(self):
+        fixtures = [
+            (self.make(rating=4.5, reviews_count=150, images=12, website='http://a.example', phone='1'), 12),
+            (self.make(rating=None, reviews_count=0, website='', phone=None), 0),
+            (self.make(rating=3.0, reviews_count=40, images=3, deleted_images=1, phone='555'), 3),
+            (self.make(rating=5.0, reviews_count=5, website='http://d.example', phone=''), 0),
+        ]
+
+        # The business scoring 0 already holds the default and is not written
+        self.assertEqual(recompute_scores(batch_size=3), 3)
+
+        for business, images_count in fixtures:
+            business.refresh_from_db()
+            self.assertAlmostEqual(business.score, python_score(business, images_count))
+        self.assertEqual(sorted(business.score for business, _ in fixtures), [0, 140, 155, 300])
+
+    def test_scores_already_right_are_not_written(self):
+        self.make(rating=4.0, reviews_count=10)
+        self.assertEqual(recompute_scores(), 1)
+        self.assertEqual(recompute_scores(), 0)
+
+
+class TestRecomputeRankings(BusinessFixtures):
+    def test_ranks_are_per_task_with_ties_broken_by_id(self):
+        low = self.make(score=10)
+        first_tie = self.make(score=50)
+        second_tie = self.make(score=50)
+        middle = self.make(score=30)
+        hidden = self.make(score=99, rank=7, is_deleted=True)
+        other_task = ScrapingTask.all_objects.create(project_title='Bars')
+        other = [self.make(task=other_task, score=score) for score in (5, 20)]
+
+        recompute_rankings()
+
+        ranks = dict(Business.all_objects.values_list('pk', 'rank'))
+        self.assertEqual(
+            [ranks[business.pk] for business in (first_tie, second_tie, middle, low)], [1, 2, 3, 4]
+        )
+        self.assertEqual([ranks[business.pk] for business in other], [2, 1])
+        self.assertEqual(ranks[hidden.pk], 7)
+
+    def test_only_the_given_tasks_are_ranked(self):
+        ranked = self.make(score=10)
+        other_task = ScrapingTask.all_objects.create(project_title='Bars')
+        untouched = self.make(task=other_task, score=10, rank=5)
+
+        self.assertEqual(recompute_rankings([self.task.pk]), 1)
+        self.assertEqual(recompute_rankings([self.task.pk]), 0)
+
+        self.assertEqual(Business.all_objects.get(pk=ranked.pk).rank, 1)
+        self.assertEqual(Business.all_objects.get(pk=untouched.pk).rank, 5)
+
+
+class TestUpdateBusinessStatuses(BusinessFixtures):
+    def test_statuses_are_left_alone(self):
+        businesses = [self.make(status=status) for status in ('PENDING', 'REVIEWED', 'DISCARDED', 'IN_PRODUCTION')]
+
+        self.assertEqual(update_business_statuses(), 0)
+
+        self.assertEqual(
+            list(Business.all_objects.filter(pk__in=[b.pk for b in businesses]).order_by('pk')
+                 .values_list('status', flat=True)),
+            ['PENDING', 'REVIEWED', 'DISCARDED', 'IN_PRODUCTION'],
+        )
@@ -0,0 +1,55 @@
+# tests/test_image_fingerprint.py
+import random
+from io import BytesIO
+
+from django.test import SimpleTestCase
+from PIL import Image as PILImage, ImageDraw
+
+from automation.services.image_fingerprint import (
+    BKTree, DuplicateIndex, fingerprint, hamming_distance, perceptual_hash)
+
+
+def make_photo(seed, size=(600, 400)):
+    rng = random.Random(seed)
+    img = PILImage.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        draw.ellipse((x, y, x + rng.randrange(40, 200), y + rng.randrange(40, 200)),
+                     fill=tuple(rng.randrange(256) for _ in range(3)))
+    return img
+
+
+def encode(img, quality=85):
+    buffer = BytesIO()
+    img.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+class TestImageFingerprint(SimpleTestCase):
+    def test_perceptual_hash_survives_reencoding_and_resizing(self):
+        photo = make_photo(1)
+        copy = PILImage.open(BytesIO(encode(photo.resize((300, 200)), quality=60)))
+
+        self.assertLessEqual(hamming_distance(perceptual_hash(photo), perceptual_hash(copy)), 4)
+        self.assertGreater(hamming_distance(perceptual_hash(photo), perceptual_hash(make_photo(2))), 10)
+
+    def test_bk_tree_finds_what_a_linear_scan_finds(self):
+        rng = random.Random(7)
+        values = [rng.getrandbits(64) - (1 << 63) for _ in range(500)]
+        tree = BKTree()
+        for value in values:
+            tree.add(value, value)
+
+        query = values[0] ^ 0b1011
+        expected = sorted(value for value in values if hamming_distance(query, value) <= 8)
+        self.assertEqual(sorted(item for _, item in tree.search(query, 8)), expected)
+
+    def test_index_matches_exact_and_near_copies(self):
+        data = encode(make_photo(3))
+        index = DuplicateIndex(max_distance=6)
+        index.add(*fingerprint(data), 'first.jpg')
+
+        self.assertEqual(index.find(*fingerprint(data)), 'first.jpg')
+        self.assertEqual(index.find(*fingerprint(encode(make_photo(3), quality=50))), 'first.jpg')
+        self.assertIsNone(index.find(*fingerprint(encode(make_photo(4)))))
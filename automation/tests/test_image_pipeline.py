@@ -0,0 +1,103 @@
+# tests/test_image_pipeline.py
+from io import BytesIO
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image as PILImage
+from unittest.mock import Mock, patch
+
+from automation.services import image_pipeline
+from automation.services.image_fingerprint import DuplicateIndex
+from automation.services.image_pipeline import ImagePipeline, process_image_bytes
+
+
+def make_image_bytes(size=(600, 600), mode='RGBA', fmt='PNG'):
+    buffer = BytesIO()
+    PILImage.new(mode, size).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class TestImagePipeline(SimpleTestCase):
+    def test_process_image_bytes_crops_to_3_2_jpeg(self):
+        data = process_image_bytes(make_image_bytes())
+
+        img = PILImage.open(BytesIO(data))
+        self.assertEqual(img.format, 'JPEG')
+        self.assertEqual(img.size, (600, 400))
+
+    @override_settings(IMAGE_PROCESS_WORKERS=1)
+    @patch('automation.services.image_pipeline.get_rate_limiter')
+    @patch('automation.services.image_pipeline.get_http_session')
+    def test_run_uploads_successful_images_in_order(self, mock_session, mock_limiter):
+        # Arrange
+        ok = Mock(status_code=200, content=make_image_bytes())
+        missing = Mock(status_code=404, content=b'')
+        mock_session.return_value.get.side_effect = lambda url, timeout: missing if 'missing' in url else ok
+        s3_client = Mock()
+        jobs = [
+            {'image_url': 'https://img.example.com/b', 'file_path': 'business_images/1/b_1.jpg', 'order': 1},
+            {'image_url': 'https://img.example.com/missing', 'file_path': 'business_images/1/b_2.jpg', 'order': 2},
+            {'image_url': 'https://img.example.com/a', 'file_path': 'business_images/1/b_0.jpg', 'order': 0},
+        ]
+
+        # Act
+        with patch.object(image_pipeline, '_image_executor', image_pipeline.ThreadPoolExecutor(max_workers=1)):
+            uploaded = ImagePipeline(s3_client, 'bucket').run(jobs)
+
+        # Assert
+        self.assertEqual([job['order'] for job in uploaded], [0, 1])
+        uploaded_keys = {call.args[2] for call in s3_client.upload_fileobj.call_args_list}
+        self.assertEqual({key for key in uploaded_keys if '@' not in key and key.endswith('.jpg')},
+                         {'business_images/1/b_0.jpg', 'business_images/1/b_1.jpg'})
+        # 600px wide: a thumb JPEG + WebP and a full-size WebP each, no medium
+        self.assertEqual(uploaded[0]['variants'], {'full': 600, 'thumb': 320})
+        self.assertIn('business_images/1/b_0@thumb.webp', uploaded_keys)
+        self.assertEqual(s3_client.upload_fileobj.call_count, 8)
+
+    @override_settings(IMAGE_PROCESS_WORKERS=1)
+    @patch('automation.services.image_pipeline.get_rate_limiter')
+    @patch('automation.services.image_pipeline.get_http_session')
+    def test_run_skips_duplicates_before_upload(self, mock_session, mock_limiter):
+        # Arrange: the same photo under two URLs
+        mock_session.return_value.get.return_value = Mock(status_code=200, content=make_image_bytes())
+        s3_client = Mock()
+        jobs = [
+            {'image_url': 'https://img.example.com/a?w=1', 'file_path': 'business_images/1/b_0.jpg', 'order': 0},
+            {'image_url': 'https://img.example.com/a?w=2', 'file_path': 'business_images/1/b_1.jpg', 'order': 1},
+        ]
+        pipeline = ImagePipeline(s3_client, 'bucket')
+
+        # Act
+        with patch.object(image_pipeline, '_image_executor', image_pipeline.ThreadPoolExecutor(max_workers=1)):
+            uploaded = pipeline.run(jobs, index=DuplicateIndex())
+
+        # Assert
+        self.assertEqual([job['file_path'] for job in uploaded], ['business_images/1/b_0.jpg'])
+        self.assertEqual([job['file_path'] for job in pipeline.duplicates], ['business_images/1/b_1.jpg'])
+        self.assertNotIn('business_images/1/b_1.jpg',
+                         {call.args[2] for call in s3_client.upload_fileobj.call_args_list})
+        self.assertEqual(len(uploaded[0]['content_hash']), 64)
+
+    @override_settings(IMAGE_PROCESS_WORKERS=1)
+    @patch('automation.services.image_pipeline.get_rate_limiter')
+    @patch('automation.services.image_pipeline.get_http_session')
+    def test_failed_derivative_upload_removes_the_partial_set(self, mock_session, mock_limiter):
+        # Arrange: the thumb WebP upload fails after other derivatives went up
+        mock_session.return_value.get.return_value = Mock(status_code=200, content=make_image_bytes())
+        s3_client = Mock()
+
+        def upload(data, bucket, key, **kwargs):
+            if key.endswith('@thumb.webp'):
+                raise OSError('connection reset')
+        s3_client.upload_fileobj.side_effect = upload
+        jobs = [{'image_url': 'https://img.example.com/a', 'file_path': 'business_images/1/b_0.jpg', 'order': 0}]
+
+        # Act
+        with patch.object(image_pipeline, '_image_executor', image_pipeline.ThreadPoolExecutor(max_workers=1)):
+            uploaded = ImagePipeline(s3_client, 'bucket').run(jobs)
+
+        # Assert: the image is kept without derivatives, and the ones that went up are deleted
+        self.assertEqual(uploaded[0]['variants'], {})
+        put = {call.args[2] for call in s3_client.upload_fileobj.call_args_list}
+        deleted = {item['Key'] for item in s3_client.delete_objects.call_args.kwargs['Delete']['Objects']}
+        self.assertEqual(deleted, put - {'business_images/1/b_0.jpg', 'business_images/1/b_0@thumb.webp'})
+        self.assertTrue(deleted)
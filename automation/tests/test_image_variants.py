@@ -0,0 +1,47 @@
+# tests/test_image_variants.py
+from io import BytesIO
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image as PILImage
+
+from automation.services.image_variants import (
+    pick_variant, render_variants, stored_paths, variant_path, variant_url)
+
+
+class TestImageVariants(SimpleTestCase):
+    def test_render_variants_resizes_without_upscaling(self):
+        widths, files = render_variants(PILImage.new('RGB', (1500, 1000), 'red'))
+
+        self.assertEqual(widths, {'full': 1500, 'medium': 960, 'thumb': 320})
+        self.assertEqual(set(files), {
+            ('full', 'webp'), ('medium', 'jpg'), ('medium', 'webp'), ('thumb', 'jpg'), ('thumb', 'webp'),
+        })
+        thumb = PILImage.open(BytesIO(files[('thumb', 'webp')]))
+        self.assertEqual((thumb.format, thumb.size), ('WEBP', (320, 213)))
+
+        widths, files = render_variants(PILImage.new('RGB', (300, 200)))
+        self.assertEqual(widths, {'full': 300})
+        self.assertEqual(set(files), {('full', 'webp')})
+
+    def test_variant_paths(self):
+        self.assertEqual(variant_path('business_images/1/cafe_0.jpg', 'thumb', 'webp'),
+                         'business_images/1/cafe_0@thumb.webp')
+        self.assertEqual(variant_path('business_images/1/cafe_0.jpg', 'full'), 'business_images/1/cafe_0.jpg')
+        self.assertEqual(variant_path('business_images/1/cafe_0.jpg', 'full', 'webp'),
+                         'business_images/1/cafe_0.webp')
+        self.assertEqual(len(stored_paths('a/b.jpg', {'full': 1500, 'thumb': 320})), 4)
+        self.assertEqual(stored_paths('a/b.jpg', {}), ['a/b.jpg'])
+
+    def test_pick_variant_takes_smallest_wide_enough(self):
+        variants = {'full': 1500, 'medium': 960, 'thumb': 320}
+        self.assertEqual(pick_variant('a/b.jpg', variants, 200), 'a/b@thumb.jpg')
+        self.assertEqual(pick_variant('a/b.jpg', variants, 400, webp=True), 'a/b@medium.webp')
+        self.assertEqual(pick_variant('a/b.jpg', variants, 1200), 'a/b.jpg')
+        self.assertEqual(pick_variant('a/b.jpg', variants, 4000, webp=True), 'a/b.webp')
+        self.assertIsNone(pick_variant('a/b.jpg', {}, 200))
+
+    @override_settings(MEDIA_URL='https://cdn.example.com/')
+    def test_variant_url_falls_back_without_variants(self):
+        self.assertEqual(variant_url('a/b.jpg', {'full': 600, 'thumb': 320}, 300),
+                         'https://cdn.example.com/a/b@thumb.jpg')
+        self.assertEqual(variant_url('a/b.jpg', {}, 300, fallback='https://maps/x'), 'https://maps/x')
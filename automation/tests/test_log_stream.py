@@ -0,0 +1,48 @@
+# tests/test_log_stream.py
+import logging
+import tempfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from automation.services.log_stream import TaskLogStreamHandler, read_log
+
+
+class TestLogStream(SimpleTestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def log_lines(self, *lines):
+        handler = TaskLogStreamHandler(1, flush_interval=60)
+        for line in lines:
+            handler.emit(logging.makeLogRecord({'msg': line}))
+        return handler
+
+    @patch('automation.services.log_stream._group_send')
+    def test_handler_publishes_batches_with_offsets(self, mock_send):
+        handler = self.log_lines('first', 'second')
+        mock_send.assert_not_called()
+
+        handler.close()
+        mock_send.assert_called_once_with(1, {
+            'type': 'log.lines',
+            'lines': ['first', 'second'],
+            'offset': 0,
+            'next_offset': 13,
+        })
+
+    @patch('automation.services.log_stream._group_send')
+    def test_read_log_resumes_from_offset(self, mock_send):
+        self.log_lines('first', 'second').close()
+
+        self.assertEqual(read_log(1, 6), {'lines': ['second'], 'offset': 6, 'next_offset': 13})
+        self.assertEqual(read_log(1, 13)['lines'], [])
+        # A client too far behind gets only whole lines of the recent part
+        self.assertEqual(read_log(1, 0, max_bytes=9)['lines'], ['second'])
+
+    def test_missing_log_is_empty(self):
+        self.assertEqual(read_log(2, 0), {'lines': [], 'offset': 0, 'next_offset': 0})
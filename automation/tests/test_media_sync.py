@@ -0,0 +1,121 @@
+# tests/test_media_sync.py
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+from django.test import SimpleTestCase
+
+from automation.services.media_sync import MANIFEST_NAME, MediaSync
+
+
+class FakeBucket:
+    """In-memory stand-in for the parts of the S3 client MediaSync uses."""
+
+    def __init__(self, fail_keys=()):
+        self.objects = {}
+        self.uploads = []
+        self.list_calls = 0
+        self.fail_keys = set(fail_keys)
+        self._lock = threading.Lock()
+
+    def get_paginator(self, name):
+        bucket = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                bucket.list_calls += 1
+                keys = sorted(key for key in bucket.objects if key.startswith(Prefix))
+                for start in range(0, max(len(keys), 1), 2):
+                    yield {'Contents': [
+                        {'Key': key, 'Size': bucket.objects[key][0], 'ETag': f'"{bucket.objects[key][1]}"'}
+                        for key in keys[start:start + 2]
+                    ]}
+        return Paginator()
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None, Config=None):
+        if key in self.fail_keys:
+            raise OSError("connection reset")
+        with open(path, 'rb') as source:
+            data = source.read()
+        with self._lock:
+            self.uploads.append((key, ExtraArgs))
+            self.objects[key] = (len(data), hashlib.md5(data).hexdigest())
+
+
+class TestMediaSync(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        for name, content in [('a.jpg', b'a' * 10), ('b/c.png', b'c' * 20), ('b/d/e.txt', b'e' * 30)]:
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as target:
+                target.write(content)
+
+    def sync(self, bucket, **kwargs):
+        return MediaSync(bucket, 'media-bucket', self.root, prefix='media', concurrency=4, **kwargs)
+
+    def test_uploads_everything_once_then_nothing(self):
+        bucket = FakeBucket()
+        report = self.sync(bucket).run()
+        self.assertEqual((report['files'], report['uploaded'], report['failed']), (3, 3, 0))
+        self.assertEqual(set(bucket.objects), {'media/a.jpg', 'media/b/c.png', 'media/b/d/e.txt'})
+        self.assertTrue(os.path.exists(os.path.join(self.root, MANIFEST_NAME)))
+        self.assertEqual(dict(bucket.uploads)['media/a.jpg']['ContentType'], 'image/jpeg')
+
+        report = self.sync(bucket).run()
+        self.assertEqual((report['unchanged'], report['uploaded']), (3, 0))
+        self.assertEqual(len(bucket.uploads), 3)
+
+    def test_skips_objects_already_in_bucket_without_manifest(self):
+        bucket = FakeBucket()
+        self.sync(bucket).run()
+        os.remove(os.path.join(self.root, MANIFEST_NAME))
+        report = self.sync(bucket).run()
+        self.assertEqual(report['uploaded'], 0)
+
+    def test_full_check_rehashes_in_worker_threads(self):
+        bucket = FakeBucket()
+        self.sync(bucket).run()
+        sync = self.sync(bucket, trust_manifest=False)
+        hashed_in = set()
+        original = sync._is_synced
+
+        def tracking(*args):
+            hashed_in.add(threading.current_thread().name)
+            return original(*args)
+
+        sync._is_synced = tracking
+        report = sync.run()
+        self.assertEqual((report['unchanged'], report['uploaded']), (3, 0))
+        self.assertTrue(hashed_in)
+        self.assertTrue(all(name.startswith('media-sync-check') for name in hashed_in))
+
+    def test_changed_and_missing_files_are_uploaded(self):
+        bucket = FakeBucket()
+        self.sync(bucket).run()
+        with open(os.path.join(self.root, 'a.jpg'), 'wb') as target:
+            target.write(b'x' * 12)
+        del bucket.objects['media/b/c.png']
+        bucket.uploads.clear()
+        report = self.sync(bucket).run()
+        self.assertEqual(sorted(key for key, _ in bucket.uploads), ['media/a.jpg', 'media/b/c.png'])
+        self.assertEqual(report['unchanged'], 1)
+
+    def test_failed_uploads_are_retried_on_the_next_run(self):
+        bucket = FakeBucket(fail_keys={'media/b/c.png'})
+        report = self.sync(bucket).run()
+        self.assertEqual((report['uploaded'], report['failed']), (2, 1))
+
+        bucket.fail_keys.clear()
+        bucket.uploads.clear()
+        report = self.sync(bucket).run()
+        self.assertEqual([key for key, _ in bucket.uploads], ['media/b/c.png'])
+
+    def test_dry_run_uploads_nothing(self):
+        bucket = FakeBucket()
+        report = self.sync(bucket).run(dry_run=True)
+        self.assertEqual((report['to_upload'], report['bytes_to_upload']), (3, 60))
+        self.assertEqual(bucket.uploads, [])
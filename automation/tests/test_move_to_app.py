@@ -0,0 +1,92 @@
+# tests/test_move_to_app.py
+import json
+import threading
+import uuid
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from automation.models import Business, Category, Country, CustomUser, Destination, Level, MoveToAppJob, ScrapingTask
+from automation.services import move_to_app
+from automation.services.move_to_app import MoveToAppPublisher, run_job
+
+
+class FakeLocalSecrets:
+    """Stands in for RequestClient: 'Down' always fails, 'Typed' fails while it carries types."""
+
+    posted = []
+    lock = threading.Lock()
+
+    def __init__(self, session=None, timeout=None):
+        pass
+
+    def request(self, topic, body):
+        payload = json.loads(body)
+        with self.lock:
+            self.posted.append((payload['title'], 'types' in payload))
+        if payload['title'] == 'Down' or (payload['title'] == 'Typed' and 'types' in payload):
+            raise ConnectionError('Local Secrets unavailable')
+        return {'success': True}
+
+
+@patch.object(move_to_app, 'RequestClient', FakeLocalSecrets)
+class TestRunJob(TestCase):
+    def setUp(self):
+        FakeLocalSecrets.posted = []
+        self.user = CustomUser.objects.create_user('publisher', 'publisher@example.com', 'secret')
+        level = Level.objects.create(title='Places', ls_id=11)
+        Category.objects.create(title='Cafe', value='cafe', level=level, ls_id=21)
+        country = Country.objects.create(name='Spain', code='ES', ls_id=31)
+        Destination.objects.create(name='Madrid', country=country, ls_id=41)
+        self.task = ScrapingTask.all_objects.create(project_title='Cafes', level=level, user=self.user)
+
+    def business(self, title):
+        return Business.all_objects.create(
+            task=self.task, project_id=uuid.uuid4(), project_title='Cafes', search_string='cafes',
+            title=title, place_id=str(uuid.uuid4()), scraped_at=timezone.now(), status='REVIEWED',
+            main_category='Cafe', city='Madrid', country='Spain', types='Cafe, Bar',
+            description='Cafe', description_eng='Cafe', description_esp='Cafe', description_fr='Cafe',
+        )
+
+    def test_partial_failure_and_fallback_without_types(self):
+        published = self.business('Published')
+        typed = self.business('Typed')
+        down = self.business('Down')
+        job = MoveToAppJob.objects.create(user=self.user, business_ids=[published.id, typed.id, down.id, 999999])
+
+        run_job(job, MoveToAppPublisher(concurrency=2, retries=0))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'COMPLETED')
+        self.assertEqual((job.total, job.processed, job.succeeded, job.failed), (4, 4, 2, 2))
+
+        statuses = dict(Business.all_objects.values_list('title', 'status'))
+        self.assertEqual(statuses, {'Published': 'IN_PRODUCTION', 'Typed': 'IN_PRODUCTION', 'Down': 'REVIEWED'})
+
+        moved = {item['business_title']: item for item in job.results['moved_to_app_businesses']}
+        self.assertNotIn('warning', moved['Published'])
+        self.assertTrue(moved['Typed']['warning'].startswith('Moved without types'))
+        failed = {item['business_id']: item['error'] for item in job.results['move_to_app_errors']}
+        self.assertEqual(set(failed), {down.id, 999999})
+        self.assertEqual(failed[999999], 'Business not found')
+        self.assertEqual(sorted(FakeLocalSecrets.posted), sorted([
+            ('Published', True), ('Typed', True), ('Typed', False), ('Down', True), ('Down', False),
+        ]))
+        self.assertEqual(
+            [(item['old_status'], item['new_status']) for item in job.results['updated_businesses']],
+            [('REVIEWED', 'IN_PRODUCTION')] * 2,
+        )
+        self.assertEqual(job.results['affected_tasks'], [self.task.id])
+
+    def test_business_without_a_known_category_is_not_posted(self):
+        business = self.business('Published')
+        Business.all_objects.filter(pk=business.pk).update(main_category='Museum')
+        job = MoveToAppJob.objects.create(user=self.user, business_ids=[business.id])
+
+        run_job(job, MoveToAppPublisher(concurrency=1, retries=0))
+
+        job.refresh_from_db()
+        self.assertEqual((job.succeeded, job.failed), (0, 1))
+        self.assertEqual(FakeLocalSecrets.posted, [])
+        self.assertEqual(Business.all_objects.get(pk=business.pk).status, 'REVIEWED')
@@ -0,0 +1,65 @@
+# tests/test_openai_keys.py
+import asyncio
+from collections import Counter
+from unittest.mock import AsyncMock, patch
+
+import openai
+from django.test import SimpleTestCase
+
+from automation.services import openai_keys
+from automation.services.openai_keys import NoOpenAIKeyAvailable, OpenAIKeyPool
+
+
+class TestOpenAIKeyPool(SimpleTestCase):
+    def test_keys_rotate_by_weight(self):
+        pool = OpenAIKeyPool(['a', None, 'b', 'a'], weights=[3, 1, 1])
+        self.assertEqual(len(pool), 2)
+        picks = Counter(pool.acquire() for _ in range(8))
+        self.assertEqual(picks, {'a': 6, 'b': 2})
+
+    def test_rate_limited_key_cools_down_and_recovers(self):
+        pool = OpenAIKeyPool(['a', 'b'], base_cooldown=60, max_cooldown=60)
+        pool.failure('a', openai.error.RateLimitError('slow down'))
+        self.assertEqual({pool.acquire() for _ in range(4)}, {'b'})
+        pool.success('a')
+        self.assertIn('a', {pool.acquire() for _ in range(4)})
+
+    def test_rejected_keys_leave_rotation(self):
+        pool = OpenAIKeyPool(['a'])
+        pool.failure('a', openai.error.AuthenticationError('bad key'))
+        self.assertFalse(pool.has_usable_key())
+        with self.assertRaises(NoOpenAIKeyAvailable):
+            pool.acquire()
+
+    def test_chat_completion_moves_to_the_next_key(self):
+        pool = OpenAIKeyPool(['a', 'b'], base_cooldown=60, max_cooldown=60)
+        used = []
+
+        def create(api_key, **kwargs):
+            used.append(api_key)
+            if api_key == 'a':
+                raise openai.error.RateLimitError('slow down')
+            return {'choices': []}
+
+        with patch.object(openai_keys, 'get_openai_key_pool', return_value=pool), \
+                patch.object(openai_keys, 'get_rate_limiter'), \
+                patch.object(openai.ChatCompletion, 'create', side_effect=create):
+            self.assertEqual(openai_keys.chat_completion(messages=[]), {'choices': []})
+        self.assertEqual(used, ['a', 'b'])
+
+    def test_async_chat_completion_moves_to_the_next_key(self):
+        pool = OpenAIKeyPool(['a', 'b'], base_cooldown=60, max_cooldown=60)
+        used = []
+
+        async def acreate(api_key, **kwargs):
+            used.append(api_key)
+            if api_key == 'a':
+                raise openai.error.AuthenticationError('bad key')
+            return {'choices': []}
+
+        with patch.object(openai_keys, 'get_openai_key_pool', return_value=pool), \
+                patch.object(openai_keys, 'get_rate_limiter', return_value=AsyncMock()), \
+                patch.object(openai.ChatCompletion, 'acreate', side_effect=acreate):
+            self.assertEqual(asyncio.run(openai_keys.achat_completion(messages=[])), {'choices': []})
+        self.assertEqual(used, ['a', 'b'])
+        self.assertEqual([stats['disabled'] for stats in pool.get_stats()], [True, False])
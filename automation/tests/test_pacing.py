@@ -0,0 +1,56 @@
+# tests/test_pacing.py
+from django.test import SimpleTestCase
+from unittest.mock import Mock, patch
+
+from automation.services.pacing import SERPAPI_HOST, PacingController, parse_retry_after
+
+
+@patch('automation.services.pacing.time.sleep')
+class TestPacingController(SimpleTestCase):
+    def setUp(self):
+        self.pacer = PacingController(base_delay=1, max_delay=30)
+
+    def test_no_delay_without_throttling(self, mock_sleep):
+        response = Mock(status_code=200, headers={})
+
+        for _ in range(5):
+            with self.pacer.request('example.com'):
+                pass
+            self.pacer.record_response('example.com', response)
+
+        mock_sleep.assert_not_called()
+        self.assertEqual(self.pacer.get_stats()['throttled_seconds'], 0)
+
+    def test_429_with_retry_after_delays_only_that_host(self, mock_sleep):
+        response = Mock(status_code=429, headers={'Retry-After': '5'})
+
+        self.assertTrue(self.pacer.record_response('images.example.com', response))
+
+        self.assertEqual(self.pacer.wait('other.example.com'), 0.0)
+        waited = self.pacer.wait('images.example.com')
+        self.assertAlmostEqual(waited, 5, delta=0.5)
+        stats = self.pacer.get_stats()
+        self.assertEqual(stats['hosts']['images.example.com']['throttle_events'], 1)
+        self.assertGreater(stats['throttled_seconds'], 0)
+
+    def test_backoff_grows_and_decays(self, mock_sleep):
+        self.pacer.throttle('example.com')
+        self.pacer.throttle('example.com')
+        self.pacer.throttle('example.com')
+        self.assertEqual(self.pacer.get_stats()['hosts']['example.com']['delay'], 4)
+
+        for _ in range(5):
+            self.pacer.success('example.com')
+        self.assertEqual(self.pacer.get_stats()['hosts']['example.com']['delay'], 0)
+
+    def test_serpapi_rate_limit_error_throttles(self, mock_sleep):
+        self.assertTrue(self.pacer.record_serpapi_result({'error': 'Rate limit exceeded'}))
+        self.assertFalse(self.pacer.record_serpapi_result({'error': 'Invalid API key'}))
+        self.assertFalse(self.pacer.record_serpapi_result({'place_results': {}}))
+        self.assertEqual(self.pacer.get_stats()['hosts'][SERPAPI_HOST]['throttle_events'], 1)
+
+    def test_parse_retry_after(self, mock_sleep):
+        self.assertEqual(parse_retry_after('12'), 12.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
@@ -0,0 +1,56 @@
+# tests/test_pagination.py
+from django.test import SimpleTestCase
+
+from django.db.models import Q
+
+from automation.services.pagination import (
+    _after, decode_cursor, encode_cursor, paginate, parse_page_size, stable_ordering
+)
+
+
+class TestKeysetCursor(SimpleTestCase):
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor({'after': 1234})
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decode_cursor(cursor), {'after': 1234})
+
+    def test_malformed_cursor_raises_value_error(self):
+        for cursor in ('zz', '!!!', encode_cursor([1, 2])):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(parse_page_size(None, 50, 200), 50)
+        self.assertEqual(parse_page_size('abc', 50, 200), 50)
+        self.assertEqual(parse_page_size('0', 50, 200), 1)
+        self.assertEqual(parse_page_size('1000', 50, 200), 200)
+
+    def test_stable_ordering_adds_unique_tiebreaker(self):
+        self.assertEqual(stable_ordering('-scraped_at'), ('-scraped_at', '-id'))
+        self.assertEqual(stable_ordering('title'), ('title', 'id'))
+        self.assertEqual(stable_ordering('-id'), ('-id',))
+
+    def test_after_seeks_past_position(self):
+        self.assertEqual(
+            _after(('-scraped_at', '-id'), ['2024-01-01', 7]),
+            Q(scraped_at__lt='2024-01-01') | (Q(scraped_at='2024-01-01') & Q(id__lt=7))
+        )
+        self.assertEqual(
+            _after(('-scraped_at', '-id'), ['2024-01-01', 7], backwards=True),
+            Q(scraped_at__gt='2024-01-01') | (Q(scraped_at='2024-01-01') & Q(id__gt=7))
+        )
+
+    def test_after_rejects_null_positions(self):
+        with self.assertRaises(ValueError):
+            _after(('-project_title', '-id'), [None, 5])
+
+    def test_cursor_for_other_ordering_is_rejected(self):
+        cursor = encode_cursor({'v': [1], 'd': 'next'})
+        with self.assertRaises(ValueError):
+            paginate(None, ('-scraped_at', '-id'), cursor, 10)
+
+    def test_cursor_of_the_wrong_shape_is_rejected(self):
+        for position in ({'after': 5}, {'v': 5}, {'v': [[1]]}, {'v': [{'id': 1}]}, {'v': [None]},
+                         {'v': [1], 'd': 'sideways'}):
+            with self.assertRaises(ValueError):
+                paginate(None, ('id',), encode_cursor(position), 10)
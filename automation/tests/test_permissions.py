@@ -0,0 +1,71 @@
+# tests/test_permissions.py
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from automation.services.permissions import (
+    UserPermissions, get_permissions, get_request_permissions, invalidate_permissions
+)
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'permissions-tests',
+    }
+}
+
+
+def make_request(session):
+    user = SimpleNamespace(pk=7, is_authenticated=True, is_superuser=False)
+    return SimpleNamespace(user=user, session=session)
+
+
+class TestUserPermissions(SimpleTestCase):
+    def test_ambassador_flags_and_destinations(self):
+        permissions = UserPermissions(roles=['AMBASSADOR'], destination_ids=[3, 5])
+
+        self.assertFalse(permissions.is_admin)
+        self.assertTrue(permissions.is_admin_or_ambassador)
+        self.assertTrue(permissions.can_access_destination(3))
+        self.assertFalse(permissions.can_access_destination(4))
+        self.assertEqual(permissions.as_dict()['can_edit'], True)
+        self.assertEqual(permissions.as_dict()['can_delete'], False)
+
+    def test_superuser_is_admin_everywhere(self):
+        permissions = UserPermissions(is_superuser=True)
+
+        self.assertTrue(permissions.is_admin)
+        self.assertTrue(permissions.can_access_destination(99))
+
+    @patch('automation.services.permissions.load_permissions')
+    def test_loaded_once_per_user_instance(self, mock_load):
+        mock_load.return_value = UserPermissions(roles=['ADMIN'])
+        user = SimpleNamespace(is_authenticated=True)
+
+        for _ in range(3):
+            self.assertTrue(get_permissions(user).is_admin)
+        self.assertEqual(mock_load.call_count, 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PERMISSIONS_SESSION_CACHE=True)
+@patch('automation.services.permissions.load_permissions')
+class TestSessionCachedPermissions(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_session_reused_until_invalidated(self, mock_load):
+        mock_load.return_value = UserPermissions(roles=['AMBASSADOR'], destination_ids=[1])
+        session = {}
+
+        get_request_permissions(make_request(session))
+        permissions = get_request_permissions(make_request(session))
+        self.assertEqual(permissions.destination_ids, frozenset([1]))
+        self.assertEqual(mock_load.call_count, 1)
+
+        mock_load.return_value = UserPermissions(roles=['AMBASSADOR'], destination_ids=[1, 2])
+        invalidate_permissions(7)
+        permissions = get_request_permissions(make_request(session))
+        self.assertEqual(permissions.destination_ids, frozenset([1, 2]))
+        self.assertEqual(mock_load.call_count, 2)
@@ -0,0 +1,95 @@
+# tests/test_rate_limiter.py
+import asyncio
+import threading
+
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+from automation.services import rate_limiter
+from automation.services.rate_limiter import (
+    InMemoryTokenBucketStore,
+    TokenBucketRateLimiter,
+    get_rate_limiter,
+)
+
+
+class TestTokenBucketRateLimiter(SimpleTestCase):
+    def setUp(self):
+        self.store = InMemoryTokenBucketStore()
+
+    def test_burst_is_granted_without_waiting(self):
+        limiter = TokenBucketRateLimiter('test', rate=1, capacity=3, store=self.store)
+
+        waits = [limiter.acquire('key') for _ in range(3)]
+
+        self.assertEqual(waits, [0.0, 0.0, 0.0])
+
+    @patch('automation.services.rate_limiter.time.sleep')
+    def test_waits_when_bucket_is_empty(self, mock_sleep):
+        limiter = TokenBucketRateLimiter('test', rate=10, capacity=1, store=self.store)
+        limiter.acquire('key')
+
+        waited = limiter.acquire('key')
+
+        self.assertGreater(waited, 0)
+        mock_sleep.assert_called()
+        metrics = limiter.get_metrics()
+        self.assertEqual(len(metrics), 1)
+        stats = next(iter(metrics.values()))
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['throttled_calls'], 1)
+        self.assertGreater(stats['total_wait'], 0)
+
+    def test_more_tokens_than_capacity_is_rejected(self):
+        limiter = TokenBucketRateLimiter('test', rate=1, capacity=2, store=self.store)
+
+        with self.assertRaises(ValueError):
+            limiter.acquire('key', tokens=3)
+        with self.assertRaises(ValueError):
+            asyncio.run(limiter.acquire_async('key', tokens=3))
+
+    def test_async_acquire_calls_the_store_off_the_event_loop(self):
+        limiter = TokenBucketRateLimiter('test', rate=1, capacity=1, store=self.store)
+        threads = []
+        consume = self.store.consume
+
+        def tracking(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return consume(*args, **kwargs)
+
+        async def acquire():
+            loop_thread = threading.current_thread()
+            with patch.object(self.store, 'consume', side_effect=tracking):
+                waited = await limiter.acquire_async('key')
+            return loop_thread, waited
+
+        loop_thread, waited = asyncio.run(acquire())
+        self.assertEqual(waited, 0.0)
+        self.assertTrue(threads)
+        self.assertNotIn(loop_thread, threads)
+
+    def test_keys_have_separate_buckets(self):
+        limiter = TokenBucketRateLimiter('test', rate=0.001, capacity=1, store=self.store)
+
+        self.assertEqual(limiter.acquire('first'), 0.0)
+        self.assertEqual(limiter.acquire('second'), 0.0)
+
+    def test_raw_keys_are_not_stored(self):
+        limiter = TokenBucketRateLimiter('test', rate=1, capacity=1, store=self.store)
+
+        limiter.acquire('sk-secret-key')
+
+        self.assertNotIn('sk-secret-key', str(limiter.get_metrics()))
+
+    @override_settings(RATE_LIMITS={'demo': {'calls': 30, 'period': 60, 'burst': 5}})
+    def test_limiter_is_built_from_settings(self):
+        with patch.dict(rate_limiter._limiters, clear=True):
+            limiter = get_rate_limiter('demo')
+
+            self.assertEqual(limiter.rate, 0.5)
+            self.assertEqual(limiter.capacity, 5)
+            self.assertIs(get_rate_limiter('demo'), limiter)
+
+    def test_unknown_limiter_raises(self):
+        with self.assertRaises(ValueError):
+            get_rate_limiter('does-not-exist')
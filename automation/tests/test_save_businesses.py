@@ -0,0 +1,72 @@
+# tests/test_save_businesses.py
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from automation.models import Business, ScrapingTask
+from automation.tasks import save_businesses
+
+
+def result(place_id, **fields):
+    return {'place_id': place_id, 'title': f'Place {place_id}', **fields}
+
+
+@patch('automation.tasks.daily_activity.record_businesses_gathered')
+class TestSaveBusinesses(TestCase):
+    def setUp(self):
+        self.task = ScrapingTask.all_objects.create(project_title='Cafes')
+
+    def existing(self, place_id, **fields):
+        values = {
+            'task': self.task, 'project_id': self.task.project_id, 'project_title': 'Cafes',
+            'search_string': 'cafes', 'title': 'Stored', 'place_id': place_id, 'scraped_at': timezone.now(),
+        }
+        values.update(fields)
+        return Business.all_objects.create(**values)
+
+    def test_new_places_are_created_and_known_ones_updated(self, gathered):
+        stored = self.existing('p1', rating=3.0)
+        gathered.reset_mock()
+
+        saved = save_businesses(self.task, [result('p1', rating=4.5), result('p2')], 'cafes, Madrid')
+
+        self.assertEqual([business.place_id for business, _ in saved], ['p1', 'p2'])
+        self.assertEqual(Business.all_objects.count(), 2)
+        stored.refresh_from_db()
+        self.assertEqual((stored.title, stored.rating), ('Place p1', 4.5))
+        self.assertEqual(Business.objects.get(place_id='p2').city, 'cafes')
+        gathered.assert_called_once_with(self.task, 1)
+
+    def test_fields_missing_from_a_result_keep_their_stored_value(self, gathered):
+        self.existing('p1', phone='123', website='http://stored.example')
+        self.existing('p2', phone='456')
+        gathered.reset_mock()
+
+        save_businesses(self.task, [result('p1'), result('p2', phone='789')], 'cafes, Madrid')
+
+        self.assertEqual(
+            dict(Business.objects.values_list('place_id', 'phone')), {'p1': '123', 'p2': '789'}
+        )
+        self.assertEqual(Business.objects.get(place_id='p1').website, 'http://stored.example')
+        gathered.assert_called_once_with(self.task, 0)
+
+    def test_place_repeated_on_a_page_is_saved_once_with_its_last_values(self, gathered):
+        saved = save_businesses(
+            self.task, [result('p1', title='First'), result('p2'), result('p1', title='Last')], 'cafes, Madrid'
+        )
+
+        self.assertEqual(len(saved), 2)
+        self.assertEqual(Business.objects.get(place_id='p1').title, 'Last')
+        gathered.assert_called_once_with(self.task, 2)
+
+    def test_deleted_business_is_skipped(self, gathered):
+        deleted = self.existing('p1', is_deleted=True)
+        gathered.reset_mock()
+
+        saved = save_businesses(self.task, [result('p1'), result('p2')], 'cafes, Madrid')
+
+        self.assertEqual([business.place_id for business, _ in saved], ['p2'])
+        deleted.refresh_from_db()
+        self.assertEqual((deleted.title, deleted.is_deleted), ('Stored', True))
+        gathered.assert_called_once_with(self.task, 1)
@@ -0,0 +1,86 @@
+# tests/test_scraping_engine.py
+import threading
+import time
+
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+from automation.services.scraping_engine import ScrapingEngine
+
+
+@patch('automation.services.scraping_engine.connections')
+class TestScrapingEngine(SimpleTestCase):
+    def test_runs_queries_concurrently(self, mock_connections):
+        # Arrange
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def worker(index, query_data):
+            with lock:
+                active.append(index)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(index)
+            return 2
+
+        queries = [{'query': f'query {i}'} for i in range(6)]
+
+        # Act
+        total = ScrapingEngine(worker, max_workers=3).run(queries)
+
+        # Assert
+        self.assertEqual(total, 12)
+        self.assertEqual(max(peak), 3)
+
+    def test_pages_of_a_query_stay_in_order(self, mock_connections):
+        # Arrange
+        seen = {}
+
+        def worker(index, query_data):
+            pages = []
+            for page in range(1, 4):
+                time.sleep(0.01)
+                pages.append(page)
+            seen[query_data['query']] = pages
+            return len(pages)
+
+        queries = [{'query': 'a'}, {'query': 'b'}]
+
+        # Act
+        ScrapingEngine(worker, max_workers=2).run(queries)
+
+        # Assert
+        self.assertEqual(seen, {'a': [1, 2, 3], 'b': [1, 2, 3]})
+
+    def test_failing_query_does_not_stop_others(self, mock_connections):
+        # Arrange
+        def worker(index, query_data):
+            if index == 1:
+                raise RuntimeError("boom")
+            return 1
+
+        # Act
+        total = ScrapingEngine(worker, max_workers=2).run([{'query': 'a'}, {'query': 'b'}, {'query': 'c'}])
+
+        # Assert
+        self.assertEqual(total, 2)
+        mock_connections.close_all.assert_called()
+
+    @override_settings(SCRAPING_MAX_WORKERS=1)
+    def test_single_worker_runs_inline(self, mock_connections):
+        # Arrange
+        threads = set()
+
+        def worker(index, query_data):
+            threads.add(threading.current_thread().name)
+            return 1
+
+        # Act
+        total = ScrapingEngine(worker).run([{'query': 'a'}, {'query': 'b'}])
+
+        # Assert
+        self.assertEqual(total, 2)
+        self.assertEqual(threads, {threading.current_thread().name})
+        mock_connections.close_all.assert_not_called()
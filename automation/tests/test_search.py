@@ -0,0 +1,22 @@
+# tests/test_search.py
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from automation.services.search import build_search_text, normalize_text
+
+
+class TestSearchText(SimpleTestCase):
+    def test_normalize_text_folds_case_accents_and_punctuation(self):
+        self.assertEqual(normalize_text("Café de l'Opéra, C/ Mayor"), 'cafe de l opera c mayor')
+        self.assertEqual(normalize_text('ÑANDÚ  Crêperie'), 'nandu creperie')
+        self.assertEqual(normalize_text(None), '')
+
+    def test_build_search_text_from_object_and_values(self):
+        business = SimpleNamespace(title='Bistrô Paris', city='Paris', country='France', postal_code='75001',
+                                   description=None)
+        expected = 'bistro paris paris france 75001'
+        self.assertEqual(build_search_text(business), expected)
+        self.assertEqual(build_search_text({
+            'title': 'Bistrô Paris', 'city': 'Paris', 'country': 'France', 'postal_code': '75001',
+        }), expected)
@@ -0,0 +1,109 @@
+# tests/test_storage_gc.py
+import os
+import shutil
+import tempfile
+import uuid
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from automation.models import Business, Image, ScrapingTask
+from automation.services import storage_gc
+from automation.services.storage_gc import DELETE_BATCH_SIZE, LocalObjectStore, S3ObjectStore, collect_old_tasks
+
+
+class FakeS3Client:
+    def __init__(self, failing=()):
+        self.deleted = []
+        self.failing = set(failing)
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [item['Key'] for item in Delete['Objects']]
+        self.deleted.append(keys)
+        return {'Errors': [{'Key': key, 'Code': 'AccessDenied'} for key in keys if key in self.failing]}
+
+
+class TestS3ObjectStore(SimpleTestCase):
+    def test_delete_sends_at_most_1000_keys_per_request(self):
+        client = FakeS3Client(failing={'key-5'})
+        keys = [f'key-{i}' for i in range(2 * DELETE_BATCH_SIZE + 500)]
+        deleted = S3ObjectStore(client, 'bucket', workers=2).delete(keys)
+
+        self.assertEqual(sorted(len(batch) for batch in client.deleted), [500, DELETE_BATCH_SIZE, DELETE_BATCH_SIZE])
+        self.assertEqual(sorted(key for batch in client.deleted for key in batch), sorted(keys))
+        self.assertEqual(deleted, len(keys) - 1)
+
+
+class TestCollectOldTasks(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.store = LocalObjectStore(self.root)
+
+    def write(self, key, size):
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as target:
+            target.write(b'x' * size)
+
+    def make_task(self, days_old=40):
+        task = ScrapingTask.all_objects.create(project_title='old')
+        ScrapingTask.all_objects.filter(pk=task.pk).update(
+            created_at=timezone.now() - timezone.timedelta(days=days_old)
+        )
+        business = Business.all_objects.create(
+            task=task, project_id=uuid.uuid4(), project_title='old', search_string='cafes',
+            title='Cafe', place_id=str(uuid.uuid4()), scraped_at=timezone.now(),
+        )
+        Image.all_objects.create(business=business, image_url='http://img',
+                                 local_path=f'business_images/{business.pk}/cafe_0.jpg')
+        self.write(f'business_images/{business.pk}/cafe_0.jpg', 100)
+        self.write(f'scraping_results/{task.pk}/results.json', 10)
+        return task, business
+
+    def test_dry_run_counts_bytes_and_deletes_nothing(self):
+        task, business = self.make_task()
+        self.make_task(days_old=5)
+
+        report = collect_old_tasks(older_than_days=30, dry_run=True, store=self.store)
+
+        self.assertEqual((report['tasks'], report['businesses'], report['images']), (1, 1, 1))
+        self.assertEqual((report['objects'], report['bytes'], report['deleted_objects']), (2, 110, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.root, f'business_images/{business.pk}/cafe_0.jpg')))
+        self.assertTrue(ScrapingTask.objects.filter(pk=task.pk).exists())
+
+    def test_tasks_are_processed_in_chunks_and_soft_deleted(self):
+        tasks = [self.make_task()[0] for _ in range(5)]
+        recent, _ = self.make_task(days_old=5)
+        chunks = []
+        original = storage_gc._task_objects
+
+        def tracking(store, task_ids, task_files):
+            chunks.append(task_ids)
+            return original(store, task_ids, task_files)
+
+        with patch.object(storage_gc, '_task_objects', side_effect=tracking):
+            report = collect_old_tasks(older_than_days=30, chunk_size=2, store=self.store)
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual((report['tasks'], report['objects'], report['deleted_objects']), (5, 10, 10))
+        self.assertEqual(self.store.list('scraping_results/'), [(f'scraping_results/{recent.pk}/results.json', 10)])
+        ids = [task.pk for task in tasks]
+        self.assertFalse(ScrapingTask.objects.filter(pk__in=ids).exists())
+        self.assertEqual(ScrapingTask.all_objects.filter(pk__in=ids, is_deleted=True).count(), 5)
+        self.assertFalse(Business.all_objects.filter(task_id__in=ids, is_deleted=False).exists())
+        self.assertFalse(Image.all_objects.filter(business__task_id__in=ids, is_deleted=False).exists())
+        self.assertTrue(ScrapingTask.objects.filter(pk=recent.pk).exists())
+
+    def test_tasks_with_businesses_in_production_are_kept(self):
+        published, business = self.make_task()
+        Business.all_objects.filter(pk=business.pk).update(status='IN_PRODUCTION')
+        expired, _ = self.make_task()
+
+        report = collect_old_tasks(older_than_days=30, store=self.store)
+
+        self.assertEqual((report['tasks'], report['published_tasks_kept']), (1, 1))
+        self.assertTrue(os.path.exists(os.path.join(self.root, f'business_images/{business.pk}/cafe_0.jpg')))
+        self.assertTrue(ScrapingTask.objects.filter(pk=published.pk).exists())
+        self.assertFalse(ScrapingTask.objects.filter(pk=expired.pk).exists())
@@ -0,0 +1,60 @@
+# tests/test_task_logging.py
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from automation.services import task_logging
+from automation.services.log_stream import read_log
+
+
+class TestTaskLogging(SimpleTestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.logger = logging.getLogger('automation.tests.task_logging')
+        self.logger.setLevel(logging.DEBUG)
+        self.router = task_logging.TaskLogRouter()
+        self.logger.addHandler(self.router)
+        self.addCleanup(self.logger.removeHandler, self.router)
+
+    def test_summarize_bounds_large_payloads(self):
+        payload = {f'key{i}': 'x' * 1000 for i in range(100)}
+        summary = task_logging.summarize(payload, max_chars=200)
+        self.assertLess(len(summary), 250)
+        self.assertIn('...', summary)
+
+    @override_settings(LOG_PAYLOAD_SAMPLE_EVERY=3)
+    def test_log_payload_samples_and_counts(self):
+        with patch('automation.services.log_stream._group_send'):
+            with task_logging.task_log_context(7) as counters:
+                for i in range(7):
+                    task_logging.log_payload(self.logger, 'results', 'Result', {'i': i})
+
+        self.assertEqual(counters.snapshot(), {'results': 7})
+        sampled = [line for line in read_log(7)['lines'] if 'Result [results #' in line]
+        self.assertEqual(len(sampled), 3)  # 1st, 4th and 7th
+        self.assertTrue(all('[task 7]' in line for line in sampled))
+
+    def test_worker_threads_log_to_their_task(self):
+        def work(i):
+            self.logger.info(f"worker {i}")
+            task_logging.count('work')
+
+        with patch('automation.services.log_stream._group_send'):
+            with task_logging.task_log_context(8) as counters:
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    for i in range(4):
+                        task_logging.submit_in_context(executor, work, i).result()
+            self.logger.info("outside any task")
+
+        lines = read_log(8)['lines']
+        self.assertEqual(sum('worker' in line for line in lines), 4)
+        self.assertFalse(any('outside any task' in line for line in lines))
+        self.assertEqual(counters.snapshot(), {'work': 4})
@@ -0,0 +1,75 @@
+# tests/test_tiered_cache.py
+import threading
+import time
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from automation.services.tiered_cache import LocalLRUCache, TieredCache
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tiered-cache-tests',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestTieredCache(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_local_tier_evicts_least_recently_used(self):
+        local = LocalLRUCache(max_entries=2)
+        local.set('a', 1, None)
+        local.set('b', 2, None)
+        local.get('a')
+        local.set('c', 3, None)
+
+        self.assertEqual(local.get('a'), 1)
+        self.assertIsNone(local.get('b', None))
+        self.assertEqual(len(local), 2)
+
+    def test_concurrent_misses_call_loader_once(self):
+        tiered = TieredCache()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'value': 42}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(tiered.get_or_set('key', loader, timeout=60)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'value': 42}] * 5)
+
+    def test_other_process_reads_shared_tier(self):
+        TieredCache().set('key', 'shared', timeout=60)
+        other = TieredCache()
+
+        self.assertEqual(other.get_or_set('key', lambda: 'loaded'), 'shared')
+        self.assertEqual(other.get_or_set('key', lambda: 'loaded'), 'shared')
+
+        stats = other.get_stats()
+        self.assertEqual(stats['shared_hits'], 1)
+        self.assertEqual(stats['local_hits'], 1)
+        self.assertEqual(stats['loads'], 0)
+
+    def test_callable_timeout_and_uncached_none(self):
+        tiered = TieredCache()
+
+        tiered.get_or_set('token', lambda: {'expires_in': 120}, timeout=lambda value: value['expires_in'])
+        self.assertEqual(caches['default'].get('token'), {'expires_in': 120})
+
+        self.assertIsNone(tiered.get_or_set('empty', lambda: None))
+        self.assertIsNone(caches['default'].get('empty'))
@@ -0,0 +1,25 @@
+# tests/test_translation_memory.py
+from django.test import SimpleTestCase
+
+from automation.services.translation_memory import memory_key
+
+
+class TestTranslationMemoryKeys(SimpleTestCase):
+    def test_key_ignores_whitespace_and_language_case(self):
+        self.assertEqual(
+            memory_key('  Hotel   del Mar\n', 'Spanish', 'v1'),
+            memory_key('Hotel del Mar', 'spanish', 'v1'),
+        )
+
+    def test_key_depends_on_language_and_prompt_version(self):
+        key = memory_key('Hotel del Mar', 'spanish', 'v1')
+        self.assertNotEqual(key, memory_key('Hotel del Mar', 'fr', 'v1'))
+        self.assertNotEqual(key, memory_key('Hotel del Mar', 'spanish', 'v2'))
+        self.assertEqual(len(key), 64)
+
+    def test_unicode_forms_share_a_key(self):
+        composed, decomposed = 'Café', 'Café'
+        self.assertEqual(
+            memory_key(composed, 'eng', 'v1'),
+            memory_key(decomposed, 'eng', 'v1'),
+        )
@@ -1,24 +1,21 @@
 import asyncio
-import os
 from typing import List, Dict, Optional
-from django.core.cache import cache
 import logging
-import openai
 import time
 from functools import wraps
 import json
+from automation.services import translation_memory
+from automation.services.openai_keys import achat_completion
 
 logger = logging.getLogger(__name__)
 
 # Configuration
-OPENAI_API_KEY = os.getenv('GENAI_OPENAI_API_KEY')
-CACHE_TIMEOUT = 86400  # 24 hours
+# Bump when the translation prompt changes, so the translation memory stops serving old output
+TRANSLATION_PROMPT_VERSION = 'translate-v1'
 MIN_WORDS = 220
 MAX_RETRIES = 3
 RETRY_DELAY = 1
 
-openai.api_key = OPENAI_API_KEY
-
 def retry_with_exponential_backoff(max_retries=MAX_RETRIES, initial_delay=RETRY_DELAY):
     def decorator(func):
         @wraps(func)
@@ -38,8 +35,9 @@ def retry_with_exponential_backoff(max_retries=MAX_RETRIES, initial_delay=RETRY_
     return decorator
 
 async def call_openai_with_retry(messages: List[Dict], model="gpt-3.5-turbo", temperature=0.7):
-    """Make OpenAI API call with retry logic"""
-    response = await openai.ChatCompletion.acreate(
+    """Make OpenAI API call on a key from the pool, moving to the next key on failure"""
+    response = await achat_completion(
+        retries=MAX_RETRIES,
         model=model,
         messages=messages,
         temperature=temperature
@@ -51,20 +49,18 @@ async def translate_text_openai(text: str, target_language: str) -> Optional[str
     if not text:
         return None
 
-    cache_key = f"trans_{hash(text)}_{target_language}"
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
+    return await translation_memory.atranslate(
+        text, target_language, TRANSLATION_PROMPT_VERSION, _request_translation
+    )
 
+async def _request_translation(text: str, target_language: str) -> Optional[str]:
     messages = [
         {"role": "system", "content": f"You are a professional translator. Translate the following text to {target_language}. Maintain the original meaning and tone."},
         {"role": "user", "content": text}
     ]
 
     try:
-        translated_text = await call_openai_with_retry(messages)
-        cache.set(cache_key, translated_text, CACHE_TIMEOUT)
-        return translated_text
+        return await call_openai_with_retry(messages)
     except Exception as e:
         logger.error(f"Translation error: {str(e)}", exc_info=True)
         return None
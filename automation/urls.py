@@ -49,6 +49,7 @@ urlpatterns = [
     path('change-business-status/<int:business_id>/', views.change_business_status, name='change_business_status'),
     path('update-business-status/<int:business_id>/', views.update_business_status, name='update_business_status'),
     path('update_business_statuses/', views.update_business_statuses, name='update_business_statuses'),
+    path('move_to_app_jobs/<int:job_id>/', views.move_to_app_job_status, name='move_to_app_job_status'),
   
     path('admin-view/', views.admin_view, name='admin_view'),
     
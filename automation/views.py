@@ -42,13 +42,19 @@ from django.template.loader import render_to_string
 
 from automation.api.serializers import BusinessSerializer, TimelineDataSerializer
 from automation.services.ls_backend import LSBackendClient
-from automation.services.dashboard_service import DashboardService
+from automation.services.dashboard_service import DashboardService, TASK_STATUSES
+from automation.services import daily_activity
+from automation.services.move_to_app import job_response as move_to_app_job_response, validate_for_production
+from automation.services.task_queue import submit_scraping_task
+from automation.services.openai_keys import get_openai_key_pool
+from automation.services.permissions import get_permissions
+from automation.services.task_detail import get_task_detail, get_user_permissions
 from automation.utils import process_scraped_types
-from automation.tasks import format_operating_hours
+from automation.tasks import format_operating_hours, publish_move_to_app_job
  
 from .tasks import * 
 from .permissions import IsAdminOrAmbassadorForDestination
-from .models import CustomUser, Destination, Feedback, HourlyBusyness, Level, PopularTimes, ScrapingTask, Image, Business, UserPreference,  UserRole, Country
+from .models import CustomUser, Destination, Feedback, HourlyBusyness, Level, MoveToAppJob, PopularTimes, ScrapingTask, Image, Business, UserPreference,  UserRole, Country
 from .forms import FeedbackFormSet, DestinationForm, UserProfileForm, CustomUserCreationForm, CustomUserChangeForm, ScrapingTaskForm, BusinessForm
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.paginator import Paginator
@@ -81,30 +87,12 @@ def welcome_view(request):
         return redirect('login')
 
 def is_admin(user):
-    return user.is_superuser or user.roles.filter(role='ADMIN').exists()
+    return get_permissions(user).is_admin
  
 OPENAI_API_KEY = settings.TRANSLATION_OPENAI_API_KEY
 FALLBACK_1_OPENAI_API_KEY = settings.FALLBACK_1_OPENAI_API_KEY 
 FALLBACK_2_OPENAI_API_KEY = settings.FALLBACK_2_OPENAI_API_KEY 
 
-def get_available_openai_key():
-    keys = [
-        settings.OPENAI_API_KEY,
-        settings.FALLBACK_1_OPENAI_API_KEY,
-        settings.FALLBACK_2_OPENAI_API_KEY,
-    ]
-    for key in keys:
-        try:
-            openai.api_key = key
-            openai.Model.list()
-            logger.debug(f"Using OpenAI API Key: {key} - views")
-            return key
-        except Exception as e:
-            logger.error(f"API key {key} failed with error: {e}")
-            continue
-    logger.error("All OpenAI API keys failed.")
-    return None
- 
 #LSBACKEND API
 
 # def get_levels(request):
@@ -353,13 +341,16 @@ class UploadFileView(View):
                 'image_count': int(user_pref.last_image_count),
             }
 
+            # Priorities are an admin option; everyone else gets normal priority
+            priority = request.POST.get('priority') if request.user.is_admin else None
+
             try:
-                process_scraping_task(task_id=task.id, form_data=form_data)
+                submit_scraping_task(task, form_data=form_data, priority=priority)
                 logger.info(f"Sites Gathering task {task.id} created and queued, project ID: {task.project_id}")
                 messages.success(request, 'Task created successfully!')
                 return redirect('task_list')
             except Exception as e:
-                logger.error(f"Failed to start the Sites Gathering task for task_id {task.id}: {str(e)}", exc_info=True)
+                logger.error(f"Failed to queue the Sites Gathering task for task_id {task.id}: {str(e)}", exc_info=True)
                 messages.error(request, "Failed to start the Sites Gathering task. Please try again.")
                 raise
 
@@ -372,8 +363,8 @@ class TaskDetailView(View):
             user = request.user
             
             # Check basic permissions
-            if not (user.is_superuser or 
-                   user.roles.filter(role__in=['ADMIN', 'AMBASSADOR']).exists()):
+            permissions = get_user_permissions(user)
+            if not permissions['can_edit']:
                 return render(
                     request,
                     'automation/error.html',
@@ -381,18 +372,9 @@ class TaskDetailView(View):
                     status=403
                 )
 
-            api_url = f"{request.scheme}://{request.get_host()}/api/tasks/{id}/detailed_view/"
-            response = requests.get(
-                api_url,
-                cookies=request.COOKIES,
-                headers={
-                    'X-CSRFToken': request.COOKIES.get('csrftoken'),
-                    'Accept': 'application/json'
-                }
-            )
-
-            if response.status_code != 200:
-                logger.error(f"API request failed with status {response.status_code}")
+            try:
+                api_data = get_task_detail(id, user, permissions=permissions)
+            except ScrapingTask.DoesNotExist:
                 return render(
                     request,
                     'automation/error.html',
@@ -400,8 +382,6 @@ class TaskDetailView(View):
                     status=404
                 )
 
-            api_data = response.json()
-            
             # Calculate empty descriptions from API data
             empty_descriptions = sum(
                 1 for business in api_data['businesses'] 
@@ -478,7 +458,7 @@ def update_main_task_status(task):
     return new_status
 
 @method_decorator(login_required, name='dispatch')
-@method_decorator(user_passes_test(lambda u: u.is_superuser or u.roles.filter(role='ADMIN').exists()), name='dispatch')
+@method_decorator(user_passes_test(is_admin), name='dispatch')
 class TranslateBusinessesView(View):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1057,7 +1037,7 @@ def admin_view(request):
 
 @login_required
 def ambassador_view(request):
-    if not request.user.roles.filter(role='AMBASSADOR').exists():
+    if not get_permissions(request.user).is_ambassador:
         return redirect('login')
     
     destination = request.user.destination
@@ -1065,7 +1045,7 @@ def ambassador_view(request):
     return render(request, 'automation/ambassador_template.html', {'businesses': businesses})
 
 @method_decorator(login_required, name='dispatch')
-@method_decorator(user_passes_test(lambda u: u.roles.filter(role='AMBASSADOR').exists()), name='dispatch')
+@method_decorator(user_passes_test(lambda u: get_permissions(u).is_ambassador), name='dispatch')
 class AmbassadorDashboardView(View):
     def get(self, request):
         ambassador = request.user
@@ -1127,11 +1107,11 @@ class AmbassadorDashboardView(View):
 @login_required
 def ambassador_businesses(request):
     # Check if the user is an ambassador or an admin
-    if not request.user.roles.filter(role='AMBASSADOR').exists() and not request.user.is_superuser:
+    if not get_permissions(request.user).is_ambassador and not request.user.is_superuser:
         return redirect('login')  # Redirect non-ambassadors and non-admins elsewhere
 
     # Get the ambassador's destinations and cities
-    ambassador_destinations = request.user.destinations.all()
+    ambassador_destinations = get_permissions(request.user).destination_ids
  
 
     # Filter businesses based on ambassador's destinations and cities
@@ -1304,31 +1284,24 @@ class DashboardView(View):
     
     def get(self, request):
         user = request.user
-        context = self.get_common_context()
- 
+        service = DashboardService()
+
         # Determine user role
-        is_admin = user.is_superuser or user.roles.filter(role='ADMIN').exists()
-        is_ambassador = user.roles.filter(role='AMBASSADOR').exists()
+        permissions = get_permissions(user)
+        is_admin = permissions.is_admin
+        is_ambassador = permissions.is_ambassador
         is_staff = user.is_staff
         is_superuser = user.is_superuser
 
-        # Add role-specific context
-        if is_admin or is_staff or is_superuser:
-            context.update(self.get_admin_context())
-        elif is_ambassador:
-            context.update(self.get_ambassador_context(user))
-        else:
-            context.update(self.get_user_context(user))
-
-        # Fetch and paginate tasks, with ambassador-specific filtering
+        # Tasks and businesses in scope, for the ambassador counters
         if is_admin:
             tasks = ScrapingTask.objects.all().order_by('-created_at')
             businesses = Business.objects.all()
         elif is_ambassador:
-            ambassador_destinations = user.destinations.all()
-            ambassador_city_names = ambassador_destinations.values_list('name', flat=True)
+            ambassador_destinations = permissions.destination_ids
+            ambassador_city_names = Destination.objects.filter(id__in=ambassador_destinations).values_list('name', flat=True)
             tasks = ScrapingTask.objects.filter(
-                Q(destination__in=ambassador_destinations) | Q(destination_name__in=ambassador_city_names)
+                Q(destination_id__in=ambassador_destinations) | Q(destination_name__in=ambassador_city_names)
             ).order_by('-created_at')
             businesses = Business.objects.filter(
                 Q(form_destination_id__in=ambassador_destinations) |
@@ -1338,12 +1311,29 @@ class DashboardView(View):
             tasks = ScrapingTask.objects.none()
             businesses = Business.objects.none()
 
+        # One aggregate query per table; admins see everything, so the global
+        # counters double as their scoped counters
+        all_task_counts = service.get_task_counts()
+        all_business_counts = service.get_business_counts()
+        task_counts = all_task_counts if is_admin else service.get_task_counts(tasks)
+        business_counts = all_business_counts if is_admin else service.get_business_counts(businesses)
+
+        context = self.get_common_context(all_task_counts, all_business_counts)
+
+        # Add role-specific context
+        if is_admin or is_staff or is_superuser:
+            context.update(self.get_admin_context(all_business_counts))
+        elif is_ambassador:
+            context.update(self.get_ambassador_context(user))
+        else:
+            context.update(self.get_user_context(user))
+
        # Get task counts and percentages
-        completed_count = tasks.filter(status='COMPLETED').count()
-        in_progress_count = tasks.filter(status='IN_PROGRESS').count()
-        pending_count = tasks.filter(status='PENDING').count()
-        task_done_count = tasks.filter(status='TASK_DONE').count()
-        total_count = tasks.count()
+        completed_count = task_counts['by_status']['COMPLETED']
+        in_progress_count = task_counts['by_status']['IN_PROGRESS']
+        pending_count = task_counts['by_status']['PENDING']
+        task_done_count = task_counts['by_status']['TASK_DONE']
+        total_count = task_counts['all']
         
         # Calculate task percentages
         if total_count > 0:
@@ -1354,21 +1344,14 @@ class DashboardView(View):
 
         # Get business status counts
         business_status_counts = {
-            'pending': businesses.filter(status='PENDING').count(),
-            'reviewed': businesses.filter(status='REVIEWED').count(),
-            'in_production': businesses.filter(status='IN_PRODUCTION').count(),
-            'discarded': businesses.filter(status='DISCARDED').count()
+            'pending': business_counts['by_status']['PENDING'],
+            'reviewed': business_counts['by_status']['REVIEWED'],
+            'in_production': business_counts['by_status']['IN_PRODUCTION'],
+            'discarded': business_counts['by_status']['DISCARDED']
         }
 
-        # Paginate tasks
-        paginator = Paginator(tasks, 1000000)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-
-        # Update context with all data
+        # The task list itself is paged client-side from /api/tasks/filter/
         context.update({
-            'tasks': page_obj.object_list,
-            'page_obj': page_obj,
             'is_admin': is_admin,
             'is_ambassador': is_ambassador,
             'is_staff': is_staff,
@@ -1420,19 +1403,17 @@ class DashboardView(View):
                 'destination': destination_name
             }
         
-    def get_common_context(self):
+    def get_common_context(self, task_counts=None, business_counts=None):
         context = {}
         try:
-            translation_status_counts = ScrapingTask.objects.values('translation_status').annotate(count=Count('id')).order_by()
+            service = DashboardService()
+            task_counts = task_counts or service.get_task_counts()
+            business_counts = business_counts or service.get_business_counts()
+            by_status = task_counts['by_status']
 
             # Get total counts with proper filtering
-            context['total_projects'] = ScrapingTask.objects.filter(
-                status__in=['PENDING', 'IN_PROGRESS', 'COMPLETED', 'FAILED', 'TASK_DONE']
-            ).count()
-            
-            context['total_businesses'] = Business.objects.filter(
-                status__in=['PENDING', 'REVIEWED', 'IN_PRODUCTION']
-            ).count()
+            context['total_projects'] = task_counts['total']
+            context['total_businesses'] = business_counts['total']
             
             context['available_destinations'] = list(Destination.objects.values('id', 'name'))
             context['destination_categories'] = {
@@ -1449,74 +1430,24 @@ class DashboardView(View):
                 },
                 'total_businesses': 0
             }   
-            # Get status counts with explicit filtering
-            status_counts = ScrapingTask.objects.values('status').annotate(
-                count=Count('id', distinct=True)  # Use distinct to avoid duplicates
-            ).filter(
-                status__in=['PENDING', 'IN_PROGRESS', 'COMPLETED', 'FAILED', 'TASK_DONE']
-            ).order_by()
 
-            # Debug logging
-            logger.debug(f"Raw status counts: {list(status_counts)}")
-
-            # Initialize counters
-            context['pending_projects'] = 0
-            context['ongoing_projects'] = 0
-            context['completed_projects'] = 0
-            context['failed_projects'] = 0
-            context['task_done'] = 0
-            context['translated_projects'] = next((item['count'] for item in translation_status_counts if item['translation_status'] == 'TRANSLATED'), 0)
-            
-
-            # Assign counts with validation
-            for item in status_counts:
-                if item['status'] == 'PENDING':
-                    context['pending_projects'] = item['count']
-                elif item['status'] == 'IN_PROGRESS':
-                    context['ongoing_projects'] = item['count']
-                elif item['status'] == 'COMPLETED':
-                    context['completed_projects'] = item['count']
-                elif item['status'] == 'FAILED':
-                    context['failed_projects'] = item['count']
-
-            # Verify total matches sum of individual counts
-            total_from_status = (
-                context['pending_projects'] +
-                context['ongoing_projects'] +
-                context['completed_projects'] +
-                context['task_done'] +
-                context['failed_projects']
-            )
-
-            logger.debug(f"Total projects from sum: {total_from_status}")
-            logger.debug(f"Total projects from direct count: {context['total_projects']}")
-
-            if total_from_status != context['total_projects']:
-                logger.warning(
-                    f"Task count mismatch: sum({total_from_status}) != "
-                    f"total({context['total_projects']})"
-                )
+            context['pending_projects'] = by_status['PENDING']
+            context['ongoing_projects'] = by_status['IN_PROGRESS']
+            context['completed_projects'] = by_status['COMPLETED']
+            context['failed_projects'] = by_status['FAILED']
+            context['task_done'] = by_status['TASK_DONE']
+            context['translated_projects'] = task_counts['translated']
 
             # Get recent projects with proper ordering and limit
             context['projects'] = ScrapingTask.objects.filter(
-                status__in=['PENDING', 'IN_PROGRESS', 'COMPLETED', 'FAILED','TASK_DONE']
+                status__in=TASK_STATUSES
             ).order_by('-created_at')[:5]
 
             # Add timeline data
             context['timeline_data'] = json.dumps(self.get_timeline_data(), cls=DjangoJSONEncoder)
 
-            # Get status counts for chart with validation
-            status_counts_chart = ScrapingTask.objects.values('status').annotate(
-                count=Count('id', distinct=True)
-            ).filter(
-                status__in=['PENDING', 'IN_PROGRESS', 'COMPLETED', 'FAILED','TASK_DONE']
-            ).order_by()
-
-            context['status_counts'] = {
-                item['status']: item['count'] 
-                for item in status_counts_chart 
-                if item['status'] in ['PENDING', 'IN_PROGRESS', 'COMPLETED', 'FAILED','TASK_DONE']
-            }
+            # Status counts for chart
+            context['status_counts'] = {status: by_status[status] for status in TASK_STATUSES}
 
             # Additional statistics with validation
             if context['total_projects'] > 0:
@@ -1530,12 +1461,8 @@ class DashboardView(View):
                 context['avg_businesses_per_task'] = 0
                 context['completion_rate'] = 0
 
-            # Recent tasks count with proper date filtering
-            seven_days_ago = timezone.now() - timezone.timedelta(days=7)
-            context['recent_tasks_count'] = ScrapingTask.objects.filter(
-                created_at__gte=seven_days_ago,
-                status__in=['PENDING', 'IN_PROGRESS', 'COMPLETED', 'FAILED','TASK_DONE']
-            ).count()
+            # Tasks created in the last 7 days
+            context['recent_tasks_count'] = task_counts['recent']
 
             # Debug logging
             logger.debug(f"Final context counts: {context}")
@@ -1549,117 +1476,40 @@ class DashboardView(View):
 
         return context
 
-    def get_admin_context(self):
-        ambassador_count = CustomUser.objects.filter(roles__role='AMBASSADOR').count()
+    def get_admin_context(self, business_counts=None):
+        business_counts = business_counts or DashboardService().get_business_counts()
+        user_counts = CustomUser.objects.aggregate(
+            total=Count('id', distinct=True),
+            ambassadors=Count('id', filter=Q(roles__role='AMBASSADOR'), distinct=True)
+        )
 
         return {
-            'total_users': CustomUser.objects.count(),
-            'total_businesses': Business.objects.count(),
+            'total_users': user_counts['total'],
+            'total_businesses': business_counts['all'],
             'total_destinations': Destination.objects.count(),
-            'businesses': Business.objects.all(),
             'user_role': UserRole.objects.count(),
-            'ambassador_count': ambassador_count,
+            'ambassador_count': user_counts['ambassadors'],
         }
 
     def get_ambassador_context(self, user):
-        # Fetch businesses that match either the destination or the city name for ambassadors
         ambassador_destinations = user.destinations.all()
-        ambassador_city_names = ambassador_destinations.values_list('name', flat=True)
 
         return {
-            'businesses': Business.objects.filter(
-                Q(form_destination_id__in=ambassador_destinations) | Q(city__in=ambassador_city_names)
-            ),
             'ambassador_destinations': ambassador_destinations,
         }
 
     def get_timeline_data(self):
         """Get accurate timeline data for tasks and businesses"""
         try:
-            # Get data for the last 30 days
-            end_date = timezone.now()
+            # Get data for the last 60 days
+            end_date = timezone.localdate()
             start_date = end_date - timezone.timedelta(days=60)
-            
-            # Get daily counts with proper aggregation
-            timeline_data = (
-                ScrapingTask.objects.filter(
-                    created_at__gte=start_date,
-                    created_at__lte=end_date
-                )
-                .annotate(
-                    date=TruncDate('created_at')
-                )
-                .values('date')
-                .annotate(
-                    task_count=Count('id', distinct=True),
-                    business_count=Count('businesses', distinct=True)
-                )
-                .order_by('date')
-            )
-
-            # Verify specific date counts
-            specific_date = timezone.datetime(2024, 12, 30).date()
-            specific_date_data = (
-                ScrapingTask.objects.filter(
-                    created_at__date=specific_date
-                ).aggregate(
-                    task_count=Count('id', distinct=True),
-                    business_count=Count('businesses', distinct=True)
-                )
-            )
-            
-            logger.debug(f"Specific date (30-12-2024) counts: {specific_date_data}")
-            
-            # Get specific task details - using project_title instead of title
-            task_details = ScrapingTask.objects.filter(
-                id__in=[397, 398, 399]
-            ).annotate(
-                business_count=Count('businesses')
-            ).values('id', 'project_title', 'business_count', 'created_at')
-            
-            logger.debug(f"Specific task details: {task_details}")
-            
-            # Format data for chart
-            dates = []
-            tasks = []
-            businesses = []
-            
-            # Fill in data for each day
-            current_date = start_date.date()
-            while current_date <= end_date.date():
-                dates.append(current_date.strftime('%Y-%m-%d'))
-                
-                # Get data for current date
-                day_data = next(
-                    (item for item in timeline_data if item['date'] == current_date),
-                    {'task_count': 0, 'business_count': 0}
-                )
-                
-                tasks.append(day_data['task_count'])
-                businesses.append(day_data['business_count'])
-                
-                current_date += timezone.timedelta(days=1)
-
-            # Log the final counts for verification
-            logger.debug(f"Timeline data summary:")
-            logger.debug(f"Date range: {start_date.date()} to {end_date.date()}")
-            logger.debug(f"Total tasks in period: {sum(tasks)}")
-            logger.debug(f"Total businesses in period: {sum(businesses)}")
-            
-            # Verify latest day's counts
-            latest_date = end_date.date()
-            latest_counts = ScrapingTask.objects.filter(
-                created_at__date=latest_date
-            ).aggregate(
-                task_count=Count('id', distinct=True),
-                business_count=Count('businesses', distinct=True)
-            )
-            logger.debug(f"Latest day ({latest_date}) counts: {latest_counts}")
+            timeline = daily_activity.get_timeline(start_date, end_date)
 
             return {
-                'dates': dates,
-                'tasks': tasks,
-                'businesses': businesses
+                'dates': timeline['dates'],
+                'tasks': timeline['tasks'],
+                'businesses': timeline['businesses']
             }
 
         except Exception as e:
@@ -1743,58 +1593,7 @@ class GetTimelineDataView(View):
             start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
             end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
             
-            # Get timeline data
-            timeline_data = (
-                ScrapingTask.objects.filter(
-                    created_at__date__gte=start_date,
-                    created_at__date__lte=end_date
-                )
-                .annotate(
-                    date=TruncDate('created_at')
-                )
-                .values('date')
-                .annotate(
-                    task_count=Count('id', distinct=True),
-                    business_count=Count('businesses', distinct=True)
-                )
-                .order_by('date')
-            )
-            
-            # Calculate totals
-            totals = ScrapingTask.objects.filter(
-                created_at__date__gte=start_date,
-                created_at__date__lte=end_date
-            ).aggregate(
-                total_tasks=Count('id', distinct=True),
-                total_businesses=Count('businesses', distinct=True)
-            )
-            
-            # Format data for chart
-            dates = []
-            tasks = []
-            businesses = []
-            
-            current_date = start_date
-            while current_date <= end_date:
-                dates.append(current_date.strftime('%Y-%m-%d'))
-                
-                day_data = next(
-                    (item for item in timeline_data if item['date'] == current_date),
-                    {'task_count': 0, 'business_count': 0}
-                )
-                
-                tasks.append(day_data['task_count'])
-                businesses.append(day_data['business_count'])
-                
-                current_date += timezone.timedelta(days=1)
-            
-            return JsonResponse({
-                'dates': dates,
-                'tasks': tasks,
-                'businesses': businesses,
-                'total_tasks': totals['total_tasks'],
-                'total_businesses': totals['total_businesses']
-            })
+            return JsonResponse(daily_activity.get_timeline(start_date, end_date))
             
         except Exception as e:
             logger.error(f"Error in GetTimelineDataView: {str(e)}")
@@ -1883,50 +1682,7 @@ class DashboardViewSet(ViewSet):
             start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
             end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
 
-            timeline_data = (
-                ScrapingTask.objects.filter(
-                    created_at__date__gte=start_date,
-                    created_at__date__lte=end_date
-                )
-                .annotate(date=TruncDate('created_at'))
-                .values('date')
-                .annotate(
-                    task_count=Count('id', distinct=True),
-                    business_count=Count('businesses', distinct=True)
-                )
-                .order_by('date')
-            )
-
-            totals = ScrapingTask.objects.filter(
-                created_at__date__gte=start_date,
-                created_at__date__lte=end_date
-            ).aggregate(
-                total_tasks=Count('id', distinct=True),
-                total_businesses=Count('businesses', distinct=True)
-            )
-
-            dates = []
-            tasks = []
-            businesses = []
-
-            current_date = start_date
-            while current_date <= end_date:
-                dates.append(current_date.strftime('%Y-%m-%d'))
-                day_data = next(
-                    (item for item in timeline_data if item['date'] == current_date),
-                    {'task_count': 0, 'business_count': 0}
-                )
-                tasks.append(day_data['task_count'])
-                businesses.append(day_data['business_count'])
-                current_date += timezone.timedelta(days=1)
-
-            return Response({
-                'dates': dates,
-                'tasks': tasks,
-                'businesses': businesses,
-                'total_tasks': totals['total_tasks'],
-                'total_businesses': totals['total_businesses']
-            })
+            return Response(daily_activity.get_timeline(start_date, end_date))
 
         except Exception as e:
             logger.error(f"Error in timeline_data view: {str(e)}")
@@ -2081,54 +1837,23 @@ class CustomPasswordChangeDoneView(PasswordChangeDoneView):
     template_name = 'automation/password_change_done.html'
  
 def is_admin_or_ambassador(user):
-    return user.is_superuser or user.roles.filter(role__in=['ADMIN', 'AMBASSADOR']).exists()
+    return get_permissions(user).is_admin_or_ambassador
 
 #########USER###################USER###################USER###################USER##########
   
 @login_required
 def task_list(request):
     """
-    Shows only the latest 50 tasks if no search param is provided,
-    or the fully filtered results if a search param is present.
-    Also applies role-based constraints for ADMIN, AMBASSADOR, etc.
+    Task list page. Rows are fetched by the page itself from
+    /api/tasks/filter/, one keyset page at a time, with the role-based
+    constraints for ADMIN, AMBASSADOR, etc. applied there.
     """
 
-    user = request.user
-
-    # 1) Base queryset according to user role
-    if user.is_superuser or user.roles.filter(role='ADMIN').exists():
-        queryset = ScrapingTask.objects.all()
-    elif user.roles.filter(role='AMBASSADOR').exists():
-        ambassador_destinations = user.destinations.all()
-        queryset = ScrapingTask.objects.filter(destination__in=ambassador_destinations)
-    else:
-        queryset = ScrapingTask.objects.none()
-
-    # 2) Check for search parameters
     search_destination = request.GET.get('destination', '').strip()
     search_country = request.GET.get('country', '').strip()
     search_status = request.GET.get('status', '').strip()
 
-    # If user provided search terms, filter the queryset
-    if search_destination or search_country or search_status:
-        if search_destination:
-            queryset = queryset.filter(destination_name__icontains=search_destination)
-        if search_country:
-            queryset = queryset.filter(country_name__icontains=search_country)
-        if search_status:
-            queryset = queryset.filter(status__iexact=search_status)
-    else:
-        # No search => only show the latest 50 tasks for minimal initial load time
-        queryset = queryset.order_by('-id')[:50]
-
-    # 3) Paginate the results
-    paginator = Paginator(queryset, 100000)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
     return render(request, 'automation/task_list.html', {
-        'tasks': page_obj.object_list,
-        'page_obj': page_obj,
         'search_destination': search_destination,
         'search_country': search_country,
         'search_status': search_status,
@@ -2144,9 +1869,9 @@ class BusinessViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        if user.roles.filter(role='ADMIN').exists():
+        if get_permissions(user).has_role('ADMIN'):
             return Business.objects.all()
-        elif user.roles.filter(role='AMBASSADOR').exists():
+        elif get_permissions(user).is_ambassador:
             return Business.objects.filter(city=user.destination)
         return Business.objects.none()
 
@@ -2524,39 +2249,10 @@ def update_business_statuses(request):
             affected_tasks = set()
             updated_businesses = []
             errors = []
-            moved_to_app_businesses = []
-            validation_errors = []
-            move_to_app_errors = []
 
-            # Pre-validation phase for IN_PRODUCTION moves
+            # Moves to production are published to Local Secrets in the background
             if new_status == 'IN_PRODUCTION':
-                for business_id in business_ids:
-                    try:
-                        business = get_object_or_404(Business, id=business_id)
-                        missing_descriptions = []
-
-                        # Validate required descriptions
-                        if not business.description or not business.description.strip():
-                            missing_descriptions.append('Original description')
-                        if not business.description_eng or not business.description_eng.strip():
-                            missing_descriptions.append('English description')
-                        if not business.description_esp or not business.description_esp.strip():
-                            missing_descriptions.append('Spanish description')
-                        if not business.description_fr or not business.description_fr.strip():
-                            missing_descriptions.append('French description')
-
-                        if missing_descriptions:
-                            validation_errors.append({
-                                'business_id': business_id,
-                                'business_title': business.title or f"Business {business_id}",
-                                'missing_fields': missing_descriptions
-                            })
-
-                    except Business.DoesNotExist:
-                        validation_errors.append({
-                            'business_id': business_id,
-                            'error': 'Business not found'
-                        })
+                validation_errors = validate_for_production(business_ids)
 
                 # If there are validation errors, return them without processing
                 if validation_errors:
@@ -2568,6 +2264,30 @@ def update_business_statuses(request):
                         'failed_validations': len(validation_errors)
                     }, status=400)
 
+                user = CustomUser.objects.filter(id=int(user_id)).first()
+                if not user:
+                    return JsonResponse({
+                        'success': False,
+                        'error': f'User {user_id} not found'
+                    }, status=400)
+
+                with transaction.atomic():
+                    job = MoveToAppJob.objects.create(
+                        user=user,
+                        business_ids=[int(business_id) for business_id in business_ids],
+                        total=len(business_ids)
+                    )
+                    transaction.on_commit(lambda: publish_move_to_app_job.delay(job.id))
+
+                logger.info(f"Queued move to app job {job.id} for {len(business_ids)} businesses")
+                return JsonResponse({
+                    'success': True,
+                    'queued': True,
+                    'job_id': job.id,
+                    'status_url': reverse('move_to_app_job_status', args=[job.id]),
+                    'total_requested': len(business_ids)
+                }, status=202)
+
             # Main processing phase
             with transaction.atomic():
                 for business_id in business_ids:
@@ -2575,203 +2295,20 @@ def update_business_statuses(request):
                         business = get_object_or_404(Business, id=business_id)
                         old_status = business.status
 
-                        # Handle IN_PRODUCTION logic
-                        if new_status == 'IN_PRODUCTION':
-                            try:
-                                # Process types
-                                types_sources = [
-                                    business.types,
-                                    getattr(business, 'types_eng', None),
-                                    getattr(business, 'types_esp', None),
-                                    getattr(business, 'types_fr', None)
-                                ]
-                                
-                                all_types = []
-                                for types_str in types_sources:
-                                    if types_str:
-                                        types_list = [t.strip() for t in types_str.split(',')]
-                                        all_types.extend(types_list)
-
-                                processed_types = process_scraped_types(all_types, business.main_category)
-
-                                # Prepare business data
-                                business_data = model_to_dict(business)
-                                business_data['types'] = processed_types
-                                
-                                if not business_data.get('language'):
-                                    business_data['language'] = 'en'
-
-                                # Format operating hours
-                                if business_data.get('operating_hours'):
-                                    try:
-                                        formatted_hours = format_operating_hours(business_data['operating_hours'])
-                                        business_data['operating_hours'] = formatted_hours
-                                    except Exception as e:
-                                        logger.error(f"Error formatting operating hours for business {business_id}: {str(e)}")
-                                        move_to_app_errors.append({
-                                            'business_id': business_id,
-                                            'business_title': business.title or f"Business {business_id}",
-                                            'error': f"Operating hours formatting error: {str(e)}"
-                                        })
-                                        continue
-
-                                # Add required IDs and relationships
-                                task_obj = business.task
-                                business_data["level_id"] = task_obj.level.ls_id
-
-                                # Category handling
-                                try:
-                                    task_level = business.task.level
-                                    
-                                    # Handle main category
-                                    main_category = get_category_by_title(
-                                        title=business.main_category,
-                                        level=task_level
-                                    )
-                                    
-                                    if not main_category:
-                                        move_to_app_errors.append({
-                                            'business_id': business_id,
-                                            'business_title': business.title or f"Business {business_id}",
-                                            'error': f"Main category not found: {business.main_category}"
-                                        })
-                                        continue
-                                        
-                                    business_data["category_id"] = main_category.ls_id
-                                    
-                                    # Handle subcategory
-                                    if business.tailored_category:
-                                        sub_category = get_category_by_title(
-                                            title=business.tailored_category,
-                                            level=task_level,
-                                            parent=main_category
-                                        )
-                                        
-                                        if sub_category:
-                                            business_data["sub_category_id"] = sub_category.ls_id
-                                        else:
-                                            logger.warning(
-                                                f"Subcategory not found for business {business_id}: {business.tailored_category}"
-                                            )
-
-                                except Exception as e:
-                                    move_to_app_errors.append({
-                                        'business_id': business_id,
-                                        'business_title': business.title or f"Business {business_id}",
-                                        'error': f"Category processing error: {str(e)}"
-                                    })
-                                    continue
-
-                                # City and Country handling
-                                try:
-                                    destination = get_object_or_404(Destination, name__iexact=business.city)
-                                    business_data["city_id"] = destination.ls_id
-                                    
-                                    country_obj = get_object_or_404(Country, name__iexact=business.country)
-                                    business_data["country_id"] = country_obj.ls_id
-                                    country_data = model_to_dict(country_obj)
-                                except Exception as e:
-                                    move_to_app_errors.append({
-                                        'business_id': business_id,
-                                        'business_title': business.title or f"Business {business_id}",
-                                        'error': f"Location mapping error: {str(e)}"
-                                    })
-                                    continue
-
-                                # User and images
-                                try:
-                                    user = CustomUser.objects.filter(id=int(user_id)).first()
-                                    if not user:
-                                        move_to_app_errors.append({
-                                            'business_id': business_id,
-                                            'business_title': business.title or f"Business {business_id}",
-                                            'error': f"User {user_id} not found"
-                                        })
-                                        continue
-
-                                    user_data = model_to_dict(user)
-                                    image_urls = list(
-                                        Image.objects.filter(
-                                            business=business_id,
-                                            is_approved=True
-                                        ).values_list('image_url', flat=True)
-                                    )
-
-                                    result_data = {
-                                        **business_data,
-                                        'country': country_data,
-                                        'user': user_data,
-                                        'images_urls': image_urls
-                                    }
-
-                                    app_data = json.dumps(result_data, default=datetime_serializer)
-                                    
-                                    # Attempt to move to Local Secrets
-                                    try:
-                                        RequestClient().request('move-to-app', app_data)
-                                        moved_to_app_businesses.append({
-                                            'business_id': business_id,
-                                            'business_title': business.title or f"Business {business_id}"
-                                        })
-                                        logger.info(f"Successfully moved business {business_id} to Local Secrets")
-                                        
-                                    except Exception as first_error:
-                                        # Retry without types
-                                        try:
-                                            result_data_without_types = result_data.copy()
-                                            removed_types = result_data_without_types.pop('types', '')
-                                            
-                                            app_data_without_types = json.dumps(result_data_without_types, default=datetime_serializer)
-                                            RequestClient().request('move-to-app', app_data_without_types)
-                                            
-                                            moved_to_app_businesses.append({
-                                                'business_id': business_id,
-                                                'business_title': business.title or f"Business {business_id}",
-                                                'warning': f'Moved without types: {removed_types}'
-                                            })
-                                            logger.warning(f"Business {business_id} moved to Local Secrets without types")
-                                            
-                                        except Exception as second_error:
-                                            move_to_app_errors.append({
-                                                'business_id': business_id,
-                                                'business_title': business.title or f"Business {business_id}",
-                                                'error': f"Failed to move to Local Secrets: {str(second_error)}"
-                                            })
-                                            logger.error(f"Failed to move business {business_id} to Local Secrets: {str(second_error)}")
-                                            continue
-
-                                except Exception as e:
-                                    move_to_app_errors.append({
-                                        'business_id': business_id,
-                                        'business_title': business.title or f"Business {business_id}",
-                                        'error': f"Data preparation error: {str(e)}"
-                                    })
-                                    continue
-
-                            except Exception as e:
-                                move_to_app_errors.append({
-                                    'business_id': business_id,
-                                    'business_title': business.title or f"Business {business_id}",
-                                    'error': f"Processing error: {str(e)}"
-                                })
-                                continue
-
-                        # Update status only if IN_PRODUCTION processing succeeded or for other statuses
-                        if new_status != 'IN_PRODUCTION' or any(item['business_id'] == business_id for item in moved_to_app_businesses):
-                            business.status = new_status
-                            business.save()
-                            
-                            if business.task:
-                                affected_tasks.add(business.task)
-                            
-                            updated_businesses.append({
-                                'id': business.id,
-                                'old_status': old_status,
-                                'new_status': new_status,
-                                'title': business.title or f"Business {business_id}"
-                            })
-                            
-                            logger.info(f"Business {business_id} status updated: {old_status} -> {new_status}")
+                        business.status = new_status
+                        business.save()
+
+                        if business.task:
+                            affected_tasks.add(business.task)
+
+                        updated_businesses.append({
+                            'id': business.id,
+                            'old_status': old_status,
+                            'new_status': new_status,
+                            'title': business.title or f"Business {business_id}"
+                        })
+
+                        logger.info(f"Business {business_id} status updated: {old_status} -> {new_status}")
                     
                     except Business.DoesNotExist:
                         error_msg = f"Business {business_id} not found"
@@ -2809,26 +2346,12 @@ def update_business_statuses(request):
                 'total_requested': len(business_ids)
             }
 
-            # Add move to app specific data
-            if new_status == 'IN_PRODUCTION':
-                response_data.update({
-                    'moved_to_app_count': len(moved_to_app_businesses),
-                    'moved_to_app_businesses': moved_to_app_businesses,
-                    'move_to_app_errors': move_to_app_errors,
-                    'move_to_app_failed_count': len(move_to_app_errors)
-                })
-
             if errors:
                 response_data['errors'] = errors
                 response_data['error_count'] = len(errors)
 
             # Determine overall success status
-            if new_status == 'IN_PRODUCTION':
-                total_success = len(moved_to_app_businesses)
-                total_failures = len(move_to_app_errors) + len(errors)
-                response_data['partial_success'] = total_success > 0 and total_failures > 0
-            else:
-                response_data['partial_success'] = len(updated_businesses) > 0 and len(errors) > 0
+            response_data['partial_success'] = len(updated_businesses) > 0 and len(errors) > 0
 
             logger.info(
                 f"Bulk status update completed: "
@@ -2854,6 +2377,19 @@ def update_business_statuses(request):
         'success': False,
         'error': 'Invalid request method.'
     }, status=405)
+
+
+@login_required
+@require_GET
+def move_to_app_job_status(request, job_id):
+    """Progress of a bulk move to production, polled by the task detail page."""
+    job = get_object_or_404(MoveToAppJob, id=job_id)
+    if job.user_id != request.user.id and not get_permissions(request.user).is_admin:
+        return JsonResponse({
+            'success': False,
+            'error': 'You do not have permission to view this job.'
+        }, status=403)
+    return JsonResponse(move_to_app_job_response(job))
  
 def update_task_status(task, instance):
     """Update the task status based on its businesses' statuses"""
@@ -2942,50 +2478,13 @@ def submit_feedback(request, business_id):
 @login_required
 def business_list(request):
     """
-    Shows only the latest 50 businesses if no search param is provided,
-    or the fully filtered results if a search param is present.
-    Also applies role-based constraints for ADMIN, AMBASSADOR, etc.
+    Business list page. Rows are fetched by the page itself from
+    /api/businesses/advanced_filter/, one keyset page at a time, with the
+    role-based constraints for ADMIN, AMBASSADOR, etc. applied there.
     """
-
-    # 1) Base queryset according to user role
-    user = request.user
-    if user.is_superuser or user.roles.filter(role='ADMIN').exists():
-        queryset = Business.objects.all()
-    elif user.roles.filter(role='AMBASSADOR').exists():
-        ambassador_destinations = user.destinations.all()
-        ambassador_city_names = ambassador_destinations.values_list('name', flat=True)
-        queryset = Business.objects.filter(
-            Q(form_destination_id__in=ambassador_destinations) | Q(city__in=ambassador_city_names)
-        )
-    else:
-        queryset = Business.objects.none()
-
-    # 2) Check if there is a search param
     search_query = request.GET.get('search', '').strip()
 
-    # If user provided a search term, filter the entire queryset
-    if search_query:
-        queryset = queryset.filter(
-            Q(title__icontains=search_query)
-            | Q(category_name__icontains=search_query)
-            | Q(address__icontains=search_query)
-            | Q(city__icontains=search_query) 
-        )
-    else:
-        # No search => only show, say, the latest 50 (or any custom subset)
-        # for a minimal initial load time.
-        # You can pick any ordering or limit you prefer:
-        queryset = queryset.order_by('-id')[:50]
-
-    # 3) Paginate
-    # Keep the high limit 100000 if you want, or a smaller chunk, as you prefer
-    paginator = Paginator(queryset, 100000)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
     return render(request, 'automation/business_list.html', {
-        'businesses': page_obj.object_list,
-        'page_obj': page_obj,
         'search_query': search_query,
     })
  
@@ -3044,7 +2543,7 @@ def business_detail(request, business_id):
 
     status_availability = {status_key: any(b.status == status_key for b in task_businesses) for status_key in available_statuses_dict.keys()}
 
-    is_admin = request.user.is_superuser or request.user.roles.filter(role='ADMIN').exists()
+    is_admin = get_permissions(request.user).is_admin
 
     main_categories = Category.objects.filter(parent__isnull=True)
     subcategories = Category.objects.filter(parent__isnull=False)
@@ -3211,7 +2710,7 @@ def update_businesses(request):
         return JsonResponse(response_data)
     
 @login_required
-@user_passes_test(lambda u: u.is_superuser or u.roles.filter(role='ADMIN').exists())
+@user_passes_test(is_admin)
 def edit_business(request, business_id):
     try:
         business = Business.objects.get(id=business_id)
@@ -3235,7 +2734,7 @@ def edit_business(request, business_id):
         return redirect('business_list')
  
 @login_required
-@user_passes_test(lambda u: u.is_superuser or u.roles.filter(role='ADMIN').exists())
+@user_passes_test(is_admin)
 def delete_business(request, business_id):
     try:
         business = Business.objects.get(id=business_id)
@@ -3403,12 +2902,7 @@ def generate_description(request):
 
             logger.debug("Constructed system and user prompts for OpenAI request.")
 
-            valid_openai_key = get_available_openai_key()
-
-            if valid_openai_key:
-                openai.api_key = valid_openai_key
-                logger.debug(f"OpenAI API Key set? {'Yes' if openai.api_key else 'No'}")
-            else:
+            if not get_openai_key_pool().has_usable_key():
                 logger.critical("Failed to access OpenAI API due to no available API keys.")
                 return JsonResponse({'success': False, 'error': 'No available OpenAI API keys.'})
             
@@ -3711,7 +3205,7 @@ def update_image_approval(request):
  
 
 @login_required
-@user_passes_test(lambda u: u.is_superuser or u.roles.filter(role='ADMIN').exists() or u.roles.filter(role='AMBASSADOR').exists())
+@user_passes_test(is_admin_or_ambassador)
 def destination_management(request):
     # Handle POST request for form submission
     if request.method == 'POST':
@@ -3729,7 +3223,7 @@ def destination_management(request):
             return JsonResponse({'status': 'error', 'errors': form.errors})
 
     # Check if the user is an ambassador and filter accordingly
-    if request.user.roles.filter(role='AMBASSADOR').exists():
+    if get_permissions(request.user).is_ambassador:
         # For an ambassador, get only the destinations assigned to them
         all_destinations = request.user.destinations.all().order_by('name')
     else:
@@ -3771,7 +3265,7 @@ def destination_management(request):
     })
  
 @login_required
-@user_passes_test(lambda u: u.is_superuser or u.roles.filter(role='ADMIN').exists())
+@user_passes_test(is_admin)
 def get_destination(request, destination_id):
     destination = get_object_or_404(Destination, id=destination_id)
     data = {
@@ -3782,7 +3276,7 @@ def get_destination(request, destination_id):
     return JsonResponse(data)
  
 @login_required
-@user_passes_test(lambda u: u.is_superuser or u.roles.filter(role='ADMIN').exists())
+@user_passes_test(is_admin)
 def get_destinations_tasks(request):
     country_name = request.GET.get('country_name')
     
@@ -3802,7 +3296,7 @@ def get_destinations_tasks(request):
         return JsonResponse({'error': 'Country not found'}, status=404)
 
 @login_required
-@user_passes_test(lambda u: u.is_superuser or u.roles.filter(role='ADMIN').exists())
+@user_passes_test(is_admin)
 def destination_detail(request, destination_id):
     # Retrieve the destination object or return a 404 if not found
     destination = get_object_or_404(Destination, id=destination_id)
@@ -3839,8 +3333,8 @@ def destination_detail(request, destination_id):
         'destination': destination,
         'ambassador_details': page_obj.object_list,
         'page_obj': page_obj,
-        'is_admin': request.user.is_superuser or request.user.roles.filter(role='ADMIN').exists(),
-        'is_ambassador': request.user.roles.filter(role='AMBASSADOR').exists(),
+        'is_admin': get_permissions(request.user).is_admin,
+        'is_ambassador': get_permissions(request.user).is_ambassador,
         'is_staff': request.user.is_staff,
         'is_superuser': request.user.is_superuser,
     }
@@ -3853,7 +3347,7 @@ def ambassador_profile(request, ambassador_id):
     return render(request, 'ambassador_profile.html', {'ambassador': ambassador})
  
 @login_required
-@user_passes_test(lambda u: u.is_superuser or u.roles.filter(role='ADMIN').exists())
+@user_passes_test(is_admin)
 def create_destination(request):
     if request.method == 'POST':
         form = DestinationForm(request.POST)
@@ -3875,7 +3369,7 @@ def create_destination(request):
     })
 
 @login_required
-@user_passes_test(lambda u: u.is_superuser or u.roles.filter(role='ADMIN').exists())
+@user_passes_test(is_admin)
 def edit_destination(request):
     if request.method == 'POST':
         destination_id = request.POST.get('id')
@@ -3909,7 +3403,7 @@ def edit_destination(request):
     return JsonResponse({'status': 'error', 'message': 'Invalid request method.'})
 
 @login_required
-@user_passes_test(lambda u: u.is_superuser or u.roles.filter(role='ADMIN').exists())
+@user_passes_test(is_admin)
 def delete_destination(request, destination_id):
     destination = get_object_or_404(Destination, id=destination_id)
     name = destination.name
@@ -3950,7 +3444,7 @@ def search_destinations(request):
         return JsonResponse({
             'status': 'success',
             'destinations': destination_data,
-            'is_admin': request.user.is_superuser or request.user.roles.filter(role='ADMIN').exists()
+            'is_admin': get_permissions(request.user).is_admin
         })
     except Exception as e:
         logger.error(f"Error in search_destinations: {str(e)}", exc_info=True)
@@ -3969,16 +3463,15 @@ def start_scraping(request, project_id):
         messages.warning(request, f"Sites Gathering is already in progress for project: {scraping_task.project_title}")
         return JsonResponse({"status": "warning", "message": "Sites Gathering already in progress"})
     
+    if scraping_task.status == 'QUEUED':
+        return JsonResponse({"status": "warning", "message": "Sites Gathering already queued"})
+
     try:
-        logger.info(f"Calling process_scraping_task with task_id: {scraping_task.id}")
-        celery_task = process_scraping_task(scraping_task.id)
-        
-        logger.info(f"Celery task created with id: {celery_task.id}")
-        scraping_task.status = 'IN_PROGRESS'
-        scraping_task.celery_task_id = celery_task.id
-        scraping_task.save()
-        
-        logger.info(f"Sites Gathering started for project: {scraping_task.project_title} (ID: {scraping_task.id})")
+        logger.info(f"Queueing process_scraping_task for task_id: {scraping_task.id}")
+        with transaction.atomic():
+            submit_scraping_task(scraping_task, form_data=scraping_task.form_data, priority=scraping_task.priority)
+
+        logger.info(f"Sites Gathering queued for project: {scraping_task.project_title} (ID: {scraping_task.id})")
         messages.success(request, f"Sites Gathering started for project: {scraping_task.project_title}")
         return JsonResponse({"status": "success", "message": "Sites Gathering started successfully"})
     
@@ -4238,7 +3731,7 @@ def save_business_from_json(task, business_data, query, form_data=None):
         raise
 
 @method_decorator(login_required, name='dispatch')
-@method_decorator(user_passes_test(lambda u: u.is_superuser or u.roles.filter(role='ADMIN').exists()), name='dispatch')
+@method_decorator(user_passes_test(is_admin), name='dispatch')
 class UploadScrapingResultsView(View):
     def get(self, request):
         tasks = ScrapingTask.objects.all()
@@ -4400,7 +3893,7 @@ def delete_task(request, id):
     user = request.user
     try:
         # If superuser or admin => can delete any
-        if user.is_superuser or user.roles.filter(role='ADMIN').exists():
+        if get_permissions(user).is_admin:
             task = ScrapingTask.objects.get(id=id)
         else:
             # Must be the task's owner
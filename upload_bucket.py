@@ -4,6 +4,8 @@ import click
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
+from automation.services.media_sync import MediaSync
+
 # Cargar variables de entorno
 load_dotenv()
 
@@ -33,29 +35,37 @@ s3_client = session.client('s3',
 @click.option('--local-dir',
     default='media/',
     help='The local directory to upload from')
-def upload_folder_to_s3(bucket: str, prefix: str, local_dir: str):
+@click.option('--concurrency',
+    default=16,
+    help='Number of files uploaded at once')
+@click.option('--dry-run',
+    is_flag=True,
+    help='Only report what would be uploaded')
+def upload_folder_to_s3(bucket: str, prefix: str, local_dir: str, concurrency: int, dry_run: bool):
     """
     Sube una carpeta local a DigitalOcean Spaces.
 
+    Solo sube los archivos que faltan o cambiaron, en paralelo; si se
+    interrumpe, la siguiente ejecución continúa donde quedó.
+
     :param bucket: Nombre del bucket para subir los archivos
     :param prefix: Prefijo (carpeta) dentro del bucket
     :param local_dir: Directorio local para subir
+    :param concurrency: Archivos subidos a la vez
+    :param dry_run: Solo mostrar lo que se subiría
     """
     if not os.path.exists(local_dir):
         raise click.ClickException(f"The local directory {local_dir} does not exist")
 
-    for root, dirs, files in os.walk(local_dir):
-        for file in files:
-            local_path = os.path.join(root, file)
-            relative_path = os.path.relpath(local_path, local_dir)
-            s3_path = os.path.join(prefix, relative_path).replace("\\", "/")
-
-            try:
-                click.echo(f"Uploading {local_path} to {s3_path}")
-                s3_client.upload_file(local_path, bucket, s3_path)
-            except ClientError as e:
-                click.echo(f"Error uploading {local_path}: {e}", err=True)
+    sync = MediaSync(s3_client, bucket, local_dir, prefix=prefix, concurrency=concurrency)
+    report = sync.run(dry_run=dry_run)
 
+    click.echo(f"{report['files']} files, {report['unchanged']} unchanged, "
+               f"{report['to_upload']} to upload ({report['bytes_to_upload'] / (1024 * 1024):.1f} MB)")
+    if dry_run:
+        return
+    if report['failed']:
+        click.echo(f"{report['failed']} files failed to upload; run again to retry them", err=True)
     click.echo("Upload completed")
 
 @click.command()